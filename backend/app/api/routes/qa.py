@@ -1,7 +1,12 @@
 """QA (Question & Answer) API routes."""
+from typing import AsyncIterator
 from fastapi import APIRouter, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 import structlog
+from app.api.sse import format_sse, sse_response
 from app.schemas.qa import AskQuestionRequest, QAResponse
+from app.services.prompt_prefix import prefix_stats
 from app.services.qa_service import qa_service
 from app.core.exceptions import AppException
 
@@ -65,6 +70,55 @@ async def ask_question(request: AskQuestionRequest):
         )
 
 
+@router.post("/ask/stream")
+async def ask_question_stream(request: AskQuestionRequest) -> StreamingResponse:
+    """
+    流式提问接口 - 以 Server-Sent Events 逐步返回回答
+
+    请求体与 `/ask` 相同。
+
+    **Events**:
+    - `token`: `{"content": "回答片段..."}`，随 AI 生成逐个发送
+    - `done`: `{"references": [...], "relatedSteps": [...], "sessionId": "uuid..."}`，
+      回答结束后发送，此时会话历史已保存
+    - `error`: `{"ok": false, "errorCode": "...", "message": "..."}`，生成中途失败时发送
+
+    **Errors** (开始流式响应之前):
+    - 400: Invalid request (invalid URL or question too short/long)
+    - 500: Internal error
+    """
+    try:
+        logger.info("qa_ask_question_stream", repo_url=request.repo_url, question_length=len(request.question))
+
+        # 准备阶段使用同步 GitHub 客户端，放到线程池中避免阻塞事件循环
+        prepared = await run_in_threadpool(qa_service.prepare_question, request)
+
+    except AppException as e:
+        logger.warning(
+            "qa_request_failed",
+            error_code=e.error_code,
+            message=e.message,
+            status=e.status_code,
+        )
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+
+    except Exception as e:
+        logger.error("qa_request_error", error=str(e), exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to process question: {str(e)}",
+        )
+
+    async def events() -> AsyncIterator[str]:
+        async for kind, payload in qa_service.stream_answer(request, prepared):
+            if kind == "token":
+                yield format_sse("token", {"content": payload})
+            else:
+                yield format_sse(kind, payload)
+
+    return sse_response(events())
+
+
 @router.get("/history/{session_id}", response_model=dict)
 async def get_conversation_history(session_id: str):
     """
@@ -158,7 +212,10 @@ async def get_session_stats():
         "ok": true,
         "data": {
             "active_sessions": 5,
-            "total_sessions_created": 42
+            "total_sessions_created": 42,
+            "prompt_prefixes": {
+                "qa": {"requests": 40, "hits": 36, "hit_rate": 0.9}
+            }
         }
     }
     ```
@@ -170,6 +227,8 @@ async def get_session_stats():
             "ok": True,
             "data": {
                 "active_sessions": active_count,
+                # 稳定 prompt 前缀的重复率，可据此判断服务端 prompt 缓存能否命中
+                "prompt_prefixes": prefix_stats.get_stats(),
             },
         }
 
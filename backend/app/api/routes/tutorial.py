@@ -1,9 +1,14 @@
 """Tutorial API routes."""
-from typing import List, Dict, Any
+import asyncio
+from typing import AsyncIterator, List, Dict, Any, Optional
+from datetime import datetime, timezone
 from fastapi import APIRouter, Query
-from pydantic import HttpUrl
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import HttpUrl, ValidationError
 
-from app.core.exceptions import InvalidRepoURLError
+from app.api.sse import format_sse, sse_response
+from app.core.exceptions import AppException, InvalidRepoURLError
 from app.core.logging import get_logger
 from app.schemas.tutorial import (
     FileNode,
@@ -12,11 +17,16 @@ from app.schemas.tutorial import (
     RepositoryStructure,
     Step,
     TutorialData,
+    TutorialJob,
+    TutorialJobRequest,
+    TutorialJobResponse,
     TutorialResponse,
 )
 from app.services.repository_service import repository_service
+from app.services.cache_manager import cache
 from app.services.code_analyzer import CodeAnalyzer
-from app.services.ai_generator import tutorial_generator
+from app.services.ai_generator import PROMPT_VERSION, tutorial_generator
+from app.services.job_queue import JobQueue
 
 logger = get_logger(__name__)
 
@@ -48,22 +58,314 @@ def convert_github_tree_to_file_nodes(tree_data: List[Dict[str, Any]]) -> List[F
     return nodes
 
 
-def get_real_tutorial_data(repo_url: str, language: str = "zh-CN") -> TutorialData:
+def tutorial_cache_key(repo_url: str, commit_sha: str, language: str) -> str:
+    """Get the cache key of a generated tutorial.
+
+    Args:
+        repo_url: GitHub repository URL
+        commit_sha: Commit the tutorial was generated for
+        language: Output language
+
+    Returns:
+        Cache key including the prompt version
+    """
+    return f"tutorial:{repo_url}:{commit_sha}:{language}:p{PROMPT_VERSION}"
+
+
+def get_cached_tutorial(
+    repo_url: str, commit_sha: str, language: str
+) -> Optional[TutorialData]:
+    """Get a previously generated tutorial from cache.
+
+    Args:
+        repo_url: GitHub repository URL
+        commit_sha: Commit the tutorial was generated for
+        language: Output language
+
+    Returns:
+        Cached tutorial data, or None
+    """
+    cached = cache.get(tutorial_cache_key(repo_url, commit_sha, language))
+    if cached is None:
+        return None
+
+    logger.info("tutorial_from_cache", repo_url=repo_url, commit=commit_sha)
+    return TutorialData.model_validate(cached)
+
+
+def cache_tutorial(
+    repo_url: str, commit_sha: str, language: str, tutorial_data: TutorialData
+) -> None:
+    """Store a generated tutorial in cache.
+
+    Args:
+        repo_url: GitHub repository URL
+        commit_sha: Commit the tutorial was generated for
+        language: Output language
+        tutorial_data: Post-processed tutorial data
+    """
+    cache.set(
+        tutorial_cache_key(repo_url, commit_sha, language),
+        tutorial_data.model_dump(mode="json", by_alias=True),
+        tags=repository_service.cache_tags(repo_url, commit_sha),
+    )
+
+
+def get_real_tutorial_data(
+    repo_url: str, language: str = "zh-CN", regenerate: bool = False
+) -> TutorialData:
     """Generate tutorial data using real GitHub API and AI.
 
+    AI-generated tutorials are cached per (repo, commit, language, prompt
+    version); the fallback tutorial used when AI fails is never cached.
+
     Args:
         repo_url: GitHub repository URL
         language: Output language
+        regenerate: Ignore a cached tutorial and generate a new one
 
     Returns:
         Tutorial data with AI-generated learning path
     """
+    commit_sha = repository_service.get_head_sha(repo_url)
+    if not regenerate:
+        cached = get_cached_tutorial(repo_url, commit_sha, language)
+        if cached is not None:
+            return cached
+
     # Fetch real repository information
     logger.info("fetching_real_repo_info", repo_url=repo_url)
     repo_info_data = repository_service.get_repository_info(repo_url)
 
-    # Create RepoInfo from real data
-    repo_info = RepoInfo(
+    # Perform code analysis
+    logger.info("analyzing_code", repo_url=repo_url)
+    analyzer = CodeAnalyzer(repo_url)
+    analysis = analyzer.analyze(commit_sha=commit_sha)
+
+    # Fetch real directory tree
+    logger.info("fetching_real_repo_tree", repo_url=repo_url)
+    tree_data = repository_service.get_repository_tree(
+        repo_url, path="", max_depth=2, ref=commit_sha
+    )
+
+    # Generate learning path with AI
+    try:
+        logger.info("generating_tutorial_with_ai", repo_url=repo_url)
+        ai_tutorial = tutorial_generator.generate(
+            repo_info=repo_info_data,
+            analysis=analysis,
+            language=language,
+            repo_url=repo_url,
+            commit_sha=commit_sha,
+        )
+    except Exception as e:
+        # Fallback to simplified version if AI fails
+        logger.warning("ai_generation_failed_using_fallback", error=str(e))
+        ai_tutorial = None
+
+    tutorial_data = build_tutorial_data(
+        repo_url, repo_info_data, analysis, tree_data, ai_tutorial
+    )
+    if ai_tutorial is not None:
+        cache_tutorial(repo_url, commit_sha, language, tutorial_data)
+    return tutorial_data
+
+
+async def get_real_tutorial_data_async(
+    repo_url: str, language: str = "zh-CN", regenerate: bool = False
+) -> TutorialData:
+    """Async variant of get_real_tutorial_data that never blocks the event loop.
+
+    Args:
+        repo_url: GitHub repository URL
+        language: Output language
+        regenerate: Ignore a cached tutorial and generate a new one
+
+    Returns:
+        Tutorial data with AI-generated learning path
+    """
+    commit_sha = await repository_service.get_head_sha_async(repo_url)
+    if not regenerate:
+        cached = await asyncio.to_thread(
+            get_cached_tutorial, repo_url, commit_sha, language
+        )
+        if cached is not None:
+            return cached
+
+    # Repository info and code analysis are independent; fetch them together
+    logger.info("fetching_real_repo_info", repo_url=repo_url)
+    logger.info("analyzing_code", repo_url=repo_url)
+    repo_info_data, analysis = await asyncio.gather(
+        repository_service.get_repository_info_async(repo_url),
+        CodeAnalyzer(repo_url).analyze_async(commit_sha=commit_sha),
+    )
+
+    # Served from cache: the analysis has just fetched the same tree
+    logger.info("fetching_real_repo_tree", repo_url=repo_url)
+    tree_data = await repository_service.get_repository_tree_async(
+        repo_url, path="", max_depth=2, ref=commit_sha
+    )
+
+    try:
+        logger.info("generating_tutorial_with_ai", repo_url=repo_url)
+        ai_tutorial = await tutorial_generator.generate_async(
+            repo_info=repo_info_data,
+            analysis=analysis,
+            language=language,
+            repo_url=repo_url,
+            commit_sha=commit_sha,
+        )
+    except Exception as e:
+        logger.warning("ai_generation_failed_using_fallback", error=str(e))
+        ai_tutorial = None
+
+    tutorial_data = build_tutorial_data(
+        repo_url, repo_info_data, analysis, tree_data, ai_tutorial
+    )
+    if ai_tutorial is not None:
+        await asyncio.to_thread(
+            cache_tutorial, repo_url, commit_sha, language, tutorial_data
+        )
+    return tutorial_data
+
+
+async def stream_real_tutorial_events(
+    repo_url: str, language: str, commit_sha: str, regenerate: bool = False
+) -> AsyncIterator[str]:
+    """Produce the Server-Sent Events of a streamed tutorial.
+
+    Events:
+    - ``repo``: RepoInfo, as soon as repository info is fetched
+    - ``tree``: root FileNode list of the directory tree
+    - ``analysis``: project type, key files and dependencies
+      (these three are fetched concurrently and sent as each one finishes)
+    - ``overview`` / ``prerequisites`` / ``module`` / ``step``: parts of the
+      AI-generated learning path as the model produces them
+    - ``complete``: the final TutorialData, identical to GET /tutorial
+
+    A cached tutorial is sent as a single ``complete`` event. If AI
+    generation fails midway, ``complete`` carries the fallback tutorial and
+    supersedes any modules/steps streamed before the failure.
+
+    Args:
+        repo_url: GitHub repository URL
+        language: Output language
+        commit_sha: Resolved HEAD commit the tutorial is generated for
+        regenerate: Ignore a cached tutorial and generate a new one
+
+    Yields:
+        Formatted SSE events
+    """
+    if not regenerate:
+        cached = await asyncio.to_thread(
+            get_cached_tutorial, repo_url, commit_sha, language
+        )
+        if cached is not None:
+            yield format_sse("complete", cached.model_dump(mode="json", by_alias=True))
+            return
+
+    # Start everything at once and report each part as soon as it is ready
+    info_task = asyncio.ensure_future(
+        repository_service.get_repository_info_async(repo_url)
+    )
+    tree_task = asyncio.ensure_future(
+        repository_service.get_repository_tree_async(
+            repo_url, path="", max_depth=2, ref=commit_sha
+        )
+    )
+    analysis_task = asyncio.ensure_future(
+        CodeAnalyzer(repo_url).analyze_async(commit_sha=commit_sha)
+    )
+    tasks = (info_task, tree_task, analysis_task)
+
+    try:
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            # Parts finishing together are sent in the usual repo, tree,
+            # analysis order
+            for task in sorted(done, key=tasks.index):
+                if task is info_task:
+                    repo_info_data = task.result()
+                    repo_info = build_repo_info(repo_url, repo_info_data)
+                    yield format_sse(
+                        "repo", repo_info.model_dump(mode="json", by_alias=True)
+                    )
+                elif task is tree_task:
+                    tree_data = task.result()
+                    yield format_sse(
+                        "tree",
+                        [
+                            node.model_dump(mode="json", by_alias=True)
+                            for node in convert_github_tree_to_file_nodes(tree_data)
+                        ],
+                    )
+                else:
+                    analysis = task.result()
+                    yield format_sse(
+                        "analysis",
+                        {
+                            "projectType": analysis["project_type"],
+                            "keyFiles": analysis.get("key_files", []),
+                            "dependencies": analysis.get("dependencies", {}),
+                        },
+                    )
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    ai_tutorial = None
+    try:
+        logger.info("streaming_tutorial_with_ai", repo_url=repo_url)
+        async for kind, payload in tutorial_generator.stream_async(
+            repo_info=repo_info_data,
+            analysis=analysis,
+            language=language,
+            repo_url=repo_url,
+            commit_sha=commit_sha,
+        ):
+            if kind == "tutorial":
+                ai_tutorial = payload
+                continue
+
+            try:
+                if kind == "module":
+                    payload = Module(**payload).model_dump(mode="json", by_alias=True)
+                elif kind == "step":
+                    payload = Step(**payload).model_dump(mode="json", by_alias=True)
+            except ValidationError as e:
+                # The final tutorial is authoritative; skip malformed previews
+                logger.warning("streamed_part_invalid", kind=kind, error=str(e))
+                continue
+            yield format_sse(kind, payload)
+    except Exception as e:
+        logger.warning("ai_generation_failed_using_fallback", error=str(e))
+        ai_tutorial = None
+
+    tutorial_data = build_tutorial_data(
+        repo_url, repo_info_data, analysis, tree_data, ai_tutorial
+    )
+    if ai_tutorial is not None:
+        await asyncio.to_thread(
+            cache_tutorial, repo_url, commit_sha, language, tutorial_data
+        )
+    yield format_sse("complete", tutorial_data.model_dump(mode="json", by_alias=True))
+
+
+def build_repo_info(repo_url: str, repo_info_data: Dict[str, Any]) -> RepoInfo:
+    """Create RepoInfo from fetched repository information.
+
+    Args:
+        repo_url: GitHub repository URL
+        repo_info_data: Repository information from RepositoryService
+
+    Returns:
+        Repository info model
+    """
+    return RepoInfo(
         owner=repo_info_data["owner"],
         name=repo_info_data["name"],
         stars=repo_info_data["stars"],
@@ -71,14 +373,28 @@ def get_real_tutorial_data(repo_url: str, language: str = "zh-CN") -> TutorialDa
         githubUrl=repo_url,
     )
 
-    # Perform code analysis
-    logger.info("analyzing_code", repo_url=repo_url)
-    analyzer = CodeAnalyzer(repo_url)
-    analysis = analyzer.analyze()
 
-    # Fetch real directory tree
-    logger.info("fetching_real_repo_tree", repo_url=repo_url)
-    tree_data = repository_service.get_repository_tree(repo_url, path="", max_depth=2)
+def build_tutorial_data(
+    repo_url: str,
+    repo_info_data: Dict[str, Any],
+    analysis: Dict[str, Any],
+    tree_data: List[Dict[str, Any]],
+    ai_tutorial: Optional[Dict[str, Any]],
+) -> TutorialData:
+    """Assemble TutorialData from fetched repository data and AI output.
+
+    Args:
+        repo_url: GitHub repository URL
+        repo_info_data: Repository information
+        analysis: Code analysis results
+        tree_data: Directory tree data
+        ai_tutorial: AI-generated learning path, or None to use the fallback
+
+    Returns:
+        Tutorial data
+    """
+    # Create RepoInfo from real data
+    repo_info = build_repo_info(repo_url, repo_info_data)
 
     # Convert tree data to FileNode format
     root_directories = convert_github_tree_to_file_nodes(tree_data)
@@ -91,22 +407,12 @@ def get_real_tutorial_data(repo_url: str, language: str = "zh-CN") -> TutorialDa
         keyFiles=key_files,
     )
 
-    # Generate learning path with AI
-    try:
-        logger.info("generating_tutorial_with_ai", repo_url=repo_url)
-        ai_tutorial = tutorial_generator.generate(
-            repo_info=repo_info_data, analysis=analysis, language=language
-        )
-
+    if ai_tutorial is not None:
         overview = ai_tutorial.get("overview", f"{repo_info.name} 项目学习指南")
         prerequisites = ai_tutorial.get("prerequisites", [])
         modules_data = ai_tutorial.get("modules", [])
         steps_data = ai_tutorial.get("steps", [])
-
-    except Exception as e:
-        # Fallback to simplified version if AI fails
-        logger.warning("ai_generation_failed_using_fallback", error=str(e))
-
+    else:
         overview = (
             f"{repo_info.name} 是一个优秀的开源项目，"
             f"采用 {analysis['project_type']['language']} 开发。"
@@ -164,6 +470,55 @@ def get_real_tutorial_data(repo_url: str, language: str = "zh-CN") -> TutorialDa
     )
 
 
+def run_tutorial_job(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Generate a tutorial in a job queue worker thread.
+
+    Args:
+        params: repo_url, language and regenerate as submitted
+
+    Returns:
+        Serialized TutorialData
+    """
+    tutorial_data = get_real_tutorial_data(
+        params["repo_url"], params["language"], regenerate=params["regenerate"]
+    )
+    return tutorial_data.model_dump(mode="json", by_alias=True)
+
+
+def to_tutorial_job(job: Dict[str, Any]) -> TutorialJob:
+    """Convert a job queue entry to the API model.
+
+    Args:
+        job: Job dictionary from JobQueue
+
+    Returns:
+        Tutorial job model
+    """
+
+    def timestamp(value: Optional[float]) -> Optional[datetime]:
+        return datetime.fromtimestamp(value, timezone.utc) if value else None
+
+    return TutorialJob(
+        id=job["id"],
+        status=job["status"],
+        repoUrl=job["params"]["repo_url"],
+        language=job["params"]["language"],
+        createdAt=timestamp(job["created_at"]),
+        startedAt=timestamp(job["started_at"]),
+        finishedAt=timestamp(job["finished_at"]),
+        result=job["result"],
+        error=job["error"],
+    )
+
+
+# Tutorial generation off the request path; started/stopped in the app lifespan
+tutorial_jobs = JobQueue(
+    "tutorial-jobs",
+    run_tutorial_job,
+    formatter=lambda job: to_tutorial_job(job).model_dump(mode="json", by_alias=True),
+)
+
+
 def get_mock_tutorial_data(repo_url: str) -> TutorialData:
     """Generate mock tutorial data for a given repository URL.
 
@@ -573,6 +928,7 @@ async def get_tutorial(
     repo_url: HttpUrl = Query(..., alias="repoUrl", description="GitHub repository URL"),
     language: str = Query("zh-CN", description="Output language"),
     use_mock: bool = Query(False, alias="useMock", description="Use mock data instead of real GitHub API"),
+    regenerate: bool = Query(False, description="Generate a new tutorial instead of serving the cached one"),
 ) -> TutorialResponse:
     """Get tutorial for a GitHub repository.
 
@@ -580,6 +936,7 @@ async def get_tutorial(
         repo_url: GitHub repository URL
         language: Output language code
         use_mock: If True, use mock data; if False, fetch real data from GitHub API
+        regenerate: If True, bypass the tutorial cache and regenerate with AI
 
     Returns:
         Tutorial data
@@ -596,8 +953,104 @@ async def get_tutorial(
         tutorial_data = get_mock_tutorial_data(str(repo_url))
     else:
         logger.info("using_real_github_data")
-        tutorial_data = get_real_tutorial_data(str(repo_url), language=language)
+        tutorial_data = await get_real_tutorial_data_async(
+            str(repo_url), language=language, regenerate=regenerate
+        )
 
     logger.info("tutorial_generated", repo=f"{tutorial_data.repo.owner}/{tutorial_data.repo.name}")
 
     return TutorialResponse(ok=True, data=tutorial_data)
+
+
+@router.get("/tutorial/stream")
+async def stream_tutorial(
+    repo_url: HttpUrl = Query(..., alias="repoUrl", description="GitHub repository URL"),
+    language: str = Query("zh-CN", description="Output language"),
+    regenerate: bool = Query(False, description="Generate a new tutorial instead of serving the cached one"),
+) -> StreamingResponse:
+    """Stream tutorial generation for a GitHub repository as Server-Sent Events.
+
+    See stream_real_tutorial_events for the event sequence.
+
+    Args:
+        repo_url: GitHub repository URL
+        language: Output language code
+        regenerate: If True, bypass the tutorial cache and regenerate with AI
+
+    Returns:
+        text/event-stream response
+
+    Raises:
+        AppException: If the repository cannot be resolved (before streaming starts)
+    """
+    logger.info("stream_tutorial", repo_url=str(repo_url), language=language)
+
+    # Resolve the commit up front so an unknown repository is a normal error response
+    commit_sha = await repository_service.get_head_sha_async(str(repo_url))
+
+    return sse_response(
+        stream_real_tutorial_events(
+            str(repo_url), language, commit_sha, regenerate=regenerate
+        )
+    )
+
+
+@router.post("/tutorial/jobs", response_model=TutorialJobResponse, status_code=202)
+async def submit_tutorial_job(request: TutorialJobRequest) -> TutorialJobResponse:
+    """Queue tutorial generation as a background job.
+
+    A job for the same repository, language and regenerate flag that is
+    still queued or running is returned instead of queueing another one;
+    the callback URL is then added to that job.
+
+    Args:
+        request: Repository, language and optional callback URL
+
+    Returns:
+        The queued (or deduplicated) job; poll GET /tutorial/jobs/{id}
+
+    Raises:
+        AppException: INVALID_CALLBACK_URL (400) if the callback URL points to
+            a non-public or non-allowed host, JOB_QUEUE_FULL (503) if too many
+            jobs are queued
+    """
+    repo_url = str(request.repo_url)
+    logger.info("submit_tutorial_job", repo_url=repo_url, language=request.language)
+
+    # A regenerate request must not be answered by a job serving the cache
+    job = await run_in_threadpool(
+        tutorial_jobs.submit,
+        f"{repo_url}:{request.language}:{int(request.regenerate)}",
+        {
+            "repo_url": repo_url,
+            "language": request.language,
+            "regenerate": request.regenerate,
+        },
+        str(request.callback_url) if request.callback_url else None,
+    )
+
+    return TutorialJobResponse(ok=True, data=to_tutorial_job(job))
+
+
+@router.get("/tutorial/jobs/{job_id}", response_model=TutorialJobResponse)
+async def get_tutorial_job(job_id: str) -> TutorialJobResponse:
+    """Get the status, and once finished the result, of a tutorial job.
+
+    Args:
+        job_id: Job ID returned on submit
+
+    Returns:
+        Job with its tutorial data or error
+
+    Raises:
+        AppException: JOB_NOT_FOUND (404) for unknown or expired jobs
+    """
+    job = await run_in_threadpool(tutorial_jobs.get, job_id)
+    if job is None:
+        raise AppException(
+            error_code="JOB_NOT_FOUND",
+            message=f"Job not found or expired: {job_id}",
+            status_code=404,
+        )
+
+    return TutorialJobResponse(ok=True, data=to_tutorial_job(job))
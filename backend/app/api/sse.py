@@ -0,0 +1,73 @@
+"""Server-Sent Events helpers shared by streaming routes."""
+import json
+from typing import Any, AsyncIterator
+
+from fastapi.responses import StreamingResponse
+
+from app.core.exceptions import AppException
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Format one Server-Sent Event.
+
+    Args:
+        event: Event name
+        data: JSON-serializable payload
+
+    Returns:
+        Event text including the terminating blank line
+    """
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+async def _with_error_event(events: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Turn an exception raised mid-stream into a final error event.
+
+    Once the first event is sent the HTTP status can no longer change, so
+    errors are reported in the same shape as the JSON error responses.
+    """
+    try:
+        async for event in events:
+            yield event
+    except AppException as e:
+        logger.warning("sse_stream_failed", error_code=e.error_code, message=e.message)
+        yield format_sse(
+            "error",
+            {
+                "ok": False,
+                "errorCode": e.error_code,
+                "message": e.message,
+                "details": e.details,
+            },
+        )
+    except Exception as e:
+        logger.error("sse_stream_failed", error=str(e), exc_info=True)
+        yield format_sse(
+            "error",
+            {
+                "ok": False,
+                "errorCode": "INTERNAL_ERROR",
+                "message": "An internal error occurred",
+                "details": {},
+            },
+        )
+
+
+def sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    """Wrap formatted events in a streaming text/event-stream response.
+
+    Args:
+        events: Async iterator of strings produced by format_sse
+
+    Returns:
+        Streaming response with proxy buffering disabled
+    """
+    return StreamingResponse(
+        _with_error_event(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,5 +1,5 @@
 """Application configuration."""
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic_settings import BaseSettings
 
 
@@ -28,6 +28,15 @@ class Settings(BaseSettings):
     # GitHub API Configuration
     github_token: Optional[str] = None
     github_api_base_url: str = "https://api.github.com"
+    github_codeload_base_url: str = "https://codeload.github.com"
+    github_max_concurrency: int = 8  # parallel file fetches per batch
+
+    # Snapshot Configuration (tarball ingestion, served from local disk)
+    snapshot_enabled: bool = False
+    snapshot_dir: str = ".snapshots"
+    snapshot_max_file_size: int = 1024 * 1024  # larger files are not stored
+    snapshot_max_age: int = 7 * 24 * 3600  # seconds snapshots are kept; 0 = forever
+    snapshot_max_bytes: int = 2 * 1024**3  # object store size limit; 0 = unbounded
 
     # AI Model Configuration
     ai_provider: str = "openai"
@@ -37,7 +46,48 @@ class Settings(BaseSettings):
 
     # Cache Configuration
     cache_enabled: bool = True
-    cache_ttl: int = 3600  # 1 hour in seconds
+    cache_ttl: int = 3600  # 1 hour in seconds, for keys without a policy
+    # TTL by key prefix (longest match wins); null = immutable (never expires).
+    # Keys pinned to a commit SHA ("<repo_url>@<sha>") are always immutable.
+    cache_ttl_policies: Dict[str, Optional[int]] = {
+        "repo_head:": 60,  # branch HEAD -> commit SHA resolution
+        "repo_info:": 3600,  # stars/forks change often
+        "repo_tree:": 3600,
+        "file_content:": 3600,
+        "analysis:": None,  # keyed by commit SHA
+        "tutorial:": 7 * 24 * 3600,  # AI output is expensive to regenerate
+    }
+    # Expired repo_info/repo_tree entries are served for this long while a
+    # background refresh runs (stale-while-revalidate); 0 disables it
+    cache_stale_ttl: int = 24 * 3600
+    cache_backend: str = "sqlite"  # persistent tier: "sqlite" or "file"
+    cache_db_path: Optional[str] = None  # default: <cache dir>/cache.db
+    cache_compress_min_bytes: int = 4096  # zlib-compress larger entries
+    cache_memory_max_bytes: int = 64 * 1024 * 1024  # in-process LRU tier
+    cache_janitor_enabled: bool = True
+    cache_janitor_interval: int = 300  # seconds between sweeps
+    cache_janitor_batch_size: int = 500  # entries deleted per transaction
+    cache_max_bytes: int = 512 * 1024 * 1024  # 0 = unbounded
+    cache_max_entries: int = 0  # 0 = unbounded
+    cache_eviction_policy: str = "lru"  # "lru" or "lfu"
+
+    # QA code search (BM25 index over each commit's source files)
+    code_search_enabled: bool = True
+    code_search_max_files: int = 200  # files indexed per commit
+    code_search_max_file_size: int = 100_000  # larger files are not indexed
+    code_search_top_k: int = 5  # chunks added to each question's context
+
+    # QA prompt size: history and context are ranked and packed into this
+    # many tokens (system prompt and question included)
+    qa_prompt_token_budget: int = 8000
+
+    # Background Jobs (tutorial generation queue)
+    job_db_path: Optional[str] = None  # default: .cache/jobs.db
+    job_workers: int = 2  # concurrent tutorial generations
+    job_max_pending: int = 100  # queued jobs before submit is rejected; 0 = unbounded
+    job_retention: int = 24 * 3600  # seconds finished jobs (and results) are kept
+    job_callback_timeout: float = 10.0
+    job_callback_allowed_hosts: List[str] = []  # empty = any public host
 
     # Rate Limiting (for future use)
     rate_limit_enabled: bool = False
@@ -1,4 +1,7 @@
 """FastAPI application entry point."""
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -6,16 +9,37 @@ from app.api.routes import tutorial, qa
 from app.config import settings
 from app.core.logging import setup_logging
 from app.middleware.error_handler import add_exception_handlers
+from app.services.cache_janitor import cache_janitor
+from app.services.repository_service import repository_service
 
 # Initialize logging
 setup_logging(settings.log_level)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Manage resources shared across requests.
+
+    Args:
+        app: FastAPI application instance
+    """
+    if settings.cache_janitor_enabled:
+        cache_janitor.start()
+    tutorial.tutorial_jobs.start()
+    yield
+    # Interrupted jobs are persisted and requeued on the next start
+    tutorial.tutorial_jobs.stop(timeout=5)
+    cache_janitor.stop()
+    await repository_service.async_github_client.aclose()
+
+
 # Create FastAPI application
 app = FastAPI(
     title=settings.app_name,
     description="GitHub 项目学习助手 API",
     version=settings.app_version,
     debug=settings.debug,
+    lifespan=lifespan,
 )
 
 # CORS configuration - hardcoded to avoid env variable issues
@@ -1,5 +1,6 @@
 """Tutorial data schemas."""
-from typing import Optional
+from datetime import datetime
+from typing import Literal, Optional
 
 from pydantic import BaseModel, Field, HttpUrl
 
@@ -119,6 +120,54 @@ class TutorialResponse(BaseModel):
     data: TutorialData = Field(..., description="Tutorial data")
 
 
+class TutorialJobRequest(BaseModel):
+    """Background tutorial generation request."""
+
+    repo_url: HttpUrl = Field(..., alias="repoUrl", description="Repository URL")
+    language: str = Field("zh-CN", description="Output language")
+    regenerate: bool = Field(False, description="Bypass the tutorial cache")
+    callback_url: Optional[HttpUrl] = Field(
+        None, alias="callbackUrl", description="URL the finished job is POSTed to"
+    )
+
+    class Config:
+        populate_by_name = True
+
+
+class TutorialJob(BaseModel):
+    """Background tutorial generation job."""
+
+    id: str = Field(..., description="Job ID")
+    status: Literal["queued", "running", "succeeded", "failed"] = Field(
+        ..., description="Job status"
+    )
+    repo_url: str = Field(..., alias="repoUrl", description="Repository URL")
+    language: str = Field(..., description="Output language")
+    created_at: datetime = Field(..., alias="createdAt", description="Submit time")
+    started_at: Optional[datetime] = Field(
+        None, alias="startedAt", description="Time a worker picked the job up"
+    )
+    finished_at: Optional[datetime] = Field(
+        None, alias="finishedAt", description="Completion time"
+    )
+    result: Optional[TutorialData] = Field(
+        None, description="Tutorial data, once the job succeeded"
+    )
+    error: Optional[dict] = Field(
+        None, description="errorCode and message, if the job failed"
+    )
+
+    class Config:
+        populate_by_name = True
+
+
+class TutorialJobResponse(BaseModel):
+    """Background tutorial job API response."""
+
+    ok: bool = Field(True, description="Success status")
+    data: TutorialJob = Field(..., description="Job")
+
+
 class ErrorResponse(BaseModel):
     """Error API response."""
 
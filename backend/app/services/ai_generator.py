@@ -1,67 +1,33 @@
 """AI-powered tutorial generation service."""
+import asyncio
+import hashlib
 import json
 import structlog
-from typing import Dict, Any, List, Optional
-from openai import OpenAI
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
+from openai import AsyncOpenAI, OpenAI
 
 from app.config import settings
 from app.core.exceptions import AppException
+from app.services.file_store import LineIndexedFile, file_store
+from app.services.json_stream import JSONStreamParser
+from app.services.prompt_prefix import PromptLayout, prefix_stats
+from app.services.single_flight import SingleFlight
 
 logger = structlog.get_logger()
 
+# Bump when prompts or post-processing change so cached tutorials are regenerated
+PROMPT_VERSION = 4
 
-class PromptBuilder:
-    """Builds prompts for AI model based on project analysis."""
-
-    @staticmethod
-    def build_tutorial_prompt(
-        repo_info: Dict[str, Any],
-        analysis: Dict[str, Any],
-        language: str = "zh-CN",
-    ) -> str:
-        """Build tutorial generation prompt.
-
-        Args:
-            repo_info: Repository information
-            analysis: Code analysis results
-            language: Output language (zh-CN or en-US)
-
-        Returns:
-            Formatted prompt string
-        """
-        project_type = analysis["project_type"]
-        structure = analysis["structure"]
-        dependencies = analysis["dependencies"]
-
-        prompt = f"""你是一位经验丰富的技术导师，专门帮助开发者学习开源项目。
+TUTORIAL_SYSTEM_PROMPT = "You are an expert technical educator who creates structured learning paths for open source projects. Always output valid JSON."
 
-## 项目信息
-- 名称: {repo_info['name']}
-- 作者: {repo_info['owner']}
-- 类型: {project_type['primary_type']}
-- 框架: {project_type.get('framework', 'N/A')}
-- 语言: {project_type['language']}
-- Stars: {repo_info['stars']:,}
+# Fixed part of the tutorial prompt; project data follows it (see
+# PromptBuilder.build_tutorial_layout). Keep request data out of it so every
+# tutorial request shares this prefix.
+TUTORIAL_INSTRUCTIONS = """你是一位经验丰富的技术导师，专门帮助开发者学习开源项目。
 
-## 项目结构
-- 总目录数: {structure['total_directories']}
-- 关键目录: {', '.join([d['name'] for d in structure.get('key_directories', [])[:5]])}
-
-## 依赖信息
-"""
-
-        if dependencies:
-            pkg_mgr = dependencies.get("package_manager", "N/A")
-            prompt += f"- 包管理器: {pkg_mgr}\n"
-
-            if "core_dependencies" in dependencies:
-                core_deps = dependencies["core_dependencies"][:5]
-                prompt += f"- 核心依赖: {', '.join(core_deps)}\n"
-
-        prompt += """
 ## 任务要求
 
-请为这个项目创建一个结构化的学习路径，帮助开发者从零开始理解和运行项目。
+请为下面给出的项目创建一个结构化的学习路径，帮助开发者从零开始理解和运行项目。
 
 输出格式必须是有效的 JSON，包含以下结构：
 
@@ -84,7 +50,12 @@ class PromptBuilder:
       "title": "步骤标题",
       "description": "步骤描述",
       "moduleId": "module-1",
-      "tips": ["提示1", "提示2"]
+      "tips": ["提示1", "提示2"],
+      "filePath": "本步骤讲解的文件路径",
+      "lineStart": 1,
+      "lineEnd": 10,
+      "codeSnippet": "该文件第 lineStart 到 lineEnd 行的原文",
+      "explanation": "代码讲解（2-3句话）"
     }
   ]
 }
@@ -99,17 +70,98 @@ class PromptBuilder:
    - 模块 3: 关键功能深入
    - 模块 4（可选）: 进阶内容
 4. **学习步骤**: 每个模块 2-4 个具体步骤
+   - filePath 使用项目信息中列出的关键文件或目录下真实存在的文件
+   - codeSnippet 逐字摘录该文件的 3-15 行代码，不要改写或省略
 
 请确保：
 - 步骤循序渐进，从简单到复杂
 - 每个步骤都有清晰的目标和提示
 - 估算时间要合理
-- 内容针对{project_type['primary_type']}项目特点
 - 输出纯 JSON，不要有其他文字
 
+"""
+
+
+class PromptBuilder:
+    """Builds prompts for AI model based on project analysis."""
+
+    @staticmethod
+    def build_tutorial_layout(
+        repo_info: Dict[str, Any],
+        analysis: Dict[str, Any],
+        language: str = "zh-CN",
+    ) -> PromptLayout:
+        """Build the tutorial generation prompt as stable prefix + project data.
+
+        The prefix (TUTORIAL_INSTRUCTIONS) is identical for every repository,
+        so providers can serve it from their prompt cache.
+
+        Args:
+            repo_info: Repository information
+            analysis: Code analysis results
+            language: Output language (zh-CN or en-US)
+
+        Returns:
+            Prompt layout
+        """
+        project_type = analysis["project_type"]
+        structure = analysis["structure"]
+        dependencies = analysis["dependencies"]
+        # Real paths the steps can cite (their lines are verified afterwards)
+        key_files = "\n".join(
+            f"- {file_info['path']}" for file_info in analysis.get("key_files", [])[:8]
+        ) or "- README.md"
+
+        body = f"""## 项目信息
+- 名称: {repo_info['name']}
+- 作者: {repo_info['owner']}
+- 类型: {project_type['primary_type']}
+- 框架: {project_type.get('framework', 'N/A')}
+- 语言: {project_type['language']}
+- Stars: {repo_info['stars']:,}
+
+## 项目结构
+- 总目录数: {structure['total_directories']}
+- 关键目录: {', '.join([d['name'] for d in structure.get('key_directories', [])[:5]])}
+
+## 关键文件
+{key_files}
+
+## 依赖信息
+"""
+
+        if dependencies:
+            pkg_mgr = dependencies.get("package_manager", "N/A")
+            body += f"- 包管理器: {pkg_mgr}\n"
+
+            if "core_dependencies" in dependencies:
+                core_deps = dependencies["core_dependencies"][:5]
+                body += f"- 核心依赖: {', '.join(core_deps)}\n"
+
+        body += f"""
+内容要针对{project_type['primary_type']}项目特点。
+
 请生成学习路径："""
 
-        return prompt
+        return PromptLayout(prefix=TUTORIAL_INSTRUCTIONS, body=body)
+
+    @staticmethod
+    def build_tutorial_prompt(
+        repo_info: Dict[str, Any],
+        analysis: Dict[str, Any],
+        language: str = "zh-CN",
+    ) -> str:
+        """Build tutorial generation prompt.
+
+        Args:
+            repo_info: Repository information
+            analysis: Code analysis results
+            language: Output language (zh-CN or en-US)
+
+        Returns:
+            Formatted prompt string
+        """
+        return PromptBuilder.build_tutorial_layout(repo_info, analysis, language).prompt
 
     @staticmethod
     def build_step_details_prompt(
@@ -170,12 +222,14 @@ class AIGenerator:
         if not self.api_key:
             logger.warning("openai_api_key_not_configured")
             self.client = None
+            self.async_client = None
         else:
             # 支持 OpenRouter 等兼容 OpenAI 的 API
             client_kwargs = {"api_key": self.api_key}
             if self.base_url:
                 client_kwargs["base_url"] = self.base_url
             self.client = OpenAI(**client_kwargs)
+            self.async_client = AsyncOpenAI(**client_kwargs)
             logger.info("ai_generator_initialized", model=self.model, base_url=self.base_url or "default")
 
     def is_available(self) -> bool:
@@ -186,6 +240,82 @@ class AIGenerator:
         """
         return self.client is not None
 
+    def _ensure_available(self, message: str) -> None:
+        """Raise if no API key is configured.
+
+        Args:
+            message: Error message for the client
+
+        Raises:
+            AppException: If AI generator is not available
+        """
+        if not self.is_available():
+            raise AppException(
+                error_code="AI_NOT_CONFIGURED",
+                message=message,
+                status_code=503,
+            )
+
+    def _build_tutorial_request(
+        self,
+        repo_info: Dict[str, Any],
+        analysis: Dict[str, Any],
+        language: str,
+    ) -> Dict[str, Any]:
+        """Build chat completion arguments for tutorial generation.
+
+        Args:
+            repo_info: Repository information
+            analysis: Code analysis results
+            language: Output language
+
+        Returns:
+            Keyword arguments for chat.completions.create
+        """
+        layout = PromptBuilder.build_tutorial_layout(repo_info, analysis, language)
+        prefix_stats.record("tutorial", TUTORIAL_SYSTEM_PROMPT + layout.prefix)
+
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": TUTORIAL_SYSTEM_PROMPT},
+                {"role": "user", "content": layout.prompt},
+            ],
+            "temperature": 0.7,
+            "max_tokens": 2000,
+            "response_format": {"type": "json_object"},
+        }
+
+    def _parse_tutorial_response(self, content: str) -> Dict[str, Any]:
+        """Parse the JSON tutorial returned by the model.
+
+        Args:
+            content: Raw completion text
+
+        Returns:
+            Generated tutorial structure
+
+        Raises:
+            AppException: If the response is not valid JSON
+        """
+        try:
+            result = json.loads(content)
+        except json.JSONDecodeError as e:
+            logger.error("failed_to_parse_ai_response", error=str(e))
+            raise AppException(
+                error_code="AI_PARSE_ERROR",
+                message="Failed to parse AI response as JSON",
+                status_code=500,
+            )
+
+        logger.info(
+            "tutorial_generated_successfully",
+            modules=len(result.get("modules", [])),
+            steps=len(result.get("steps", [])),
+        )
+
+        return result
+
     def generate_tutorial(
         self,
         repo_info: Dict[str, Any],
@@ -205,55 +335,129 @@ class AIGenerator:
         Raises:
             AppException: If AI generation fails
         """
-        if not self.is_available():
-            raise AppException(
-                error_code="AI_NOT_CONFIGURED",
-                message="OpenAI API key not configured. Please set OPENAI_API_KEY in .env file.",
-                status_code=503,
-            )
+        self._ensure_available(
+            "OpenAI API key not configured. Please set OPENAI_API_KEY in .env file."
+        )
 
         try:
-            # Build prompt
-            prompt = PromptBuilder.build_tutorial_prompt(
-                repo_info, analysis, language
-            )
+            request = self._build_tutorial_request(repo_info, analysis, language)
 
             logger.info("generating_tutorial_with_ai", model=self.model)
 
             # Call OpenAI API
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert technical educator who creates structured learning paths for open source projects. Always output valid JSON.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.7,
-                max_tokens=2000,
-                response_format={"type": "json_object"},
-            )
+            response = self.client.chat.completions.create(**request)
 
             # Parse response
-            content = response.choices[0].message.content
-            result = json.loads(content)
+            self._log_usage("tutorial_tokens_used", response)
+            return self._parse_tutorial_response(response.choices[0].message.content)
 
-            logger.info(
-                "tutorial_generated_successfully",
-                modules=len(result.get("modules", [])),
-                steps=len(result.get("steps", [])),
+        except AppException:
+            raise
+        except Exception as e:
+            logger.error("ai_generation_failed", error=str(e))
+            raise AppException(
+                error_code="AI_GENERATION_ERROR",
+                message=f"AI generation failed: {str(e)}",
+                status_code=500,
             )
 
-            return result
+    async def generate_tutorial_async(
+        self,
+        repo_info: Dict[str, Any],
+        analysis: Dict[str, Any],
+        language: str = "zh-CN",
+    ) -> Dict[str, Any]:
+        """Async variant of generate_tutorial using AsyncOpenAI.
 
-        except json.JSONDecodeError as e:
-            logger.error("failed_to_parse_ai_response", error=str(e))
+        Args:
+            repo_info: Repository information
+            analysis: Code analysis results
+            language: Output language
+
+        Returns:
+            Generated tutorial structure
+
+        Raises:
+            AppException: If AI generation fails
+        """
+        self._ensure_available(
+            "OpenAI API key not configured. Please set OPENAI_API_KEY in .env file."
+        )
+
+        try:
+            request = self._build_tutorial_request(repo_info, analysis, language)
+
+            logger.info("generating_tutorial_with_ai", model=self.model)
+
+            response = await self.async_client.chat.completions.create(**request)
+
+            self._log_usage("tutorial_tokens_used", response)
+            return self._parse_tutorial_response(response.choices[0].message.content)
+
+        except AppException:
+            raise
+        except Exception as e:
+            logger.error("ai_generation_failed", error=str(e))
             raise AppException(
-                error_code="AI_PARSE_ERROR",
-                message="Failed to parse AI response as JSON",
+                error_code="AI_GENERATION_ERROR",
+                message=f"AI generation failed: {str(e)}",
                 status_code=500,
             )
+
+    async def stream_tutorial_async(
+        self,
+        repo_info: Dict[str, Any],
+        analysis: Dict[str, Any],
+        language: str = "zh-CN",
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """Generate tutorial content, yielding parts as the model emits them.
+
+        Yields ("overview", str), ("prerequisites", list), ("module", dict)
+        and ("step", dict) as soon as each part of the JSON output is
+        complete, then ("tutorial", dict) with the whole parsed result.
+
+        Args:
+            repo_info: Repository information
+            analysis: Code analysis results
+            language: Output language
+
+        Yields:
+            (kind, payload) tuples
+
+        Raises:
+            AppException: If AI generation fails
+        """
+        self._ensure_available(
+            "OpenAI API key not configured. Please set OPENAI_API_KEY in .env file."
+        )
+
+        parser = JSONStreamParser(max_depth=2)
+
+        try:
+            request = self._build_tutorial_request(repo_info, analysis, language)
+
+            logger.info("streaming_tutorial_with_ai", model=self.model)
+
+            stream = await self.async_client.chat.completions.create(
+                **request, stream=True
+            )
+
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+
+                for path, value in parser.feed(delta):
+                    if path in (("overview",), ("prerequisites",)):
+                        yield path[0], value
+                    elif len(path) == 2 and path[0] in ("modules", "steps"):
+                        if isinstance(value, dict):
+                            yield path[0][:-1], value
+
+        except AppException:
+            raise
         except Exception as e:
             logger.error("ai_generation_failed", error=str(e))
             raise AppException(
@@ -262,6 +466,8 @@ class AIGenerator:
                 status_code=500,
             )
 
+        yield "tutorial", self._parse_tutorial_response(parser.text)
+
     def enhance_step(
         self, step_info: Dict[str, Any], file_content: str, language: str = "zh-CN"
     ) -> Dict[str, Any]:
@@ -319,34 +525,88 @@ class AIGenerator:
         Raises:
             AppException: If AI generation fails
         """
-        if not self.is_available():
-            raise AppException(
-                error_code="AI_NOT_CONFIGURED",
-                message="OpenAI API key not configured.",
-                status_code=503,
-            )
+        self._ensure_available("OpenAI API key not configured.")
 
         try:
             logger.info("generating_qa_answer_with_ai", model=self.model)
 
             # Call OpenAI API
             response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=0.3,  # Lower temperature for more factual answers
-                max_tokens=1000,
+                **self._build_qa_request(messages)
             )
 
-            # Extract answer
-            answer = response.choices[0].message.content
+            return self._extract_qa_answer(response)
+
+        except Exception as e:
+            logger.error("qa_answer_generation_failed", error=str(e))
+            raise AppException(
+                error_code="AI_GENERATION_ERROR",
+                message=f"Failed to generate answer: {str(e)}",
+                status_code=500,
+            )
+
+    async def generate_qa_answer_async(self, messages: List[Dict[str, str]]) -> str:
+        """Async variant of generate_qa_answer using AsyncOpenAI.
+
+        Args:
+            messages: List of messages (system, user, assistant)
+
+        Returns:
+            Generated answer text
+
+        Raises:
+            AppException: If AI generation fails
+        """
+        self._ensure_available("OpenAI API key not configured.")
+
+        try:
+            logger.info("generating_qa_answer_with_ai", model=self.model)
+
+            response = await self.async_client.chat.completions.create(
+                **self._build_qa_request(messages)
+            )
+
+            return self._extract_qa_answer(response)
+
+        except Exception as e:
+            logger.error("qa_answer_generation_failed", error=str(e))
+            raise AppException(
+                error_code="AI_GENERATION_ERROR",
+                message=f"Failed to generate answer: {str(e)}",
+                status_code=500,
+            )
+
+    async def stream_qa_answer_async(
+        self, messages: List[Dict[str, str]]
+    ) -> AsyncIterator[str]:
+        """Generate a QA answer, yielding text as the model produces it.
+
+        Args:
+            messages: List of messages (system, user, assistant)
+
+        Yields:
+            Answer text fragments
+
+        Raises:
+            AppException: If AI generation fails
+        """
+        self._ensure_available("OpenAI API key not configured.")
+
+        answer_length = 0
+        try:
+            logger.info("streaming_qa_answer_with_ai", model=self.model)
 
-            logger.info(
-                "qa_answer_generated",
-                answer_length=len(answer),
-                tokens_used=response.usage.total_tokens if response.usage else 0,
+            stream = await self.async_client.chat.completions.create(
+                **self._build_qa_request(messages), stream=True
             )
 
-            return answer
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    answer_length += len(delta)
+                    yield delta
 
         except Exception as e:
             logger.error("qa_answer_generation_failed", error=str(e))
@@ -356,47 +616,228 @@ class AIGenerator:
                 status_code=500,
             )
 
+        logger.info("qa_answer_generated", answer_length=answer_length)
+
+    def _build_qa_request(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
+        """Build chat completion arguments for QA answers."""
+        return {
+            "model": self.model,
+            "messages": messages,
+            "temperature": 0.3,  # Lower temperature for more factual answers
+            "max_tokens": 1000,
+        }
+
+    def _extract_qa_answer(self, response: Any) -> str:
+        """Extract the answer text from a chat completion response."""
+        answer = response.choices[0].message.content
+
+        self._log_usage("qa_answer_generated", response, answer_length=len(answer))
+
+        return answer
+
+    @staticmethod
+    def _log_usage(event: str, response: Any, **fields: Any) -> None:
+        """Log the token usage of a completion.
+
+        ``cached_tokens`` is the part of the prompt the provider served from
+        its prompt cache (reported by OpenAI-compatible APIs that support it).
+        """
+        usage = getattr(response, "usage", None)
+        details = getattr(usage, "prompt_tokens_details", None)
+        logger.info(
+            event,
+            tokens_used=usage.total_tokens if usage else 0,
+            prompt_tokens=usage.prompt_tokens if usage else 0,
+            cached_tokens=getattr(details, "cached_tokens", None) or 0,
+            **fields,
+        )
+
 
 class TutorialGenerator:
     """High-level tutorial generator combining analysis and AI."""
 
+    # Longest range a step may cite, and how snippet lines are used to locate it
+    MAX_STEP_LINES = 60
+    MIN_ANCHOR_LENGTH = 8
+    MAX_ANCHOR_TRIES = 3
+
     def __init__(self):
         """Initialize tutorial generator."""
         self.ai_generator = AIGenerator()
+        self._flight = SingleFlight()
+
+    def _flight_key(
+        self,
+        repo_info: Dict[str, Any],
+        analysis: Dict[str, Any],
+        language: str,
+        commit_sha: Optional[str] = None,
+    ) -> str:
+        """Identify a generation by its inputs so identical requests coalesce."""
+        inputs = json.dumps(
+            [repo_info, analysis, language, commit_sha], sort_keys=True, default=str
+        )
+        digest = hashlib.sha256(inputs.encode("utf-8")).hexdigest()
+        return f"tutorial:{repo_info.get('full_name')}:{language}:{digest}"
 
     def generate(
         self,
         repo_info: Dict[str, Any],
         analysis: Dict[str, Any],
         language: str = "zh-CN",
+        repo_url: Optional[str] = None,
+        commit_sha: Optional[str] = None,
     ) -> Dict[str, Any]:
         """Generate complete tutorial.
 
+        Concurrent requests for the same inputs share one LLM call.
+
         Args:
             repo_info: Repository information
             analysis: Code analysis results
             language: Output language
+            repo_url: GitHub repository URL; when given, step line ranges and
+                snippets are checked against the repository files
+            commit_sha: Commit the files are read at
 
         Returns:
             Complete tutorial data
         """
+        return self._flight.do(
+            self._flight_key(repo_info, analysis, language, commit_sha),
+            self._generate,
+            repo_info,
+            analysis,
+            language,
+            repo_url,
+            commit_sha,
+        )
+
+    def _generate(
+        self,
+        repo_info: Dict[str, Any],
+        analysis: Dict[str, Any],
+        language: str,
+        repo_url: Optional[str],
+        commit_sha: Optional[str],
+    ) -> Dict[str, Any]:
+        """Generate a tutorial without coalescing (see generate)."""
         logger.info("starting_tutorial_generation", repo=repo_info["name"])
 
         # Generate tutorial structure with AI
         ai_result = self.ai_generator.generate_tutorial(repo_info, analysis, language)
 
         # Post-process and validate
-        tutorial = self._post_process(ai_result, repo_info, analysis)
+        tutorial = self._post_process(
+            ai_result, repo_info, analysis, repo_url, commit_sha
+        )
+
+        logger.info("tutorial_generation_completed", repo=repo_info["name"])
+
+        return tutorial
+
+    async def generate_async(
+        self,
+        repo_info: Dict[str, Any],
+        analysis: Dict[str, Any],
+        language: str = "zh-CN",
+        repo_url: Optional[str] = None,
+        commit_sha: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Async variant of generate.
+
+        Args:
+            repo_info: Repository information
+            analysis: Code analysis results
+            language: Output language
+            repo_url: GitHub repository URL; when given, step line ranges and
+                snippets are checked against the repository files
+            commit_sha: Commit the files are read at
+
+        Returns:
+            Complete tutorial data
+        """
+        return await self._flight.do_async(
+            self._flight_key(repo_info, analysis, language, commit_sha),
+            lambda: self._generate_async(
+                repo_info, analysis, language, repo_url, commit_sha
+            ),
+        )
+
+    async def _generate_async(
+        self,
+        repo_info: Dict[str, Any],
+        analysis: Dict[str, Any],
+        language: str,
+        repo_url: Optional[str],
+        commit_sha: Optional[str],
+    ) -> Dict[str, Any]:
+        """Generate a tutorial without coalescing (see generate_async)."""
+        logger.info("starting_tutorial_generation", repo=repo_info["name"])
+
+        ai_result = await self.ai_generator.generate_tutorial_async(
+            repo_info, analysis, language
+        )
+        # Verifying step locations reads files, so keep it off the event loop
+        tutorial = await asyncio.to_thread(
+            self._post_process, ai_result, repo_info, analysis, repo_url, commit_sha
+        )
 
         logger.info("tutorial_generation_completed", repo=repo_info["name"])
 
         return tutorial
 
+    async def stream_async(
+        self,
+        repo_info: Dict[str, Any],
+        analysis: Dict[str, Any],
+        language: str = "zh-CN",
+        repo_url: Optional[str] = None,
+        commit_sha: Optional[str] = None,
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """Generate a tutorial, yielding its parts as they are produced.
+
+        Streamed steps already carry the same defaults as the final tutorial.
+        Unlike generate_async, concurrent streams are not coalesced: each
+        caller consumes its own token stream.
+
+        Args:
+            repo_info: Repository information
+            analysis: Code analysis results
+            language: Output language
+            repo_url: GitHub repository URL (see generate)
+            commit_sha: Commit the files are read at
+
+        Yields:
+            ("overview" | "prerequisites" | "module" | "step", payload) tuples,
+            then ("tutorial", dict) with the complete post-processed tutorial
+        """
+        logger.info("starting_tutorial_stream", repo=repo_info["name"])
+
+        async for kind, payload in self.ai_generator.stream_tutorial_async(
+            repo_info, analysis, language
+        ):
+            if kind == "step":
+                payload = self._fill_step_defaults(payload)
+            elif kind == "tutorial":
+                payload = await asyncio.to_thread(
+                    self._post_process,
+                    payload,
+                    repo_info,
+                    analysis,
+                    repo_url,
+                    commit_sha,
+                )
+                logger.info("tutorial_generation_completed", repo=repo_info["name"])
+            yield kind, payload
+
     def _post_process(
         self,
         ai_result: Dict[str, Any],
         repo_info: Dict[str, Any],
         analysis: Dict[str, Any],
+        repo_url: Optional[str] = None,
+        commit_sha: Optional[str] = None,
     ) -> Dict[str, Any]:
         """Post-process AI-generated content.
 
@@ -404,6 +845,9 @@ class TutorialGenerator:
             ai_result: AI-generated tutorial
             repo_info: Repository information
             analysis: Code analysis results
+            repo_url: GitHub repository URL to verify step locations against
+                (skipped when None)
+            commit_sha: Commit the files are read at
 
         Returns:
             Processed tutorial data
@@ -432,21 +876,117 @@ class TutorialGenerator:
 
         # Add default values for missing fields
         for step in tutorial["steps"]:
-            if "filePath" not in step:
-                step["filePath"] = "README.md"
-            if "lineStart" not in step:
-                step["lineStart"] = 1
-            if "lineEnd" not in step:
-                step["lineEnd"] = 5
-            if "codeSnippet" not in step:
-                step["codeSnippet"] = "# 查看项目文档"
-            if "explanation" not in step:
-                step["explanation"] = step.get("description", "")
-            if "relatedFiles" not in step:
-                step["relatedFiles"] = []
+            self._fill_step_defaults(step)
+
+        if repo_url:
+            self._verify_step_locations(tutorial["steps"], repo_url, commit_sha)
 
         return tutorial
 
+    def _verify_step_locations(
+        self, steps: List[Dict[str, Any]], repo_url: str, commit_sha: Optional[str]
+    ) -> None:
+        """Correct step line ranges and snippets against the repository files.
+
+        The AI often cites plausible but wrong line numbers. Steps whose file
+        exists are fixed in place (see _verify_step_location); steps whose
+        file cannot be read are left as generated.
+
+        Args:
+            steps: Steps with defaults filled in, modified in place
+            repo_url: GitHub repository URL
+            commit_sha: Commit the files are read at
+        """
+        paths = [
+            step["filePath"] for step in steps if isinstance(step["filePath"], str)
+        ]
+        try:
+            files = file_store.get_many(repo_url, paths, ref=commit_sha)
+        except AppException as e:
+            logger.warning("step_locations_unverified", error=e.message)
+            return
+
+        corrected = [
+            step.get("id")
+            for step in steps
+            if isinstance(step["filePath"], str)
+            and step["filePath"] in files
+            and self._verify_step_location(step, files[step["filePath"]])
+        ]
+        if corrected:
+            logger.info("step_locations_corrected", steps=corrected)
+
+    @classmethod
+    def _verify_step_location(
+        cls, step: Dict[str, Any], indexed: LineIndexedFile
+    ) -> bool:
+        """Point a step's lines and snippet at real content of its file.
+
+        The longest lines of the AI snippet are looked up in the file; when
+        one occurs, the range is moved to the occurrence nearest the cited
+        lines.
+        The range is then clamped to the file (and MAX_STEP_LINES), and the
+        snippet replaced with exactly those lines.
+
+        Args:
+            step: Step to fix, modified in place
+            indexed: Content of the step's file
+
+        Returns:
+            Whether anything changed
+        """
+        original = (step["lineStart"], step["lineEnd"], step["codeSnippet"])
+        try:
+            start, end = int(step["lineStart"]), int(step["lineEnd"])
+        except (TypeError, ValueError):
+            start, end = 1, 5
+
+        # Longer lines are more distinctive; the AI may have altered some lines
+        snippet_lines = str(step["codeSnippet"]).split("\n")
+        candidates = sorted(
+            range(len(snippet_lines)), key=lambda i: -len(snippet_lines[i].strip())
+        )
+        for anchor in candidates[: cls.MAX_ANCHOR_TRIES]:
+            text = snippet_lines[anchor].strip()
+            if len(text) < cls.MIN_ANCHOR_LENGTH:
+                break
+            found = indexed.find(text)
+            if found:
+                line = min(found, key=lambda n: (abs(n - (start + anchor)), n))
+                start = line - anchor
+                end = start + len(snippet_lines) - 1
+                break
+
+        start = min(max(start, 1), indexed.line_count)
+        end = min(max(end, start), start + cls.MAX_STEP_LINES - 1, indexed.line_count)
+        step["lineStart"], step["lineEnd"] = start, end
+        step["codeSnippet"] = indexed.lines(start, end)
+        return (start, end, step["codeSnippet"]) != original
+
+    @staticmethod
+    def _fill_step_defaults(step: Dict[str, Any]) -> Dict[str, Any]:
+        """Add default values for step fields the AI left out.
+
+        Args:
+            step: AI-generated step, modified in place
+
+        Returns:
+            The same step
+        """
+        if "filePath" not in step:
+            step["filePath"] = "README.md"
+        if "lineStart" not in step:
+            step["lineStart"] = 1
+        if "lineEnd" not in step:
+            step["lineEnd"] = 5
+        if "codeSnippet" not in step:
+            step["codeSnippet"] = "# 查看项目文档"
+        if "explanation" not in step:
+            step["explanation"] = step.get("description", "")
+        if "relatedFiles" not in step:
+            step["relatedFiles"] = []
+        return step
+
 
 # Global instance
 tutorial_generator = TutorialGenerator()
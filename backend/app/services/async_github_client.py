@@ -0,0 +1,433 @@
+"""Async GitHub REST API client based on httpx."""
+import asyncio
+import base64
+import structlog
+from typing import Optional, Dict, Any, List
+from urllib.parse import quote
+
+import httpx
+
+from app.config import settings
+from app.core.exceptions import AppException
+from app.services.github_client import build_directory_tree, parse_repo_url
+
+logger = structlog.get_logger()
+
+
+class AsyncGitHubClient:
+    """Non-blocking counterpart of GitHubClient for use inside the event loop."""
+
+    TIMEOUT = 30.0
+
+    def __init__(self, token: Optional[str] = None):
+        """Initialize async GitHub client.
+
+        Args:
+            token: GitHub personal access token. If not provided, uses token from settings.
+        """
+        self.token = token or settings.github_token
+        self._base_url = settings.github_api_base_url.rstrip("/")
+        self._http: Optional[httpx.AsyncClient] = None
+        self._http_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_http(self) -> httpx.AsyncClient:
+        """Get the HTTP client bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._http is None or self._http_loop is not loop:
+            headers = {
+                "Accept": "application/vnd.github+json",
+                "X-GitHub-Api-Version": "2022-11-28",
+            }
+            if self.token:
+                headers["Authorization"] = f"Bearer {self.token}"
+            self._http = httpx.AsyncClient(
+                base_url=self._base_url, headers=headers, timeout=self.TIMEOUT
+            )
+            self._http_loop = loop
+        return self._http
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+            self._http_loop = None
+
+    def parse_repo_url(self, repo_url: str) -> tuple[str, str]:
+        """Parse GitHub repository URL to extract owner and repo name.
+
+        Args:
+            repo_url: GitHub repository URL
+
+        Returns:
+            Tuple of (owner, repo_name)
+        """
+        return parse_repo_url(repo_url)
+
+    async def _get(
+        self,
+        path: str,
+        not_found: AppException,
+        params: Optional[Dict[str, Any]] = None,
+        accept: Optional[str] = None,
+    ) -> httpx.Response:
+        """Send a GET request and map error responses to AppException.
+
+        Args:
+            path: API path relative to the base URL
+            not_found: Exception to raise on 404
+            params: Query parameters
+            accept: Accept header override
+
+        Returns:
+            Successful response
+
+        Raises:
+            AppException: On network errors and non-2xx responses
+        """
+        headers = {"Accept": accept} if accept else None
+
+        try:
+            response = await self._get_http().get(path, params=params, headers=headers)
+        except httpx.HTTPError as e:
+            logger.error("github_request_failed", path=path, error=str(e))
+            raise AppException(
+                error_code="GITHUB_API_ERROR",
+                message=f"GitHub API request failed: {str(e)}",
+                status_code=502,
+            )
+
+        if response.is_success:
+            return response
+
+        if response.status_code == 404:
+            raise not_found
+
+        if response.status_code == 429 or (
+            response.status_code == 403
+            and response.headers.get("x-ratelimit-remaining") == "0"
+        ):
+            logger.error("github_rate_limit_exceeded", path=path)
+            raise AppException(
+                error_code="RATE_LIMIT_EXCEEDED",
+                message="GitHub API rate limit exceeded. Please try again later.",
+                status_code=429,
+            )
+
+        try:
+            message = response.json().get("message", response.text)
+        except ValueError:
+            message = response.text
+        logger.error("github_api_error", status=response.status_code, error=message)
+        raise AppException(
+            error_code="GITHUB_API_ERROR",
+            message=f"GitHub API error: {message}",
+            status_code=response.status_code,
+        )
+
+    def _repo_not_found(self, repo_url: str) -> AppException:
+        return AppException(
+            error_code="REPO_NOT_FOUND",
+            message=f"Repository not found: {repo_url}",
+            status_code=404,
+        )
+
+    async def get_repo_info(self, repo_url: str) -> Dict[str, Any]:
+        """Get basic repository information.
+
+        Args:
+            repo_url: GitHub repository URL
+
+        Returns:
+            Dictionary with the same fields as GitHubClient.get_repo_info
+        """
+        owner, repo = self.parse_repo_url(repo_url)
+        response = await self._get(
+            f"/repos/{owner}/{repo}", not_found=self._repo_not_found(repo_url)
+        )
+        data = response.json()
+
+        info = {
+            "owner": data["owner"]["login"],
+            "name": data["name"],
+            "full_name": data["full_name"],
+            "description": data.get("description") or "",
+            "stars": data.get("stargazers_count", 0),
+            "forks": data.get("forks_count", 0),
+            "language": data.get("language") or "Unknown",
+            "topics": data.get("topics", []),
+            "default_branch": data.get("default_branch"),
+            "created_at": data.get("created_at"),
+            "updated_at": data.get("updated_at"),
+            "clone_url": data.get("clone_url"),
+            "homepage": data.get("homepage") or "",
+            "license": (data.get("license") or {}).get("name"),
+        }
+
+        logger.info("repo_info_retrieved", repo=info["full_name"], stars=info["stars"])
+        return info
+
+    async def get_commit_sha(self, repo_url: str, ref: Optional[str] = None) -> str:
+        """Resolve a branch, tag or the default branch to a commit SHA.
+
+        Args:
+            repo_url: GitHub repository URL
+            ref: Branch, tag or commit (default: repository default branch)
+
+        Returns:
+            Commit SHA
+        """
+        owner, repo = self.parse_repo_url(repo_url)
+        ref = ref or "HEAD"
+        response = await self._get(
+            f"/repos/{owner}/{repo}/commits/{quote(ref, safe='')}",
+            not_found=AppException(
+                error_code="REF_NOT_FOUND",
+                message=f"Failed to resolve ref '{ref}'",
+                status_code=404,
+            ),
+            accept="application/vnd.github.sha",
+        )
+        return response.text.strip()
+
+    async def get_directory_tree(
+        self,
+        repo_url: str,
+        path: str = "",
+        max_depth: int = 3,
+        ref: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Get directory tree structure of repository.
+
+        Args:
+            repo_url: GitHub repository URL
+            path: Starting path in repository (default: root)
+            max_depth: Maximum depth to traverse (default: 3)
+            ref: Commit SHA or branch name (default: default branch HEAD)
+
+        Returns:
+            List of file/directory nodes (same shape as GitHubClient)
+        """
+        owner, repo = self.parse_repo_url(repo_url)
+        ref = ref or await self.get_commit_sha(repo_url)
+        prefix = path.strip("/")
+        not_found = AppException(
+            error_code="TREE_FETCH_FAILED",
+            message=f"Path not found in repository: {path}",
+            status_code=404,
+        )
+
+        response = await self._get(
+            f"/repos/{owner}/{repo}/git/trees/{ref}",
+            not_found=not_found,
+            params={"recursive": "1"},
+        )
+        data = response.json()
+
+        if data.get("truncated"):
+            logger.warning(
+                "git_tree_truncated_falling_back",
+                repo=f"{owner}/{repo}",
+                ref=ref,
+                entries=len(data.get("tree", [])),
+            )
+            entries = await self._walk_git_tree(owner, repo, ref, prefix, max_depth)
+        else:
+            entries = data.get("tree", [])
+
+        if prefix and not any(
+            e["path"] == prefix or e["path"].startswith(prefix + "/") for e in entries
+        ):
+            raise not_found
+
+        tree = build_directory_tree(entries, prefix, max_depth)
+        logger.info(
+            "directory_tree_retrieved",
+            repo=f"{owner}/{repo}",
+            path=path,
+            nodes=len(tree),
+        )
+        return tree
+
+    async def get_file_paths(
+        self, repo_url: str, ref: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """List every file path of a commit with one recursive tree request.
+
+        Args:
+            repo_url: GitHub repository URL
+            ref: Commit SHA or branch name (default: default branch HEAD)
+
+        Returns:
+            Dictionary with ``paths`` and ``truncated`` (same as GitHubClient)
+        """
+        owner, repo = self.parse_repo_url(repo_url)
+        ref = ref or await self.get_commit_sha(repo_url)
+
+        response = await self._get(
+            f"/repos/{owner}/{repo}/git/trees/{ref}",
+            not_found=self._repo_not_found(repo_url),
+            params={"recursive": "1"},
+        )
+        data = response.json()
+
+        truncated = bool(data.get("truncated"))
+        paths = [e["path"] for e in data.get("tree", []) if e.get("type") == "blob"]
+        logger.info(
+            "file_paths_listed",
+            repo=f"{owner}/{repo}",
+            files=len(paths),
+            truncated=truncated,
+        )
+        return {"paths": paths, "truncated": truncated}
+
+    async def _walk_git_tree(
+        self, owner: str, repo: str, ref: str, prefix: str, max_depth: int
+    ) -> List[Dict[str, Any]]:
+        """Collect tree entries level by level, fetching each level concurrently.
+
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            ref: Commit SHA or branch name
+            prefix: Starting path (without leading/trailing slashes)
+            max_depth: Maximum depth to traverse
+
+        Returns:
+            Flat list of tree entries with full paths
+        """
+        not_found = AppException(
+            error_code="TREE_FETCH_FAILED",
+            message=f"Failed to fetch tree for {owner}/{repo}",
+            status_code=404,
+        )
+
+        async def fetch_level(sha: str, base: str) -> List[Dict[str, Any]]:
+            response = await self._get(
+                f"/repos/{owner}/{repo}/git/trees/{sha}", not_found=not_found
+            )
+            return [
+                {**e, "path": f"{base}/{e['path']}" if base else e["path"]}
+                for e in response.json().get("tree", [])
+            ]
+
+        entries: List[Dict[str, Any]] = []
+        tree_sha, walked = ref, ""
+
+        # Resolve the starting directory one path component at a time
+        for part in [p for p in prefix.split("/") if p]:
+            level = await fetch_level(tree_sha, walked)
+            walked = f"{walked}/{part}" if walked else part
+            match = next((e for e in level if e["path"] == walked), None)
+            if match is None:
+                return []
+            entries.append(match)
+            if match["type"] != "tree":
+                return entries
+            tree_sha = match["sha"]
+
+        pending = [(tree_sha, prefix)]
+        for depth in range(max_depth):
+            levels = await asyncio.gather(
+                *(fetch_level(sha, base) for sha, base in pending)
+            )
+            pending = []
+            for level in levels:
+                entries.extend(level)
+                if depth + 1 < max_depth:
+                    pending.extend(
+                        (e["sha"], e["path"]) for e in level if e["type"] == "tree"
+                    )
+            if not pending:
+                break
+
+        return entries
+
+    async def get_file_content(
+        self, repo_url: str, file_path: str, ref: Optional[str] = None
+    ) -> str:
+        """Get content of a specific file.
+
+        Args:
+            repo_url: GitHub repository URL
+            file_path: Path to file in repository
+            ref: Commit SHA or branch name (default: default branch)
+
+        Returns:
+            File content as string
+
+        Raises:
+            AppException: If file not found or cannot be decoded
+        """
+        owner, repo = self.parse_repo_url(repo_url)
+        response = await self._get(
+            f"/repos/{owner}/{repo}/contents/{quote(file_path.strip('/'))}",
+            not_found=AppException(
+                error_code="FILE_NOT_FOUND",
+                message=f"File not found: {file_path}",
+                status_code=404,
+            ),
+            params={"ref": ref} if ref else None,
+        )
+        data = response.json()
+
+        if isinstance(data, list):
+            raise AppException(
+                error_code="INVALID_FILE_PATH",
+                message=f"Path is a directory, not a file: {file_path}",
+                status_code=400,
+            )
+
+        try:
+            if data.get("encoding") == "none" or (
+                not data.get("content") and data.get("size", 0) > 0
+            ):
+                # Files over 1 MB come without content; read them as a blob
+                raw = await self._get_blob(owner, repo, data["sha"], file_path)
+            else:
+                raw = base64.b64decode(data.get("content", ""))
+            content = raw.decode("utf-8")
+        except (UnicodeDecodeError, ValueError) as e:
+            logger.error("file_decode_failed", file=file_path, error=str(e))
+            raise AppException(
+                error_code="FILE_DECODE_ERROR",
+                message=f"Failed to decode file (binary file?): {file_path}",
+                status_code=400,
+            )
+
+        logger.info(
+            "file_content_retrieved",
+            repo=f"{owner}/{repo}",
+            file=file_path,
+            size=len(content),
+        )
+        return content
+
+    async def _get_blob(
+        self, owner: str, repo: str, sha: str, file_path: str
+    ) -> bytes:
+        """Get the raw bytes of a blob.
+
+        The contents API omits the content of files over 1 MB; the blob API
+        serves files up to 100 MB.
+
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            sha: Blob SHA
+            file_path: Path of the file, for error messages
+
+        Returns:
+            Blob content
+        """
+        response = await self._get(
+            f"/repos/{owner}/{repo}/git/blobs/{sha}",
+            not_found=AppException(
+                error_code="FILE_NOT_FOUND",
+                message=f"File not found: {file_path}",
+                status_code=404,
+            ),
+            accept="application/vnd.github.raw",
+        )
+        logger.info("file_blob_retrieved", file=file_path, size=len(response.content))
+        return response.content
@@ -0,0 +1,870 @@
+"""Storage backends (tiers) for CacheManager."""
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+import structlog
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Dict, Any, Callable, List, Tuple
+
+logger = structlog.get_logger()
+
+
+class CacheBackend(ABC):
+    """A single cache tier storing entry envelopes by key.
+
+    An entry is a JSON-serializable dict with at least ``key``, ``value``,
+    ``cached_at``, ``expires_at`` and ``tags``. Expiry is decided by
+    CacheManager; a backend only stores, returns and removes entries.
+    """
+
+    name = "backend"
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get the entry stored for a key, or None."""
+
+    @abstractmethod
+    def set(self, key: str, entry: Dict[str, Any]) -> bool:
+        """Store an entry, returning True on success."""
+
+    @abstractmethod
+    def delete(self, key: str) -> bool:
+        """Remove an entry, returning True if it existed."""
+
+    @abstractmethod
+    def clear(self) -> int:
+        """Remove all entries, returning how many were removed."""
+
+    @abstractmethod
+    def delete_by_tag(self, tag: str) -> int:
+        """Remove all entries carrying a tag, returning how many were removed."""
+
+    @abstractmethod
+    def delete_by_prefix(self, prefix: str) -> int:
+        """Remove all entries whose key starts with a prefix."""
+
+    def purge_expired(
+        self,
+        limit: Optional[int] = None,
+        grace: int = 0,
+        grace_prefixes: Optional[Tuple[str, ...]] = None,
+    ) -> Tuple[int, int]:
+        """Remove expired entries.
+
+        Args:
+            limit: Maximum number of entries to remove in this call
+            grace: Keep entries that expired less than this many seconds ago
+            grace_prefixes: Only keys with one of these prefixes get the grace
+                period (default: all keys)
+
+        Returns:
+            Tuple of (entries removed, bytes reclaimed)
+        """
+        return 0, 0
+
+    @staticmethod
+    def _purge_cutoff(
+        key: str, grace: int, grace_prefixes: Optional[Tuple[str, ...]]
+    ) -> float:
+        """Expiry time before which an entry for key is purged."""
+        if grace_prefixes is None or key.startswith(grace_prefixes):
+            return time.time() - grace
+        return time.time()
+
+    def evict(
+        self,
+        max_bytes: int = 0,
+        max_entries: int = 0,
+        policy: str = "lru",
+        batch_size: int = 500,
+    ) -> Tuple[int, int]:
+        """Evict entries until the tier is within its size limits.
+
+        Tiers that bound themselves on write keep this no-op default.
+
+        Args:
+            max_bytes: Maximum total entry size (0 = unbounded)
+            max_entries: Maximum number of entries (0 = unbounded)
+            policy: "lru" (least recently used) or "lfu" (least frequently used)
+            batch_size: Entries removed per transaction
+
+        Returns:
+            Tuple of (entries evicted, bytes reclaimed)
+        """
+        return 0, 0
+
+    def touch(self, key: str) -> None:
+        """Record a read of key that a faster tier served.
+
+        Keeps this tier's LRU/LFU order in step with reads that never reach
+        it; tiers without eviction metadata keep this no-op default.
+        """
+
+    def compact(self) -> None:
+        """Return space freed by deletions to the filesystem, if supported."""
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get tier statistics.
+
+        Returns:
+            Dictionary with backend name and hit/miss/eviction counters
+        """
+        return {
+            "backend": self.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class MemoryLRUBackend(CacheBackend):
+    """In-process LRU tier bounded by the JSON-encoded size of its entries.
+
+    Values are returned as stored, without copying; callers must treat cached
+    values as read-only.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_bytes: int):
+        """Initialize memory tier.
+
+        Args:
+            max_bytes: Upper bound for the total size of stored entries
+        """
+        super().__init__()
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def set(self, key: str, entry: Dict[str, Any]) -> bool:
+        size = len(json.dumps(entry, ensure_ascii=False))
+        if size > self.max_bytes:
+            # Never let a single large value flush the whole tier
+            self.delete(key)
+            return False
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.total_bytes -= previous[1]
+            self._entries[key] = (entry, size)
+            self.total_bytes += size
+
+            while self.total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+                self.evictions += 1
+        return True
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            item = self._entries.pop(key, None)
+            if item is None:
+                return False
+            self.total_bytes -= item[1]
+            return True
+
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self.total_bytes = 0
+            return count
+
+    def _delete_matching(
+        self,
+        predicate: Callable[[str, Dict[str, Any]], bool],
+        limit: Optional[int] = None,
+    ) -> Tuple[int, int]:
+        """Remove entries for which predicate(key, entry) is true.
+
+        Returns:
+            Tuple of (entries removed, bytes reclaimed)
+        """
+        with self._lock:
+            matched = [
+                key
+                for key, (entry, _) in self._entries.items()
+                if predicate(key, entry)
+            ][:limit]
+            reclaimed = 0
+            for key in matched:
+                reclaimed += self._entries.pop(key)[1]
+            self.total_bytes -= reclaimed
+        return len(matched), reclaimed
+
+    def delete_by_tag(self, tag: str) -> int:
+        return self._delete_matching(lambda key, entry: tag in entry.get("tags", ()))[0]
+
+    def delete_by_prefix(self, prefix: str) -> int:
+        return self._delete_matching(lambda key, entry: key.startswith(prefix))[0]
+
+    def purge_expired(
+        self,
+        limit: Optional[int] = None,
+        grace: int = 0,
+        grace_prefixes: Optional[Tuple[str, ...]] = None,
+    ) -> Tuple[int, int]:
+        def expired(key: str, entry: Dict[str, Any]) -> bool:
+            expires_at = entry.get("expires_at")
+            return expires_at is not None and expires_at < self._purge_cutoff(
+                key, grace, grace_prefixes
+            )
+
+        return self._delete_matching(expired, limit)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats.update(
+            {
+                "entries": len(self._entries),
+                "total_size": self.total_bytes,
+                "max_size": self.max_bytes,
+            }
+        )
+        return stats
+
+
+class FileBackend(CacheBackend):
+    """Disk tier storing one JSON file per (MD5-hashed) key."""
+
+    name = "file"
+
+    def __init__(self, cache_dir: str):
+        """Initialize file tier.
+
+        Args:
+            cache_dir: Directory to store cache files
+        """
+        super().__init__()
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _get_cache_path(self, key: str) -> Path:
+        cache_key = hashlib.md5(key.encode()).hexdigest()
+        return self.cache_dir / f"{cache_key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        cache_path = self._get_cache_path(key)
+
+        try:
+            with cache_path.open("r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            logger.error("cache_read_failed", key=key, error=str(e))
+            # If cache read fails, remove the corrupted file
+            self.delete(key)
+            self.misses += 1
+            return None
+
+        self.touch(key)
+        self.hits += 1
+        return entry
+
+    def touch(self, key: str) -> None:
+        try:
+            # Track recency for LRU eviction
+            os.utime(self._get_cache_path(key))
+        except OSError:
+            pass
+
+    def set(self, key: str, entry: Dict[str, Any]) -> bool:
+        cache_path = self._get_cache_path(key)
+
+        try:
+            # Write to a temp file first so readers never see partial JSON
+            fd, tmp_name = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_name, cache_path)
+            return True
+
+        except Exception as e:
+            logger.error("cache_write_failed", key=key, error=str(e))
+            return False
+
+    def delete(self, key: str) -> bool:
+        cache_path = self._get_cache_path(key)
+
+        try:
+            cache_path.unlink()
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.error("cache_delete_failed", key=key, error=str(e))
+            return False
+
+    def clear(self) -> int:
+        count = 0
+        try:
+            for cache_file in self.cache_dir.glob("*.json"):
+                cache_file.unlink()
+                count += 1
+        except Exception as e:
+            logger.error("cache_clear_failed", error=str(e))
+        return count
+
+    def _delete_matching(
+        self,
+        predicate: Callable[[str, Dict[str, Any]], bool],
+        limit: Optional[int] = None,
+    ) -> Tuple[int, int]:
+        """Remove entries for which predicate(key, entry) is true.
+
+        Keys are only stored inside the (hashed) files, so this reads them all.
+
+        Returns:
+            Tuple of (entries removed, bytes reclaimed)
+        """
+        count = 0
+        reclaimed = 0
+        for cache_file in self.cache_dir.glob("*.json"):
+            if limit is not None and count >= limit:
+                break
+            try:
+                with cache_file.open("r", encoding="utf-8") as f:
+                    entry = json.load(f)
+                if predicate(entry.get("key", ""), entry):
+                    size = cache_file.stat().st_size
+                    cache_file.unlink()
+                    count += 1
+                    reclaimed += size
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                logger.error("cache_scan_failed", file=str(cache_file), error=str(e))
+        return count, reclaimed
+
+    def delete_by_tag(self, tag: str) -> int:
+        return self._delete_matching(lambda key, entry: tag in entry.get("tags", ()))[0]
+
+    def delete_by_prefix(self, prefix: str) -> int:
+        return self._delete_matching(lambda key, entry: key.startswith(prefix))[0]
+
+    def purge_expired(
+        self,
+        limit: Optional[int] = None,
+        grace: int = 0,
+        grace_prefixes: Optional[Tuple[str, ...]] = None,
+    ) -> Tuple[int, int]:
+        def expired(key: str, entry: Dict[str, Any]) -> bool:
+            expires_at = entry.get("expires_at")
+            return expires_at is not None and expires_at < self._purge_cutoff(
+                key, grace, grace_prefixes
+            )
+
+        return self._delete_matching(expired, limit)
+
+    def evict(
+        self,
+        max_bytes: int = 0,
+        max_entries: int = 0,
+        policy: str = "lru",
+        batch_size: int = 500,
+    ) -> Tuple[int, int]:
+        # Reads refresh the file mtime, so oldest mtime = least recently used.
+        # Access counts aren't tracked on disk; LFU falls back to LRU here.
+        files = []
+        for cache_file in self.cache_dir.glob("*.json"):
+            try:
+                stat = cache_file.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, cache_file))
+
+        total_size = sum(size for _, size, _ in files)
+        count = len(files)
+        evicted = 0
+        reclaimed = 0
+        for _, size, cache_file in sorted(files, key=lambda f: f[0]):
+            if (not max_bytes or total_size <= max_bytes) and (
+                not max_entries or count <= max_entries
+            ):
+                break
+            try:
+                cache_file.unlink()
+            except FileNotFoundError:
+                pass
+            total_size -= size
+            count -= 1
+            evicted += 1
+            reclaimed += size
+
+        self.evictions += evicted
+        return evicted, reclaimed
+
+    def get_stats(self) -> Dict[str, Any]:
+        total_files = 0
+        total_size = 0
+
+        try:
+            for cache_file in self.cache_dir.glob("*.json"):
+                total_files += 1
+                total_size += cache_file.stat().st_size
+        except Exception as e:
+            logger.error("cache_stats_failed", error=str(e))
+
+        stats = super().get_stats()
+        stats.update({"entries": total_files, "total_size": total_size})
+        return stats
+
+
+class SQLiteBackend(CacheBackend):
+    """Persistent tier backed by a single SQLite database in WAL mode.
+
+    Writes are atomic upserts, entries above ``compress_min_bytes`` are
+    zlib-compressed, expiry is indexed for bulk purges, and entry count and
+    total size are kept up to date by triggers so stats never scan the table.
+    Access time and hit count are recorded per entry for LRU/LFU eviction;
+    reads only buffer them in memory, and the buffer is written in one
+    transaction every ACCESS_FLUSH_SIZE reads or ACCESS_FLUSH_INTERVAL
+    seconds (and before evicting), so a read is never a write transaction.
+    Tags live in a secondary ``cache_tags`` table that is cleaned up by a
+    trigger whenever an entry is deleted.
+    """
+
+    name = "sqlite"
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS cache_entries (
+            key TEXT PRIMARY KEY,
+            data BLOB NOT NULL,
+            compressed INTEGER NOT NULL DEFAULT 0,
+            size INTEGER NOT NULL,
+            expires_at REAL,
+            accessed_at REAL NOT NULL DEFAULT 0,
+            hit_count INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_cache_entries_expires_at
+            ON cache_entries (expires_at);
+        CREATE INDEX IF NOT EXISTS idx_cache_entries_accessed_at
+            ON cache_entries (accessed_at);
+        CREATE INDEX IF NOT EXISTS idx_cache_entries_hit_count
+            ON cache_entries (hit_count, accessed_at);
+
+        CREATE TABLE IF NOT EXISTS cache_stats (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            entries INTEGER NOT NULL,
+            total_size INTEGER NOT NULL
+        );
+        INSERT OR IGNORE INTO cache_stats (id, entries, total_size)
+            VALUES (1, 0, 0);
+
+        CREATE TABLE IF NOT EXISTS cache_tags (
+            tag TEXT NOT NULL,
+            key TEXT NOT NULL,
+            PRIMARY KEY (tag, key)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_cache_tags_key ON cache_tags (key);
+    """
+
+    # Recreated on every schema upgrade, as CREATE TRIGGER IF NOT EXISTS
+    # would keep the body of an older version
+    TRIGGERS = """
+        DROP TRIGGER IF EXISTS cache_entries_insert;
+        DROP TRIGGER IF EXISTS cache_entries_update;
+        DROP TRIGGER IF EXISTS cache_entries_delete;
+
+        CREATE TRIGGER cache_entries_insert
+        AFTER INSERT ON cache_entries BEGIN
+            UPDATE cache_stats
+            SET entries = entries + 1, total_size = total_size + NEW.size
+            WHERE id = 1;
+        END;
+        CREATE TRIGGER cache_entries_update
+        AFTER UPDATE OF size ON cache_entries BEGIN
+            UPDATE cache_stats
+            SET total_size = total_size - OLD.size + NEW.size
+            WHERE id = 1;
+        END;
+        CREATE TRIGGER cache_entries_delete
+        AFTER DELETE ON cache_entries BEGIN
+            UPDATE cache_stats
+            SET entries = entries - 1, total_size = total_size - OLD.size
+            WHERE id = 1;
+            DELETE FROM cache_tags WHERE key = OLD.key;
+        END;
+    """
+
+    # Rows and totals written under older definitions
+    RECOUNT = """
+        UPDATE cache_entries SET size = length(data) WHERE size != length(data);
+        UPDATE cache_stats SET
+            entries = (SELECT COUNT(*) FROM cache_entries),
+            total_size = (SELECT COALESCE(SUM(size), 0) FROM cache_entries)
+            WHERE id = 1;
+    """
+
+    # Bumped whenever SCHEMA or TRIGGERS change; stored in PRAGMA user_version
+    # 2: size is the stored (possibly compressed) length
+    SCHEMA_VERSION = 2
+
+    ACCESS_FLUSH_SIZE = 256
+    ACCESS_FLUSH_INTERVAL = 30.0
+
+    # Columns added to cache_entries after it was first created
+    MIGRATIONS = {
+        "accessed_at": "ALTER TABLE cache_entries "
+        "ADD COLUMN accessed_at REAL NOT NULL DEFAULT 0",
+        "hit_count": "ALTER TABLE cache_entries "
+        "ADD COLUMN hit_count INTEGER NOT NULL DEFAULT 0",
+    }
+
+    def __init__(self, db_path: str, compress_min_bytes: int = 4096):
+        """Initialize SQLite tier.
+
+        Args:
+            db_path: Path to the database file
+            compress_min_bytes: Entries at least this large are compressed
+        """
+        super().__init__()
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.compress_min_bytes = compress_min_bytes
+        self._local = threading.local()
+        # key -> (last access time, reads) not yet written to cache_entries
+        self._accesses: Dict[str, Tuple[float, int]] = {}
+        self._access_lock = threading.Lock()
+        self._accesses_flushed_at = time.monotonic()
+
+        conn = self._get_conn()
+        if conn.execute("PRAGMA user_version").fetchone()[0] < self.SCHEMA_VERSION:
+            self._upgrade_schema(conn)
+
+    def _upgrade_schema(self, conn: sqlite3.Connection) -> None:
+        """Create the schema, or bring a database of an older version up to date.
+
+        The columns and version are read again after taking the write lock,
+        so of several processes upgrading the same database only the first
+        one changes it.
+        """
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version >= self.SCHEMA_VERSION:
+                conn.rollback()
+                return
+
+            columns = {
+                row[1] for row in conn.execute("PRAGMA table_info(cache_entries)")
+            }
+            if columns:
+                for column, statement in self.MIGRATIONS.items():
+                    if column not in columns:
+                        conn.execute(statement)
+            # executescript() would commit first; run the scripts one by one
+            for statement in self._split_sql(
+                self.SCHEMA + self.TRIGGERS + self.RECOUNT
+            ):
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        logger.info(
+            "sqlite_cache_schema_upgraded",
+            path=str(self.db_path),
+            version=self.SCHEMA_VERSION,
+        )
+
+    @staticmethod
+    def _split_sql(script: str) -> List[str]:
+        """Split an SQL script into its statements (trigger bodies stay whole)."""
+        statements, statement = [], ""
+        for line in script.splitlines(keepends=True):
+            statement += line
+            if sqlite3.complete_statement(statement):
+                statements.append(statement)
+                statement = ""
+        return statements
+
+    def _get_conn(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            # Only takes effect on a new database; lets compact() shrink the file
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            row = (
+                self._get_conn()
+                .execute(
+                    "SELECT data, compressed FROM cache_entries WHERE key = ?", (key,)
+                )
+                .fetchone()
+            )
+            if row is None:
+                self.misses += 1
+                return None
+
+            data, compressed = row
+            if compressed:
+                data = zlib.decompress(data)
+            entry = json.loads(data)
+
+        except Exception as e:
+            logger.error("cache_read_failed", key=key, error=str(e))
+            self.delete(key)
+            self.misses += 1
+            return None
+
+        self.touch(key)
+        self.hits += 1
+        return entry
+
+    def touch(self, key: str) -> None:
+        with self._access_lock:
+            _, reads = self._accesses.get(key, (0.0, 0))
+            self._accesses[key] = (time.time(), reads + 1)
+            due = (
+                len(self._accesses) >= self.ACCESS_FLUSH_SIZE
+                or time.monotonic() - self._accesses_flushed_at
+                >= self.ACCESS_FLUSH_INTERVAL
+            )
+        if due:
+            self.flush_accesses()
+
+    def flush_accesses(self) -> None:
+        """Write buffered access times and hit counts in one transaction."""
+        with self._access_lock:
+            accesses, self._accesses = self._accesses, {}
+            self._accesses_flushed_at = time.monotonic()
+        if not accesses:
+            return
+
+        try:
+            conn = self._get_conn()
+            with conn:
+                # MAX: a set() after the buffered read already moved accessed_at
+                conn.executemany(
+                    "UPDATE cache_entries SET accessed_at = MAX(accessed_at, ?), "
+                    "hit_count = hit_count + ? WHERE key = ?",
+                    [
+                        (accessed_at, reads, key)
+                        for key, (accessed_at, reads) in accesses.items()
+                    ],
+                )
+        except Exception as e:
+            logger.error("cache_access_flush_failed", error=str(e))
+
+    def set(self, key: str, entry: Dict[str, Any]) -> bool:
+        data = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+        compressed = len(data) >= self.compress_min_bytes
+        if compressed:
+            data = zlib.compress(data)
+        # Stats and max_bytes eviction count the bytes actually stored
+        size = len(data)
+
+        try:
+            conn = self._get_conn()
+            with conn:
+                conn.execute(
+                    """
+                    INSERT INTO cache_entries
+                        (key, data, compressed, size, expires_at, accessed_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (key) DO UPDATE SET
+                        data = excluded.data,
+                        compressed = excluded.compressed,
+                        size = excluded.size,
+                        expires_at = excluded.expires_at,
+                        accessed_at = excluded.accessed_at
+                    """,
+                    (
+                        key,
+                        data,
+                        int(compressed),
+                        size,
+                        entry.get("expires_at"),
+                        time.time(),
+                    ),
+                )
+                conn.execute("DELETE FROM cache_tags WHERE key = ?", (key,))
+                conn.executemany(
+                    "INSERT OR IGNORE INTO cache_tags (tag, key) VALUES (?, ?)",
+                    [(tag, key) for tag in entry.get("tags", ())],
+                )
+            return True
+
+        except Exception as e:
+            logger.error("cache_write_failed", key=key, error=str(e))
+            return False
+
+    def delete(self, key: str) -> bool:
+        try:
+            conn = self._get_conn()
+            with conn:
+                cursor = conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+            return cursor.rowcount > 0
+
+        except Exception as e:
+            logger.error("cache_delete_failed", key=key, error=str(e))
+            return False
+
+    def clear(self) -> int:
+        try:
+            conn = self._get_conn()
+            with conn:
+                cursor = conn.execute("DELETE FROM cache_entries")
+            return cursor.rowcount
+
+        except Exception as e:
+            logger.error("cache_clear_failed", error=str(e))
+            return 0
+
+    def _delete_where(self, where: str, params: Tuple[Any, ...]) -> int:
+        """Delete entries matching a WHERE clause, returning the row count."""
+        try:
+            conn = self._get_conn()
+            with conn:
+                cursor = conn.execute(
+                    f"DELETE FROM cache_entries WHERE {where}", params
+                )
+            return cursor.rowcount
+
+        except Exception as e:
+            logger.error("cache_bulk_delete_failed", where=where, error=str(e))
+            return 0
+
+    def delete_by_tag(self, tag: str) -> int:
+        return self._delete_where(
+            "key IN (SELECT key FROM cache_tags WHERE tag = ?)", (tag,)
+        )
+
+    def delete_by_prefix(self, prefix: str) -> int:
+        # Range scan on the primary key; chr(0x10FFFF) sorts after any suffix
+        return self._delete_where(
+            "key >= ? AND key < ?", (prefix, prefix + chr(0x10FFFF))
+        )
+
+    def _delete_selected(self, select: str, params: Tuple[Any, ...]) -> Tuple[int, int]:
+        """Delete the (key, size) rows returned by a query in one transaction.
+
+        Returns:
+            Tuple of (entries removed, bytes reclaimed)
+        """
+        try:
+            conn = self._get_conn()
+            with conn:
+                rows = conn.execute(select, params).fetchall()
+                conn.executemany(
+                    "DELETE FROM cache_entries WHERE key = ?",
+                    [(key,) for key, _ in rows],
+                )
+            return len(rows), sum(size for _, size in rows)
+
+        except Exception as e:
+            logger.error("cache_bulk_delete_failed", error=str(e))
+            return 0, 0
+
+    def purge_expired(
+        self,
+        limit: Optional[int] = None,
+        grace: int = 0,
+        grace_prefixes: Optional[Tuple[str, ...]] = None,
+    ) -> Tuple[int, int]:
+        now = time.time()
+        if grace_prefixes is None:
+            grace_prefixes = ("",)
+        # Entries past the grace period, or past expiry without a grace prefix
+        in_grace = " OR ".join("substr(key, 1, ?) = ?" for _ in grace_prefixes)
+        params: List[Any] = [now - grace, now]
+        for prefix in grace_prefixes:
+            params.extend([len(prefix), prefix])
+        params.append(-1 if limit is None else limit)
+        return self._delete_selected(
+            "SELECT key, size FROM cache_entries WHERE expires_at < ? "
+            f"OR (expires_at < ? AND NOT ({in_grace or '0'})) LIMIT ?",
+            tuple(params),
+        )
+
+    def evict(
+        self,
+        max_bytes: int = 0,
+        max_entries: int = 0,
+        policy: str = "lru",
+        batch_size: int = 500,
+    ) -> Tuple[int, int]:
+        self.flush_accesses()
+        order = "hit_count, accessed_at" if policy == "lfu" else "accessed_at"
+        evicted = 0
+        reclaimed = 0
+
+        while True:
+            stats = self.get_stats()
+            over_bytes = max_bytes and stats["total_size"] > max_bytes
+            over_entries = max_entries and stats["entries"] > max_entries
+            if not (over_bytes or over_entries):
+                break
+
+            batch = batch_size
+            if not over_bytes:
+                batch = min(batch_size, stats["entries"] - max_entries)
+            count, size = self._delete_selected(
+                f"SELECT key, size FROM cache_entries ORDER BY {order} LIMIT ?",
+                (batch,),
+            )
+            if not count:
+                break
+            evicted += count
+            reclaimed += size
+
+        self.evictions += evicted
+        return evicted, reclaimed
+
+    def compact(self) -> None:
+        try:
+            conn = self._get_conn()
+            conn.execute("PRAGMA incremental_vacuum")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except Exception as e:
+            logger.error("cache_compact_failed", error=str(e))
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        try:
+            entries, total_size = (
+                self._get_conn()
+                .execute("SELECT entries, total_size FROM cache_stats WHERE id = 1")
+                .fetchone()
+            )
+            stats.update({"entries": entries, "total_size": total_size})
+        except Exception as e:
+            logger.error("cache_stats_failed", error=str(e))
+        return stats
@@ -0,0 +1,145 @@
+"""Background maintenance of the persistent cache tiers."""
+import threading
+import time
+import structlog
+from typing import Optional, Dict, Any
+
+from app.config import settings
+from app.services.cache_manager import STALE_KEY_PREFIXES, CacheManager, cache
+
+logger = structlog.get_logger()
+
+
+class CacheJanitor:
+    """Periodically purges expired entries and enforces cache size limits.
+
+    Each sweep deletes expired entries in small batches (short transactions,
+    so request threads are never blocked for long), then evicts entries by
+    the configured policy until every tier is within ``max_bytes`` and
+    ``max_entries``.
+    """
+
+    def __init__(
+        self,
+        cache_manager: CacheManager,
+        interval: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        policy: Optional[str] = None,
+        batch_size: Optional[int] = None,
+    ):
+        """Initialize cache janitor.
+
+        Args:
+            cache_manager: Cache whose tiers are maintained
+            interval: Seconds between sweeps (default: settings.cache_janitor_interval)
+            max_bytes: Size limit per tier, 0 = unbounded
+                (default: settings.cache_max_bytes)
+            max_entries: Entry limit per tier, 0 = unbounded
+                (default: settings.cache_max_entries)
+            policy: "lru" or "lfu" (default: settings.cache_eviction_policy)
+            batch_size: Entries deleted per transaction
+                (default: settings.cache_janitor_batch_size)
+        """
+        self.cache_manager = cache_manager
+        self.interval = interval or settings.cache_janitor_interval
+        self.max_bytes = settings.cache_max_bytes if max_bytes is None else max_bytes
+        self.max_entries = (
+            settings.cache_max_entries if max_entries is None else max_entries
+        )
+        self.policy = policy or settings.cache_eviction_policy
+        self.batch_size = batch_size or settings.cache_janitor_batch_size
+        self.totals = {"sweeps": 0, "expired": 0, "evicted": 0, "bytes_reclaimed": 0}
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> Dict[str, int]:
+        """Run a single sweep over every cache tier.
+
+        Returns:
+            Dictionary with entries expired, entries evicted and bytes reclaimed
+        """
+        started = time.monotonic()
+        report = {"expired": 0, "evicted": 0, "bytes_reclaimed": 0}
+
+        for backend in self.cache_manager.backends:
+            while not self._stop_event.is_set():
+                count, size = backend.purge_expired(
+                    limit=self.batch_size,
+                    grace=self.cache_manager.stale_ttl,
+                    grace_prefixes=STALE_KEY_PREFIXES,
+                )
+                report["expired"] += count
+                report["bytes_reclaimed"] += size
+                if count < self.batch_size:
+                    break
+
+            count, size = backend.evict(
+                self.max_bytes, self.max_entries, self.policy, self.batch_size
+            )
+            report["evicted"] += count
+            report["bytes_reclaimed"] += size
+
+            if report["expired"] or report["evicted"]:
+                backend.compact()
+
+        self.totals["sweeps"] += 1
+        for name, value in report.items():
+            self.totals[name] += value
+
+        logger.info(
+            "cache_janitor_sweep",
+            duration_ms=round((time.monotonic() - started) * 1000, 1),
+            **report,
+        )
+        return report
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error("cache_janitor_sweep_failed", error=str(e))
+
+    def start(self) -> None:
+        """Start sweeping in a background daemon thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="cache-janitor", daemon=True
+        )
+        self._thread.start()
+        logger.info(
+            "cache_janitor_started",
+            interval=self.interval,
+            max_bytes=self.max_bytes,
+            max_entries=self.max_entries,
+            policy=self.policy,
+        )
+
+    def stop(self) -> None:
+        """Stop the background thread, waiting for a running sweep to finish."""
+        if self._thread is None:
+            return
+
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        logger.info("cache_janitor_stopped", **self.totals)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cumulative janitor statistics.
+
+        Returns:
+            Dictionary with sweep count and totals expired/evicted/reclaimed
+        """
+        return {
+            **self.totals,
+            "running": self._thread is not None and self._thread.is_alive(),
+        }
+
+
+# Global janitor instance for the global cache
+cache_janitor = CacheJanitor(cache)
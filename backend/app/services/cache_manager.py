@@ -1,58 +1,122 @@
 """Cache manager for storing and retrieving cached data."""
-import json
-import hashlib
+import re
+import time
 import structlog
 from pathlib import Path
-from typing import Optional, Any
-from datetime import datetime, timedelta
+from typing import Optional, Any, Dict, List, Tuple
+from datetime import datetime
 
 from app.config import settings
+from app.services.cache_backends import (
+    CacheBackend,
+    FileBackend,
+    MemoryLRUBackend,
+    SQLiteBackend,
+)
 
 logger = structlog.get_logger()
 
+# Keys addressing content at a fixed commit, e.g. "file_content:<url>@<sha>:path"
+COMMIT_PINNED_KEY = re.compile(r"@[0-9a-f]{40}(?::|$)")
+
+# Key families served stale-while-revalidate (see RepositoryService._get_cached);
+# their entries are kept for settings.cache_stale_ttl past expiry
+STALE_KEY_PREFIXES = ("repo_info:", "repo_tree:", "file_paths:")
+
 
 class CacheManager:
-    """File-based cache manager for API responses."""
+    """Tiered cache manager for API responses.
 
-    def __init__(self, cache_dir: str = ".cache"):
+    Lookups go through the backends in order (L1 first); a hit in a lower
+    tier is promoted to the tiers above it. Writes go to every tier.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = ".cache",
+        backends: Optional[List[CacheBackend]] = None,
+    ):
         """Initialize cache manager.
 
         Args:
             cache_dir: Directory to store cache files (relative to project root)
+            backends: Cache tiers, fastest first (default: memory LRU in front of
+                the persistent store selected by settings.cache_backend)
         """
         self.cache_dir = Path(cache_dir)
-        self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.enabled = settings.cache_enabled
         self.ttl = settings.cache_ttl
+        self.ttl_policies = settings.cache_ttl_policies
+        self.stale_ttl = settings.cache_stale_ttl
+        self.backends = backends or [
+            MemoryLRUBackend(settings.cache_memory_max_bytes),
+            self._create_persistent_backend(),
+        ]
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
         logger.info(
             "cache_manager_initialized",
             cache_dir=str(self.cache_dir),
+            backends=[backend.name for backend in self.backends],
             enabled=self.enabled,
             ttl=self.ttl,
         )
 
-    def _get_cache_key(self, key: str) -> str:
-        """Generate cache key hash.
+    def _create_persistent_backend(self) -> CacheBackend:
+        """Create the persistent tier configured by settings.cache_backend."""
+        if settings.cache_backend == "file":
+            return FileBackend(str(self.cache_dir))
+        return SQLiteBackend(
+            settings.cache_db_path or str(self.cache_dir / "cache.db"),
+            compress_min_bytes=settings.cache_compress_min_bytes,
+        )
+
+    def get_ttl(self, key: str) -> Optional[int]:
+        """Get the TTL policy for a key.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            TTL in seconds, or None if the entry never expires
+        """
+        if COMMIT_PINNED_KEY.search(key):
+            return None
+
+        matches = [prefix for prefix in self.ttl_policies if key.startswith(prefix)]
+        if not matches:
+            return self.ttl
+        return self.ttl_policies[max(matches, key=len)]
+
+    def _is_expired(self, entry: Dict[str, Any], grace: int = 0) -> bool:
+        """Check whether a cache entry has expired.
 
         Args:
-            key: Original cache key
+            entry: Cache entry envelope
+            grace: Seconds past expiry during which the entry still counts as live
 
         Returns:
-            MD5 hash of the key
+            True if the entry is past its expiry time (plus grace)
         """
-        return hashlib.md5(key.encode()).hexdigest()
+        if "expires_at" in entry:
+            expires_at = entry["expires_at"]
+        else:
+            # Entries written before expires_at was stored
+            cached_at = datetime.fromisoformat(entry["cached_at"]).timestamp()
+            expires_at = cached_at + entry.get("ttl", self.ttl)
+        return expires_at is not None and time.time() > expires_at + grace
 
-    def _get_cache_path(self, key: str) -> Path:
-        """Get cache file path for a key.
+    def get_stale_grace(self, key: str) -> int:
+        """Get how long past expiry an entry is kept for stale reads.
 
         Args:
             key: Cache key
 
         Returns:
-            Path to cache file
+            self.stale_ttl for stale-while-revalidate key families, else 0
         """
-        cache_key = self._get_cache_key(key)
-        return self.cache_dir / f"{cache_key}.json"
+        return self.stale_ttl if key.startswith(STALE_KEY_PREFIXES) else 0
 
     def get(self, key: str) -> Optional[Any]:
         """Get cached value.
@@ -63,45 +127,80 @@ class CacheManager:
         Returns:
             Cached value if exists and not expired, None otherwise
         """
-        if not self.enabled:
-            return None
-
-        cache_path = self._get_cache_path(key)
-
-        if not cache_path.exists():
-            logger.debug("cache_miss", key=key)
-            return None
-
-        try:
-            with cache_path.open("r", encoding="utf-8") as f:
-                cache_data = json.load(f)
+        return self.get_with_stale(key)[0]
 
-            # Check expiration
-            cached_at = datetime.fromisoformat(cache_data["cached_at"])
-            expires_at = cached_at + timedelta(seconds=self.ttl)
+    def get_with_stale(
+        self, key: str, max_stale: int = 0
+    ) -> Tuple[Optional[Any], bool]:
+        """Get cached value, accepting entries up to max_stale seconds past expiry.
 
-            if datetime.now() > expires_at:
-                logger.debug("cache_expired", key=key)
-                # Remove expired cache
-                cache_path.unlink()
-                return None
+        Args:
+            key: Cache key
+            max_stale: How long after expiry an entry may still be served
 
-            logger.debug("cache_hit", key=key)
-            return cache_data["value"]
+        Returns:
+            Tuple of (cached value or None, whether the value is stale)
+        """
+        if not self.enabled:
+            return None, False
 
-        except Exception as e:
-            logger.error("cache_read_failed", key=key, error=str(e))
-            # If cache read fails, remove the corrupted file
-            if cache_path.exists():
-                cache_path.unlink()
-            return None
+        for level, backend in enumerate(self.backends):
+            entry = backend.get(key)
+            if entry is None:
+                continue
 
-    def set(self, key: str, value: Any) -> bool:
+            try:
+                expired = self._is_expired(entry)
+                unusable = expired and self._is_expired(entry, max_stale)
+                # Entries of stale-while-revalidate families outlive a plain get
+                dead = unusable and self._is_expired(entry, self.get_stale_grace(key))
+            except Exception as e:
+                logger.error("cache_read_failed", key=key, error=str(e))
+                unusable = dead = True
+
+            if unusable:
+                logger.debug("cache_expired", key=key, backend=backend.name)
+                if dead:
+                    backend.delete(key)
+                continue
+
+            # Promote to the faster tiers
+            for upper in self.backends[:level]:
+                upper.set(key, entry)
+            # Keep the slower tiers' LRU/LFU order aware of the read
+            for lower in self.backends[level + 1 :]:
+                lower.touch(key)
+
+            if expired:
+                self.stale_hits += 1
+                logger.debug("cache_stale_hit", key=key, backend=backend.name)
+                return entry["value"], True
+
+            self.hits += 1
+            logger.debug("cache_hit", key=key, backend=backend.name)
+            return entry["value"], False
+
+        self.misses += 1
+        logger.debug("cache_miss", key=key)
+        return None, False
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+    ) -> bool:
         """Set cached value.
 
+        Every entry is tagged with ``kind:<key prefix>`` (e.g. ``kind:repo_tree``)
+        in addition to the given tags.
+
         Args:
             key: Cache key
             value: Value to cache (must be JSON serializable)
+            ttl: Entry TTL in seconds (default: the key's TTL policy)
+            tags: Tags for bulk invalidation (e.g. ``repo:owner/name``)
 
         Returns:
             True if successfully cached, False otherwise
@@ -109,25 +208,25 @@ class CacheManager:
         if not self.enabled:
             return False
 
-        cache_path = self._get_cache_path(key)
-
-        try:
-            cache_data = {
-                "cached_at": datetime.now().isoformat(),
-                "key": key,
-                "value": value,
-            }
-
-            with cache_path.open("w", encoding="utf-8") as f:
-                json.dump(cache_data, f, ensure_ascii=False, indent=2)
-
-            logger.debug("cache_set", key=key)
-            return True
+        ttl = ttl if ttl is not None else self.get_ttl(key)
+        now = time.time()
+        entry = {
+            "cached_at": datetime.fromtimestamp(now).isoformat(),
+            "expires_at": now + ttl if ttl is not None else None,
+            "key": key,
+            "tags": [f"kind:{key.split(':', 1)[0]}", *(tags or [])],
+            "ttl": ttl,
+            "value": value,
+        }
 
-        except Exception as e:
-            logger.error("cache_write_failed", key=key, error=str(e))
+        # A tier may decline an entry (e.g. too large for the memory tier)
+        stored = [backend.set(key, entry) for backend in self.backends]
+        if not any(stored):
             return False
 
+        logger.debug("cache_set", key=key)
+        return True
+
     def delete(self, key: str) -> bool:
         """Delete cached value.
 
@@ -137,64 +236,91 @@ class CacheManager:
         Returns:
             True if cache was deleted, False otherwise
         """
-        cache_path = self._get_cache_path(key)
+        deleted = [backend.delete(key) for backend in self.backends]
+        if any(deleted):
+            logger.debug("cache_deleted", key=key)
+        return any(deleted)
 
-        if cache_path.exists():
-            try:
-                cache_path.unlink()
-                logger.debug("cache_deleted", key=key)
-                return True
-            except Exception as e:
-                logger.error("cache_delete_failed", key=key, error=str(e))
-                return False
+    def invalidate_tag(self, tag: str) -> int:
+        """Delete every entry carrying a tag.
+
+        Args:
+            tag: Tag to invalidate (e.g. ``repo:owner/name`` or ``kind:repo_tree``)
+
+        Returns:
+            Number of entries deleted
+        """
+        count = max(backend.delete_by_tag(tag) for backend in self.backends)
+        logger.info("cache_tag_invalidated", tag=tag, entries_deleted=count)
+        return count
 
-        return False
+    def invalidate_prefix(self, prefix: str) -> int:
+        """Delete every entry whose key starts with a prefix.
+
+        Args:
+            prefix: Key prefix (e.g. ``repo_tree:``)
+
+        Returns:
+            Number of entries deleted
+        """
+        count = max(backend.delete_by_prefix(prefix) for backend in self.backends)
+        logger.info("cache_prefix_invalidated", prefix=prefix, entries_deleted=count)
+        return count
 
     def clear(self) -> int:
         """Clear all cached data.
 
         Returns:
-            Number of cache files deleted
+            Number of entries deleted from the persistent tier
         """
-        count = 0
-        try:
-            for cache_file in self.cache_dir.glob("*.json"):
-                cache_file.unlink()
-                count += 1
+        counts = [backend.clear() for backend in self.backends]
+        logger.info("cache_cleared", files_deleted=counts[-1])
+        return counts[-1]
 
-            logger.info("cache_cleared", files_deleted=count)
-            return count
+    def purge_expired(self) -> int:
+        """Remove expired entries from every tier.
 
-        except Exception as e:
-            logger.error("cache_clear_failed", error=str(e))
-            return count
+        Stale-while-revalidate keys (STALE_KEY_PREFIXES) still within the
+        stale window are kept.
+
+        Returns:
+            Number of entries removed
+        """
+        count = max(
+            backend.purge_expired(
+                grace=self.stale_ttl, grace_prefixes=STALE_KEY_PREFIXES
+            )[0]
+            for backend in self.backends
+        )
+        logger.info("cache_expired_purged", entries_deleted=count)
+        return count
 
     def get_stats(self) -> dict:
         """Get cache statistics.
 
         Returns:
             Dictionary with cache statistics:
-            - total_files: Total number of cache files
-            - total_size: Total size in bytes
+            - total_files: Total number of entries in the persistent tier
+            - total_size: Total size in bytes of the persistent tier
             - enabled: Whether cache is enabled
-            - ttl: Cache TTL in seconds
+            - ttl: Default cache TTL in seconds
+            - ttl_policies: TTL by key prefix (None = immutable)
+            - hits / misses: Lookups answered / not answered by any tier
+            - stale_hits: Lookups answered with an expired (stale) value
+            - tiers: Per-backend statistics, including evictions
         """
-        total_files = 0
-        total_size = 0
-
-        try:
-            for cache_file in self.cache_dir.glob("*.json"):
-                total_files += 1
-                total_size += cache_file.stat().st_size
-
-        except Exception as e:
-            logger.error("cache_stats_failed", error=str(e))
+        tiers = [backend.get_stats() for backend in self.backends]
 
         return {
-            "total_files": total_files,
-            "total_size": total_size,
+            "total_files": tiers[-1].get("entries", 0),
+            "total_size": tiers[-1].get("total_size", 0),
             "enabled": self.enabled,
             "ttl": self.ttl,
+            "ttl_policies": self.ttl_policies,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "tiers": tiers,
         }
 
 
@@ -1,11 +1,14 @@
 """Code analyzer for identifying project type, structure, and dependencies."""
-import json
-import re
+import asyncio
 import structlog
 from typing import Dict, Any, List, Optional, Set
 from pathlib import Path
 
+from app.services.cache_manager import cache
+from app.services.manifest_bundle import MANIFEST_FILES, ManifestBundle
+from app.services.path_index import PathIndex
 from app.services.repository_service import repository_service
+from app.services.type_rules import TypeRuleEngine
 
 logger = structlog.get_logger()
 
@@ -88,141 +91,61 @@ class ProjectTypeIdentifier:
         },
     }
 
-    def __init__(self, repo_url: str):
+    _rules: Optional[TypeRuleEngine] = None
+
+    def __init__(
+        self,
+        repo_url: str,
+        paths: Optional[PathIndex] = None,
+        manifests: Optional[ManifestBundle] = None,
+        ref: Optional[str] = None,
+    ):
         """Initialize project type identifier.
 
         Args:
             repo_url: GitHub repository URL
+            paths: Prefetched path index (loaded on demand if omitted)
+            manifests: Prefetched manifests (loaded on demand if omitted)
+            ref: Commit SHA to analyze (default: default branch HEAD)
         """
         self.repo_url = repo_url
-        self._file_list: Optional[Set[str]] = None
-        self._package_json: Optional[Dict[str, Any]] = None
-
-    def _get_file_list(self) -> Set[str]:
-        """Get list of all files in repository (cached).
-
-        Returns:
-            Set of file paths
-        """
-        if self._file_list is None:
-            tree = repository_service.get_repository_tree(
-                self.repo_url, path="", max_depth=2
+        self.ref = ref
+        self._paths = paths
+        self._manifests = manifests
+
+    def _get_paths(self) -> PathIndex:
+        """Get the index of every file in the repository, loading it on first use."""
+        if self._paths is None:
+            self._paths = PathIndex.load(self.repo_url, self.ref)
+        return self._paths
+
+    def _get_manifests(self) -> ManifestBundle:
+        """Get the manifest bundle, loading it on first use."""
+        if self._manifests is None:
+            self._manifests = ManifestBundle.load(self.repo_url, self.ref)
+        return self._manifests
+
+    def _get_dependencies(self) -> Set[str]:
+        """Get all package.json dependency names, including dev dependencies."""
+        return self._get_manifests().package_dependencies
+
+    def _read_content(self, file_path: str) -> Optional[str]:
+        """Read a file for content patterns; None if it cannot be read."""
+        if ManifestBundle.covers(file_path):
+            return self._get_manifests().text(file_path)
+        try:
+            return repository_service.get_file_content(
+                self.repo_url, file_path, ref=self.ref
             )
-            self._file_list = self._extract_file_paths(tree)
-
-        return self._file_list
-
-    def _extract_file_paths(self, tree: List[Dict[str, Any]]) -> Set[str]:
-        """Extract all file paths from directory tree.
-
-        Args:
-            tree: Directory tree data
-
-        Returns:
-            Set of file paths
-        """
-        paths = set()
-        for item in tree:
-            paths.add(item["path"])
-            if item.get("children"):
-                paths.update(self._extract_file_paths(item["children"]))
-        return paths
-
-    def _get_package_json(self) -> Optional[Dict[str, Any]]:
-        """Get and parse package.json (cached).
-
-        Returns:
-            Parsed package.json content or None
-        """
-        if self._package_json is None:
-            try:
-                content = repository_service.get_file_content(
-                    self.repo_url, "package.json"
-                )
-                self._package_json = json.loads(content)
-            except Exception as e:
-                logger.debug("package_json_not_found", error=str(e))
-                self._package_json = {}
-
-        return self._package_json if self._package_json else None
-
-    def _check_file_exists(self, file_path: str) -> bool:
-        """Check if a file exists in repository.
-
-        Args:
-            file_path: File path to check
-
-        Returns:
-            True if file exists
-        """
-        file_list = self._get_file_list()
-        return file_path in file_list
-
-    def _check_package_dependency(self, dependency: str) -> bool:
-        """Check if package.json contains a dependency.
-
-        Args:
-            dependency: Dependency name to check
-
-        Returns:
-            True if dependency exists
-        """
-        package_json = self._get_package_json()
-        if not package_json:
-            return False
-
-        all_deps = {
-            **package_json.get("dependencies", {}),
-            **package_json.get("devDependencies", {}),
-        }
-
-        return dependency in all_deps
-
-    def _check_pattern(self, pattern: Dict[str, Any]) -> bool:
-        """Check if project matches a type pattern.
-
-        Args:
-            pattern: Pattern definition
-
-        Returns:
-            True if pattern matches
-        """
-        # Check required files
-        for required_file in pattern.get("required_files", []):
-            if not self._check_file_exists(required_file):
-                return False
-
-        # Check alternative files (at least one must exist)
-        for alternatives in pattern.get("alternative_files", []):
-            if not any(self._check_file_exists(f) for f in alternatives):
-                return False
-
-        # Check package dependencies
-        for dep in pattern.get("package_dependencies", []):
-            if not self._check_package_dependency(dep):
-                return False
-
-        # Check excluded dependencies (must not exist)
-        for dep in pattern.get("exclude_dependencies", []):
-            if self._check_package_dependency(dep):
-                return False
-
-        # Check file content patterns
-        for content_pattern in pattern.get("file_content_patterns", []):
-            file_path = content_pattern["file"]
-            pattern_regex = content_pattern["pattern"]
-
-            if self._check_file_exists(file_path):
-                try:
-                    content = repository_service.get_file_content(
-                        self.repo_url, file_path
-                    )
-                    if not re.search(pattern_regex, content, re.IGNORECASE):
-                        return False
-                except Exception:
-                    return False
+        except Exception:
+            return None
 
-        return True
+    @classmethod
+    def _get_rules(cls) -> TypeRuleEngine:
+        """Get TYPE_PATTERNS compiled into a rule engine (compiled once per class)."""
+        if cls.__dict__.get("_rules") is None:
+            cls._rules = TypeRuleEngine(cls.TYPE_PATTERNS)
+        return cls._rules
 
     def identify(self) -> Dict[str, Any]:
         """Identify project type and related information.
@@ -234,13 +157,11 @@ class ProjectTypeIdentifier:
             - language: Primary programming language
             - all_types: List of all detected types
         """
-        detected_types = []
-
-        # Check each type pattern
-        for type_name, pattern in self.TYPE_PATTERNS.items():
-            if self._check_pattern(pattern):
-                detected_types.append(type_name)
-                logger.debug("type_detected", type=type_name)
+        # Evaluate all type patterns in one pass
+        detected_types = self._get_rules().match(
+            self._get_paths(), self._get_dependencies, self._read_content
+        )
+        logger.debug("types_detected", types=detected_types)
 
         # Determine primary type (most specific first)
         priority_order = [
@@ -320,15 +241,32 @@ class ProjectTypeIdentifier:
 class DependencyAnalyzer:
     """Analyzes project dependencies."""
 
-    def __init__(self, repo_url: str, project_type: str):
+    def __init__(
+        self,
+        repo_url: str,
+        project_type: str,
+        manifests: Optional[ManifestBundle] = None,
+        ref: Optional[str] = None,
+    ):
         """Initialize dependency analyzer.
 
         Args:
             repo_url: GitHub repository URL
             project_type: Detected project type
+            manifests: Prefetched manifests (loaded on demand if omitted)
+            ref: Commit SHA to analyze (default: default branch HEAD)
         """
         self.repo_url = repo_url
         self.project_type = project_type
+        self.ref = ref
+        self._manifests = manifests
+
+    @property
+    def manifests(self) -> ManifestBundle:
+        """Manifest bundle, loaded on first use."""
+        if self._manifests is None:
+            self._manifests = ManifestBundle.load(self.repo_url, self.ref)
+        return self._manifests
 
     def analyze(self) -> Dict[str, Any]:
         """Analyze project dependencies.
@@ -356,126 +294,78 @@ class DependencyAnalyzer:
 
     def _analyze_node_dependencies(self) -> Dict[str, Any]:
         """Analyze Node.js dependencies from package.json."""
-        try:
-            content = repository_service.get_file_content(
-                self.repo_url, "package.json"
+        package_data = self.manifests.package_json
+        if package_data is None:
+            logger.warning(
+                "failed_to_analyze_node_deps", error="package.json missing or invalid"
             )
-            package_data = json.loads(content)
+            return {}
 
-            dependencies = package_data.get("dependencies", {})
-            dev_dependencies = package_data.get("devDependencies", {})
+        dependencies = package_data.get("dependencies", {})
+        dev_dependencies = package_data.get("devDependencies", {})
 
-            # Extract core and notable dependencies
-            core_deps = list(dependencies.keys())[:10]  # Top 10
-            dev_deps = list(dev_dependencies.keys())[:10]
+        # Extract core and notable dependencies
+        core_deps = list(dependencies.keys())[:10]  # Top 10
+        dev_deps = list(dev_dependencies.keys())[:10]
 
-            return {
-                "package_manager": "npm",
-                "core_dependencies": core_deps,
-                "dev_dependencies": dev_deps,
-                "total_dependencies": len(dependencies),
-                "total_dev_dependencies": len(dev_dependencies),
-            }
-        except Exception as e:
-            logger.warning("failed_to_analyze_node_deps", error=str(e))
-            return {}
+        return {
+            "package_manager": "npm",
+            "core_dependencies": core_deps,
+            "dev_dependencies": dev_deps,
+            "total_dependencies": len(dependencies),
+            "total_dev_dependencies": len(dev_dependencies),
+        }
 
     def _analyze_python_dependencies(self) -> Dict[str, Any]:
         """Analyze Python dependencies."""
-        try:
-            # Try requirements.txt first
-            try:
-                content = repository_service.get_file_content(
-                    self.repo_url, "requirements.txt"
-                )
-                deps = [
-                    line.split("==")[0].split(">=")[0].split("<=")[0].strip()
-                    for line in content.splitlines()
-                    if line.strip() and not line.startswith("#")
-                ]
-                return {
-                    "package_manager": "pip",
-                    "dependencies": deps[:20],  # Top 20
-                    "total_dependencies": len(deps),
-                }
-            except Exception:
-                pass
-
-            # Try pyproject.toml
-            try:
-                content = repository_service.get_file_content(
-                    self.repo_url, "pyproject.toml"
-                )
-                # Simple extraction (could be improved with TOML parser)
-                return {"package_manager": "poetry", "dependencies": []}
-            except Exception:
-                pass
+        # Try requirements.txt first
+        deps = self.manifests.requirements
+        if deps is not None:
+            return {
+                "package_manager": "pip",
+                "dependencies": deps[:20],  # Top 20
+                "total_dependencies": len(deps),
+            }
 
-            return {}
+        # Try pyproject.toml
+        if "pyproject.toml" in self.manifests:
+            # Simple extraction (could be improved with TOML parser)
+            return {"package_manager": "poetry", "dependencies": []}
 
-        except Exception as e:
-            logger.warning("failed_to_analyze_python_deps", error=str(e))
-            return {}
+        return {}
 
     def _analyze_go_dependencies(self) -> Dict[str, Any]:
         """Analyze Go dependencies."""
-        try:
-            content = repository_service.get_file_content(self.repo_url, "go.mod")
-            # Simple parsing of go.mod
-            require_section = False
-            deps = []
-            for line in content.splitlines():
-                line = line.strip()
-                if line.startswith("require"):
-                    require_section = True
-                    continue
-                if require_section and line.startswith(")"):
-                    break
-                if require_section and line:
-                    dep = line.split()[0] if line.split() else ""
-                    if dep:
-                        deps.append(dep)
-
-            return {
-                "package_manager": "go modules",
-                "dependencies": deps[:20],
-                "total_dependencies": len(deps),
-            }
-        except Exception as e:
-            logger.warning("failed_to_analyze_go_deps", error=str(e))
+        deps = self.manifests.go_requirements
+        if deps is None:
+            logger.warning("failed_to_analyze_go_deps", error="go.mod missing")
             return {}
 
+        return {
+            "package_manager": "go modules",
+            "dependencies": deps[:20],
+            "total_dependencies": len(deps),
+        }
+
     def _analyze_rust_dependencies(self) -> Dict[str, Any]:
         """Analyze Rust dependencies."""
-        try:
-            content = repository_service.get_file_content(self.repo_url, "Cargo.toml")
-            # Simple extraction (could be improved with TOML parser)
-            return {"package_manager": "cargo", "dependencies": []}
-        except Exception as e:
-            logger.warning("failed_to_analyze_rust_deps", error=str(e))
+        if "Cargo.toml" not in self.manifests:
+            logger.warning("failed_to_analyze_rust_deps", error="Cargo.toml missing")
             return {}
 
+        # Simple extraction (could be improved with TOML parser)
+        return {"package_manager": "cargo", "dependencies": []}
+
     def _analyze_java_dependencies(self) -> Dict[str, Any]:
         """Analyze Java dependencies."""
         # Try Maven first
-        try:
-            content = repository_service.get_file_content(self.repo_url, "pom.xml")
+        if "pom.xml" in self.manifests:
             return {"package_manager": "maven", "dependencies": []}
-        except Exception:
-            pass
 
         # Try Gradle
-        try:
-            for gradle_file in ["build.gradle", "build.gradle.kts"]:
-                try:
-                    content = repository_service.get_file_content(
-                        self.repo_url, gradle_file
-                    )
-                    return {"package_manager": "gradle", "dependencies": []}
-                except Exception:
-                    continue
-        except Exception:
-            pass
+        for gradle_file in ["build.gradle", "build.gradle.kts"]:
+            if gradle_file in self.manifests:
+                return {"package_manager": "gradle", "dependencies": []}
 
         return {}
 
@@ -512,11 +402,14 @@ class StructureAnalyzer:
         """
         self.repo_url = repo_url
 
-    def analyze(self, tree: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def analyze(
+        self, tree: List[Dict[str, Any]], paths: Optional[PathIndex] = None
+    ) -> Dict[str, Any]:
         """Analyze directory structure.
 
         Args:
             tree: Directory tree data
+            paths: Index of every file, for repository-wide file counts
 
         Returns:
             Structure analysis results
@@ -538,12 +431,20 @@ class StructureAnalyzer:
                         }
                     )
 
-        return {
+        result = {
             "total_directories": len(all_dirs),
             "key_directories": key_directories,
             "all_directories": all_dirs,
         }
 
+        if paths is not None:
+            result["total_files"] = len(paths)
+            result["file_extensions"] = dict(
+                list(paths.extension_counts().items())[:10]
+            )
+
+        return result
+
     def _get_directory_purpose(self, dir_name: str) -> str:
         """Get description of directory purpose.
 
@@ -579,15 +480,19 @@ class StructureAnalyzer:
 class KeyFilesExtractor:
     """Extracts key files based on project type."""
 
-    def __init__(self, repo_url: str, project_type: str):
+    def __init__(
+        self, repo_url: str, project_type: str, paths: Optional[PathIndex] = None
+    ):
         """Initialize key files extractor.
 
         Args:
             repo_url: GitHub repository URL
             project_type: Detected project type
+            paths: Index of every file; when given, only existing files are listed
         """
         self.repo_url = repo_url
         self.project_type = project_type
+        self.paths = paths
 
     def extract(self) -> List[Dict[str, str]]:
         """Extract key files list.
@@ -634,12 +539,20 @@ class KeyFilesExtractor:
                 ]
             )
 
+        # Skip candidates the repository does not have, unless the listing
+        # is incomplete
+        if self.paths is not None and not self.paths.truncated:
+            key_files = [f for f in key_files if f["path"] in self.paths]
+
         return key_files
 
 
 class CodeAnalyzer:
     """Main code analyzer service."""
 
+    # Bump when analyzer output changes so cached results are not reused
+    ANALYZER_VERSION = 2
+
     def __init__(self, repo_url: str):
         """Initialize code analyzer.
 
@@ -649,9 +562,24 @@ class CodeAnalyzer:
         self.repo_url = repo_url
         self.type_identifier = ProjectTypeIdentifier(repo_url)
 
-    def analyze(self) -> Dict[str, Any]:
+    def _cache_key(self, commit_sha: str) -> str:
+        """Get the analysis cache key for a commit."""
+        return f"analysis:{self.repo_url}:{commit_sha}:v{self.ANALYZER_VERSION}"
+
+    def analyze(
+        self, use_cache: bool = True, commit_sha: Optional[str] = None
+    ) -> Dict[str, Any]:
         """Perform full code analysis.
 
+        Results are cached per commit: the default branch HEAD is resolved
+        first and the analysis runs against that exact commit. The tree and
+        full path listing and all candidate manifest files are fetched
+        concurrently up front, so the analyzers themselves do no GitHub I/O.
+
+        Args:
+            use_cache: Whether to use cache (default: True)
+            commit_sha: Commit to analyze (default: default branch HEAD)
+
         Returns:
             Analysis results including:
             - project_type: Project type information
@@ -659,35 +587,156 @@ class CodeAnalyzer:
             - dependencies: Dependency information
             - key_files: Important files list
         """
-        logger.info("starting_code_analysis", repo_url=self.repo_url)
+        commit_sha = commit_sha or repository_service.get_head_sha(
+            self.repo_url, use_cache
+        )
+        cache_key = self._cache_key(commit_sha)
+
+        if use_cache:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                logger.info(
+                    "code_analysis_from_cache",
+                    repo_url=self.repo_url,
+                    commit=commit_sha,
+                )
+                return cached
 
-        # Identify project type
-        project_type_info = self.type_identifier.identify()
-        primary_type = project_type_info["primary_type"]
+        logger.info(
+            "starting_code_analysis", repo_url=self.repo_url, commit=commit_sha
+        )
+
+        # One round trip: the tree, the path listing and every manifest in parallel
+        tree, listing, files = repository_service.get_tree_paths_and_files(
+            self.repo_url, MANIFEST_FILES, max_depth=2, ref=commit_sha
+        )
+
+        paths = PathIndex.from_listing(self.repo_url, listing, commit_sha)
+        manifests = ManifestBundle.from_files(self.repo_url, files, commit_sha)
+        result = self._analyze_prefetched(tree, paths, manifests, commit_sha)
+        cache.set(
+            cache_key,
+            result,
+            tags=repository_service.cache_tags(self.repo_url, commit_sha),
+        )
+
+        logger.info("code_analysis_completed", repo_url=self.repo_url)
+        return result
+
+    async def analyze_async(
+        self, use_cache: bool = True, commit_sha: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Perform full code analysis without blocking the event loop.
+
+        Same steps as analyze(), with the prefetch awaited on the event loop
+        and the cache accessed from a worker thread.
+
+        Args:
+            use_cache: Whether to use cache (default: True)
+            commit_sha: Commit to analyze (default: default branch HEAD)
+
+        Returns:
+            Same structure as analyze()
+        """
+        commit_sha = commit_sha or await repository_service.get_head_sha_async(
+            self.repo_url, use_cache
+        )
+        cache_key = self._cache_key(commit_sha)
+
+        if use_cache:
+            cached = await asyncio.to_thread(cache.get, cache_key)
+            if cached is not None:
+                logger.info(
+                    "code_analysis_from_cache",
+                    repo_url=self.repo_url,
+                    commit=commit_sha,
+                )
+                return cached
 
-        # Get directory tree
-        tree = repository_service.get_repository_tree(
-            self.repo_url, path="", max_depth=2
+        logger.info(
+            "starting_code_analysis", repo_url=self.repo_url, commit=commit_sha
         )
 
+        tree, listing, files = await repository_service.get_tree_paths_and_files_async(
+            self.repo_url, MANIFEST_FILES, max_depth=2, ref=commit_sha
+        )
+
+        paths = PathIndex.from_listing(self.repo_url, listing, commit_sha)
+        manifests = ManifestBundle.from_files(self.repo_url, files, commit_sha)
+        result = self._analyze_prefetched(tree, paths, manifests, commit_sha)
+        await asyncio.to_thread(
+            cache.set,
+            cache_key,
+            result,
+            tags=repository_service.cache_tags(self.repo_url, commit_sha),
+        )
+
+        logger.info("code_analysis_completed", repo_url=self.repo_url)
+        return result
+
+    def _analyze_prefetched(
+        self,
+        tree: List[Dict[str, Any]],
+        paths: PathIndex,
+        manifests: ManifestBundle,
+        commit_sha: str,
+    ) -> Dict[str, Any]:
+        """Run all analyzers on a prefetched tree, path index and manifest bundle.
+
+        Args:
+            tree: Directory tree data
+            paths: Index of every file of the commit
+            manifests: Manifests of the commit
+            commit_sha: Commit being analyzed
+
+        Returns:
+            Full analysis results
+        """
+        self.type_identifier = ProjectTypeIdentifier(
+            self.repo_url, paths, manifests, ref=commit_sha
+        )
+        project_type_info = self.type_identifier.identify()
+        return self._build_result(
+            project_type_info, tree, paths, manifests, ref=commit_sha
+        )
+
+    def _build_result(
+        self,
+        project_type_info: Dict[str, Any],
+        tree: List[Dict[str, Any]],
+        paths: PathIndex,
+        manifests: Optional[ManifestBundle] = None,
+        ref: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Run the structure, dependency and key file analyzers.
+
+        Args:
+            project_type_info: Result of ProjectTypeIdentifier.identify()
+            tree: Directory tree data
+            paths: Index of every file of the commit
+            manifests: Prefetched manifests (loaded on demand if omitted)
+            ref: Commit SHA being analyzed
+
+        Returns:
+            Full analysis results
+        """
+        primary_type = project_type_info["primary_type"]
+
         # Analyze structure
         structure_analyzer = StructureAnalyzer(self.repo_url)
-        structure = structure_analyzer.analyze(tree)
+        structure = structure_analyzer.analyze(tree, paths)
 
         # Analyze dependencies
-        dep_analyzer = DependencyAnalyzer(self.repo_url, primary_type)
+        dep_analyzer = DependencyAnalyzer(self.repo_url, primary_type, manifests, ref)
         dependencies = dep_analyzer.analyze()
 
         # Extract key files
-        files_extractor = KeyFilesExtractor(self.repo_url, primary_type)
+        files_extractor = KeyFilesExtractor(self.repo_url, primary_type, paths)
         key_files = files_extractor.extract()
 
-        result = {
+        return {
             "project_type": project_type_info,
             "structure": structure,
             "dependencies": dependencies,
             "key_files": key_files,
         }
-
-        logger.info("code_analysis_completed", repo_url=self.repo_url)
-        return result
@@ -0,0 +1,143 @@
+"""Background building of the per-commit code indexes."""
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional, Set
+
+import structlog
+
+from app.services.code_search import CodeSearchIndex, fetch_source_files
+from app.services.symbol_index import SymbolIndex
+
+logger = structlog.get_logger()
+
+
+class CodeIndexer:
+    """Builds the code indexes of a commit off the request path.
+
+    The code search and symbol indexes are built together from one fetch
+    of the commit's source files.
+
+    Building an index reads up to settings.code_search_max_files files,
+    which without a snapshot costs hundreds of GitHub API calls. Lookups
+    therefore only return indexes that exist already and schedule a build
+    otherwise; until it finishes, questions are answered from the README
+    and key files. In snapshot mode the files are read from the local
+    snapshot instead of the API.
+    """
+
+    RETRY_AFTER = 300  # seconds before a failed build is attempted again
+
+    def __init__(self, max_workers: int = 1):
+        """Initialize indexer.
+
+        Args:
+            max_workers: Builds running at the same time
+        """
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="code-indexer"
+        )
+        self._lock = threading.Lock()
+        self._pending: Set[str] = set()
+        self._failed: Dict[str, float] = {}
+
+    def search_index(self, repo_url: str, ref: str) -> Optional[CodeSearchIndex]:
+        """Get the search index of a commit without waiting for it.
+
+        Args:
+            repo_url: GitHub repository URL
+            ref: Commit SHA
+
+        Returns:
+            Search index, or None while it is being built
+        """
+        index = CodeSearchIndex.peek(repo_url, ref)
+        if index is None:
+            self.schedule(repo_url, ref)
+        return index
+
+    def symbol_index(self, repo_url: str, ref: str) -> Optional[SymbolIndex]:
+        """Get the symbol index of a commit without waiting for it.
+
+        Args:
+            repo_url: GitHub repository URL
+            ref: Commit SHA
+
+        Returns:
+            Symbol index, or None while it is being built
+        """
+        index = SymbolIndex.peek(repo_url, ref)
+        if index is None:
+            self.schedule(repo_url, ref)
+        return index
+
+    def schedule(self, repo_url: str, ref: str) -> Optional[Future]:
+        """Start building the indexes of a commit, at most once at a time.
+
+        Args:
+            repo_url: GitHub repository URL
+            ref: Commit SHA
+
+        Returns:
+            Future of the build, or None if one is running already or the
+            last one failed less than RETRY_AFTER seconds ago
+        """
+        key = f"{repo_url}@{ref}"
+        with self._lock:
+            if key in self._pending:
+                return None
+            failed_at = self._failed.get(key)
+            if failed_at is not None and time.monotonic() - failed_at < (
+                self.RETRY_AFTER
+            ):
+                return None
+            self._pending.add(key)
+
+        def run() -> None:
+            try:
+                self.build(repo_url, ref)
+                with self._lock:
+                    self._failed.pop(key, None)
+            except Exception as e:
+                logger.warning(
+                    "code_index_build_failed", repo_url=repo_url, error=str(e)
+                )
+                with self._lock:
+                    self._failed[key] = time.monotonic()
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+
+        logger.info("code_index_build_scheduled", repo_url=repo_url, ref=ref)
+        return self._executor.submit(run)
+
+    def build(self, repo_url: str, ref: str) -> None:
+        """Build and store the indexes of a commit (blocking).
+
+        Args:
+            repo_url: GitHub repository URL
+            ref: Commit SHA
+        """
+        files = fetch_source_files(repo_url, ref)
+        search_index = CodeSearchIndex.build(repo_url, files, ref)
+        CodeSearchIndex.store(repo_url, ref, search_index)
+        logger.info(
+            "code_search_index_built",
+            repo_url=repo_url,
+            files=len(files),
+            chunks=len(search_index),
+            terms=len(search_index._postings),
+        )
+
+        symbols = SymbolIndex.build(files)
+        SymbolIndex.store(repo_url, ref, symbols)
+        logger.info(
+            "symbol_index_built",
+            repo_url=repo_url,
+            files=len(files),
+            symbols=len(symbols),
+        )
+
+
+# Global instance
+code_indexer = CodeIndexer()
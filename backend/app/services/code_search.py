@@ -0,0 +1,370 @@
+"""BM25 search over the source files of one repository commit."""
+import math
+import re
+import threading
+from array import array
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import structlog
+
+from app.config import settings
+from app.services.cache_manager import cache
+from app.services.file_store import file_store
+from app.services.path_index import PathIndex
+from app.services.repository_service import repository_service
+
+logger = structlog.get_logger()
+
+# Extensions of files worth indexing (source code and prose documentation)
+INDEXED_EXTENSIONS = {
+    ".py",
+    ".js",
+    ".jsx",
+    ".ts",
+    ".tsx",
+    ".mjs",
+    ".vue",
+    ".svelte",
+    ".go",
+    ".rs",
+    ".java",
+    ".kt",
+    ".scala",
+    ".rb",
+    ".php",
+    ".cs",
+    ".c",
+    ".h",
+    ".cc",
+    ".cpp",
+    ".hpp",
+    ".swift",
+    ".md",
+    ".rst",
+}
+
+# Directories holding generated or third-party code
+SKIPPED_DIRS = {
+    "node_modules",
+    "vendor",
+    "third_party",
+    "dist",
+    "build",
+    "target",
+    "out",
+    "coverage",
+    "__pycache__",
+    ".git",
+    ".next",
+    ".venv",
+    "venv",
+}
+
+TEST_DIRS = {"test", "tests", "__tests__", "spec", "testdata"}
+
+_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_SUBWORD = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+")
+
+
+def tokenize(text: str) -> Iterator[str]:
+    """Split text into lowercase search terms.
+
+    Identifiers are emitted whole and, when they are camelCase, PascalCase
+    or snake_case, also as their parts, so ``getUserProfile`` matches
+    queries for ``getuserprofile``, ``user`` and ``profile``.
+
+    Args:
+        text: Code or natural language text
+
+    Yields:
+        Terms of at least two characters
+    """
+    for identifier in _IDENTIFIER.findall(text):
+        if len(identifier) >= 2:
+            yield identifier.lower()
+        parts = _SUBWORD.findall(identifier)
+        if len(parts) > 1:
+            for part in parts:
+                if len(part) >= 2:
+                    yield part.lower()
+
+
+def select_files(paths: PathIndex, max_files: int) -> List[str]:
+    """Choose the files of a commit to index.
+
+    Generated, vendored and minified files are skipped. Shallow paths come
+    first and test files last, so the most central code is indexed when a
+    repository has more files than max_files.
+
+    Args:
+        paths: Index of every file of the commit
+        max_files: Maximum number of files to return
+
+    Returns:
+        File paths to index
+    """
+    candidates = []
+    for extension in INDEXED_EXTENSIONS:
+        for path in paths.with_extension(extension):
+            directories = path.split("/")[:-1]
+            if SKIPPED_DIRS.intersection(directories) or path.endswith(".min.js"):
+                continue
+            file_name = path.rsplit("/", 1)[-1].lower()
+            is_test = bool(TEST_DIRS.intersection(directories)) or "test" in file_name
+            candidates.append((is_test, len(directories), path))
+
+    candidates.sort()
+    return [path for _, _, path in candidates[:max_files]]
+
+
+def fetch_source_files(repo_url: str, ref: str) -> Dict[str, str]:
+    """Fetch the files of a commit that the code indexes cover.
+
+    Args:
+        repo_url: GitHub repository URL
+        ref: Commit SHA
+
+    Returns:
+        File path -> content for the files chosen by select_files, without
+        files larger than settings.code_search_max_file_size
+    """
+    paths = select_files(PathIndex.load(repo_url, ref), settings.code_search_max_files)
+    return {
+        path: content
+        for path, content in repository_service.get_multiple_files(
+            repo_url, paths, ref=ref
+        ).items()
+        if len(content) <= settings.code_search_max_file_size
+    }
+
+
+class CodeSearchIndex:
+    """Okapi BM25 inverted index over fixed-size line chunks of source files.
+
+    Files are split into chunks of CHUNK_LINES lines; every chunk is a
+    document whose terms are its identifiers (see tokenize) plus the terms
+    of its file path, so questions naming a module also find its files.
+    Postings are kept as ``array`` pairs of (chunk id, term frequency).
+
+    The index stores only chunk positions, not text: search results are
+    read back from the (cached) file contents. Indexes are built once per
+    commit (in the background, see code_indexer), persisted in the cache
+    and shared through a small in-process LRU.
+    """
+
+    VERSION = 1
+    CHUNK_LINES = 40
+    K1 = 1.2
+    B = 0.75
+    MAX_CHUNKS_PER_FILE = 2
+    MAX_SHARED = 8
+
+    _shared: "OrderedDict[str, CodeSearchIndex]" = OrderedDict()
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        repo_url: str,
+        ref: Optional[str],
+        chunks: List[Tuple[str, int, int, int]],
+        postings: Dict[str, List[int]],
+    ):
+        """Initialize index from its serialized form.
+
+        Args:
+            repo_url: GitHub repository URL
+            ref: Commit SHA the files were read at
+            chunks: (path, start line, end line, term count) per chunk id
+            postings: Term -> flat [chunk id, frequency, chunk id, ...] list
+        """
+        self.repo_url = repo_url
+        self.ref = ref
+        self.chunks = [tuple(chunk) for chunk in chunks]
+        self._postings = {term: array("I", flat) for term, flat in postings.items()}
+        total = sum(chunk[3] for chunk in chunks)
+        self._avg_length = total / len(chunks) if chunks else 0.0
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    @classmethod
+    def build(
+        cls, repo_url: str, files: Dict[str, str], ref: Optional[str] = None
+    ) -> "CodeSearchIndex":
+        """Index file contents.
+
+        Args:
+            repo_url: GitHub repository URL
+            files: File path -> content
+            ref: Commit SHA the files were read at
+
+        Returns:
+            Search index
+        """
+        chunks: List[Tuple[str, int, int, int]] = []
+        postings: Dict[str, List[int]] = {}
+
+        for path in sorted(files):
+            lines = files[path].split("\n")
+            path_terms = list(tokenize(path))
+            for start in range(0, len(lines), cls.CHUNK_LINES):
+                window = lines[start : start + cls.CHUNK_LINES]
+                counts = Counter(tokenize("\n".join(window)))
+                counts.update(path_terms)
+                if not counts:
+                    continue
+
+                chunk_id = len(chunks)
+                chunks.append(
+                    (path, start + 1, start + len(window), sum(counts.values()))
+                )
+                for term, frequency in counts.items():
+                    postings.setdefault(term, []).extend((chunk_id, frequency))
+
+        return cls(repo_url, ref, chunks, postings)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize for the cache."""
+        return {
+            "chunks": [list(chunk) for chunk in self.chunks],
+            "postings": {term: flat.tolist() for term, flat in self._postings.items()},
+        }
+
+    def search(self, terms: Iterable[str], limit: int = 5) -> List[Dict[str, Any]]:
+        """Rank chunks against query terms.
+
+        Args:
+            terms: Query terms (tokenized with tokenize)
+            limit: Maximum number of results
+
+        Returns:
+            List of {path, start_line, end_line, score}, best first, with at
+            most MAX_CHUNKS_PER_FILE chunks per file
+        """
+        scores: Dict[int, float] = {}
+        total = len(self.chunks)
+
+        for term in dict.fromkeys(terms):
+            flat = self._postings.get(term)
+            if not flat:
+                continue
+            doc_frequency = len(flat) // 2
+            idf = math.log(1 + (total - doc_frequency + 0.5) / (doc_frequency + 0.5))
+            for i in range(0, len(flat), 2):
+                chunk_id, frequency = flat[i], flat[i + 1]
+                length = self.chunks[chunk_id][3]
+                norm = self.K1 * (1 - self.B + self.B * length / self._avg_length)
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * (
+                    frequency * (self.K1 + 1) / (frequency + norm)
+                )
+
+        results: List[Dict[str, Any]] = []
+        per_file: Counter = Counter()
+        for chunk_id in sorted(scores, key=lambda c: (-scores[c], c)):
+            path, start, end, _ = self.chunks[chunk_id]
+            if per_file[path] >= self.MAX_CHUNKS_PER_FILE:
+                continue
+            per_file[path] += 1
+            results.append(
+                {
+                    "path": path,
+                    "start_line": start,
+                    "end_line": end,
+                    "score": round(scores[chunk_id], 4),
+                }
+            )
+            if len(results) >= limit:
+                break
+
+        return results
+
+    def retrieve(self, terms: Iterable[str], limit: int = 5) -> List[Dict[str, Any]]:
+        """Search and attach the text of each matching chunk.
+
+        Args:
+            terms: Query terms (tokenized with tokenize)
+            limit: Maximum number of results
+
+        Returns:
+            Results of search with a ``content`` field added; chunks whose
+            file can no longer be read are dropped
+        """
+        hits = self.search(terms, limit)
+        if not hits:
+            return []
+
+        files = file_store.get_many(
+            self.repo_url, [hit["path"] for hit in hits], ref=self.ref
+        )
+
+        chunks = []
+        for hit in hits:
+            indexed = files.get(hit["path"])
+            if indexed is None:
+                continue
+            content = indexed.lines(hit["start_line"], hit["end_line"])
+            chunks.append({**hit, "content": content})
+        return chunks
+
+    @classmethod
+    def _cache_key(cls, repo_url: str, ref: str) -> str:
+        return f"code_search:{repo_url}@{ref}:v{cls.VERSION}"
+
+    @classmethod
+    def _get_shared(cls, key: str) -> Optional["CodeSearchIndex"]:
+        with cls._shared_lock:
+            index = cls._shared.get(key)
+            if index is not None:
+                cls._shared.move_to_end(key)
+            return index
+
+    @classmethod
+    def _share(cls, key: str, index: "CodeSearchIndex") -> None:
+        with cls._shared_lock:
+            cls._shared[key] = index
+            cls._shared.move_to_end(key)
+            while len(cls._shared) > cls.MAX_SHARED:
+                cls._shared.popitem(last=False)
+
+    @classmethod
+    def peek(cls, repo_url: str, ref: str) -> Optional["CodeSearchIndex"]:
+        """Get the search index of a commit if it was built already.
+
+        Never builds the index (that takes a fetch of the indexed files);
+        see code_indexer for building it in the background.
+
+        Args:
+            repo_url: GitHub repository URL
+            ref: Commit SHA
+
+        Returns:
+            Search index, or None if it has not been built yet
+        """
+        key = cls._cache_key(repo_url, ref)
+        index = cls._get_shared(key)
+        if index is not None:
+            return index
+
+        cached = cache.get(key)
+        if cached is None:
+            return None
+        logger.info("code_search_index_from_cache", repo_url=repo_url)
+        index = cls(repo_url, ref, cached["chunks"], cached["postings"])
+        cls._share(key, index)
+        return index
+
+    @classmethod
+    def store(cls, repo_url: str, ref: str, index: "CodeSearchIndex") -> None:
+        """Keep a built search index for peek, in memory and in the cache.
+
+        Args:
+            repo_url: GitHub repository URL
+            ref: Commit SHA
+            index: Index built from the files of that commit
+        """
+        key = cls._cache_key(repo_url, ref)
+        cache.set(
+            key, index.to_dict(), tags=repository_service.cache_tags(repo_url, ref)
+        )
+        cls._share(key, index)
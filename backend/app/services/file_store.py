@@ -0,0 +1,197 @@
+"""Line-addressable file contents for citing exact line ranges."""
+import mmap
+import threading
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Dict, List, Optional, Union
+
+import structlog
+
+from app.core.exceptions import AppException
+from app.services.repository_service import repository_service
+
+logger = structlog.get_logger()
+
+Buffer = Union[bytes, mmap.mmap]
+
+
+class LineIndexedFile:
+    """UTF-8 file content plus the byte offset at which every line starts.
+
+    Any line range is sliced straight out of the buffer with two offset
+    lookups instead of splitting the whole file. The buffer may be bytes or
+    an mmap of a snapshot object, so large files need not be read into
+    memory. Offsets are only valid because "\\n" never occurs inside a
+    multi-byte UTF-8 sequence.
+    """
+
+    def __init__(self, data: Buffer):
+        """Index a buffer.
+
+        Args:
+            data: UTF-8 encoded content (bytes or mmap)
+        """
+        self._data = data
+        self._offsets = array("I", [0])
+        position = data.find(b"\n")
+        while position != -1:
+            self._offsets.append(position + 1)
+            position = data.find(b"\n", position + 1)
+        if self._offsets[-1] != len(data) or len(data) == 0:
+            # Sentinel: end of the last line (unless the file ends with "\n")
+            self._offsets.append(len(data))
+
+    @classmethod
+    def from_text(cls, text: str) -> "LineIndexedFile":
+        """Index already decoded content."""
+        return cls(text.encode("utf-8"))
+
+    @property
+    def size(self) -> int:
+        """Content size in bytes."""
+        return len(self._data)
+
+    @property
+    def line_count(self) -> int:
+        """Number of lines (a trailing newline does not start a new line)."""
+        return len(self._offsets) - 1
+
+    def lines(self, start: int, end: int) -> str:
+        """Get lines start..end (1-based, inclusive), clamped to the file.
+
+        Args:
+            start: First line
+            end: Last line
+
+        Returns:
+            The lines without the final newline ("" for an empty range)
+        """
+        start = max(start, 1)
+        end = min(end, self.line_count)
+        if start > end:
+            return ""
+        chunk = self._data[self._offsets[start - 1] : self._offsets[end]]
+        return bytes(chunk).decode("utf-8", errors="replace").removesuffix("\n")
+
+    def line_of(self, offset: int) -> int:
+        """Get the 1-based line containing a byte offset."""
+        return bisect_right(self._offsets, offset)
+
+    def find(self, text: str, limit: int = 50) -> List[int]:
+        """Find the lines on which a piece of text starts.
+
+        Args:
+            text: Text to search for (typically one line of code)
+            limit: Maximum number of occurrences to report
+
+        Returns:
+            1-based line numbers of the first occurrences
+        """
+        needle = text.encode("utf-8")
+        if not needle:
+            return []
+
+        found = []
+        position = self._data.find(needle)
+        while position != -1 and len(found) < limit:
+            found.append(self.line_of(position))
+            position = self._data.find(needle, position + 1)
+        return found
+
+
+class FileStore:
+    """Line-indexed files of pinned commits, kept in a size-bounded LRU.
+
+    Files of a local snapshot are memory-mapped; others are read through the
+    repository service (and its cache) and indexed once.
+    """
+
+    MAX_BYTES = 32 * 1024 * 1024
+
+    def __init__(self):
+        """Initialize file store."""
+        self._files: "OrderedDict[str, LineIndexedFile]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _remember(self, key: str, indexed: LineIndexedFile) -> None:
+        with self._lock:
+            if key in self._files:
+                return
+            self._files[key] = indexed
+            self._bytes += indexed.size
+            while self._bytes > self.MAX_BYTES and len(self._files) > 1:
+                _, evicted = self._files.popitem(last=False)
+                self._bytes -= evicted.size
+
+    def _recall(self, key: str) -> Optional[LineIndexedFile]:
+        with self._lock:
+            indexed = self._files.get(key)
+            if indexed is not None:
+                self._files.move_to_end(key)
+            return indexed
+
+    def get_many(
+        self, repo_url: str, file_paths: List[str], ref: Optional[str] = None
+    ) -> Dict[str, LineIndexedFile]:
+        """Get line-indexed files, fetching the ones not indexed yet concurrently.
+
+        Args:
+            repo_url: GitHub repository URL
+            file_paths: Paths of the files
+            ref: Commit SHA (default: default branch HEAD, not kept)
+
+        Returns:
+            Mapping of path to indexed file; missing or unreadable files
+            are skipped
+        """
+        result: Dict[str, LineIndexedFile] = {}
+        missing = []
+        for file_path in dict.fromkeys(file_paths):
+            key = f"{repo_url}@{ref}:{file_path}"
+            indexed = self._recall(key) if ref else None
+            if indexed is None:
+                try:
+                    mapped = repository_service.map_file(repo_url, file_path, ref)
+                except AppException as e:
+                    logger.debug(
+                        "file_store_skipped", file_path=file_path, error=e.message
+                    )
+                    continue
+                if mapped is None:
+                    missing.append(file_path)
+                    continue
+                indexed = LineIndexedFile(mapped)
+                if ref:
+                    self._remember(key, indexed)
+            result[file_path] = indexed
+
+        if missing:
+            fetched = repository_service.get_multiple_files(repo_url, missing, ref=ref)
+            for file_path, content in fetched.items():
+                indexed = LineIndexedFile.from_text(content)
+                result[file_path] = indexed
+                if ref:
+                    self._remember(f"{repo_url}@{ref}:{file_path}", indexed)
+
+        return result
+
+    def get(
+        self, repo_url: str, file_path: str, ref: Optional[str] = None
+    ) -> Optional[LineIndexedFile]:
+        """Get one line-indexed file.
+
+        Args:
+            repo_url: GitHub repository URL
+            file_path: Path of the file
+            ref: Commit SHA (default: default branch HEAD)
+
+        Returns:
+            Indexed file, or None if it cannot be read
+        """
+        return self.get_many(repo_url, [file_path], ref).get(file_path)
+
+
+# Global instance
+file_store = FileStore()
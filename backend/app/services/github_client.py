@@ -1,9 +1,8 @@
 """GitHub API client for repository information retrieval."""
 import structlog
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Iterable, List, Tuple
 from github import Github, GithubException, RateLimitExceededException
 from github.Repository import Repository
-from github.ContentFile import ContentFile
 
 from app.config import settings
 from app.core.exceptions import AppException
@@ -11,6 +10,109 @@ from app.core.exceptions import AppException
 logger = structlog.get_logger()
 
 
+GIT_TYPE_TO_NODE_TYPE = {"blob": "file", "tree": "dir", "commit": "submodule"}
+
+
+def parse_repo_url(repo_url: str) -> Tuple[str, str]:
+    """Parse GitHub repository URL to extract owner and repo name.
+
+    Args:
+        repo_url: GitHub repository URL (e.g., https://github.com/owner/repo)
+
+    Returns:
+        Tuple of (owner, repo_name)
+
+    Raises:
+        AppException: If URL format is invalid
+    """
+    try:
+        # Remove trailing slashes and .git suffix
+        url = repo_url.rstrip("/").rstrip(".git")
+
+        # Handle different URL formats
+        if "github.com/" in url:
+            # Extract path after github.com/
+            parts = url.split("github.com/")[-1].split("/")
+            if len(parts) >= 2:
+                owner, repo = parts[0], parts[1]
+                logger.debug("repo_url_parsed", owner=owner, repo=repo)
+                return owner, repo
+
+        raise ValueError("Invalid GitHub URL format")
+
+    except Exception as e:
+        logger.error("repo_url_parse_failed", url=repo_url, error=str(e))
+        raise AppException(
+            error_code="INVALID_REPO_URL",
+            message=f"Invalid GitHub repository URL: {repo_url}",
+            status_code=400,
+        )
+
+
+def build_directory_tree(
+    entries: Iterable[Dict[str, Any]], path: str = "", max_depth: int = 3
+) -> List[Dict[str, Any]]:
+    """Build nested directory nodes from flat Git tree entries.
+
+    Produces the same node shape as the contents-API walk used previously:
+    directories carry ``children`` (empty at the depth limit) and files carry
+    ``size``.
+
+    Args:
+        entries: Flat entries with ``path``, ``type`` (blob/tree/commit),
+            optional ``mode`` and ``size``
+        path: Starting path in repository (default: root)
+        max_depth: Maximum depth to include
+
+    Returns:
+        List of file/directory nodes
+    """
+    prefix = path.strip("/")
+    base = f"{prefix}/" if prefix else ""
+    roots: List[Dict[str, Any]] = []
+    dirs: Dict[str, Dict[str, Any]] = {}
+
+    # Parents must be placed before their children
+    ordered = sorted(entries, key=lambda e: e["path"].count("/"))
+
+    for entry in ordered:
+        entry_path = entry["path"]
+
+        # Starting path points at a single file
+        if prefix and entry_path == prefix and entry["type"] != "tree":
+            relative = entry_path.rsplit("/", 1)[-1]
+        elif entry_path.startswith(base) and entry_path != prefix:
+            relative = entry_path[len(base) :]
+        else:
+            continue
+
+        if relative.count("/") >= max_depth:
+            continue
+
+        node_type = GIT_TYPE_TO_NODE_TYPE.get(entry["type"], "file")
+        if node_type == "file" and entry.get("mode") == "120000":
+            node_type = "symlink"
+
+        node: Dict[str, Any] = {
+            "name": entry_path.rsplit("/", 1)[-1],
+            "path": entry_path,
+            "type": node_type,
+        }
+        if node_type == "dir":
+            node["children"] = []
+            dirs[entry_path] = node
+        else:
+            node["size"] = entry.get("size") or 0
+
+        parent_path = entry_path.rsplit("/", 1)[0] if "/" in relative else None
+        if parent_path is None:
+            roots.append(node)
+        elif parent_path in dirs:
+            dirs[parent_path]["children"].append(node)
+
+    return roots
+
+
 class GitHubClient:
     """Client for interacting with GitHub API."""
 
@@ -41,28 +143,7 @@ class GitHubClient:
         Raises:
             AppException: If URL format is invalid
         """
-        try:
-            # Remove trailing slashes and .git suffix
-            url = repo_url.rstrip("/").rstrip(".git")
-
-            # Handle different URL formats
-            if "github.com/" in url:
-                # Extract path after github.com/
-                parts = url.split("github.com/")[-1].split("/")
-                if len(parts) >= 2:
-                    owner, repo = parts[0], parts[1]
-                    logger.debug("repo_url_parsed", owner=owner, repo=repo)
-                    return owner, repo
-
-            raise ValueError("Invalid GitHub URL format")
-
-        except Exception as e:
-            logger.error("repo_url_parse_failed", url=repo_url, error=str(e))
-            raise AppException(
-                error_code="INVALID_REPO_URL",
-                message=f"Invalid GitHub repository URL: {repo_url}",
-                status_code=400,
-            )
+        return parse_repo_url(repo_url)
 
     def get_repository(self, repo_url: str) -> Repository:
         """Get GitHub repository object.
@@ -159,72 +240,97 @@ class GitHubClient:
         logger.info("repo_info_retrieved", repo=repo.full_name, stars=info["stars"])
         return info
 
+    def get_commit_sha(self, repo_url: str, ref: Optional[str] = None) -> str:
+        """Resolve a branch, tag or the default branch to a commit SHA.
+
+        Args:
+            repo_url: GitHub repository URL
+            ref: Branch, tag or commit (default: repository default branch)
+
+        Returns:
+            Commit SHA
+
+        Raises:
+            AppException: If the ref cannot be resolved
+        """
+        repo = self.get_repository(repo_url)
+        ref = ref or repo.default_branch
+
+        try:
+            commit_sha = repo.get_commit(ref).sha
+            logger.debug(
+                "commit_sha_resolved", repo=repo.full_name, ref=ref, sha=commit_sha
+            )
+            return commit_sha
+
+        except GithubException as e:
+            logger.error(
+                "commit_resolve_failed", repo=repo.full_name, ref=ref, error=str(e)
+            )
+            raise AppException(
+                error_code=(
+                    "REF_NOT_FOUND" if e.status in (404, 422) else "GITHUB_API_ERROR"
+                ),
+                message=f"Failed to resolve ref '{ref}': {e.data.get('message', str(e))}",
+                status_code=404 if e.status in (404, 422) else e.status,
+            )
+
     def get_directory_tree(
-        self, repo_url: str, path: str = "", max_depth: int = 3
+        self,
+        repo_url: str,
+        path: str = "",
+        max_depth: int = 3,
+        ref: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
         """Get directory tree structure of repository.
 
+        Uses the recursive Git Trees API so the whole tree is fetched in a single
+        request; depth filtering happens locally. Falls back to a level-by-level
+        walk when GitHub truncates the recursive response.
+
         Args:
             repo_url: GitHub repository URL
             path: Starting path in repository (default: root)
             max_depth: Maximum depth to traverse (default: 3)
+            ref: Commit SHA or branch name (default: repository default branch)
 
         Returns:
             List of file/directory nodes with structure:
             - name: File or directory name
             - path: Full path
-            - type: 'file' or 'directory'
+            - type: 'file' or 'dir'
             - children: List of child nodes (for directories)
             - size: File size in bytes (for files)
         """
         repo = self.get_repository(repo_url)
-
-        def traverse_directory(
-            contents: List[ContentFile], current_depth: int = 0
-        ) -> List[Dict[str, Any]]:
-            """Recursively traverse directory structure."""
-            if current_depth >= max_depth:
-                return []
-
-            nodes = []
-            for content in contents:
-                node = {
-                    "name": content.name,
-                    "path": content.path,
-                    "type": content.type,
-                }
-
-                if content.type == "dir":
-                    # Recursively get subdirectory contents
-                    try:
-                        subcontents = repo.get_contents(content.path)
-                        if isinstance(subcontents, list):
-                            node["children"] = traverse_directory(
-                                subcontents, current_depth + 1
-                            )
-                        else:
-                            node["children"] = []
-                    except Exception as e:
-                        logger.warning(
-                            "failed_to_get_subdir",
-                            path=content.path,
-                            error=str(e),
-                        )
-                        node["children"] = []
-                else:
-                    # For files, include size
-                    node["size"] = content.size
-
-                nodes.append(node)
-
-            return nodes
+        ref = ref or repo.default_branch
+        prefix = path.strip("/")
 
         try:
-            contents = repo.get_contents(path)
-            if not isinstance(contents, list):
-                contents = [contents]
+            git_tree = repo.get_git_tree(ref, recursive=True)
+
+            if git_tree.raw_data.get("truncated"):
+                logger.warning(
+                    "git_tree_truncated_falling_back",
+                    repo=repo.full_name,
+                    ref=ref,
+                    entries=len(git_tree.tree),
+                )
+                entries = self._walk_git_tree(repo, ref, prefix, max_depth)
+            else:
+                entries = [self._tree_element_to_entry(e) for e in git_tree.tree]
+
+            if prefix and not any(
+                e["path"] == prefix or e["path"].startswith(prefix + "/")
+                for e in entries
+            ):
+                raise AppException(
+                    error_code="TREE_FETCH_FAILED",
+                    message=f"Path not found in repository: {path}",
+                    status_code=404,
+                )
 
-            tree = traverse_directory(contents)
+            tree = build_directory_tree(entries, prefix, max_depth)
             logger.info(
                 "directory_tree_retrieved",
                 repo=repo.full_name,
@@ -233,6 +339,8 @@ class GitHubClient:
             )
             return tree
 
+        except AppException:
+            raise
         except Exception as e:
             logger.error(
                 "failed_to_get_directory_tree",
@@ -246,12 +354,119 @@ class GitHubClient:
                 status_code=500,
             )
 
-    def get_file_content(self, repo_url: str, file_path: str) -> str:
+    def get_file_paths(
+        self, repo_url: str, ref: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """List every file path of a commit with one recursive tree request.
+
+        Unlike get_directory_tree there is no depth limit and no level-by-level
+        fallback: for trees GitHub truncates, the partial listing is returned
+        and flagged, since walking a huge tree would cost one request per
+        directory.
+
+        Args:
+            repo_url: GitHub repository URL
+            ref: Commit SHA or branch name (default: repository default branch)
+
+        Returns:
+            Dictionary with ``paths`` (blob paths in tree order) and
+            ``truncated`` (whether GitHub truncated the listing)
+        """
+        repo = self.get_repository(repo_url)
+        ref = ref or repo.default_branch
+
+        try:
+            git_tree = repo.get_git_tree(ref, recursive=True)
+        except GithubException as e:
+            logger.error("failed_to_list_file_paths", repo=repo.full_name, error=str(e))
+            raise AppException(
+                error_code="TREE_FETCH_FAILED",
+                message=f"Failed to fetch directory tree: {str(e)}",
+                status_code=500,
+            )
+
+        truncated = bool(git_tree.raw_data.get("truncated"))
+        paths = [e.path for e in git_tree.tree if e.type == "blob"]
+        logger.info(
+            "file_paths_listed",
+            repo=repo.full_name,
+            files=len(paths),
+            truncated=truncated,
+        )
+        return {"paths": paths, "truncated": truncated}
+
+    def _walk_git_tree(
+        self, repo: Repository, ref: str, prefix: str, max_depth: int
+    ) -> List[Dict[str, Any]]:
+        """Collect tree entries level by level with non-recursive tree requests.
+
+        Only directories that will actually be expanded are fetched, so the
+        number of requests is bounded by the directories within ``max_depth``.
+
+        Args:
+            repo: GitHub Repository object
+            ref: Commit SHA or branch name
+            prefix: Starting path (without leading/trailing slashes)
+            max_depth: Maximum depth to traverse
+
+        Returns:
+            Flat list of tree entries with full paths
+        """
+        tree_sha = ref
+        entries: List[Dict[str, Any]] = []
+        walked = ""
+
+        # Resolve the starting directory one path component at a time
+        for part in [p for p in prefix.split("/") if p]:
+            level = repo.get_git_tree(tree_sha).tree
+            match = next((e for e in level if e.path == part), None)
+            if match is None:
+                return []
+            entry = self._tree_element_to_entry(match, walked)
+            entries.append(entry)
+            if match.type != "tree":
+                return entries
+            walked = entry["path"]
+            tree_sha = match.sha
+
+        pending = [(tree_sha, prefix, 0)]
+        while pending:
+            sha, base, depth = pending.pop(0)
+            for element in repo.get_git_tree(sha).tree:
+                entry = self._tree_element_to_entry(element, base)
+                entries.append(entry)
+                if element.type == "tree" and depth + 1 < max_depth:
+                    pending.append((element.sha, entry["path"], depth + 1))
+
+        return entries
+
+    @staticmethod
+    def _tree_element_to_entry(element: Any, base: str = "") -> Dict[str, Any]:
+        """Convert a Git tree element to a flat entry dictionary.
+
+        Args:
+            element: PyGithub GitTreeElement
+            base: Path of the tree containing the element (for non-recursive trees)
+
+        Returns:
+            Dictionary with path, type, mode and size
+        """
+        return {
+            "path": f"{base}/{element.path}" if base else element.path,
+            "type": element.type,
+            "mode": element.mode,
+            "size": element.size,
+        }
+
+    def get_file_content(
+        self, repo_url: str, file_path: str, ref: Optional[str] = None
+    ) -> str:
         """Get content of a specific file.
 
         Args:
             repo_url: GitHub repository URL
             file_path: Path to file in repository
+            ref: Commit SHA or branch name (default: default branch)
 
         Returns:
             File content as string
@@ -262,7 +477,11 @@ class GitHubClient:
         repo = self.get_repository(repo_url)
 
         try:
-            content_file = repo.get_contents(file_path)
+            content_file = (
+                repo.get_contents(file_path, ref=ref)
+                if ref
+                else repo.get_contents(file_path)
+            )
 
             if isinstance(content_file, list):
                 raise AppException(
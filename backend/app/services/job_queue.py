@@ -0,0 +1,549 @@
+"""Persistent background job queue backed by SQLite."""
+import ipaddress
+import json
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+import httpx
+import structlog
+
+from app.config import settings
+from app.core.exceptions import AppException
+
+logger = structlog.get_logger()
+
+JobHandler = Callable[[Dict[str, Any]], Any]
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+
+def check_callback_url(url: str, allowed_hosts: List[str]) -> Optional[str]:
+    """Reject callback URLs that would make the server call internal services.
+
+    The URL must be http(s). With an allowlist, its host must be on it;
+    without one, every address the host resolves to must be public (not
+    loopback, private, link-local or otherwise reserved).
+
+    Args:
+        url: Callback URL
+        allowed_hosts: Hosts callbacks may go to; empty = any public host
+
+    Returns:
+        The checked public address to connect to, or None for an allowlisted
+        host (which is trusted to resolve to the right place)
+
+    Raises:
+        AppException: INVALID_CALLBACK_URL (400) if the URL is not allowed
+    """
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    address = None
+    reason = None
+    if parts.scheme not in ("http", "https") or not host:
+        reason = "Callback URLs must be http(s) URLs with a host"
+    elif allowed_hosts:
+        if host not in (allowed.lower() for allowed in allowed_hosts):
+            reason = "Callback host is not allowed"
+    else:
+        try:
+            addresses = [
+                info[4][0].split("%", 1)[0] for info in socket.getaddrinfo(host, None)
+            ]
+        except (socket.gaierror, UnicodeError):
+            addresses = []
+        if not addresses:
+            reason = "Callback host cannot be resolved"
+        elif not all(ipaddress.ip_address(a).is_global for a in addresses):
+            reason = "Callback host resolves to a non-public address"
+        else:
+            address = addresses[0]
+
+    if reason is not None:
+        raise AppException(
+            error_code="INVALID_CALLBACK_URL",
+            message=reason,
+            status_code=400,
+            details={"callbackUrl": url},
+        )
+    return address
+
+
+def post_to_address(
+    url: str, address: Optional[str], payload: Any, timeout: float
+) -> httpx.Response:
+    """POST JSON to a URL, connecting to an already resolved address.
+
+    Resolving the host again could yield a different (internal) address
+    than the one checked (DNS rebinding), so the connection goes to
+    ``address`` while the Host header and TLS server name (SNI and
+    certificate check) stay those of the URL. Redirects are not followed.
+
+    Args:
+        url: Target URL
+        address: IP address to connect to; None resolves the host as usual
+        payload: JSON body
+        timeout: Request timeout in seconds
+
+    Returns:
+        Response
+    """
+    headers: Dict[str, str] = {}
+    extensions: Dict[str, Any] = {}
+    if address is not None:
+        parts = urlsplit(url)
+        userinfo, _, host_port = parts.netloc.rpartition("@")
+        netloc = f"[{address}]" if ":" in address else address
+        if parts.port is not None:
+            netloc = f"{netloc}:{parts.port}"
+        if userinfo:
+            netloc = f"{userinfo}@{netloc}"
+        headers["Host"] = host_port
+        extensions["sni_hostname"] = parts.hostname
+        url = urlunsplit(parts._replace(netloc=netloc))
+
+    with httpx.Client(timeout=timeout) as client:
+        return client.post(url, json=payload, headers=headers, extensions=extensions)
+
+
+class JobQueue:
+    """Runs submitted jobs on a pool of worker threads.
+
+    Jobs are stored in SQLite, so queued jobs survive a restart and jobs that
+    were running when the process died are queued again on start. Submitting
+    a job whose dedup key matches a queued or running job returns that job
+    instead of adding another; the submit's callback URL, if any, is added
+    to that job's callbacks. When ``max_pending`` jobs are already queued,
+    submit raises JOB_QUEUE_FULL (503) so callers can back off.
+
+    Finished jobs keep their result for ``retention`` seconds (idle workers
+    purge older ones every PURGE_INTERVAL seconds); if a job was submitted
+    with a callback URL, the finished job is POSTed to it.
+    """
+
+    PURGE_INTERVAL = 600
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            dedup_key TEXT NOT NULL,
+            status TEXT NOT NULL,
+            params TEXT NOT NULL,
+            callback_url TEXT,
+            result TEXT,
+            error TEXT,
+            created_at REAL NOT NULL,
+            started_at REAL,
+            finished_at REAL
+        );
+        CREATE INDEX IF NOT EXISTS jobs_status_created
+            ON jobs (status, created_at);
+        CREATE INDEX IF NOT EXISTS jobs_dedup_key ON jobs (dedup_key);
+
+        -- Callbacks of submits deduplicated onto an existing job
+        CREATE TABLE IF NOT EXISTS job_callbacks (
+            job_id TEXT NOT NULL,
+            url TEXT NOT NULL,
+            PRIMARY KEY (job_id, url)
+        ) WITHOUT ROWID;
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: JobHandler,
+        db_path: Optional[str] = None,
+        workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        retention: Optional[int] = None,
+        callback_timeout: Optional[float] = None,
+        callback_hosts: Optional[List[str]] = None,
+        formatter: Optional[Callable[[Dict[str, Any]], Any]] = None,
+    ):
+        """Initialize job queue.
+
+        Args:
+            name: Queue name, used for thread names and logs
+            handler: Function run for each job; receives the job params and
+                returns a JSON-serializable result
+            db_path: SQLite database file (default: settings.job_db_path or
+                .cache/jobs.db)
+            workers: Number of worker threads (default: settings.job_workers)
+            max_pending: Queued jobs allowed before submit is rejected, 0 =
+                unbounded (default: settings.job_max_pending)
+            retention: Seconds finished jobs are kept
+                (default: settings.job_retention)
+            callback_timeout: Timeout for callback requests in seconds
+                (default: settings.job_callback_timeout)
+            callback_hosts: Hosts callback URLs may point to, empty = any
+                public host (default: settings.job_callback_allowed_hosts)
+            formatter: Converts a job dictionary to the callback payload
+                (default: the job dictionary itself)
+        """
+        self.name = name
+        self.handler = handler
+        self.db_path = db_path or settings.job_db_path or ".cache/jobs.db"
+        self.workers = workers or settings.job_workers
+        self.max_pending = (
+            settings.job_max_pending if max_pending is None else max_pending
+        )
+        self.retention = settings.job_retention if retention is None else retention
+        self.callback_timeout = callback_timeout or settings.job_callback_timeout
+        self.callback_hosts = (
+            settings.job_callback_allowed_hosts
+            if callback_hosts is None
+            else callback_hosts
+        )
+        self.formatter = formatter
+
+        self._local = threading.local()
+        self._submit_lock = threading.Lock()
+        self._wakeup = threading.Condition()
+        self._stop_event = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._purge_lock = threading.Lock()
+        self._purged_at = time.monotonic()
+
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = self._get_conn()
+        conn.executescript(self.SCHEMA)
+        conn.commit()
+
+    def _get_conn(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def submit(
+        self,
+        dedup_key: str,
+        params: Dict[str, Any],
+        callback_url: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Queue a job, or return the active job with the same dedup key.
+
+        Args:
+            dedup_key: Jobs with equal keys are not run concurrently; it must
+                cover every param that changes the result
+            params: JSON-serializable arguments passed to the handler
+            callback_url: URL to POST the finished job to (also when the
+                job is deduplicated)
+
+        Returns:
+            Job dictionary (see get)
+
+        Raises:
+            AppException: INVALID_CALLBACK_URL if callback_url is not allowed
+                (see check_callback_url), JOB_QUEUE_FULL if max_pending jobs
+                are queued
+        """
+        if callback_url is not None:
+            check_callback_url(callback_url, self.callback_hosts)
+
+        conn = self._get_conn()
+
+        # Serialize check-then-insert so concurrent submits cannot both insert
+        with self._submit_lock, conn:
+            existing = conn.execute(
+                "SELECT * FROM jobs WHERE dedup_key = ? AND status IN (?, ?) "
+                "ORDER BY created_at LIMIT 1",
+                (dedup_key, *ACTIVE_STATUSES),
+            ).fetchone()
+            if existing is not None:
+                if callback_url and callback_url != existing["callback_url"]:
+                    conn.execute(
+                        "INSERT OR IGNORE INTO job_callbacks (job_id, url) "
+                        "VALUES (?, ?)",
+                        (existing["id"], callback_url),
+                    )
+                logger.info("job_deduplicated", queue=self.name, job_id=existing["id"])
+                return self._to_dict(existing)
+
+            if self.max_pending:
+                pending = conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUED,)
+                ).fetchone()[0]
+                if pending >= self.max_pending:
+                    logger.warning("job_queue_full", queue=self.name, pending=pending)
+                    raise AppException(
+                        error_code="JOB_QUEUE_FULL",
+                        message="Too many jobs are queued. Please try again later.",
+                        status_code=503,
+                        details={"pending": pending, "maxPending": self.max_pending},
+                    )
+
+            job_id = uuid.uuid4().hex
+            conn.execute(
+                "INSERT INTO jobs (id, dedup_key, status, params, callback_url, "
+                "created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    job_id,
+                    dedup_key,
+                    QUEUED,
+                    json.dumps(params, ensure_ascii=False),
+                    callback_url,
+                    time.time(),
+                ),
+            )
+
+        with self._wakeup:
+            self._wakeup.notify()
+
+        logger.info("job_submitted", queue=self.name, job_id=job_id)
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job by ID.
+
+        Args:
+            job_id: Job ID returned by submit
+
+        Returns:
+            Dictionary with id, status, params, result, error and timestamps,
+            or None if the job does not exist (or was purged)
+        """
+        row = (
+            self._get_conn()
+            .execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+            .fetchone()
+        )
+        return self._to_dict(row) if row is not None else None
+
+    def _to_dict(self, row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "id": row["id"],
+            "status": row["status"],
+            "params": json.loads(row["params"]),
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": json.loads(row["error"]) if row["error"] else None,
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"],
+        }
+
+    def _claim(self) -> Optional[sqlite3.Row]:
+        """Mark the oldest queued job as running and return it."""
+        conn = self._get_conn()
+        while True:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1",
+                (QUEUED,),
+            ).fetchone()
+            if row is None:
+                return None
+
+            # Only one worker (in any process) wins the status transition
+            with conn:
+                claimed = conn.execute(
+                    "UPDATE jobs SET status = ?, started_at = ? "
+                    "WHERE id = ? AND status = ?",
+                    (RUNNING, time.time(), row["id"], QUEUED),
+                ).rowcount
+            if claimed:
+                return row
+
+    def run_next(self) -> bool:
+        """Run the oldest queued job in the calling thread.
+
+        Returns:
+            True if a job was run, False if none was queued
+        """
+        row = self._claim()
+        if row is None:
+            return False
+
+        job_id = row["id"]
+        started = time.monotonic()
+        result, error = None, None
+        try:
+            result = self.handler(json.loads(row["params"]))
+            status = SUCCEEDED
+        except AppException as e:
+            status = FAILED
+            error = {"errorCode": e.error_code, "message": e.message}
+        except Exception as e:
+            logger.error("job_failed", queue=self.name, job_id=job_id, exc_info=True)
+            status = FAILED
+            error = {"errorCode": "INTERNAL_ERROR", "message": str(e)}
+
+        conn = self._get_conn()
+        with conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? "
+                "WHERE id = ?",
+                (
+                    status,
+                    (
+                        json.dumps(result, ensure_ascii=False)
+                        if result is not None
+                        else None
+                    ),
+                    json.dumps(error, ensure_ascii=False) if error else None,
+                    time.time(),
+                    job_id,
+                ),
+            )
+
+        logger.info(
+            "job_finished",
+            queue=self.name,
+            job_id=job_id,
+            status=status,
+            duration_ms=round((time.monotonic() - started) * 1000, 1),
+        )
+
+        callback_urls = [row["callback_url"]] if row["callback_url"] else []
+        callback_urls += [
+            url
+            for (url,) in conn.execute(
+                "SELECT url FROM job_callbacks WHERE job_id = ?", (job_id,)
+            )
+        ]
+        if callback_urls:
+            job = self.get(job_id)
+            for url in callback_urls:
+                self._send_callback(url, job)
+        return True
+
+    def _send_callback(self, url: str, job: Dict[str, Any]) -> None:
+        """POST a finished job to its callback URL; failures are only logged.
+
+        The URL is checked again before sending, as its host may resolve to
+        a different address than at submit time, and the request goes to
+        the address that was checked (see post_to_address).
+        """
+        try:
+            address = check_callback_url(url, self.callback_hosts)
+            payload = self.formatter(job) if self.formatter else job
+            response = post_to_address(url, address, payload, self.callback_timeout)
+            response.raise_for_status()
+        except AppException as e:
+            logger.warning(
+                "job_callback_rejected",
+                queue=self.name,
+                job_id=job["id"],
+                error=e.message,
+            )
+        except httpx.HTTPError as e:
+            logger.warning(
+                "job_callback_failed", queue=self.name, job_id=job["id"], error=str(e)
+            )
+
+    def purge_finished(self) -> int:
+        """Delete finished jobs older than the retention period.
+
+        Returns:
+            Number of jobs deleted
+        """
+        conn = self._get_conn()
+        with conn:
+            cursor = conn.execute(
+                "DELETE FROM jobs WHERE status NOT IN (?, ?) AND finished_at < ?",
+                (*ACTIVE_STATUSES, time.time() - self.retention),
+            )
+            conn.execute(
+                "DELETE FROM job_callbacks WHERE job_id NOT IN (SELECT id FROM jobs)"
+            )
+        return cursor.rowcount
+
+    def _purge_if_due(self) -> None:
+        """Purge finished jobs if PURGE_INTERVAL passed since the last purge."""
+        with self._purge_lock:
+            if time.monotonic() - self._purged_at < self.PURGE_INTERVAL:
+                return
+            self._purged_at = time.monotonic()
+
+        purged = self.purge_finished()
+        if purged:
+            logger.info("jobs_purged", queue=self.name, purged=purged)
+
+    def _work(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                if self.run_next():
+                    continue
+                self._purge_if_due()
+            except Exception as e:
+                logger.error("job_worker_error", queue=self.name, error=str(e))
+
+            # Idle: wait for a submit (or poll, in case another process queued)
+            with self._wakeup:
+                self._wakeup.wait(timeout=1.0)
+
+    def start(self) -> None:
+        """Requeue interrupted jobs and start the worker threads."""
+        if self._threads:
+            return
+
+        conn = self._get_conn()
+        with conn:
+            requeued = conn.execute(
+                "UPDATE jobs SET status = ?, started_at = NULL WHERE status = ?",
+                (QUEUED, RUNNING),
+            ).rowcount
+        purged = self.purge_finished()
+        self._purged_at = time.monotonic()
+
+        self._stop_event.clear()
+        self._threads = [
+            threading.Thread(
+                target=self._work, name=f"{self.name}-worker-{i}", daemon=True
+            )
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info(
+            "job_queue_started",
+            queue=self.name,
+            workers=self.workers,
+            requeued=requeued,
+            purged=purged,
+        )
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the workers, waiting for running jobs to finish.
+
+        Args:
+            timeout: Seconds to wait per worker; a job still running after
+                that is left as running and queued again on the next start
+        """
+        if not self._threads:
+            return
+
+        self._stop_event.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        logger.info("job_queue_stopped", queue=self.name)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get job counts by status.
+
+        Returns:
+            Dictionary with a count per status and the worker count
+        """
+        rows = self._get_conn().execute(
+            "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+        )
+        counts = {QUEUED: 0, RUNNING: 0, SUCCEEDED: 0, FAILED: 0}
+        counts.update({status: count for status, count in rows})
+        return {**counts, "workers": len(self._threads)}
@@ -0,0 +1,152 @@
+"""Incremental parsing of a JSON document arriving in chunks."""
+import json
+from dataclasses import dataclass
+from typing import Any, List, Optional, Tuple, Union
+
+import structlog
+
+logger = structlog.get_logger()
+
+JSONPath = Tuple[Union[str, int], ...]
+
+_WHITESPACE = " \t\r\n"
+_SCALAR_END = ",:]}" + _WHITESPACE
+
+
+@dataclass
+class _Container:
+    """An object or array that has been opened but not yet closed."""
+
+    is_object: bool
+    start: int
+    key: Union[str, int, None]
+    expect_key: bool
+
+
+class JSONStreamParser:
+    """Reports values of a streamed JSON document as soon as they are complete.
+
+    Text is fed in arbitrary chunks (e.g. LLM tokens). Each call to feed
+    returns the values that were completed by that chunk, as (path, value)
+    pairs where path is the sequence of object keys / array indexes leading
+    to the value. Only values at most max_depth levels below the root are
+    reported, so for {"steps": [{...}, {...}]} and the default depth of 2 a
+    caller sees each ("steps", i) item as it closes and finally ("steps",).
+
+    The scan is linear in the total input: each character is examined once
+    and each reported value is decoded once from its slice of the buffer.
+    """
+
+    def __init__(self, max_depth: int = 2):
+        """Initialize parser.
+
+        Args:
+            max_depth: Deepest level (1 = root members) at which to report values
+        """
+        self.max_depth = max_depth
+        self._buffer = ""
+        self._pos = 0
+        self._stack: List[_Container] = []
+        self._token_start: Optional[int] = None
+        self._in_string = False
+        self._is_key = False
+        self._escape = False
+        self._events: List[Tuple[JSONPath, Any]] = []
+
+    @property
+    def text(self) -> str:
+        """All text fed so far."""
+        return self._buffer
+
+    def feed(self, chunk: str) -> List[Tuple[JSONPath, Any]]:
+        """Consume the next chunk of the document.
+
+        Args:
+            chunk: Next piece of JSON text
+
+        Returns:
+            (path, value) pairs completed by this chunk, in document order
+        """
+        self._buffer += chunk
+        buffer = self._buffer
+
+        for i in range(self._pos, len(buffer)):
+            c = buffer[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    self._end_string(i + 1)
+                continue
+
+            if self._token_start is not None:
+                if c not in _SCALAR_END:
+                    continue
+                self._complete(self._token_start, i)
+                self._token_start = None
+
+            if c in _WHITESPACE or c == ":":
+                continue
+
+            if c == '"':
+                top = self._stack[-1] if self._stack else None
+                self._in_string = True
+                self._is_key = top is not None and top.expect_key
+                self._token_start = i
+            elif c in "{[":
+                self._stack.append(
+                    _Container(
+                        is_object=c == "{",
+                        start=i,
+                        key=None if c == "{" else 0,
+                        expect_key=c == "{",
+                    )
+                )
+            elif c in "}]":
+                if not self._stack:
+                    continue
+                container = self._stack.pop()
+                self._complete(container.start, i + 1)
+            elif c == ",":
+                if not self._stack:
+                    continue
+                top = self._stack[-1]
+                if top.is_object:
+                    top.expect_key = True
+                else:
+                    top.key += 1
+            else:
+                self._token_start = i
+
+        self._pos = len(buffer)
+        events, self._events = self._events, []
+        return events
+
+    def _end_string(self, end: int) -> None:
+        """Handle a closing quote at end - 1."""
+        start, self._token_start = self._token_start, None
+        if not self._is_key:
+            self._complete(start, end)
+            return
+
+        top = self._stack[-1]
+        top.key = json.loads(self._buffer[start:end])
+        top.expect_key = False
+
+    def _complete(self, start: int, end: int) -> None:
+        """Record the value spanning buffer[start:end] if it is shallow enough."""
+        path = tuple(container.key for container in self._stack)
+        if not 1 <= len(path) <= self.max_depth:
+            return
+
+        try:
+            value = json.loads(self._buffer[start:end])
+        except json.JSONDecodeError:
+            logger.debug("json_stream_value_skipped", path=path)
+            return
+
+        self._events.append((path, value))
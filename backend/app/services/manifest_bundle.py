@@ -0,0 +1,187 @@
+"""Manifest files of one repository commit, fetched and parsed once."""
+import json
+import threading
+from collections import OrderedDict
+from functools import cached_property
+from typing import Any, Dict, List, Optional, Set
+
+import structlog
+
+from app.services.repository_service import repository_service
+
+logger = structlog.get_logger()
+
+# Files the analyzers may read; fetched together with the tree before analysis
+MANIFEST_FILES = [
+    "package.json",
+    "requirements.txt",
+    "pyproject.toml",
+    "go.mod",
+    "Cargo.toml",
+    "pom.xml",
+    "build.gradle",
+    "build.gradle.kts",
+]
+
+
+class ManifestBundle:
+    """Contents of every MANIFEST_FILES entry of a commit, with parsed views.
+
+    The project type identifier, the dependency analyzer and the QA service
+    all read the same manifests. A bundle fetches them in one concurrent
+    batch and parses each at most once (parsed views are computed on first
+    access). Bundles for commit SHAs are immutable and shared through a
+    small in-process LRU, so the consumers of one request - and later
+    requests for the same commit - reuse the same parsed objects.
+    """
+
+    MAX_SHARED = 64
+
+    _shared: "OrderedDict[str, ManifestBundle]" = OrderedDict()
+    _shared_lock = threading.Lock()
+
+    def __init__(self, files: Dict[str, str]):
+        """Initialize bundle.
+
+        Args:
+            files: Manifest path -> content, for the manifests that exist
+        """
+        self.files = files
+
+    def __contains__(self, file_path: str) -> bool:
+        return file_path in self.files
+
+    @staticmethod
+    def covers(file_path: str) -> bool:
+        """Check whether a path is a manifest candidate.
+
+        For covered paths, absence from the bundle means the file does not
+        exist; other paths must be fetched separately.
+        """
+        return file_path in MANIFEST_FILES
+
+    def text(self, file_path: str) -> Optional[str]:
+        """Get raw manifest content.
+
+        Args:
+            file_path: Manifest path
+
+        Returns:
+            File content, or None if the manifest does not exist
+        """
+        return self.files.get(file_path)
+
+    @cached_property
+    def package_json(self) -> Optional[Dict[str, Any]]:
+        """Parsed package.json, or None if missing or invalid."""
+        content = self.files.get("package.json")
+        if content is None:
+            return None
+        try:
+            data = json.loads(content)
+        except json.JSONDecodeError as e:
+            logger.debug("package_json_invalid", error=str(e))
+            return None
+        return data if isinstance(data, dict) else None
+
+    @cached_property
+    def package_dependencies(self) -> Set[str]:
+        """Names of package.json dependencies and devDependencies."""
+        package_json = self.package_json or {}
+        return {
+            *package_json.get("dependencies", {}),
+            *package_json.get("devDependencies", {}),
+        }
+
+    @cached_property
+    def requirements(self) -> Optional[List[str]]:
+        """Package names from requirements.txt, or None if it does not exist."""
+        content = self.files.get("requirements.txt")
+        if content is None:
+            return None
+        return [
+            line.split("==")[0].split(">=")[0].split("<=")[0].strip()
+            for line in content.splitlines()
+            if line.strip() and not line.startswith("#")
+        ]
+
+    @cached_property
+    def go_requirements(self) -> Optional[List[str]]:
+        """Module paths from the go.mod require block, or None if missing."""
+        content = self.files.get("go.mod")
+        if content is None:
+            return None
+
+        require_section = False
+        deps = []
+        for line in content.splitlines():
+            line = line.strip()
+            if line.startswith("require"):
+                require_section = True
+                continue
+            if require_section and line.startswith(")"):
+                break
+            if require_section and line:
+                dep = line.split()[0] if line.split() else ""
+                if dep:
+                    deps.append(dep)
+        return deps
+
+    @classmethod
+    def _shared_key(cls, repo_url: str, ref: Optional[str]) -> Optional[str]:
+        # Only commit-pinned bundles are immutable and safe to share
+        return f"{repo_url}@{ref}" if ref else None
+
+    @classmethod
+    def _get_shared(cls, key: Optional[str]) -> Optional["ManifestBundle"]:
+        if key is None:
+            return None
+        with cls._shared_lock:
+            bundle = cls._shared.get(key)
+            if bundle is not None:
+                cls._shared.move_to_end(key)
+            return bundle
+
+    @classmethod
+    def from_files(
+        cls, repo_url: str, files: Dict[str, str], ref: Optional[str] = None
+    ) -> "ManifestBundle":
+        """Create a bundle from already fetched manifests and share it.
+
+        Args:
+            repo_url: GitHub repository URL
+            files: Manifest path -> content, for the manifests that exist
+            ref: Commit SHA the files were read at
+
+        Returns:
+            Manifest bundle
+        """
+        bundle = cls(files)
+        key = cls._shared_key(repo_url, ref)
+        if key is None:
+            return bundle
+
+        with cls._shared_lock:
+            cls._shared[key] = bundle
+            cls._shared.move_to_end(key)
+            while len(cls._shared) > cls.MAX_SHARED:
+                cls._shared.popitem(last=False)
+        return bundle
+
+    @classmethod
+    def load(cls, repo_url: str, ref: Optional[str] = None) -> "ManifestBundle":
+        """Get the manifest bundle of a commit, fetching it if not shared yet.
+
+        Args:
+            repo_url: GitHub repository URL
+            ref: Commit SHA (default: default branch HEAD, not shared)
+
+        Returns:
+            Manifest bundle
+        """
+        bundle = cls._get_shared(cls._shared_key(repo_url, ref))
+        if bundle is not None:
+            return bundle
+
+        files = repository_service.get_multiple_files(repo_url, MANIFEST_FILES, ref=ref)
+        return cls.from_files(repo_url, files, ref)
@@ -0,0 +1,245 @@
+"""Sorted index over every file path of one repository commit."""
+import re
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Pattern, Tuple
+
+import structlog
+
+from app.services.repository_service import repository_service
+
+logger = structlog.get_logger()
+
+_GLOB_SPECIAL = "*?["
+
+
+def _extension(path: str) -> str:
+    """Lowercased extension of a path's file name ("" for none or dotfiles)."""
+    name = path.rsplit("/", 1)[-1]
+    dot = name.rfind(".")
+    return name[dot:].lower() if dot > 0 else ""
+
+
+def _glob_to_regex(pattern: str) -> Pattern[str]:
+    """Compile a path glob.
+
+    ``*`` and ``?`` stay within one path segment, ``**`` spans any number of
+    directories (``**/`` also matches none) and ``[...]`` is a character class.
+    """
+    parts = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+            continue
+        if c == "*":
+            parts.append("[^/]*")
+        elif c == "?":
+            parts.append("[^/]")
+        elif c == "[" and "]" in pattern[i + 2 :]:
+            end = pattern.index("]", i + 2)
+            body = pattern[i + 1 : end]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            parts.append("[" + body.replace("\\", "\\\\") + "]")
+            i = end
+        else:
+            parts.append(re.escape(c))
+        i += 1
+    return re.compile("".join(parts) + r"\Z")
+
+
+class PathIndex:
+    """All file paths of a commit, sorted, with prefix/extension/glob queries.
+
+    Paths are kept in one sorted tuple, so everything under a directory (or
+    sharing any string prefix) is a contiguous slice found with two binary
+    searches. Each extension maps to an ``array`` of positions in that tuple,
+    which keeps the index compact for 100k-file repositories and lets
+    "all .py files under src/" be answered by bisecting the position array
+    with the directory's slice bounds. Globs are narrowed to the slice of
+    their literal prefix before the compiled pattern is applied.
+
+    Directories are not stored; a directory exists if some file lies below it.
+    Indexes of commit SHAs are immutable and shared through a small
+    in-process LRU, like manifest bundles.
+    """
+
+    MAX_SHARED = 16
+
+    _shared: "OrderedDict[str, PathIndex]" = OrderedDict()
+    _shared_lock = threading.Lock()
+
+    def __init__(self, paths: Iterable[str], truncated: bool = False):
+        """Build index.
+
+        Args:
+            paths: File paths (blobs) relative to the repository root
+            truncated: Whether the listing is known to be incomplete
+        """
+        self.paths: Tuple[str, ...] = tuple(sorted(set(paths)))
+        self.truncated = truncated
+
+        self._extensions: Dict[str, array] = {}
+        for position, path in enumerate(self.paths):
+            ext = _extension(path)
+            if ext:
+                if ext not in self._extensions:
+                    self._extensions[ext] = array("I")
+                self._extensions[ext].append(position)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.paths)
+
+    def __contains__(self, path: str) -> bool:
+        position = bisect_left(self.paths, path)
+        return position < len(self.paths) and self.paths[position] == path
+
+    def _prefix_range(self, prefix: str) -> Tuple[int, int]:
+        """Positions [start, end) of the paths starting with prefix."""
+        if not prefix:
+            return 0, len(self.paths)
+        start = bisect_left(self.paths, prefix)
+        # Every path with the prefix sorts before prefix + the highest character
+        end = bisect_left(self.paths, prefix + "\U0010ffff", start)
+        return start, end
+
+    @staticmethod
+    def _dir_prefix(directory: str) -> str:
+        directory = directory.strip("/")
+        return directory + "/" if directory else ""
+
+    def is_dir(self, path: str) -> bool:
+        """Check whether a directory contains at least one file."""
+        start, end = self._prefix_range(self._dir_prefix(path))
+        return end > start
+
+    def starting_with(self, prefix: str) -> List[str]:
+        """Get paths starting with a string prefix, in sorted order."""
+        start, end = self._prefix_range(prefix)
+        return list(self.paths[start:end])
+
+    def under(self, directory: str = "") -> List[str]:
+        """Get all files below a directory, at any depth ("" = whole tree)."""
+        return self.starting_with(self._dir_prefix(directory))
+
+    def with_extension(self, extension: str, directory: str = "") -> List[str]:
+        """Get files with an extension, optionally below a directory.
+
+        Args:
+            extension: Extension with or without the leading dot (case-insensitive)
+            directory: Restrict to files below this directory
+
+        Returns:
+            Matching paths in sorted order
+        """
+        extension = extension.lower()
+        if not extension.startswith("."):
+            extension = "." + extension
+        positions = self._extensions.get(extension)
+        if not positions:
+            return []
+
+        start, end = self._prefix_range(self._dir_prefix(directory))
+        lo = bisect_left(positions, start)
+        hi = bisect_right(positions, end - 1, lo)
+        return [self.paths[position] for position in positions[lo:hi]]
+
+    def glob(self, pattern: str) -> List[str]:
+        """Get files matching a glob such as ``src/**/*.py`` or ``*.md``.
+
+        Args:
+            pattern: Glob relative to the repository root
+
+        Returns:
+            Matching paths in sorted order
+        """
+        pattern = pattern.lstrip("/")
+        literal_end = len(pattern)
+        for special in _GLOB_SPECIAL:
+            found = pattern.find(special)
+            if found != -1:
+                literal_end = min(literal_end, found)
+
+        start, end = self._prefix_range(pattern[:literal_end])
+        if literal_end == len(pattern):
+            return [pattern] if pattern in self else []
+
+        regex = _glob_to_regex(pattern)
+        return [path for path in self.paths[start:end] if regex.match(path)]
+
+    def extension_counts(self) -> Dict[str, int]:
+        """Number of files per extension, most common first."""
+        counts = {ext: len(positions) for ext, positions in self._extensions.items()}
+        return dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+
+    @classmethod
+    def _shared_key(cls, repo_url: str, ref: Optional[str]) -> Optional[str]:
+        # Only commit-pinned indexes are immutable and safe to share
+        return f"{repo_url}@{ref}" if ref else None
+
+    @classmethod
+    def _get_shared(cls, key: Optional[str]) -> Optional["PathIndex"]:
+        if key is None:
+            return None
+        with cls._shared_lock:
+            index = cls._shared.get(key)
+            if index is not None:
+                cls._shared.move_to_end(key)
+            return index
+
+    @classmethod
+    def from_listing(
+        cls, repo_url: str, listing: Dict[str, Any], ref: Optional[str] = None
+    ) -> "PathIndex":
+        """Create an index from a fetched path listing and share it.
+
+        Args:
+            repo_url: GitHub repository URL
+            listing: Result of RepositoryService.get_file_paths
+            ref: Commit SHA the listing was read at
+
+        Returns:
+            Path index
+        """
+        index = cls(listing["paths"], bool(listing.get("truncated")))
+        logger.debug("path_index_built", repo_url=repo_url, files=len(index), ref=ref)
+        key = cls._shared_key(repo_url, ref)
+        if key is None:
+            return index
+
+        with cls._shared_lock:
+            cls._shared[key] = index
+            cls._shared.move_to_end(key)
+            while len(cls._shared) > cls.MAX_SHARED:
+                cls._shared.popitem(last=False)
+        return index
+
+    @classmethod
+    def load(cls, repo_url: str, ref: Optional[str] = None) -> "PathIndex":
+        """Get the path index of a commit, fetching the listing if not shared yet.
+
+        Args:
+            repo_url: GitHub repository URL
+            ref: Commit SHA (default: default branch HEAD, not shared)
+
+        Returns:
+            Path index
+        """
+        index = cls._get_shared(cls._shared_key(repo_url, ref))
+        if index is not None:
+            return index
+
+        listing = repository_service.get_file_paths(repo_url, ref=ref)
+        return cls.from_listing(repo_url, listing, ref)
@@ -0,0 +1,94 @@
+"""Tracking of stable prompt prefixes for provider-side prompt caching."""
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict
+
+import structlog
+
+logger = structlog.get_logger()
+
+
+@dataclass(frozen=True)
+class PromptLayout:
+    """A prompt split into its stable prefix and the variable rest.
+
+    OpenAI-compatible providers cache the longest previously seen prefix of
+    a prompt, so everything that is identical across requests goes first
+    and ``prompt == prefix + body``.
+
+    Attributes:
+        prefix: Instructions and schema; byte-identical across requests
+        body: Request-specific data
+    """
+
+    prefix: str
+    body: str
+
+    @property
+    def prompt(self) -> str:
+        """The complete prompt."""
+        return self.prefix + self.body
+
+
+class PrefixStats:
+    """Counts how often a prompt starts with a prefix sent before.
+
+    A low hit rate for a kind of prompt means its prefix varies between
+    requests (e.g. request data leaked into the instructions), which
+    defeats the provider's prompt cache.
+    """
+
+    MAX_PREFIXES = 256
+
+    def __init__(self):
+        """Initialize statistics."""
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, kind: str, prefix: str) -> bool:
+        """Record the stable prefix of a prompt being sent.
+
+        Args:
+            kind: Prompt kind, e.g. "tutorial" or "qa"
+            prefix: Stable prefix (including the system message)
+
+        Returns:
+            Whether the same prefix was sent before
+        """
+        digest = hashlib.sha256(prefix.encode("utf-8")).hexdigest()[:16]
+        key = f"{kind}:{digest}"
+        with self._lock:
+            hit = key in self._seen
+            self._seen[key] = None
+            self._seen.move_to_end(key)
+            while len(self._seen) > self.MAX_PREFIXES:
+                self._seen.popitem(last=False)
+
+            counts = self._counts.setdefault(kind, {"requests": 0, "hits": 0})
+            counts["requests"] += 1
+            counts["hits"] += hit
+
+        logger.debug("prompt_prefix_recorded", kind=kind, prefix_hash=digest, hit=hit)
+        return hit
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit rates per prompt kind.
+
+        Returns:
+            Kind -> {requests, hits, hit_rate}
+        """
+        with self._lock:
+            return {
+                kind: {
+                    **counts,
+                    "hit_rate": round(counts["hits"] / counts["requests"], 4),
+                }
+                for kind, counts in self._counts.items()
+            }
+
+
+# Global instance
+prefix_stats = PrefixStats()
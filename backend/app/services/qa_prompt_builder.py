@@ -2,19 +2,35 @@
 from typing import List, Dict, Optional, Any
 from pathlib import Path
 import structlog
+from app.config import settings
 from app.schemas.qa import QuestionContext, ChatMessage
+from app.services.prompt_prefix import prefix_stats
+from app.services.token_budget import ContextPiece, TokenCounter, pack
 
 logger = structlog.get_logger()
 
 
 class QAPromptBuilder:
-    """问答 Prompt 构建服务 - 构建包含上下文的 AI Prompt"""
+    """问答 Prompt 构建服务 - 构建包含上下文的 AI Prompt
+
+    消息布局按稳定程度排列，便于 OpenAI 兼容服务的自动 prompt 缓存命中：
+    系统消息 = 系统 Prompt + 仓库元信息（同一提交的所有问题都相同，不受 token
+    预算影响），其后是会话历史（同一会话中只追加），最后的用户消息才包含按
+    预算放入的文件内容、代码片段和问题本身。
+    """
 
-    MAX_FILE_CONTENT_LENGTH = 3000  # 每个文件内容最大长度
     MAX_HISTORY_TURNS = 5  # 最多保留的历史对话轮数
 
+    # 上下文片段的优先级（越高越先放入 token 预算），见 _context_pieces
+    CODE_PRIORITY = 50
+    HISTORY_PRIORITY = 40
+    FILE_PRIORITY = 30
+    MIN_TRUNCATED_TOKENS = 100  # 截断后至少保留的 token 数，否则整段不放
+    MESSAGE_OVERHEAD_TOKENS = 4  # 每条消息的格式开销
+
     def __init__(self):
         self.system_prompt = self._load_system_prompt()
+        self.token_counter = TokenCounter(settings.openai_model)
 
     def _load_system_prompt(self) -> str:
         """加载系统 Prompt"""
@@ -35,10 +51,14 @@ class QAPromptBuilder:
         file_contents: Optional[Dict[str, str]] = None,
         user_context: Optional[QuestionContext] = None,
         history: Optional[List[ChatMessage]] = None,
+        code_chunks: Optional[List[Dict[str, Any]]] = None,
     ) -> List[Dict[str, str]]:
         """
         构建完整的消息列表
 
+        系统 Prompt、仓库元信息和问题总是保留；会话历史、文件内容和代码片段
+        按价值排序，在 settings.qa_prompt_token_budget 内尽量多地放入。
+
         Args:
             question: 用户问题
             question_analysis: 问题分析结果
@@ -47,44 +67,130 @@ class QAPromptBuilder:
             file_contents: 相关文件内容（可选）
             user_context: 用户学习上下文（可选）
             history: 会话历史（可选）
+            code_chunks: 检索到的相关代码片段（可选）
 
         Returns:
             消息列表，格式为 [{"role": "system", "content": "..."}, ...]
         """
-        messages = [{"role": "system", "content": self.system_prompt}]
+        # 保留最近 N 轮历史作为候选
+        recent_history = history[-(self.MAX_HISTORY_TURNS * 2) :] if history else []
+
+        pieces = self._context_pieces(file_contents, code_chunks)
+        for age, msg in enumerate(reversed(recent_history)):
+            # 越新的消息越重要；较旧的消息只有在更新的消息放入后才放入
+            pieces.append(
+                ContextPiece(
+                    key=f"history:{age}",
+                    content=msg.content,
+                    priority=self.HISTORY_PRIORITY - age,
+                    requires=f"history:{age - 1}" if age else None,
+                )
+            )
+
+        # 固定部分（系统消息、问题）占用的 token 先从预算中扣除
+        system_message = self._build_system_message(repo_info, analysis)
+        fixed_tokens = (
+            self.token_counter.count(system_message)
+            + self.token_counter.count(
+                self._build_user_message(question, question_analysis, user_context, {})
+            )
+            + self.MESSAGE_OVERHEAD_TOKENS * (len(recent_history) + 2)
+        )
+        packed = pack(
+            pieces, settings.qa_prompt_token_budget - fixed_tokens, self.token_counter
+        )
+
+        prefix_hit = prefix_stats.record("qa", system_message)
+        messages = [{"role": "system", "content": system_message}]
 
-        # 添加会话历史（保留最近 N 轮）
-        if history:
-            recent_history = history[-(self.MAX_HISTORY_TURNS * 2) :]
-            for msg in recent_history:
-                messages.append({"role": msg.role, "content": msg.content})
+        # 添加放入预算的会话历史（按时间顺序）
+        for age in range(len(recent_history) - 1, -1, -1):
+            if f"history:{age}" in packed:
+                msg = recent_history[len(recent_history) - 1 - age]
+                messages.append({"role": msg.role, "content": packed[f"history:{age}"]})
 
-        # 构建用户消息（包含上下文）
+        # 构建用户消息（与本次问题相关的上下文和问题）
         user_message = self._build_user_message(
-            question, question_analysis, repo_info, analysis, file_contents, user_context
+            question, question_analysis, user_context, packed
         )
 
         messages.append({"role": "user", "content": user_message})
 
+        prompt_tokens = sum(self.token_counter.count(m["content"]) for m in messages)
         logger.debug(
             "prompt_built",
             total_messages=len(messages),
             user_message_length=len(user_message),
+            prompt_tokens=prompt_tokens,
+            token_budget=settings.qa_prompt_token_budget,
+            exact_tokens=self.token_counter.exact,
+            dropped=[piece.key for piece in pieces if piece.key not in packed],
+            prefix_hit=prefix_hit,
         )
 
         return messages
 
-    def _build_user_message(
+    def _context_pieces(
         self,
-        question: str,
-        question_analysis: Dict[str, Any],
-        repo_info: Dict[str, Any],
-        analysis: Dict[str, Any],
         file_contents: Optional[Dict[str, str]],
-        user_context: Optional[QuestionContext],
+        code_chunks: Optional[List[Dict[str, Any]]],
+    ) -> List[ContextPiece]:
+        """
+        把可选的上下文拆成按价值排序的片段
+
+        优先级：符号定义 > 检索到的代码片段 > 会话历史 > README 和关键文件内容。
+        文件内容和代码片段可以截断。
+        """
+        pieces = []
+
+        # 文件内容（README 在前，最多3个文件）
+        for index, (file_path, content) in enumerate(
+            list((file_contents or {}).items())[:3]
+        ):
+            pieces.append(
+                ContextPiece(
+                    key=f"file:{index}",
+                    content=content,
+                    priority=self.FILE_PRIORITY - index,
+                    prefix=f"### File: `{file_path}`\n```\n",
+                    suffix="\n```\n",
+                    min_tokens=self.MIN_TRUNCATED_TOKENS,
+                )
+            )
+
+        # 检索到的代码片段（符号定义在前，按相关性排序）
+        for index, chunk in enumerate(code_chunks or []):
+            header = (
+                f"### File: `{chunk['path']}` "
+                f"(lines {chunk['start_line']}-{chunk['end_line']})"
+            )
+            priority = self.CODE_PRIORITY - index
+            if chunk.get("symbol"):
+                header += f" - definition of `{chunk['symbol']}`"
+                priority += 10
+            pieces.append(
+                ContextPiece(
+                    key=f"chunk:{index}",
+                    content=chunk["content"],
+                    priority=priority,
+                    prefix=f"{header}\n```\n",
+                    suffix="\n```\n",
+                    min_tokens=self.MIN_TRUNCATED_TOKENS,
+                )
+            )
+
+        return pieces
+
+    def _build_system_message(
+        self, repo_info: Dict[str, Any], analysis: Dict[str, Any]
     ) -> str:
-        """构建用户消息，包含所有上下文信息"""
-        parts = []
+        """
+        构建系统消息：系统 Prompt 加仓库元信息
+
+        只包含同一提交的所有问题都相同的内容：不含用户学习位置等每次请求不同的
+        信息，也不含随剩余预算变化的文件内容，使其成为可被缓存的稳定前缀。
+        """
+        parts = [self.system_prompt, ""]
 
         # 1. Repository Context
         parts.append("## Repository Context")
@@ -100,40 +206,24 @@ class QAPromptBuilder:
             parts.append(f"**Framework**: {analysis['project_type']['framework']}")
         parts.append("")
 
-        # 2. User Learning Context
-        if user_context and (
-            user_context.current_module_id or user_context.current_step_id
-        ):
-            parts.append("## User's Current Learning Position")
-            if user_context.current_module_id:
-                parts.append(f"**Current Module**: {user_context.current_module_id}")
-            if user_context.current_step_id:
-                parts.append(f"**Current Step**: {user_context.current_step_id}")
-            parts.append("")
-
-        # 3. Project Structure Overview
+        # 2. Project Structure
+        structure = analysis.get("structure") or {}
         parts.append("## Project Structure")
-        if analysis.get("structure"):
-            structure = analysis["structure"]
-            parts.append(
-                f"**Total Directories**: {structure.get('total_directories', 0)}"
-            )
-
-            key_dirs = structure.get("key_directories", [])
-            if key_dirs:
-                parts.append("\n**Key Directories**:")
-                for dir_info in key_dirs[:8]:  # 最多8个
-                    parts.append(
-                        f"- `{dir_info['path']}` - {dir_info.get('purpose', 'N/A')}"
-                    )
+        parts.append(f"**Total Directories**: {structure.get('total_directories', 0)}")
+        key_dirs = structure.get("key_directories", [])
+        if key_dirs:
+            parts.append("\n**Key Directories**:")
+            for dir_info in key_dirs[:8]:  # 最多8个
+                parts.append(
+                    f"- `{dir_info['path']}` - {dir_info.get('purpose', 'N/A')}"
+                )
         parts.append("")
 
-        # 4. Dependencies
+        # 3. Dependencies
         if analysis.get("dependencies"):
             deps = analysis["dependencies"]
             parts.append("## Dependencies")
             parts.append(f"**Package Manager**: {deps.get('package_manager', 'N/A')}")
-
             core_deps = deps.get("core_dependencies", [])
             if core_deps:
                 parts.append(
@@ -141,47 +231,70 @@ class QAPromptBuilder:
                 )  # 最多10个
             parts.append("")
 
-        # 5. Key Files
-        if analysis.get("key_files"):
-            key_files = analysis["key_files"]
-            if key_files:
-                parts.append("## Important Files")
-                for file_info in key_files[:6]:  # 最多6个
-                    parts.append(
-                        f"- `{file_info['path']}` - {file_info.get('description', '')}"
-                    )
-                parts.append("")
-
-        # 6. File Contents (if provided)
-        if file_contents:
+        # 4. Key Files
+        key_files = analysis.get("key_files") or []
+        if key_files:
+            parts.append("## Important Files")
+            for file_info in key_files[:6]:  # 最多6个
+                parts.append(
+                    f"- `{file_info['path']}` - {file_info.get('description', '')}"
+                )
+            parts.append("")
+
+        return "\n".join(parts)
+
+    def _build_user_message(
+        self,
+        question: str,
+        question_analysis: Dict[str, Any],
+        user_context: Optional[QuestionContext],
+        context: Dict[str, str],
+    ) -> str:
+        """
+        构建用户消息，包含与本次问题相关的上下文
+
+        Args:
+            context: pack 选中的上下文片段（key -> 渲染后的文本），见 _context_pieces
+        """
+        parts = []
+
+        # 1. User Learning Context
+        if user_context and (
+            user_context.current_module_id or user_context.current_step_id
+        ):
+            parts.append("## User's Current Learning Position")
+            if user_context.current_module_id:
+                parts.append(f"**Current Module**: {user_context.current_module_id}")
+            if user_context.current_step_id:
+                parts.append(f"**Current Step**: {user_context.current_step_id}")
+            parts.append("")
+
+        # 2. File Contents (README first)
+        files = [text for key, text in context.items() if key.startswith("file:")]
+        if files:
             parts.append("## Relevant File Contents")
             parts.append("")
+            parts.extend(files)
+
+        # 3. Retrieved Code (most relevant chunks first)
+        chunks = [text for key, text in context.items() if key.startswith("chunk:")]
+        if chunks:
+            parts.append("## Relevant Code")
+            parts.append("")
+            parts.extend(chunks)
 
-            for file_path, content in list(file_contents.items())[
-                :3
-            ]:  # 最多3个文件
-                parts.append(f"### File: `{file_path}`")
-                parts.append("```")
-                # 截断过长的内容
-                truncated_content = content[: self.MAX_FILE_CONTENT_LENGTH]
-                if len(content) > self.MAX_FILE_CONTENT_LENGTH:
-                    truncated_content += "\n\n... (content truncated)"
-                parts.append(truncated_content)
-                parts.append("```")
-                parts.append("")
-
-        # 7. Question Analysis
+        # 4. Question Analysis
         if question_analysis.get("entities"):
             parts.append(f"**Note**: The question mentions: {', '.join(question_analysis['entities'])}")
             parts.append("")
 
-        # 8. The Actual Question
+        # 5. The Actual Question
         parts.append("## User's Question")
         parts.append(question)
         parts.append("")
 
         parts.append(
-            "Please provide a helpful, accurate answer based on the repository context above."
+            "Please provide a helpful, accurate answer based on the repository context provided."
         )
 
         return "\n".join(parts)
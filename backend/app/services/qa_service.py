@@ -1,8 +1,14 @@
 """QA service - orchestrates the question answering flow."""
-from typing import Optional, Dict, Any
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, AsyncIterator, List, Tuple
 import structlog
+from app.config import settings
 from app.services.repository_service import repository_service
 from app.services.code_analyzer import CodeAnalyzer
+from app.services.code_indexer import code_indexer
+from app.services.code_search import tokenize
+from app.services.file_store import file_store
+from app.services.manifest_bundle import ManifestBundle
 from app.services.question_analyzer import QuestionAnalyzer
 from app.services.qa_prompt_builder import QAPromptBuilder
 from app.services.session_manager import SessionManager
@@ -12,6 +18,22 @@ from app.core.exceptions import AppException
 
 logger = structlog.get_logger()
 
+AI_UNAVAILABLE_ANSWER = "抱歉，AI 问答服务暂时不可用。请确保配置了 OPENAI_API_KEY 环境变量。"
+
+MAX_DEFINITIONS = 4  # 问题中提到的符号最多引用的定义数
+MAX_DEFINITION_LINES = 80  # 每个定义放入上下文的最大行数
+MAX_REFERENCE_LINES = 10  # 每个引用展示的最大行数
+
+
+@dataclass
+class PreparedQuestion:
+    """调用 AI 前准备好的问答上下文"""
+
+    session_id: str
+    messages: List[Dict[str, str]]
+    file_contents: Dict[str, str]
+    code_chunks: List[Dict[str, Any]] = field(default_factory=list)
+
 
 class QAService:
     """问答服务 - 协调整个问答流程"""
@@ -38,94 +60,22 @@ class QAService:
             AppException: 处理失败时抛出异常
         """
         try:
-            # 1. 解析仓库 URL
-            logger.info("parsing_repo_url", repo_url=request.repo_url)
-            # 简单解析 GitHub URL (https://github.com/owner/repo)
-            parts = request.repo_url.strip("/").split("/")
-            if len(parts) < 2:
-                raise AppException(
-                    error_code="INVALID_REPO_URL",
-                    message="Invalid repository URL format",
-                    status_code=400,
-                )
-
-            owner = parts[-2]
-            repo_name = parts[-1]
-            repo_full_name = f"{owner}/{repo_name}"
-
-            # 2. 获取或创建会话
-            session_id = request.session_id
-            if not session_id or not self.session_manager.get_session(session_id):
-                session_id = self.session_manager.create_session(repo_full_name)
-                logger.info("new_session_created", session_id=session_id)
-
-            session = self.session_manager.get_session(session_id)
-
-            # 3. 分析问题
-            logger.info("analyzing_question", question=request.question[:100])
-            question_analysis = self.question_analyzer.analyze_question(
-                request.question
-            )
+            prepared = self.prepare_question(request)
 
-            # 4. 获取仓库信息
-            logger.info("fetching_repo_info", repo=repo_full_name)
-            repo_info = repository_service.get_repository_info(request.repo_url)
-
-            # 5. 执行代码分析（获取缓存的或重新分析）
-            logger.info("performing_code_analysis")
-            analyzer = CodeAnalyzer(request.repo_url)
-            analysis = analyzer.analyze()
-
-            # 6. 获取关键文件内容
-            logger.info("fetching_key_files")
-            file_contents = self._fetch_key_file_contents(
-                request.repo_url, analysis, question_analysis
-            )
-
-            # 7. 构建 Prompt
-            logger.info("building_prompt")
-            messages = self.prompt_builder.build_messages(
-                question=request.question,
-                question_analysis=question_analysis,
-                repo_info=repo_info,
-                analysis=analysis,
-                file_contents=file_contents,
-                user_context=request.context,
-                history=session.messages if session else None,
-            )
-
-            # 8. 调用 AI 生成回答
+            # 9. 调用 AI 生成回答
             if not self.ai_generator.is_available():
                 # AI 未配置，返回友好提示
                 return QAResponse(
-                    answer="抱歉，AI 问答服务暂时不可用。请确保配置了 OPENAI_API_KEY 环境变量。",
+                    answer=AI_UNAVAILABLE_ANSWER,
                     references=[],
                     related_steps=[],
-                    sessionId=session_id,
+                    sessionId=prepared.session_id,
                 )
 
             logger.info("calling_ai_for_answer")
-            answer = self.ai_generator.generate_qa_answer(messages)
+            answer = self.ai_generator.generate_qa_answer(prepared.messages)
 
-            # 9. 提取代码引用（基于关键文件）
-            references = self._create_references(file_contents)
-
-            # 10. 保存会话历史
-            self.session_manager.add_message(session_id, "user", request.question)
-            self.session_manager.add_message(session_id, "assistant", answer)
-
-            logger.info(
-                "qa_completed",
-                session_id=session_id,
-                answer_length=len(answer),
-            )
-
-            return QAResponse(
-                answer=answer,
-                references=references,
-                related_steps=[],  # TODO: 未来可以基于学习位置推荐相关步骤
-                sessionId=session_id,
-            )
+            return self._complete_answer(prepared, request.question, answer)
 
         except AppException:
             raise
@@ -137,11 +87,181 @@ class QAService:
                 status_code=500,
             )
 
+    async def stream_answer(
+        self, request: AskQuestionRequest, prepared: PreparedQuestion
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        流式生成回答
+
+        先逐个返回 AI 生成的文本片段，流结束后返回引用和会话 ID，
+        并保存会话历史（客户端中途断开时不保存）。
+
+        Args:
+            request: 问答请求
+            prepared: prepare_question 的结果
+
+        Yields:
+            ("token", 文本片段)，最后是 ("done", 不含 answer 的 QAResponse)
+
+        Raises:
+            AppException: AI 生成失败时抛出异常
+        """
+        if not self.ai_generator.is_available():
+            yield "token", AI_UNAVAILABLE_ANSWER
+            response = QAResponse(answer="", sessionId=prepared.session_id)
+            yield "done", response.dict(by_alias=True, exclude={"answer"})
+            return
+
+        logger.info("streaming_ai_answer")
+        parts = []
+        async for delta in self.ai_generator.stream_qa_answer_async(prepared.messages):
+            parts.append(delta)
+            yield "token", delta
+
+        response = self._complete_answer(prepared, request.question, "".join(parts))
+        yield "done", response.dict(by_alias=True, exclude={"answer"})
+
+    def prepare_question(self, request: AskQuestionRequest) -> PreparedQuestion:
+        """
+        准备问答上下文：解析仓库、获取会话、分析代码并构建 Prompt
+
+        Args:
+            request: 问答请求
+
+        Returns:
+            调用 AI 所需的上下文
+
+        Raises:
+            AppException: 仓库 URL 无效或获取仓库数据失败时抛出异常
+        """
+        # 1. 解析仓库 URL
+        logger.info("parsing_repo_url", repo_url=request.repo_url)
+        # 简单解析 GitHub URL (https://github.com/owner/repo)
+        parts = request.repo_url.strip("/").split("/")
+        if len(parts) < 2:
+            raise AppException(
+                error_code="INVALID_REPO_URL",
+                message="Invalid repository URL format",
+                status_code=400,
+            )
+
+        owner = parts[-2]
+        repo_name = parts[-1]
+        repo_full_name = f"{owner}/{repo_name}"
+
+        # 2. 获取或创建会话
+        session_id = request.session_id
+        if not session_id or not self.session_manager.get_session(session_id):
+            session_id = self.session_manager.create_session(repo_full_name)
+            logger.info("new_session_created", session_id=session_id)
+
+        session = self.session_manager.get_session(session_id)
+
+        # 3. 分析问题
+        logger.info("analyzing_question", question=request.question[:100])
+        question_analysis = self.question_analyzer.analyze_question(request.question)
+
+        # 4. 获取仓库信息
+        logger.info("fetching_repo_info", repo=repo_full_name)
+        repo_info = repository_service.get_repository_info(request.repo_url)
+
+        # 5. 执行代码分析（获取缓存的或重新分析），固定到同一个提交
+        logger.info("performing_code_analysis")
+        commit_sha = repository_service.get_head_sha(request.repo_url)
+        analyzer = CodeAnalyzer(request.repo_url)
+        analysis = analyzer.analyze(commit_sha=commit_sha)
+
+        # 6. 检索与问题相关的代码：先找问题中提到的符号的定义，再用 BM25 补充片段
+        logger.info("searching_code")
+        definitions = self._find_definitions(
+            request.repo_url, question_analysis, commit_sha
+        )
+        code_chunks = definitions + [
+            chunk
+            for chunk in self._search_code(
+                request.repo_url, question_analysis, commit_sha
+            )
+            if not any(self._overlaps(chunk, d) for d in definitions)
+        ]
+
+        # 7. 获取关键文件内容（清单文件复用分析时已解析的 manifest bundle）；
+        # 检索到代码片段时只保留 README，把上下文留给相关代码
+        logger.info("fetching_key_files")
+        manifests = ManifestBundle.load(request.repo_url, commit_sha)
+        file_contents = self._fetch_key_file_contents(
+            request.repo_url,
+            analysis,
+            question_analysis,
+            manifests,
+            commit_sha,
+            max_key_files=0 if code_chunks else 3,
+        )
+        code_chunks = [c for c in code_chunks if c["path"] not in file_contents]
+
+        # 8. 构建 Prompt
+        logger.info("building_prompt")
+        messages = self.prompt_builder.build_messages(
+            question=request.question,
+            question_analysis=question_analysis,
+            repo_info=repo_info,
+            analysis=analysis,
+            file_contents=file_contents,
+            user_context=request.context,
+            history=session.messages if session else None,
+            code_chunks=code_chunks,
+        )
+
+        return PreparedQuestion(
+            session_id=session_id,
+            messages=messages,
+            file_contents=file_contents,
+            code_chunks=code_chunks,
+        )
+
+    def _complete_answer(
+        self, prepared: PreparedQuestion, question: str, answer: str
+    ) -> QAResponse:
+        """
+        提取代码引用并保存会话历史
+
+        Args:
+            prepared: prepare_question 的结果
+            question: 用户问题
+            answer: AI 生成的完整回答
+
+        Returns:
+            问答响应
+        """
+        # 10. 提取代码引用（优先使用检索到的代码片段）
+        references = self._create_references(
+            prepared.file_contents, prepared.code_chunks
+        )
+
+        # 11. 保存会话历史
+        self.session_manager.add_message(prepared.session_id, "user", question)
+        self.session_manager.add_message(prepared.session_id, "assistant", answer)
+
+        logger.info(
+            "qa_completed",
+            session_id=prepared.session_id,
+            answer_length=len(answer),
+        )
+
+        return QAResponse(
+            answer=answer,
+            references=references,
+            related_steps=[],  # TODO: 未来可以基于学习位置推荐相关步骤
+            sessionId=prepared.session_id,
+        )
+
     def _fetch_key_file_contents(
         self,
         repo_url: str,
         analysis: Dict[str, Any],
         question_analysis: Dict[str, Any],
+        manifests: Optional[ManifestBundle] = None,
+        commit_sha: Optional[str] = None,
+        max_key_files: int = 3,
     ) -> Dict[str, str]:
         """
         获取关键文件内容
@@ -150,68 +270,214 @@ class QAService:
             repo_url: 仓库 URL
             analysis: 代码分析结果
             question_analysis: 问题分析结果
+            manifests: 已获取的清单文件，其中的文件不再重复请求
+            commit_sha: 读取文件的提交（默认：默认分支 HEAD）
+            max_key_files: README 之外最多获取的关键文件数
 
         Returns:
             文件路径到内容的映射
         """
+        # 优先获取 README，其次是配置类关键文件（不要获取大型代码文件）
+        readme_path = "README.md"
+        candidates = [readme_path]
+        for file_info in analysis.get("key_files", [])[:max_key_files]:
+            file_path = file_info["path"]
+            if any(
+                ext in file_path.lower()
+                for ext in [".json", ".yml", ".yaml", ".toml", ".md", ".txt"]
+            ):
+                candidates.append(file_path)
+
+        # 清单文件直接取自 manifest bundle（不存在即跳过），其余文件并发批量获取，
+        # 单个文件失败不影响其他文件
+        fetched = {}
+        to_fetch = candidates
+        if manifests is not None:
+            fetched = {p: manifests.text(p) for p in candidates if p in manifests}
+            to_fetch = [p for p in candidates if not ManifestBundle.covers(p)]
+        if to_fetch:
+            fetched.update(
+                repository_service.get_multiple_files(
+                    repo_url, to_fetch, ref=commit_sha
+                )
+            )
+
         file_contents = {}
+        for file_path in dict.fromkeys(candidates):  # 保持 README 在前的顺序
+            if file_path not in fetched:
+                logger.debug("key_file_fetch_failed", file_path=file_path)
+                continue
+            limit = 5000 if file_path == readme_path else 3000  # 限制长度
+            file_contents[file_path] = fetched[file_path][:limit]
+            logger.debug("key_file_fetched", file_path=file_path)
+
+        return file_contents
+
+    def _search_code(
+        self,
+        repo_url: str,
+        question_analysis: Dict[str, Any],
+        commit_sha: str,
+    ) -> List[Dict[str, Any]]:
+        """
+        用问题的关键词和代码实体检索相关代码片段
+
+        Args:
+            repo_url: 仓库 URL
+            question_analysis: 问题分析结果
+            commit_sha: 检索的提交
+
+        Returns:
+            代码片段列表（path、start_line、end_line、score、content），
+            检索不可用、索引尚未构建或没有匹配时为空
+        """
+        if not settings.code_search_enabled:
+            return []
+
+        query = " ".join(
+            [
+                *question_analysis.get("keywords", []),
+                *question_analysis.get("entities", []),
+            ]
+        )
+        terms = list(tokenize(query))
+        if not terms:
+            return []
+
+        # 索引在后台构建；构建完成前只使用 README 和关键文件
+        index = code_indexer.search_index(repo_url, commit_sha)
+        if index is None:
+            return []
 
-        # 优先获取 README
         try:
-            readme_content = repository_service.get_file_content(
-                repo_url, "README.md"
+            code_chunks = index.retrieve(terms, settings.code_search_top_k)
+        except AppException as e:
+            # 检索失败时退回到只使用关键文件
+            logger.warning("code_search_failed", error=e.message)
+            return []
+
+        logger.info(
+            "code_chunks_retrieved",
+            terms=terms[:10],
+            chunks=[f"{c['path']}:{c['start_line']}" for c in code_chunks],
+        )
+        return code_chunks
+
+    def _find_definitions(
+        self,
+        repo_url: str,
+        question_analysis: Dict[str, Any],
+        commit_sha: str,
+    ) -> List[Dict[str, Any]]:
+        """
+        查找问题中提到的代码实体（函数名、类名等）的定义
+
+        Args:
+            repo_url: 仓库 URL
+            question_analysis: 问题分析结果
+            commit_sha: 查找的提交
+
+        Returns:
+            定义列表，格式同 _search_code 的代码片段，另含 symbol 和 kind
+        """
+        entities = sorted(question_analysis.get("entities", []))
+        if not settings.code_search_enabled or not entities:
+            return []
+
+        index = code_indexer.symbol_index(repo_url, commit_sha)
+        if index is None:
+            return []
+
+        found = []
+        for entity in entities:
+            found.extend(index.lookup(entity)[:2])  # 同名定义最多取2个
+        found = found[:MAX_DEFINITIONS]
+        if not found:
+            return []
+
+        files = file_store.get_many(
+            repo_url, [d["path"] for d in found], ref=commit_sha
+        )
+
+        definitions = []
+        for definition in found:
+            indexed = files.get(definition["path"])
+            if indexed is None:
+                continue
+            start = definition["start_line"]
+            end = min(definition["end_line"], start + MAX_DEFINITION_LINES - 1)
+            definitions.append(
+                {
+                    "path": definition["path"],
+                    "start_line": start,
+                    "end_line": end,
+                    "symbol": definition["name"],
+                    "kind": definition["kind"],
+                    "content": indexed.lines(start, end),
+                }
             )
-            file_contents["README.md"] = readme_content[:5000]  # 限制长度
-            logger.debug("readme_fetched", length=len(readme_content))
-        except Exception as e:
-            logger.debug("readme_not_found", error=str(e))
-
-        # 根据项目类型获取配置文件
-        key_files = analysis.get("key_files", [])
-        for file_info in key_files[:3]:  # 最多3个关键文件
-            try:
-                file_path = file_info["path"]
-                # 只获取配置类文件，不要获取大型代码文件
-                if any(
-                    ext in file_path.lower()
-                    for ext in [".json", ".yml", ".yaml", ".toml", ".md", ".txt"]
-                ):
-                    content = repository_service.get_file_content(repo_url, file_path)
-                    file_contents[file_path] = content[:3000]  # 限制长度
-                    logger.debug("key_file_fetched", file_path=file_path)
-            except Exception as e:
-                logger.debug("key_file_fetch_failed", file_path=file_path, error=str(e))
 
-        return file_contents
+        logger.info(
+            "definitions_found",
+            entities=entities[:5],
+            definitions=[f"{d['path']}:{d['start_line']}" for d in definitions],
+        )
+        return definitions
+
+    @staticmethod
+    def _overlaps(chunk: Dict[str, Any], other: Dict[str, Any]) -> bool:
+        """判断两个代码片段是否在同一文件中行号重叠"""
+        return (
+            chunk["path"] == other["path"]
+            and chunk["start_line"] <= other["end_line"]
+            and other["start_line"] <= chunk["end_line"]
+        )
 
     def _create_references(
-        self, file_contents: Dict[str, str]
+        self,
+        file_contents: Dict[str, str],
+        code_chunks: Optional[List[Dict[str, Any]]] = None,
     ) -> list[CodeReference]:
         """
         创建代码引用
 
         Args:
             file_contents: 文件内容映射
+            code_chunks: 符号定义和检索到的代码片段（优先引用，带真实行号）
 
         Returns:
             代码引用列表
         """
-        references = []
+        sources = [
+            (chunk["path"], chunk["start_line"], chunk["content"])
+            for chunk in code_chunks or []
+        ]
+        sources.extend((path, 1, content) for path, content in file_contents.items())
 
-        for file_path, content in file_contents.items():
-            # 创建引用（简化版本，使用前几行）
-            snippet = "\n".join(content.split("\n")[:10])  # 前10行
+        references = []
+        for file_path, start_line, content in sources[:3]:  # 最多3个引用
+            snippet = self._head(content, MAX_REFERENCE_LINES)
             references.append(
                 CodeReference(
                     filePath=file_path,
-                    startLine=1,
-                    endLine=min(10, len(content.split("\n"))),
+                    startLine=start_line,
+                    endLine=start_line + snippet.count("\n"),
                     snippet=snippet,
                     language=self._detect_language(file_path),
                 )
             )
 
-        return references[:3]  # 最多3个引用
+        return references
+
+    @staticmethod
+    def _head(content: str, max_lines: int) -> str:
+        """取内容的前 max_lines 行（不含末尾换行），只扫描到第 max_lines 个换行符"""
+        end = -1
+        for _ in range(max_lines):
+            end = content.find("\n", end + 1)
+            if end == -1:
+                return content[:-1] if content.endswith("\n") else content
+        return content[:end]
 
     def _detect_language(self, file_path: str) -> str:
         """根据文件扩展名检测语言"""
@@ -1,12 +1,34 @@
 """Repository service for fetching and caching GitHub repository data."""
+import asyncio
+import mmap
+import threading
 import structlog
-from typing import Dict, Any, List
-
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import (
+    Dict,
+    Any,
+    Awaitable,
+    Callable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+from app.config import settings
+from app.core.exceptions import AppException
+from app.services.async_github_client import AsyncGitHubClient
 from app.services.github_client import GitHubClient
 from app.services.cache_manager import cache
+from app.services.single_flight import SingleFlight
+from app.services.snapshot_store import SnapshotStore
 
 logger = structlog.get_logger()
 
+T = TypeVar("T")
+
 
 class RepositoryService:
     """Service for managing repository data with caching."""
@@ -14,7 +36,220 @@ class RepositoryService:
     def __init__(self):
         """Initialize repository service."""
         self.github_client = GitHubClient()
-        logger.info("repository_service_initialized")
+        self.async_github_client = AsyncGitHubClient()
+        self.snapshot_store = SnapshotStore() if settings.snapshot_enabled else None
+        self._snapshot_failures: Set[str] = set()
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.github_max_concurrency,
+            thread_name_prefix="repo-fetch",
+        )
+        self._flight = SingleFlight()
+        self._refreshing: Set[str] = set()
+        self._refresh_lock = threading.Lock()
+        logger.info(
+            "repository_service_initialized",
+            snapshot_mode=self.snapshot_store is not None,
+        )
+
+    def get_head_sha(self, repo_url: str, use_cache: bool = True) -> str:
+        """Get the commit SHA of the repository's default branch with caching.
+
+        Args:
+            repo_url: GitHub repository URL
+            use_cache: Whether to use cache (default: True)
+
+        Returns:
+            Commit SHA of the default branch HEAD
+        """
+        cache_key = f"repo_head:{repo_url}"
+
+        if use_cache:
+            cached_data = cache.get(cache_key)
+            if cached_data is not None:
+                return cached_data
+
+        logger.info("resolving_repo_head", repo_url=repo_url)
+        return self._fetch_and_cache(
+            cache_key,
+            lambda: self.github_client.get_commit_sha(repo_url),
+            self.cache_tags(repo_url),
+            use_cache,
+        )
+
+    def ensure_snapshot(
+        self, repo_url: str, commit_sha: Optional[str] = None
+    ) -> Optional[str]:
+        """Make sure a local tarball snapshot exists for a commit.
+
+        Args:
+            repo_url: GitHub repository URL
+            commit_sha: Commit to snapshot (default: current default branch HEAD)
+
+        Returns:
+            Commit SHA of the snapshot, or None if snapshots are unavailable
+        """
+        if self.snapshot_store is None:
+            return None
+
+        try:
+            owner, repo = self.github_client.parse_repo_url(repo_url)
+            commit_sha = commit_sha or self.get_head_sha(repo_url)
+        except AppException as e:
+            logger.warning(
+                "snapshot_head_unresolved", repo_url=repo_url, error=e.message
+            )
+            return None
+
+        snapshot_id = f"{owner}/{repo}@{commit_sha}"
+        if snapshot_id in self._snapshot_failures:
+            return None
+
+        if not self.snapshot_store.has_snapshot(owner, repo, commit_sha):
+            try:
+                self.snapshot_store.download(
+                    owner, repo, commit_sha, token=self.github_client.token
+                )
+                # The store only grows on downloads; trim it in the background
+                self._executor.submit(self.snapshot_store.collect_garbage)
+            except AppException as e:
+                # Don't retry the download on every call; fall back to the API
+                logger.warning(
+                    "snapshot_unavailable_using_api",
+                    repo_url=repo_url,
+                    commit=commit_sha,
+                    error=e.message,
+                )
+                self._snapshot_failures.add(snapshot_id)
+                return None
+
+        return commit_sha
+
+    def _get_snapshot_ref(
+        self, repo_url: str, ref: Optional[str] = None
+    ) -> Optional[Tuple[str, str, str]]:
+        """Get (owner, repo, commit_sha) of the snapshot serving a repository."""
+        commit_sha = self.ensure_snapshot(repo_url, ref)
+        if commit_sha is None:
+            return None
+        owner, repo = self.github_client.parse_repo_url(repo_url)
+        return owner, repo, commit_sha
+
+    def cache_tags(self, repo_url: str, ref: Optional[str] = None) -> List[str]:
+        """Get the cache tags for data belonging to a repository.
+
+        Args:
+            repo_url: GitHub repository URL
+            ref: Commit SHA the data was read at, if pinned
+
+        Returns:
+            ``repo:<owner>/<name>`` plus ``commit:<sha>`` when a ref is given
+        """
+        owner, repo = self.github_client.parse_repo_url(repo_url)
+        tags = [f"repo:{owner}/{repo}".lower()]
+        if ref:
+            tags.append(f"commit:{ref}")
+        return tags
+
+    def _fetch_and_cache(
+        self,
+        cache_key: str,
+        fetch: Callable[[], T],
+        tags: List[str],
+        use_cache: bool = True,
+    ) -> T:
+        """Fetch a value after a cache miss and cache it.
+
+        Concurrent misses for the same key share a single fetch.
+
+        Args:
+            cache_key: Cache key being filled
+            fetch: Blocking function producing the value
+            tags: Cache tags for the entry
+            use_cache: Whether to store the result
+
+        Returns:
+            Fetched value
+        """
+
+        def fetch_and_store() -> T:
+            value = fetch()
+            if use_cache:
+                cache.set(cache_key, value, tags=tags)
+            return value
+
+        return self._flight.do(cache_key, fetch_and_store)
+
+    async def _fetch_and_cache_async(
+        self,
+        cache_key: str,
+        fetch: Callable[[], Awaitable[T]],
+        tags: List[str],
+        use_cache: bool = True,
+    ) -> T:
+        """Async variant of _fetch_and_cache.
+
+        The cache is written from a worker thread, as its persistent tiers
+        do blocking disk I/O.
+        """
+
+        async def fetch_and_store() -> T:
+            value = await fetch()
+            if use_cache:
+                await asyncio.to_thread(cache.set, cache_key, value, tags=tags)
+            return value
+
+        return await self._flight.do_async(cache_key, fetch_and_store)
+
+    def _get_cached(
+        self, cache_key: str, fetch: Callable[[], Any], tags: List[str]
+    ) -> Optional[Any]:
+        """Look up a cache key with stale-while-revalidate.
+
+        An entry that expired less than settings.cache_stale_ttl ago is
+        returned as is, and refreshed in the background.
+
+        Args:
+            cache_key: Cache key
+            fetch: Blocking function producing a fresh value
+            tags: Cache tags for the refreshed entry
+
+        Returns:
+            Cached value (possibly stale), or None on a miss
+        """
+        value, stale = cache.get_with_stale(cache_key, settings.cache_stale_ttl)
+        if stale:
+            self._refresh_in_background(cache_key, fetch, tags)
+        return value
+
+    def _refresh_in_background(
+        self, cache_key: str, fetch: Callable[[], Any], tags: List[str]
+    ) -> None:
+        """Refresh a cache entry on the executor, at most once at a time per key."""
+        with self._refresh_lock:
+            if cache_key in self._refreshing:
+                return
+            self._refreshing.add(cache_key)
+
+        def refresh() -> None:
+            try:
+                # Shares the fetch with any concurrent cache miss for the key
+                self._fetch_and_cache(cache_key, fetch, tags)
+                logger.info("cache_entry_revalidated", key=cache_key)
+            except Exception as e:
+                # Keep serving the stale value; the next stale hit retries
+                logger.warning(
+                    "cache_revalidation_failed", key=cache_key, error=str(e)
+                )
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(cache_key)
+
+        self._executor.submit(refresh)
+
+    @staticmethod
+    def _repo_key(repo_url: str, ref: Optional[str]) -> str:
+        """Cache key component for a repository, pinned to a commit when given."""
+        return f"{repo_url}@{ref}" if ref else repo_url
 
     def get_repository_info(self, repo_url: str, use_cache: bool = True) -> Dict[str, Any]:
         """Get repository information with caching.
@@ -30,20 +265,23 @@ class RepositoryService:
 
         # Try to get from cache
         if use_cache:
-            cached_data = cache.get(cache_key)
+            cached_data = self._get_cached(
+                cache_key,
+                lambda: self.github_client.get_repo_info(repo_url),
+                self.cache_tags(repo_url),
+            )
             if cached_data is not None:
                 logger.info("repo_info_from_cache", repo_url=repo_url)
                 return cached_data
 
-        # Fetch from GitHub API
+        # Fetch from GitHub API and cache the result
         logger.info("fetching_repo_info_from_github", repo_url=repo_url)
-        repo_info = self.github_client.get_repo_info(repo_url)
-
-        # Cache the result
-        if use_cache:
-            cache.set(cache_key, repo_info)
-
-        return repo_info
+        return self._fetch_and_cache(
+            cache_key,
+            lambda: self.github_client.get_repo_info(repo_url),
+            self.cache_tags(repo_url),
+            use_cache,
+        )
 
     def get_repository_tree(
         self,
@@ -51,6 +289,7 @@ class RepositoryService:
         path: str = "",
         max_depth: int = 3,
         use_cache: bool = True,
+        ref: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
         """Get repository directory tree with caching.
 
@@ -59,31 +298,85 @@ class RepositoryService:
             path: Starting path in repository
             max_depth: Maximum depth to traverse
             use_cache: Whether to use cache (default: True)
+            ref: Commit SHA to read (default: default branch HEAD)
 
         Returns:
             List of file/directory nodes
         """
-        cache_key = f"repo_tree:{repo_url}:{path}:{max_depth}"
+        snapshot_ref = self._get_snapshot_ref(repo_url, ref)
+        if snapshot_ref is not None:
+            logger.info("repo_tree_from_snapshot", repo_url=repo_url, path=path)
+            return self.snapshot_store.get_tree(*snapshot_ref, path, max_depth)
+
+        cache_key = f"repo_tree:{self._repo_key(repo_url, ref)}:{path}:{max_depth}"
 
         # Try to get from cache
         if use_cache:
-            cached_data = cache.get(cache_key)
+            cached_data = self._get_cached(
+                cache_key,
+                lambda: self.github_client.get_directory_tree(
+                    repo_url, path, max_depth, ref
+                ),
+                self.cache_tags(repo_url, ref),
+            )
             if cached_data is not None:
                 logger.info("repo_tree_from_cache", repo_url=repo_url, path=path)
                 return cached_data
 
-        # Fetch from GitHub API
+        # Fetch from GitHub API and cache the result
         logger.info("fetching_repo_tree_from_github", repo_url=repo_url, path=path)
-        tree = self.github_client.get_directory_tree(repo_url, path, max_depth)
+        return self._fetch_and_cache(
+            cache_key,
+            lambda: self.github_client.get_directory_tree(
+                repo_url, path, max_depth, ref
+            ),
+            self.cache_tags(repo_url, ref),
+            use_cache,
+        )
+
+    def get_file_paths(
+        self, repo_url: str, use_cache: bool = True, ref: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """List every file path of the repository, at any depth, with caching.
+
+        Args:
+            repo_url: GitHub repository URL
+            use_cache: Whether to use cache (default: True)
+            ref: Commit SHA to read (default: default branch HEAD)
+
+        Returns:
+            Dictionary with ``paths`` (file paths) and ``truncated``
+        """
+        snapshot_ref = self._get_snapshot_ref(repo_url, ref)
+        if snapshot_ref is not None:
+            return self.snapshot_store.get_file_paths(*snapshot_ref)
+
+        cache_key = f"file_paths:{self._repo_key(repo_url, ref)}"
 
-        # Cache the result
         if use_cache:
-            cache.set(cache_key, tree)
+            cached_data = self._get_cached(
+                cache_key,
+                lambda: self.github_client.get_file_paths(repo_url, ref),
+                self.cache_tags(repo_url, ref),
+            )
+            if cached_data is not None:
+                logger.info("file_paths_from_cache", repo_url=repo_url)
+                return cached_data
 
-        return tree
+        logger.info("fetching_file_paths_from_github", repo_url=repo_url)
+        return self._fetch_and_cache(
+            cache_key,
+            lambda: self.github_client.get_file_paths(repo_url, ref),
+            self.cache_tags(repo_url, ref),
+            use_cache,
+        )
 
     def get_file_content(
-        self, repo_url: str, file_path: str, use_cache: bool = True
+        self,
+        repo_url: str,
+        file_path: str,
+        use_cache: bool = True,
+        ref: Optional[str] = None,
     ) -> str:
         """Get file content with caching.
 
@@ -91,11 +384,21 @@ class RepositoryService:
             repo_url: GitHub repository URL
             file_path: Path to file in repository
             use_cache: Whether to use cache (default: True)
+            ref: Commit SHA to read (default: default branch HEAD)
 
         Returns:
             File content as string
         """
-        cache_key = f"file_content:{repo_url}:{file_path}"
+        snapshot_ref = self._get_snapshot_ref(repo_url, ref)
+        if snapshot_ref is not None:
+            try:
+                return self.snapshot_store.read_file(*snapshot_ref, file_path)
+            except AppException as e:
+                # Oversized files are not stored locally; fetch them from the API
+                if e.error_code != "SNAPSHOT_FILE_UNAVAILABLE":
+                    raise
+
+        cache_key = f"file_content:{self._repo_key(repo_url, ref)}:{file_path}"
 
         # Try to get from cache
         if use_cache:
@@ -106,40 +409,82 @@ class RepositoryService:
                 )
                 return cached_data
 
-        # Fetch from GitHub API
+        # Fetch from GitHub API and cache the result
         logger.info(
             "fetching_file_content_from_github", repo_url=repo_url, file_path=file_path
         )
-        content = self.github_client.get_file_content(repo_url, file_path)
+        return self._fetch_and_cache(
+            cache_key,
+            lambda: self.github_client.get_file_content(repo_url, file_path, ref),
+            self.cache_tags(repo_url, ref),
+            use_cache,
+        )
 
-        # Cache the result
-        if use_cache:
-            cache.set(cache_key, content)
+    def map_file(
+        self, repo_url: str, file_path: str, ref: Optional[str] = None
+    ) -> Optional[mmap.mmap]:
+        """Memory-map a file of the local snapshot serving a repository.
 
-        return content
+        Args:
+            repo_url: GitHub repository URL
+            file_path: Path to file in repository
+            ref: Commit SHA to read (default: default branch HEAD)
 
-    def get_multiple_files(
-        self, repo_url: str, file_paths: List[str], use_cache: bool = True
-    ) -> Dict[str, str]:
-        """Get content of multiple files.
+        Returns:
+            Read-only mapping of the raw file bytes, or None if no snapshot
+            holds the file (use get_file_content instead)
+
+        Raises:
+            AppException: If the snapshot has no such file or it is binary
+        """
+        snapshot_ref = self._get_snapshot_ref(repo_url, ref)
+        if snapshot_ref is None:
+            return None
+        try:
+            return self.snapshot_store.map_file(*snapshot_ref, file_path)
+        except AppException as e:
+            if e.error_code != "SNAPSHOT_FILE_UNAVAILABLE":
+                raise
+            return None
+
+    def iter_multiple_files(
+        self,
+        repo_url: str,
+        file_paths: List[str],
+        use_cache: bool = True,
+        ref: Optional[str] = None,
+    ) -> Iterator[Tuple[str, str]]:
+        """Fetch files concurrently, yielding each one as soon as it arrives.
+
+        Duplicate paths are fetched once and at most
+        ``settings.github_max_concurrency`` requests run at a time. Files that
+        fail to load are logged and skipped.
 
         Args:
             repo_url: GitHub repository URL
             file_paths: List of file paths to fetch
             use_cache: Whether to use cache (default: True)
+            ref: Commit SHA to read (default: default branch HEAD)
 
-        Returns:
-            Dictionary mapping file paths to their contents
+        Yields:
+            Tuples of (file path, content) in completion order
         """
+        unique_paths = list(dict.fromkeys(file_paths))
         logger.info(
-            "fetching_multiple_files", repo_url=repo_url, file_count=len(file_paths)
+            "fetching_multiple_files", repo_url=repo_url, file_count=len(unique_paths)
         )
 
-        results = {}
-        for file_path in file_paths:
+        futures = {
+            self._executor.submit(
+                self.get_file_content, repo_url, file_path, use_cache, ref
+            ): file_path
+            for file_path in unique_paths
+        }
+
+        for future in as_completed(futures):
+            file_path = futures[future]
             try:
-                content = self.get_file_content(repo_url, file_path, use_cache)
-                results[file_path] = content
+                yield file_path, future.result()
             except Exception as e:
                 logger.warning(
                     "failed_to_fetch_file",
@@ -150,18 +495,346 @@ class RepositoryService:
                 # Continue with other files even if one fails
                 continue
 
+    def get_multiple_files(
+        self,
+        repo_url: str,
+        file_paths: List[str],
+        use_cache: bool = True,
+        ref: Optional[str] = None,
+    ) -> Dict[str, str]:
+        """Get content of multiple files concurrently.
+
+        Args:
+            repo_url: GitHub repository URL
+            file_paths: List of file paths to fetch
+            use_cache: Whether to use cache (default: True)
+            ref: Commit SHA to read (default: default branch HEAD)
+
+        Returns:
+            Dictionary mapping file paths to their contents, in completion order
+        """
+        return dict(self.iter_multiple_files(repo_url, file_paths, use_cache, ref))
+
+    def get_tree_paths_and_files(
+        self,
+        repo_url: str,
+        file_paths: List[str],
+        max_depth: int = 2,
+        use_cache: bool = True,
+        ref: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any], Dict[str, str]]:
+        """Fetch the root tree, the full path listing and files concurrently.
+
+        The files are requested without waiting for the tree or the listing,
+        so callers that know candidate paths (e.g. manifests) pay one round
+        trip instead of three. Missing files are skipped, as in
+        get_multiple_files.
+
+        Args:
+            repo_url: GitHub repository URL
+            file_paths: List of file paths to fetch
+            max_depth: Maximum tree depth to traverse
+            use_cache: Whether to use cache (default: True)
+            ref: Commit SHA to read (default: default branch HEAD)
+
+        Returns:
+            Tuple of (directory tree, file path listing as returned by
+            get_file_paths, mapping of file paths to contents)
+        """
+        tree_future = self._executor.submit(
+            self.get_repository_tree, repo_url, "", max_depth, use_cache, ref
+        )
+        paths_future = self._executor.submit(
+            self.get_file_paths, repo_url, use_cache, ref
+        )
+        files = self.get_multiple_files(repo_url, file_paths, use_cache, ref)
+        return tree_future.result(), paths_future.result(), files
+
+    async def get_head_sha_async(self, repo_url: str, use_cache: bool = True) -> str:
+        """Async variant of get_head_sha.
+
+        Args:
+            repo_url: GitHub repository URL
+            use_cache: Whether to use cache (default: True)
+
+        Returns:
+            Commit SHA of the default branch HEAD
+        """
+        cache_key = f"repo_head:{repo_url}"
+
+        if use_cache:
+            cached_data = await asyncio.to_thread(cache.get, cache_key)
+            if cached_data is not None:
+                return cached_data
+
+        logger.info("resolving_repo_head", repo_url=repo_url)
+        return await self._fetch_and_cache_async(
+            cache_key,
+            lambda: self.async_github_client.get_commit_sha(repo_url),
+            self.cache_tags(repo_url),
+            use_cache,
+        )
+
+    async def get_repository_info_async(
+        self, repo_url: str, use_cache: bool = True
+    ) -> Dict[str, Any]:
+        """Async variant of get_repository_info.
+
+        Args:
+            repo_url: GitHub repository URL
+            use_cache: Whether to use cache (default: True)
+
+        Returns:
+            Dictionary containing repository information
+        """
+        cache_key = f"repo_info:{repo_url}"
+
+        if use_cache:
+            cached_data = await asyncio.to_thread(
+                self._get_cached,
+                cache_key,
+                lambda: self.github_client.get_repo_info(repo_url),
+                self.cache_tags(repo_url),
+            )
+            if cached_data is not None:
+                logger.info("repo_info_from_cache", repo_url=repo_url)
+                return cached_data
+
+        logger.info("fetching_repo_info_from_github", repo_url=repo_url)
+        return await self._fetch_and_cache_async(
+            cache_key,
+            lambda: self.async_github_client.get_repo_info(repo_url),
+            self.cache_tags(repo_url),
+            use_cache,
+        )
+
+    async def get_repository_tree_async(
+        self,
+        repo_url: str,
+        path: str = "",
+        max_depth: int = 3,
+        use_cache: bool = True,
+        ref: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Async variant of get_repository_tree.
+
+        Args:
+            repo_url: GitHub repository URL
+            path: Starting path in repository
+            max_depth: Maximum depth to traverse
+            use_cache: Whether to use cache (default: True)
+            ref: Commit SHA to read (default: default branch HEAD)
+
+        Returns:
+            List of file/directory nodes
+        """
+        if self.snapshot_store is not None:
+            # Snapshot reads (and the one-off download) are disk-bound
+            return await asyncio.to_thread(
+                self.get_repository_tree, repo_url, path, max_depth, use_cache, ref
+            )
+
+        cache_key = f"repo_tree:{self._repo_key(repo_url, ref)}:{path}:{max_depth}"
+
+        if use_cache:
+            cached_data = await asyncio.to_thread(
+                self._get_cached,
+                cache_key,
+                lambda: self.github_client.get_directory_tree(
+                    repo_url, path, max_depth, ref
+                ),
+                self.cache_tags(repo_url, ref),
+            )
+            if cached_data is not None:
+                logger.info("repo_tree_from_cache", repo_url=repo_url, path=path)
+                return cached_data
+
+        logger.info("fetching_repo_tree_from_github", repo_url=repo_url, path=path)
+        return await self._fetch_and_cache_async(
+            cache_key,
+            lambda: self.async_github_client.get_directory_tree(
+                repo_url, path, max_depth, ref
+            ),
+            self.cache_tags(repo_url, ref),
+            use_cache,
+        )
+
+    async def get_file_paths_async(
+        self, repo_url: str, use_cache: bool = True, ref: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Async variant of get_file_paths.
+
+        Args:
+            repo_url: GitHub repository URL
+            use_cache: Whether to use cache (default: True)
+            ref: Commit SHA to read (default: default branch HEAD)
+
+        Returns:
+            Dictionary with ``paths`` (file paths) and ``truncated``
+        """
+        if self.snapshot_store is not None:
+            return await asyncio.to_thread(
+                self.get_file_paths, repo_url, use_cache, ref
+            )
+
+        cache_key = f"file_paths:{self._repo_key(repo_url, ref)}"
+
+        if use_cache:
+            cached_data = await asyncio.to_thread(
+                self._get_cached,
+                cache_key,
+                lambda: self.github_client.get_file_paths(repo_url, ref),
+                self.cache_tags(repo_url, ref),
+            )
+            if cached_data is not None:
+                logger.info("file_paths_from_cache", repo_url=repo_url)
+                return cached_data
+
+        logger.info("fetching_file_paths_from_github", repo_url=repo_url)
+        return await self._fetch_and_cache_async(
+            cache_key,
+            lambda: self.async_github_client.get_file_paths(repo_url, ref),
+            self.cache_tags(repo_url, ref),
+            use_cache,
+        )
+
+    async def get_file_content_async(
+        self,
+        repo_url: str,
+        file_path: str,
+        use_cache: bool = True,
+        ref: Optional[str] = None,
+    ) -> str:
+        """Async variant of get_file_content.
+
+        Args:
+            repo_url: GitHub repository URL
+            file_path: Path to file in repository
+            use_cache: Whether to use cache (default: True)
+            ref: Commit SHA to read (default: default branch HEAD)
+
+        Returns:
+            File content as string
+        """
+        if self.snapshot_store is not None:
+            return await asyncio.to_thread(
+                self.get_file_content, repo_url, file_path, use_cache, ref
+            )
+
+        cache_key = f"file_content:{self._repo_key(repo_url, ref)}:{file_path}"
+
+        if use_cache:
+            cached_data = await asyncio.to_thread(cache.get, cache_key)
+            if cached_data is not None:
+                logger.info(
+                    "file_content_from_cache", repo_url=repo_url, file_path=file_path
+                )
+                return cached_data
+
+        logger.info(
+            "fetching_file_content_from_github", repo_url=repo_url, file_path=file_path
+        )
+        return await self._fetch_and_cache_async(
+            cache_key,
+            lambda: self.async_github_client.get_file_content(
+                repo_url, file_path, ref
+            ),
+            self.cache_tags(repo_url, ref),
+            use_cache,
+        )
+
+    async def get_multiple_files_async(
+        self,
+        repo_url: str,
+        file_paths: List[str],
+        use_cache: bool = True,
+        ref: Optional[str] = None,
+    ) -> Dict[str, str]:
+        """Async variant of get_multiple_files.
+
+        Args:
+            repo_url: GitHub repository URL
+            file_paths: List of file paths to fetch
+            use_cache: Whether to use cache (default: True)
+            ref: Commit SHA to read (default: default branch HEAD)
+
+        Returns:
+            Dictionary mapping file paths to their contents, in completion order
+        """
+        unique_paths = list(dict.fromkeys(file_paths))
+        logger.info(
+            "fetching_multiple_files", repo_url=repo_url, file_count=len(unique_paths)
+        )
+
+        semaphore = asyncio.Semaphore(settings.github_max_concurrency)
+
+        async def fetch(file_path: str) -> Tuple[str, Optional[str]]:
+            async with semaphore:
+                try:
+                    content = await self.get_file_content_async(
+                        repo_url, file_path, use_cache, ref
+                    )
+                    return file_path, content
+                except Exception as e:
+                    logger.warning(
+                        "failed_to_fetch_file",
+                        repo_url=repo_url,
+                        file_path=file_path,
+                        error=str(e),
+                    )
+                    # Continue with other files even if one fails
+                    return file_path, None
+
+        results = {}
+        for next_done in asyncio.as_completed([fetch(p) for p in unique_paths]):
+            file_path, content = await next_done
+            if content is not None:
+                results[file_path] = content
+
         return results
 
-    def clear_cache_for_repo(self, repo_url: str) -> None:
+    async def get_tree_paths_and_files_async(
+        self,
+        repo_url: str,
+        file_paths: List[str],
+        max_depth: int = 2,
+        use_cache: bool = True,
+        ref: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any], Dict[str, str]]:
+        """Async variant of get_tree_paths_and_files.
+
+        Args:
+            repo_url: GitHub repository URL
+            file_paths: List of file paths to fetch
+            max_depth: Maximum tree depth to traverse
+            use_cache: Whether to use cache (default: True)
+            ref: Commit SHA to read (default: default branch HEAD)
+
+        Returns:
+            Tuple of (directory tree, file path listing, mapping of file paths
+            to contents)
+        """
+        tree, paths, files = await asyncio.gather(
+            self.get_repository_tree_async(repo_url, "", max_depth, use_cache, ref),
+            self.get_file_paths_async(repo_url, use_cache, ref),
+            self.get_multiple_files_async(repo_url, file_paths, use_cache, ref),
+        )
+        return tree, paths, files
+
+    def clear_cache_for_repo(self, repo_url: str) -> int:
         """Clear all cached data for a repository.
 
+        Removes repository info, HEAD, trees, file contents and analysis results
+        for every commit of the repository; other repositories are unaffected.
+
         Args:
             repo_url: GitHub repository URL
+
+        Returns:
+            Number of cache entries deleted
         """
-        # This is a simplified version - ideally we'd track all cache keys per repo
         logger.info("clearing_repo_cache", repo_url=repo_url)
-        cache.delete(f"repo_info:{repo_url}")
-        # Note: This won't clear all tree and file caches, but gives an idea
+        return cache.invalidate_tag(self.cache_tags(repo_url)[0])
 
 
 # Global service instance
@@ -0,0 +1,90 @@
+"""Coalescing of concurrent identical calls (single-flight)."""
+import asyncio
+import threading
+import structlog
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Tuple, TypeVar
+
+logger = structlog.get_logger()
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers share it.
+
+    Callers arriving while a call for the same key is in flight wait for that
+    call and get its result (or its exception) instead of starting their own.
+    Once the call finishes the key is released, so later callers start afresh
+    (typically hitting the cache the first call populated).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+        self._tasks: Dict[Tuple[asyncio.AbstractEventLoop, str], asyncio.Task] = {}
+
+    def do(self, key: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Call fn(*args, **kwargs), sharing the call with concurrent callers.
+
+        Args:
+            key: Identity of the call (e.g. the cache key being filled)
+            fn: Blocking function to run
+            *args: Positional arguments for fn
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            Result of the shared call
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            logger.debug("single_flight_joined", key=key)
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    async def do_async(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Await fn(), sharing the call with concurrent callers on this loop.
+
+        The shared call runs as its own task, so a cancelled caller does not
+        cancel the call for the others.
+
+        Args:
+            key: Identity of the call (e.g. the cache key being filled)
+            fn: Coroutine function to run
+
+        Returns:
+            Result of the shared call
+        """
+        task_key = (asyncio.get_running_loop(), key)
+
+        with self._lock:
+            task = self._tasks.get(task_key)
+            if task is None:
+                task = asyncio.ensure_future(fn())
+                self._tasks[task_key] = task
+                task.add_done_callback(lambda _: self._release(task_key))
+            else:
+                logger.debug("single_flight_joined", key=key)
+
+        return await asyncio.shield(task)
+
+    def _release(self, task_key: Tuple[asyncio.AbstractEventLoop, str]) -> None:
+        with self._lock:
+            self._tasks.pop(task_key, None)
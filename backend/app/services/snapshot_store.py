@@ -0,0 +1,549 @@
+"""Local content-addressed store for repository tarball snapshots."""
+import hashlib
+import json
+import mmap
+import os
+import tarfile
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import structlog
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+
+from app.config import settings
+from app.core.exceptions import AppException
+from app.services.github_client import build_directory_tree
+from app.services.single_flight import SingleFlight
+
+logger = structlog.get_logger()
+
+
+class SnapshotStore:
+    """Stores one extracted tarball per commit, deduplicating file contents.
+
+    Layout under ``root_dir``:
+    - ``objects/<aa>/<sha256>``: file contents addressed by SHA-256
+    - ``manifests/<owner>/<repo>/<commit>.json``: path -> object mapping
+
+    Downloads of different commits run in parallel; concurrent downloads of
+    one commit share a single download. collect_garbage removes old
+    snapshots and the objects no remaining snapshot references.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+    MAX_MANIFESTS = 32  # manifests memoized in-process
+
+    def __init__(
+        self,
+        root_dir: Optional[str] = None,
+        codeload_base_url: Optional[str] = None,
+        max_file_size: Optional[int] = None,
+    ):
+        """Initialize snapshot store.
+
+        Args:
+            root_dir: Directory to store snapshots (default: settings.snapshot_dir)
+            codeload_base_url: Tarball host (default: settings.github_codeload_base_url)
+            max_file_size: Files larger than this are listed but not stored
+        """
+        self.root_dir = Path(root_dir or settings.snapshot_dir)
+        self.objects_dir = self.root_dir / "objects"
+        self.manifests_dir = self.root_dir / "manifests"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.manifests_dir.mkdir(parents=True, exist_ok=True)
+        self.codeload_base_url = (
+            codeload_base_url or settings.github_codeload_base_url
+        ).rstrip("/")
+        self.max_file_size = max_file_size or settings.snapshot_max_file_size
+        self._manifests: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        # Downloads in progress vs. a running collect_garbage (mutually exclusive)
+        self._gc_condition = threading.Condition()
+        self._downloading = 0
+        self._collecting = False
+
+    def _manifest_path(self, owner: str, repo: str, commit_sha: str) -> Path:
+        return self.manifests_dir / owner / repo / f"{commit_sha}.json"
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / digest
+
+    def has_snapshot(self, owner: str, repo: str, commit_sha: str) -> bool:
+        """Check whether a snapshot for the commit is available locally.
+
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            commit_sha: Commit SHA
+
+        Returns:
+            True if the snapshot manifest exists
+        """
+        return self.get_manifest(owner, repo, commit_sha) is not None
+
+    def get_manifest(
+        self, owner: str, repo: str, commit_sha: str
+    ) -> Optional[Dict[str, Any]]:
+        """Load a snapshot manifest (memoized in-process).
+
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            commit_sha: Commit SHA
+
+        Returns:
+            Manifest with ``commit`` and ``entries`` (path -> entry), or None
+        """
+        manifest_key = f"{owner}/{repo}@{commit_sha}"
+        with self._lock:
+            manifest = self._manifests.get(manifest_key)
+            if manifest is not None:
+                self._manifests.move_to_end(manifest_key)
+                return manifest
+
+        manifest_path = self._manifest_path(owner, repo, commit_sha)
+        if not manifest_path.exists():
+            return None
+
+        try:
+            with manifest_path.open("r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except Exception as e:
+            logger.error(
+                "snapshot_manifest_read_failed", path=str(manifest_path), error=str(e)
+            )
+            return None
+
+        self._remember_manifest(manifest_key, manifest)
+        return manifest
+
+    def _remember_manifest(self, manifest_key: str, manifest: Dict[str, Any]) -> None:
+        with self._lock:
+            self._manifests[manifest_key] = manifest
+            self._manifests.move_to_end(manifest_key)
+            while len(self._manifests) > self.MAX_MANIFESTS:
+                self._manifests.popitem(last=False)
+
+    def download(
+        self, owner: str, repo: str, commit_sha: str, token: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Download the commit tarball and stream-extract it into the store.
+
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            commit_sha: Commit SHA to download
+            token: GitHub token for private repositories
+
+        Returns:
+            Snapshot manifest
+
+        Raises:
+            AppException: If the tarball cannot be downloaded or extracted
+        """
+        manifest = self.get_manifest(owner, repo, commit_sha)
+        if manifest is not None:
+            return manifest
+
+        with self._gc_condition:
+            while self._collecting:
+                self._gc_condition.wait()
+            self._downloading += 1
+        try:
+            return self._flight.do(
+                f"{owner}/{repo}@{commit_sha}",
+                self._download,
+                owner,
+                repo,
+                commit_sha,
+                token,
+            )
+        finally:
+            with self._gc_condition:
+                self._downloading -= 1
+                self._gc_condition.notify_all()
+
+    def _download(
+        self, owner: str, repo: str, commit_sha: str, token: Optional[str]
+    ) -> Dict[str, Any]:
+        """Download and store one commit (see download)."""
+        manifest = self.get_manifest(owner, repo, commit_sha)
+        if manifest is not None:
+            return manifest
+
+        url = f"{self.codeload_base_url}/{owner}/{repo}/tar.gz/{commit_sha}"
+        request = urllib.request.Request(url)
+        if token:
+            request.add_header("Authorization", f"token {token}")
+
+        logger.info("downloading_snapshot", repo=f"{owner}/{repo}", commit=commit_sha)
+
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                entries = self._extract(response)
+        except (urllib.error.URLError, tarfile.TarError, OSError) as e:
+            logger.error(
+                "snapshot_download_failed",
+                repo=f"{owner}/{repo}",
+                commit=commit_sha,
+                error=str(e),
+            )
+            raise AppException(
+                error_code="SNAPSHOT_DOWNLOAD_FAILED",
+                message=f"Failed to download repository snapshot: {str(e)}",
+                status_code=502,
+            )
+
+        manifest = {"commit": commit_sha, "entries": entries}
+        manifest_path = self._manifest_path(owner, repo, commit_sha)
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        self._write_atomic(
+            manifest_path, json.dumps(manifest, ensure_ascii=False).encode("utf-8")
+        )
+        self._remember_manifest(f"{owner}/{repo}@{commit_sha}", manifest)
+
+        logger.info(
+            "snapshot_stored",
+            repo=f"{owner}/{repo}",
+            commit=commit_sha,
+            entries=len(entries),
+        )
+        return manifest
+
+    def _extract(self, fileobj: Any) -> Dict[str, Dict[str, Any]]:
+        """Stream tar members into the object store.
+
+        Args:
+            fileobj: Readable gzip-compressed tar stream
+
+        Returns:
+            Mapping of repository path to entry metadata
+        """
+        entries: Dict[str, Dict[str, Any]] = {}
+
+        with tarfile.open(fileobj=fileobj, mode="r|gz") as tar:
+            for member in tar:
+                # Strip the "<owner>-<repo>-<sha>/" top-level directory
+                parts = member.name.split("/", 1)
+                if len(parts) < 2 or not parts[1].strip("/"):
+                    continue
+                path = parts[1].strip("/")
+
+                if member.isdir():
+                    entries[path] = {"path": path, "type": "tree", "size": None}
+                    continue
+
+                entry: Dict[str, Any] = {
+                    "path": path,
+                    "type": "blob",
+                    "mode": "120000" if member.issym() else "100644",
+                    "size": member.size,
+                    "hash": None,
+                }
+                if member.isfile() and member.size <= self.max_file_size:
+                    source = tar.extractfile(member)
+                    if source is not None:
+                        entry["hash"] = self._store_object(source)
+                entries[path] = entry
+
+        # Some tarballs omit directory members; synthesize missing parents
+        for path in list(entries):
+            parent = path.rsplit("/", 1)[0] if "/" in path else None
+            while parent and parent not in entries:
+                entries[parent] = {"path": parent, "type": "tree", "size": None}
+                parent = parent.rsplit("/", 1)[0] if "/" in parent else None
+
+        return entries
+
+    def _store_object(self, source: Any) -> str:
+        """Copy a stream into the object store, returning its digest."""
+        digest = hashlib.sha256()
+        fd, tmp_name = tempfile.mkstemp(dir=self.objects_dir)
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                while True:
+                    chunk = source.read(self.CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    tmp.write(chunk)
+
+            hex_digest = digest.hexdigest()
+            object_path = self._object_path(hex_digest)
+            if object_path.exists():
+                os.unlink(tmp_name)
+            else:
+                object_path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(tmp_name, object_path)
+            return hex_digest
+        except Exception:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+
+    def _write_atomic(self, path: Path, data: bytes) -> None:
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent)
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(data)
+        os.replace(tmp_name, path)
+
+    def _stored_object(
+        self, owner: str, repo: str, commit_sha: str, file_path: str
+    ) -> Path:
+        """Get the object path holding a file of a stored snapshot.
+
+        Raises:
+            AppException: If the file is missing or not stored
+        """
+        manifest = self.get_manifest(owner, repo, commit_sha) or {"entries": {}}
+        entry = manifest["entries"].get(file_path.strip("/"))
+
+        if entry is None:
+            raise AppException(
+                error_code="FILE_NOT_FOUND",
+                message=f"File not found: {file_path}",
+                status_code=404,
+            )
+        if entry["type"] == "tree":
+            raise AppException(
+                error_code="INVALID_FILE_PATH",
+                message=f"Path is a directory, not a file: {file_path}",
+                status_code=400,
+            )
+        if not entry.get("hash"):
+            raise AppException(
+                error_code="SNAPSHOT_FILE_UNAVAILABLE",
+                message=f"File not stored in snapshot: {file_path}",
+                status_code=404,
+            )
+        return self._object_path(entry["hash"])
+
+    @staticmethod
+    def _collected_error(file_path: str) -> AppException:
+        """Error for an object collect_garbage deleted after its manifest was read."""
+        return AppException(
+            error_code="SNAPSHOT_FILE_UNAVAILABLE",
+            message=f"File no longer stored in snapshot: {file_path}",
+            status_code=404,
+        )
+
+    def read_file(self, owner: str, repo: str, commit_sha: str, file_path: str) -> str:
+        """Read a file from a stored snapshot.
+
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            commit_sha: Commit SHA
+            file_path: Path to file in repository
+
+        Returns:
+            File content as string
+
+        Raises:
+            AppException: If the file is missing, not stored or cannot be decoded
+        """
+        object_path = self._stored_object(owner, repo, commit_sha, file_path)
+        try:
+            return object_path.read_bytes().decode("utf-8")
+        except FileNotFoundError:
+            raise self._collected_error(file_path)
+        except UnicodeDecodeError:
+            raise AppException(
+                error_code="FILE_DECODE_ERROR",
+                message=f"Failed to decode file (binary file?): {file_path}",
+                status_code=400,
+            )
+
+    def map_file(
+        self, owner: str, repo: str, commit_sha: str, file_path: str
+    ) -> Optional[mmap.mmap]:
+        """Memory-map a file of a stored snapshot read-only.
+
+        Objects are immutable, so the mapping stays valid for as long as it
+        is referenced. Content is not decoded; files with NUL bytes near the
+        start are rejected as binary.
+
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            commit_sha: Commit SHA
+            file_path: Path to file in repository
+
+        Returns:
+            Read-only mapping, or None for an empty file (which cannot be mapped)
+
+        Raises:
+            AppException: If the file is missing, not stored or binary
+        """
+        object_path = self._stored_object(owner, repo, commit_sha, file_path)
+        try:
+            with open(object_path, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return None
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            raise self._collected_error(file_path)
+
+        if mapped.find(b"\0", 0, 8192) != -1:
+            mapped.close()
+            raise AppException(
+                error_code="FILE_DECODE_ERROR",
+                message=f"Failed to decode file (binary file?): {file_path}",
+                status_code=400,
+            )
+        return mapped
+
+    def get_tree(
+        self,
+        owner: str,
+        repo: str,
+        commit_sha: str,
+        path: str = "",
+        max_depth: int = 3,
+    ) -> List[Dict[str, Any]]:
+        """Build a directory tree from a stored snapshot.
+
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            commit_sha: Commit SHA
+            path: Starting path in repository
+            max_depth: Maximum depth to traverse
+
+        Returns:
+            List of file/directory nodes (same shape as GitHubClient)
+        """
+        manifest = self.get_manifest(owner, repo, commit_sha) or {"entries": {}}
+        entries = sorted(manifest["entries"].values(), key=lambda e: e["path"])
+        return build_directory_tree(entries, path, max_depth)
+
+    def get_file_paths(self, owner: str, repo: str, commit_sha: str) -> Dict[str, Any]:
+        """List every file path of a stored snapshot.
+
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            commit_sha: Commit SHA
+
+        Returns:
+            Dictionary with ``paths`` and ``truncated`` (same shape as GitHubClient)
+        """
+        manifest = self.get_manifest(owner, repo, commit_sha) or {"entries": {}}
+        paths = [
+            path
+            for path, entry in manifest["entries"].items()
+            if entry["type"] == "blob"
+        ]
+        return {"paths": paths, "truncated": False}
+
+    def collect_garbage(
+        self, max_age: Optional[int] = None, max_bytes: Optional[int] = None
+    ) -> Dict[str, int]:
+        """Delete old snapshots and the objects no remaining snapshot references.
+
+        Snapshots downloaded more than max_age seconds ago are removed, then
+        the oldest others until the stored objects fit into max_bytes (the
+        newest snapshot is kept regardless of size). Objects are shared between
+        snapshots, so only objects no kept manifest references are deleted.
+        Skipped while a download is running, as its objects are not
+        referenced by a manifest yet.
+
+        Args:
+            max_age: Seconds a snapshot is kept, 0 = forever
+                (default: settings.snapshot_max_age)
+            max_bytes: Size limit of the object store, 0 = unbounded
+                (default: settings.snapshot_max_bytes)
+
+        Returns:
+            Dictionary with snapshots and objects removed and bytes reclaimed
+        """
+        max_age = settings.snapshot_max_age if max_age is None else max_age
+        max_bytes = settings.snapshot_max_bytes if max_bytes is None else max_bytes
+        report = {"snapshots": 0, "objects": 0, "bytes_reclaimed": 0}
+
+        with self._gc_condition:
+            if self._downloading:
+                return report
+            self._collecting = True
+        try:
+            manifests = []  # (downloaded at, path, object digests), oldest first
+            for path in self.manifests_dir.glob("*/*/*.json"):
+                try:
+                    with path.open("r", encoding="utf-8") as f:
+                        entries = json.load(f)["entries"].values()
+                    downloaded_at = path.stat().st_mtime
+                except (OSError, ValueError, KeyError, AttributeError) as e:
+                    logger.warning(
+                        "snapshot_manifest_unreadable", path=str(path), error=str(e)
+                    )
+                    continue
+                digests = {entry["hash"] for entry in entries if entry.get("hash")}
+                manifests.append((downloaded_at, path, digests))
+            manifests.sort(key=lambda m: m[0])
+
+            sizes: Dict[str, int] = {}
+            for path in self.objects_dir.glob("??/*"):
+                try:
+                    sizes[path.name] = path.stat().st_size
+                except FileNotFoundError:
+                    continue
+            references = Counter(
+                digest for _, _, digests in manifests for digest in digests
+            )
+            live_bytes = sum(
+                size for digest, size in sizes.items() if digest in references
+            )
+
+            removed = []
+            cutoff = time.time() - max_age
+            for index, (downloaded_at, path, digests) in enumerate(manifests):
+                expired = max_age and downloaded_at < cutoff
+                oversized = (
+                    max_bytes and live_bytes > max_bytes and index < len(manifests) - 1
+                )
+                if not (expired or oversized):
+                    break
+                removed.append(path)
+                for digest in digests:
+                    references[digest] -= 1
+                    if not references[digest]:
+                        live_bytes -= sizes.get(digest, 0)
+
+            with self._lock:
+                self._manifests.clear()
+            for path in removed:
+                try:
+                    path.unlink()
+                    report["snapshots"] += 1
+                except FileNotFoundError:
+                    pass
+
+            for digest, size in sizes.items():
+                if references[digest] > 0:
+                    continue
+                try:
+                    self._object_path(digest).unlink()
+                    report["objects"] += 1
+                    report["bytes_reclaimed"] += size
+                except FileNotFoundError:
+                    pass
+
+            # Temporary files of interrupted downloads
+            for path in self.objects_dir.glob("tmp*"):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+        finally:
+            with self._gc_condition:
+                self._collecting = False
+                self._gc_condition.notify_all()
+
+        if report["snapshots"] or report["objects"]:
+            logger.info("snapshot_garbage_collected", **report)
+        return report
@@ -0,0 +1,358 @@
+"""Definitions of functions, classes and methods in one repository commit."""
+import ast
+import re
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+
+import structlog
+
+from app.services.cache_manager import cache
+from app.services.repository_service import repository_service
+
+logger = structlog.get_logger()
+
+# (name, kind, path, start line, end line, container)
+Symbol = Tuple[str, str, str, int, int, str]
+
+_NAME = r"(?P<name>[A-Za-z_$][\w$]*)"
+
+# Per language: (line regex with a "name" group, kind); first match wins
+_JS_PATTERNS = [
+    (
+        r"^\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?function\s*\*?\s*" + _NAME,
+        "function",
+    ),
+    (r"^\s*(?:export\s+)?(?:default\s+)?(?:abstract\s+)?class\s+" + _NAME, "class"),
+    (
+        r"^\s*(?:export\s+)?(?:const|let|var)\s+" + _NAME + r"\s*(?::[^=]+)?=\s*"
+        r"(?:async\s+)?(?:function\b|\([^)]*\)\s*(?::[^=]+)?=>|[A-Za-z_$][\w$]*\s*=>)",
+        "function",
+    ),
+    (r"^\s*(?:export\s+)?(?:declare\s+)?(?:interface|type|enum)\s+" + _NAME, "type"),
+    (
+        r"^\s+(?:(?:public|private|protected|static|async|readonly|get|set)\s+)*"
+        + _NAME
+        + r"\s*\([^)]*\)\s*(?::[^{]+)?\{",
+        "method",
+    ),
+]
+
+_LANGUAGE_PATTERNS: Dict[str, List[Tuple[str, str]]] = {
+    ".js": _JS_PATTERNS,
+    ".jsx": _JS_PATTERNS,
+    ".mjs": _JS_PATTERNS,
+    ".ts": _JS_PATTERNS,
+    ".tsx": _JS_PATTERNS,
+    ".go": [
+        (r"^func\s+\([^)]*\)\s*" + _NAME, "method"),
+        (r"^func\s+" + _NAME, "function"),
+        (r"^type\s+" + _NAME + r"\s+(?:struct|interface)\b", "type"),
+    ],
+    ".rs": [
+        (
+            r"^\s*(?:pub(?:\([^)]*\))?\s+)?(?:const\s+)?(?:async\s+)?"
+            r"(?:unsafe\s+)?(?:extern\s+\"[^\"]*\"\s+)?fn\s+" + _NAME,
+            "function",
+        ),
+        (r"^\s*(?:pub(?:\([^)]*\))?\s+)?(?:struct|enum|union)\s+" + _NAME, "type"),
+        (r"^\s*(?:pub(?:\([^)]*\))?\s+)?(?:unsafe\s+)?trait\s+" + _NAME, "type"),
+    ],
+    ".java": [
+        (
+            r"^\s*(?:(?:public|private|protected|abstract|final|static|sealed)\s+)*"
+            r"(?:class|interface|enum|record|@interface)\s+" + _NAME,
+            "class",
+        ),
+        (
+            r"^\s+(?:(?:public|private|protected|static|final|abstract|synchronized"
+            r"|native|default)\s+)+(?:<[^>]+>\s+)?[\w<>\[\],.?\s]+?\s+"
+            + _NAME
+            + r"\s*\(",
+            "method",
+        ),
+    ],
+}
+
+# Statements and keywords the method patterns would otherwise take for names
+_KEYWORDS = {
+    "if",
+    "for",
+    "while",
+    "switch",
+    "catch",
+    "return",
+    "function",
+    "constructor",
+    "new",
+    "else",
+    "do",
+    "try",
+}
+
+_COMPILED: Dict[str, List[Tuple[Pattern[str], str]]] = {
+    ext: [(re.compile(pattern), kind) for pattern, kind in patterns]
+    for ext, patterns in _LANGUAGE_PATTERNS.items()
+}
+
+_PYTHON_DEF = re.compile(r"^\s*(?:async\s+)?(?P<kind>def|class)\s+(?P<name>\w+)")
+
+
+def _extension(path: str) -> str:
+    name = path.rsplit("/", 1)[-1]
+    return name[name.rfind(".") :].lower() if "." in name else ""
+
+
+def _python_symbols(path: str, content: str) -> List[Symbol]:
+    """Extract definitions from Python source with the ast module.
+
+    Falls back to a line regex (with one-line spans) if the file does not
+    parse, e.g. Python 2 code.
+    """
+    symbols: List[Symbol] = []
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        for number, line in enumerate(content.split("\n"), 1):
+            match = _PYTHON_DEF.match(line)
+            if match:
+                kind = "class" if match.group("kind") == "class" else "function"
+                symbols.append((match.group("name"), kind, path, number, number, ""))
+        return symbols
+
+    def visit(node: ast.AST, container: str, in_class: bool) -> None:
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, ast.ClassDef):
+                kind = "class"
+            elif isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                kind = "method" if in_class else "function"
+            else:
+                visit(child, container, in_class)
+                continue
+
+            start = min([child.lineno] + [d.lineno for d in child.decorator_list])
+            end = getattr(child, "end_lineno", None) or child.lineno
+            symbols.append((child.name, kind, path, start, end, container))
+            qualified = f"{container}.{child.name}" if container else child.name
+            visit(child, qualified, kind == "class")
+
+    visit(tree, "", False)
+    return symbols
+
+
+def _block_end(lines: List[str], start: int) -> int:
+    """Find the line closing the brace block opened at or after lines[start].
+
+    Quoted strings are skipped on a best-effort basis. Declarations without
+    a block (e.g. ``fn f();``) end on their own line.
+
+    Returns:
+        0-based index of the last line of the block
+    """
+    depth = 0
+    opened = False
+    for index in range(start, min(len(lines), start + 5000)):
+        quote = ""
+        previous = ""
+        for c in lines[index]:
+            if quote:
+                if c == quote and previous != "\\":
+                    quote = ""
+            elif c in "\"'`":
+                quote = c
+            elif c == "/" and previous == "/":
+                break
+            elif c == "{":
+                depth += 1
+                opened = True
+            elif c == "}":
+                depth -= 1
+            elif c == ";" and not opened:
+                return index
+            previous = c
+        if opened and depth <= 0:
+            return index
+        if not opened and index - start >= 3:
+            return start
+    return start
+
+
+def _pattern_symbols(path: str, content: str) -> List[Symbol]:
+    """Extract definitions with the line patterns of the file's language."""
+    patterns = _COMPILED.get(_extension(path))
+    if not patterns:
+        return []
+
+    lines = content.split("\n")
+    symbols: List[Symbol] = []
+    for index, line in enumerate(lines):
+        for regex, kind in patterns:
+            match = regex.match(line)
+            if match and not (kind == "method" and match.group("name") in _KEYWORDS):
+                end = _block_end(lines, index)
+                symbols.append(
+                    (match.group("name"), kind, path, index + 1, end + 1, "")
+                )
+                break
+    return symbols
+
+
+def extract_symbols(path: str, content: str) -> List[Symbol]:
+    """Extract function, class, method and type definitions from a file.
+
+    Python is parsed with ast, so spans (including decorators) are exact
+    and methods know their class. JS/TS, Go, Rust and Java use line
+    patterns; spans end at the matching closing brace.
+
+    Args:
+        path: File path (the extension selects the language)
+        content: File content
+
+    Returns:
+        (name, kind, path, start line, end line, container) tuples
+    """
+    if _extension(path) == ".py":
+        return _python_symbols(path, content)
+    return _pattern_symbols(path, content)
+
+
+class SymbolIndex:
+    """Definitions of a commit, sorted by lowercase name for O(log n) lookups.
+
+    Built once per commit in the same pass and from the same files as the
+    code search index (see code_indexer), persisted in the cache and shared
+    through a small in-process LRU.
+    """
+
+    VERSION = 1
+    MAX_SHARED = 8
+
+    _shared: "OrderedDict[str, SymbolIndex]" = OrderedDict()
+    _shared_lock = threading.Lock()
+
+    def __init__(self, symbols: List[Symbol]):
+        """Initialize index.
+
+        Args:
+            symbols: Definitions in any order
+        """
+        self.symbols = sorted(
+            (tuple(symbol) for symbol in symbols),
+            key=lambda s: (s[0].lower(), s[2], s[3]),
+        )
+        self._keys = [symbol[0].lower() for symbol in self.symbols]
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    @classmethod
+    def build(cls, files: Dict[str, str]) -> "SymbolIndex":
+        """Index the definitions of file contents.
+
+        Args:
+            files: File path -> content
+
+        Returns:
+            Symbol index
+        """
+        symbols: List[Symbol] = []
+        for path, content in files.items():
+            symbols.extend(extract_symbols(path, content))
+        return cls(symbols)
+
+    def lookup(self, name: str) -> List[Dict[str, Any]]:
+        """Find the definitions of a symbol.
+
+        Args:
+            name: Symbol name, case-insensitive; ``Container.name`` restricts
+                the result to members of that class
+
+        Returns:
+            List of {name, kind, path, start_line, end_line, container}
+        """
+        container = ""
+        if "." in name:
+            container, name = name.rsplit(".", 1)
+
+        key = name.lower()
+        lo = bisect_left(self._keys, key)
+        hi = bisect_right(self._keys, key, lo)
+
+        results = []
+        for symbol_name, kind, path, start, end, owner in self.symbols[lo:hi]:
+            if container and owner.rsplit(".", 1)[-1].lower() != container.lower():
+                continue
+            results.append(
+                {
+                    "name": symbol_name,
+                    "kind": kind,
+                    "path": path,
+                    "start_line": start,
+                    "end_line": end,
+                    "container": owner,
+                }
+            )
+        return results
+
+    @classmethod
+    def _cache_key(cls, repo_url: str, ref: str) -> str:
+        return f"symbols:{repo_url}@{ref}:v{cls.VERSION}"
+
+    @classmethod
+    def _get_shared(cls, key: str) -> Optional["SymbolIndex"]:
+        with cls._shared_lock:
+            index = cls._shared.get(key)
+            if index is not None:
+                cls._shared.move_to_end(key)
+            return index
+
+    @classmethod
+    def _share(cls, key: str, index: "SymbolIndex") -> None:
+        with cls._shared_lock:
+            cls._shared[key] = index
+            cls._shared.move_to_end(key)
+            while len(cls._shared) > cls.MAX_SHARED:
+                cls._shared.popitem(last=False)
+
+    @classmethod
+    def peek(cls, repo_url: str, ref: str) -> Optional["SymbolIndex"]:
+        """Get the symbol index of a commit if it was built already.
+
+        Args:
+            repo_url: GitHub repository URL
+            ref: Commit SHA
+
+        Returns:
+            Symbol index, or None if it has not been built yet (see
+            code_indexer)
+        """
+        key = cls._cache_key(repo_url, ref)
+        index = cls._get_shared(key)
+        if index is not None:
+            return index
+
+        cached = cache.get(key)
+        if cached is None:
+            return None
+        logger.info("symbol_index_from_cache", repo_url=repo_url)
+        index = cls(cached)
+        cls._share(key, index)
+        return index
+
+    @classmethod
+    def store(cls, repo_url: str, ref: str, index: "SymbolIndex") -> None:
+        """Keep a built symbol index for peek, in memory and in the cache.
+
+        Args:
+            repo_url: GitHub repository URL
+            ref: Commit SHA
+            index: Index built from the files of that commit
+        """
+        key = cls._cache_key(repo_url, ref)
+        cache.set(
+            key,
+            [list(symbol) for symbol in index.symbols],
+            tags=repository_service.cache_tags(repo_url, ref),
+        )
+        cls._share(key, index)
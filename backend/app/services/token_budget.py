@@ -0,0 +1,198 @@
+"""Token counting and budgeted packing of prompt context."""
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import structlog
+
+try:
+    import tiktoken
+except ImportError:  # optional: token counts are estimated without it
+    tiktoken = None
+
+logger = structlog.get_logger()
+
+TRUNCATION_MARKER = "\n\n... (content truncated)"
+
+
+class TokenCounter:
+    """Counts tokens with the model's tiktoken encoding, or estimates them.
+
+    Without tiktoken (or its encoding files), ASCII text is estimated at
+    four characters per token and every other character (e.g. CJK) at one
+    token, which errs on the high side. Counts are memoized by content
+    digest: the same README, chunks and history are counted again for
+    every question of a session.
+    """
+
+    MAX_CACHED = 4096
+
+    def __init__(self, model: str):
+        """Initialize counter.
+
+        Args:
+            model: Model name; provider prefixes like ``openai/`` are ignored
+        """
+        self._encoding = self._load_encoding(model)
+        self._counts: "OrderedDict[bytes, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _load_encoding(model: str) -> Optional[Any]:
+        if tiktoken is None:
+            return None
+        name = model.rsplit("/", 1)[-1]
+        try:
+            try:
+                return tiktoken.encoding_for_model(name)
+            except KeyError:
+                return tiktoken.get_encoding("cl100k_base")
+        except Exception as e:  # encodings are downloaded on first use
+            logger.warning("tokenizer_unavailable_estimating", error=str(e))
+            return None
+
+    @property
+    def exact(self) -> bool:
+        """Whether counts come from the real tokenizer."""
+        return self._encoding is not None
+
+    def _count(self, text: str) -> int:
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        ascii_chars = len(text.encode("ascii", errors="ignore"))
+        return math.ceil(ascii_chars / 4) + len(text) - ascii_chars
+
+    def count(self, text: str) -> int:
+        """Count the tokens of a text.
+
+        Args:
+            text: Text to count
+
+        Returns:
+            Number of tokens
+        """
+        if not text:
+            return 0
+        key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        with self._lock:
+            tokens = self._counts.get(key)
+            if tokens is not None:
+                self._counts.move_to_end(key)
+                return tokens
+
+        tokens = self._count(text)
+        with self._lock:
+            self._counts[key] = tokens
+            while len(self._counts) > self.MAX_CACHED:
+                self._counts.popitem(last=False)
+        return tokens
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cut a text to at most max_tokens tokens.
+
+        The cut is moved back to the last line break when that keeps at
+        least half of the text, so code is not cut mid-line.
+
+        Args:
+            text: Text to cut
+            max_tokens: Token limit
+
+        Returns:
+            The text, or a prefix of it within the limit
+        """
+        if self.count(text) <= max_tokens:
+            return text
+        if max_tokens <= 0:
+            return ""
+
+        if self._encoding is not None:
+            tokens = self._encoding.encode(text, disallowed_special=())
+            cut = self._encoding.decode(tokens[:max_tokens])
+        else:
+            # Longest prefix within the limit (estimates grow with length)
+            lo, hi = 0, len(text)
+            while lo < hi:
+                mid = (lo + hi + 1) // 2
+                if self._count(text[:mid]) <= max_tokens:
+                    lo = mid
+                else:
+                    hi = mid - 1
+            cut = text[:lo]
+
+        newline = cut.rfind("\n")
+        if newline > len(cut) // 2:
+            cut = cut[:newline]
+        return cut
+
+
+@dataclass
+class ContextPiece:
+    """One optional part of a prompt competing for the token budget.
+
+    Attributes:
+        key: Identifier the packed text is returned under
+        content: Text that may be truncated
+        priority: Pieces with higher priority are packed first
+        prefix: Fixed text before the content (e.g. a heading)
+        suffix: Fixed text after the content
+        min_tokens: If > 0, the content may be truncated as long as at least
+            this many of its tokens fit; otherwise it is all or nothing
+        requires: Key of a piece that must be packed for this one to be
+            (e.g. a newer history message before an older one)
+    """
+
+    key: str
+    content: str
+    priority: float
+    prefix: str = ""
+    suffix: str = ""
+    min_tokens: int = 0
+    requires: Optional[str] = None
+
+
+def pack(
+    pieces: List[ContextPiece], budget: int, counter: TokenCounter
+) -> Dict[str, str]:
+    """Choose the most valuable pieces that fit into a token budget.
+
+    Pieces are considered by descending priority (ties keep their order).
+    A piece that does not fit is truncated if allowed and worthwhile, else
+    skipped, so a smaller piece of lower priority may still be packed.
+
+    Args:
+        pieces: Candidate pieces
+        budget: Tokens available
+        counter: Token counter
+
+    Returns:
+        Key -> rendered text (prefix + content + suffix) of the packed
+        pieces; truncated content ends with TRUNCATION_MARKER
+    """
+    packed: Dict[str, str] = {}
+    remaining = budget
+
+    for piece in sorted(pieces, key=lambda p: -p.priority):
+        if piece.requires is not None and piece.requires not in packed:
+            continue
+
+        frame = counter.count(piece.prefix) + counter.count(piece.suffix)
+        tokens = frame + counter.count(piece.content)
+        if tokens <= remaining:
+            packed[piece.key] = piece.prefix + piece.content + piece.suffix
+            remaining -= tokens
+            continue
+
+        available = remaining - frame - counter.count(TRUNCATION_MARKER)
+        if piece.min_tokens and available >= piece.min_tokens:
+            content = counter.truncate(piece.content, available)
+            packed[piece.key] = (
+                piece.prefix + content + TRUNCATION_MARKER + piece.suffix
+            )
+            remaining -= (
+                frame + counter.count(content) + counter.count(TRUNCATION_MARKER)
+            )
+
+    return packed
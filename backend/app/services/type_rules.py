@@ -0,0 +1,184 @@
+"""Compiled matcher for project type detection patterns."""
+import re
+from typing import (
+    Any,
+    Callable,
+    Container,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Pattern,
+    Set,
+    Tuple,
+)
+
+# (file path, compiled regex) that must match if the file exists
+ContentCheck = Tuple[str, Pattern[str]]
+
+
+class _Rule:
+    """One project type pattern reduced to bit masks and index ids."""
+
+    __slots__ = (
+        "type_name",
+        "required_mask",
+        "alternative_masks",
+        "dependency_count",
+        "uses_dependencies",
+        "content_checks",
+    )
+
+    def __init__(self, type_name: str):
+        self.type_name = type_name
+        self.required_mask = 0
+        self.alternative_masks: List[int] = []
+        self.dependency_count = 0
+        self.uses_dependencies = False
+        self.content_checks: List[int] = []
+
+
+class TypeRuleEngine:
+    """Evaluates every project type pattern in a single pass over repo facts.
+
+    Patterns use the ProjectTypeIdentifier.TYPE_PATTERNS format and are
+    compiled once:
+
+    - Every file a pattern mentions gets a bit; required files and each
+      group of alternatives become masks tested against the bitset of files
+      present in the repository.
+    - Required and excluded package dependencies go into inverted indexes
+      (dependency -> rules), so package.json dependencies are looked up once
+      for all rules instead of once per rule.
+    - Content patterns are compiled regexes, deduplicated across rules, and
+      each file is read at most once.
+
+    match() gathers these facts once and then decides each rule with integer
+    and set operations only. Its result is the same as checking each pattern
+    in turn.
+    """
+
+    def __init__(self, patterns: Dict[str, Dict[str, Any]]):
+        """Compile type patterns.
+
+        Args:
+            patterns: Type name -> pattern; match results keep this order
+        """
+        self._file_bits: Dict[str, int] = {}
+        self._required_deps: Dict[str, List[int]] = {}
+        self._excluded_deps: Dict[str, List[int]] = {}
+        self._content_checks: List[ContentCheck] = []
+        self._rules: List[_Rule] = []
+
+        check_ids: Dict[Tuple[str, str], int] = {}
+
+        for index, (type_name, pattern) in enumerate(patterns.items()):
+            rule = _Rule(type_name)
+
+            for file_path in pattern.get("required_files", []):
+                rule.required_mask |= self._file_bit(file_path)
+
+            for alternatives in pattern.get("alternative_files", []):
+                mask = 0
+                for file_path in alternatives:
+                    mask |= self._file_bit(file_path)
+                rule.alternative_masks.append(mask)
+
+            for dep in pattern.get("package_dependencies", []):
+                self._required_deps.setdefault(dep, []).append(index)
+                rule.dependency_count += 1
+
+            for dep in pattern.get("exclude_dependencies", []):
+                self._excluded_deps.setdefault(dep, []).append(index)
+
+            rule.uses_dependencies = bool(
+                pattern.get("package_dependencies")
+                or pattern.get("exclude_dependencies")
+            )
+
+            for check in pattern.get("file_content_patterns", []):
+                key = (check["file"], check["pattern"])
+                if key not in check_ids:
+                    check_ids[key] = len(self._content_checks)
+                    self._content_checks.append(
+                        (check["file"], re.compile(check["pattern"], re.IGNORECASE))
+                    )
+                rule.content_checks.append(check_ids[key])
+
+            self._rules.append(rule)
+
+    def _file_bit(self, file_path: str) -> int:
+        """Get the bit assigned to a file path, assigning one if new."""
+        if file_path not in self._file_bits:
+            self._file_bits[file_path] = 1 << len(self._file_bits)
+        return self._file_bits[file_path]
+
+    def match(
+        self,
+        file_list: Container[str],
+        get_dependencies: Callable[[], Iterable[str]],
+        read_file: Callable[[str], Optional[str]],
+    ) -> List[str]:
+        """Find every project type whose pattern the repository satisfies.
+
+        Args:
+            file_list: Paths present in the repository (anything supporting ``in``)
+            get_dependencies: Returns package.json dependency names; only
+                called if a rule with dependency conditions passes its file
+                conditions
+            read_file: Returns a file's content, or None if it cannot be read;
+                only called for existing files named by content patterns
+
+        Returns:
+            Matching type names, in pattern order
+        """
+        present = 0
+        for file_path, bit in self._file_bits.items():
+            if file_path in file_list:
+                present |= bit
+
+        files_ok = [
+            present & rule.required_mask == rule.required_mask
+            and all(present & mask for mask in rule.alternative_masks)
+            for rule in self._rules
+        ]
+
+        required_hits = [0] * len(self._rules)
+        excluded: Set[int] = set()
+        if any(
+            ok and rule.uses_dependencies for ok, rule in zip(files_ok, self._rules)
+        ):
+            for dep in get_dependencies():
+                for index in self._required_deps.get(dep, ()):
+                    required_hits[index] += 1
+                excluded.update(self._excluded_deps.get(dep, ()))
+
+        content_results: Dict[int, bool] = {}
+        contents: Dict[str, Optional[str]] = {}
+
+        def content_ok(check_id: int) -> bool:
+            if check_id not in content_results:
+                file_path, regex = self._content_checks[check_id]
+                if file_path not in file_list:
+                    # Patterns only constrain files that exist
+                    content_results[check_id] = True
+                else:
+                    if file_path not in contents:
+                        contents[file_path] = read_file(file_path)
+                    content = contents[file_path]
+                    content_results[check_id] = (
+                        content is not None and regex.search(content) is not None
+                    )
+            return content_results[check_id]
+
+        matches = []
+        for index, rule in enumerate(self._rules):
+            if (
+                files_ok[index]
+                and required_hits[index] == rule.dependency_count
+                and index not in excluded
+                and all(content_ok(check_id) for check_id in rule.content_checks)
+            ):
+                matches.append(rule.type_name)
+
+        return matches
@@ -0,0 +1,68 @@
+"""Integration tests for the streaming QA endpoint."""
+import json
+from typing import Any, AsyncIterator, Dict, Iterator, List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services.qa_service import PreparedQuestion, qa_service
+
+QUESTION = {
+    "repoUrl": "https://github.com/owner/demo",
+    "question": "How do I run this project?",
+}
+
+
+@pytest.fixture
+def session_id(monkeypatch: pytest.MonkeyPatch) -> Iterator[str]:
+    """Stub question preparation and a streaming AI answer."""
+    session_id = qa_service.session_manager.create_session("owner/demo")
+
+    def prepare_question(request: Any) -> PreparedQuestion:
+        return PreparedQuestion(
+            session_id=session_id,
+            messages=[{"role": "user", "content": request.question}],
+            file_contents={"README.md": "# demo\nRun `make`"},
+        )
+
+    async def stream_qa_answer_async(
+        messages: List[Dict[str, str]],
+    ) -> AsyncIterator[str]:
+        for token in ["Run ", "`make`", "."]:
+            yield token
+
+    monkeypatch.setattr(qa_service, "prepare_question", prepare_question)
+    monkeypatch.setattr(qa_service.ai_generator, "is_available", lambda: True)
+    monkeypatch.setattr(
+        qa_service.ai_generator, "stream_qa_answer_async", stream_qa_answer_async
+    )
+    yield session_id
+    qa_service.session_manager.delete_session(session_id)
+
+
+def test_stream_forwards_tokens_then_done(client: TestClient, session_id: str) -> None:
+    """Tokens arrive as separate events; done carries references and session."""
+    response = client.post("/api/qa/ask/stream", json=QUESTION)
+
+    assert response.status_code == 200
+    events = [
+        (block.split("\n")[0][len("event: ") :], json.loads(block.split("data: ")[1]))
+        for block in response.text.strip().split("\n\n")
+    ]
+
+    assert events[:3] == [
+        ("token", {"content": "Run "}),
+        ("token", {"content": "`make`"}),
+        ("token", {"content": "."}),
+    ]
+    name, done = events[3]
+    assert name == "done"
+    assert done["sessionId"] == session_id
+    assert done["references"][0]["filePath"] == "README.md"
+    assert "answer" not in done
+
+    messages = qa_service.session_manager.get_session(session_id).messages
+    assert [(m.role, m.content) for m in messages] == [
+        ("user", QUESTION["question"]),
+        ("assistant", "Run `make`."),
+    ]
@@ -0,0 +1,115 @@
+"""Integration tests for tutorial caching."""
+from typing import Any, Dict, List, Optional
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.routes import tutorial
+from app.services.cache_backends import MemoryLRUBackend
+from app.services.cache_manager import CacheManager
+
+REPO_URL = "https://github.com/owner/demo"
+
+ANALYSIS = {
+    "project_type": {"language": "Python", "primary_type": "Python"},
+    "structure": {},
+    "dependencies": {},
+    "key_files": [],
+}
+
+AI_TUTORIAL = {
+    "overview": "Demo overview",
+    "prerequisites": ["Python"],
+    "modules": [
+        {
+            "id": "module-1",
+            "name": "Setup",
+            "description": "Set up",
+            "dependencies": [],
+            "learningObjectives": [],
+            "estimatedMinutes": 10,
+            "stepIds": ["step-1"],
+        }
+    ],
+    "steps": [
+        {
+            "id": "step-1",
+            "title": "Read README",
+            "description": "Read it",
+            "filePath": "README.md",
+            "lineStart": 1,
+            "lineEnd": 3,
+            "codeSnippet": "# demo",
+            "explanation": "Start here",
+            "moduleId": "module-1",
+        }
+    ],
+}
+
+
+@pytest.fixture
+def generations(monkeypatch: pytest.MonkeyPatch) -> List[Optional[str]]:
+    """Stub GitHub, analysis and AI; record each AI generation."""
+    calls: List[Optional[str]] = []
+    service = tutorial.repository_service
+    test_cache = CacheManager(backends=[MemoryLRUBackend(1_000_000)])
+    test_cache.enabled = True
+
+    async def get_head_sha_async(repo_url: str, use_cache: bool = True) -> str:
+        return "a" * 40
+
+    async def get_repository_info_async(
+        repo_url: str, use_cache: bool = True
+    ) -> Dict[str, Any]:
+        return {"owner": "owner", "name": "demo", "stars": 1, "language": "Python"}
+
+    async def get_repository_tree_async(*args: Any, **kwargs: Any) -> List[Any]:
+        return []
+
+    class FakeAnalyzer:
+        def __init__(self, repo_url: str):
+            pass
+
+        async def analyze_async(self, **kwargs: Any) -> Dict[str, Any]:
+            return ANALYSIS
+
+    async def generate_async(**kwargs: Any) -> Dict[str, Any]:
+        calls.append(kwargs["language"])
+        if kwargs["language"] == "fail":
+            raise RuntimeError("AI unavailable")
+        return AI_TUTORIAL
+
+    monkeypatch.setattr(service, "get_head_sha_async", get_head_sha_async)
+    monkeypatch.setattr(service, "get_repository_info_async", get_repository_info_async)
+    monkeypatch.setattr(service, "get_repository_tree_async", get_repository_tree_async)
+    monkeypatch.setattr(tutorial, "CodeAnalyzer", FakeAnalyzer)
+    monkeypatch.setattr(tutorial.tutorial_generator, "generate_async", generate_async)
+    monkeypatch.setattr(tutorial, "cache", test_cache)
+    return calls
+
+
+def test_tutorial_is_served_from_cache(
+    client: TestClient, generations: List[Optional[str]]
+) -> None:
+    """A repeat request skips generation; regenerate=true forces it."""
+    params = {"repoUrl": REPO_URL, "language": "en"}
+    first = client.get("/api/tutorial", params=params).json()
+    second = client.get("/api/tutorial", params=params).json()
+
+    assert second == first
+    assert second["data"]["overview"] == "Demo overview"
+    assert generations == ["en"]
+
+    client.get("/api/tutorial", params={**params, "regenerate": "true"})
+    assert generations == ["en", "en"]
+
+
+def test_fallback_tutorial_is_not_cached(
+    client: TestClient, generations: List[Optional[str]]
+) -> None:
+    """When AI fails the fallback is returned but generation is retried next time."""
+    params = {"repoUrl": REPO_URL, "language": "fail"}
+    client.get("/api/tutorial", params=params)
+    client.get("/api/tutorial", params=params)
+
+    assert generations == ["fail", "fail"]
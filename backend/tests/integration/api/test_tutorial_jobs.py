@@ -0,0 +1,66 @@
+"""Integration tests for background tutorial jobs."""
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.routes import tutorial
+from app.services.job_queue import JobQueue
+
+REPO_URL = "https://github.com/owner/demo"
+
+
+@pytest.fixture
+def jobs(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> JobQueue:
+    """Replace the tutorial job queue with one backed by a temporary database."""
+    queue = JobQueue(
+        "tutorial-jobs", tutorial.run_tutorial_job, db_path=str(tmp_path / "jobs.db")
+    )
+    monkeypatch.setattr(tutorial, "tutorial_jobs", queue)
+    return queue
+
+
+def test_job_lifecycle(
+    client: TestClient, jobs: JobQueue, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Submit returns 202 with a queued job; polling returns the tutorial."""
+    calls: List[Dict[str, Any]] = []
+
+    def get_real_tutorial_data(repo_url: str, language: str, regenerate: bool):
+        calls.append({"repo_url": repo_url, "language": language})
+        return tutorial.get_mock_tutorial_data(repo_url)
+
+    monkeypatch.setattr(tutorial, "get_real_tutorial_data", get_real_tutorial_data)
+
+    body = {"repoUrl": REPO_URL, "language": "en"}
+    response = client.post("/api/tutorial/jobs", json=body)
+    assert response.status_code == 202
+    job = response.json()["data"]
+    assert job["status"] == "queued"
+    assert job["result"] is None
+
+    # Same repo and language while still queued: deduplicated
+    assert (
+        client.post("/api/tutorial/jobs", json=body).json()["data"]["id"] == job["id"]
+    )
+    # ...unless the new request asks to regenerate
+    regenerate = {**body, "regenerate": True}
+    regenerate_job = client.post("/api/tutorial/jobs", json=regenerate).json()
+    assert regenerate_job["data"]["id"] != job["id"]
+
+    assert jobs.run_next()
+    assert calls == [{"repo_url": REPO_URL, "language": "en"}]
+
+    finished = client.get(f"/api/tutorial/jobs/{job['id']}").json()["data"]
+    assert finished["status"] == "succeeded"
+    assert finished["result"]["repo"]["name"] == "demo"
+    assert finished["finishedAt"] is not None
+
+
+def test_unknown_job_is_404(client: TestClient, jobs: JobQueue) -> None:
+    """Polling an unknown job ID returns JOB_NOT_FOUND."""
+    response = client.get("/api/tutorial/jobs/missing")
+
+    assert response.status_code == 404
+    assert response.json()["errorCode"] == "JOB_NOT_FOUND"
@@ -0,0 +1,147 @@
+"""Integration tests for the streaming tutorial endpoint."""
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.routes import tutorial
+from app.services.cache_backends import MemoryLRUBackend
+from app.services.cache_manager import CacheManager
+
+REPO_URL = "https://github.com/owner/demo"
+
+MODULE = {
+    "id": "module-1",
+    "name": "Setup",
+    "description": "Set up",
+    "estimatedMinutes": 10,
+}
+STEP = {
+    "id": "step-1",
+    "title": "Read README",
+    "description": "Read it",
+    "moduleId": "module-1",
+}
+
+
+def parse_events(body: str) -> List[Tuple[str, Any]]:
+    """Split a text/event-stream body into (event, data) pairs."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+@pytest.fixture
+def stub_services(monkeypatch: pytest.MonkeyPatch) -> List[str]:
+    """Stub GitHub, analysis and a streaming AI; record each generation."""
+    generations: List[str] = []
+    service = tutorial.repository_service
+
+    async def get_head_sha_async(repo_url: str, use_cache: bool = True) -> str:
+        return "b" * 40
+
+    async def get_repository_info_async(
+        repo_url: str, use_cache: bool = True
+    ) -> Dict[str, Any]:
+        return {"owner": "owner", "name": "demo", "stars": 1, "language": "Python"}
+
+    async def get_repository_tree_async(*args: Any, **kwargs: Any) -> List[Any]:
+        return [{"name": "README.md", "path": "README.md", "type": "file"}]
+
+    class FakeAnalyzer:
+        def __init__(self, repo_url: str):
+            pass
+
+        async def analyze_async(self, **kwargs: Any) -> Dict[str, Any]:
+            return {
+                "project_type": {"language": "Python", "primary_type": "Python"},
+                "key_files": [],
+                "dependencies": {},
+            }
+
+    async def stream_async(**kwargs: Any) -> AsyncIterator[Tuple[str, Any]]:
+        generations.append(kwargs["language"])
+        yield "overview", "Demo overview"
+        yield "module", dict(MODULE)
+        yield "step", tutorial.tutorial_generator._fill_step_defaults(dict(STEP))
+        yield "tutorial", tutorial.tutorial_generator._post_process(
+            {"overview": "Demo overview", "modules": [MODULE], "steps": [STEP]},
+            {"name": "demo"},
+            {},
+        )
+
+    test_cache = CacheManager(backends=[MemoryLRUBackend(1_000_000)])
+    test_cache.enabled = True
+
+    monkeypatch.setattr(service, "get_head_sha_async", get_head_sha_async)
+    monkeypatch.setattr(service, "get_repository_info_async", get_repository_info_async)
+    monkeypatch.setattr(service, "get_repository_tree_async", get_repository_tree_async)
+    monkeypatch.setattr(tutorial, "CodeAnalyzer", FakeAnalyzer)
+    monkeypatch.setattr(tutorial.tutorial_generator, "stream_async", stream_async)
+    monkeypatch.setattr(tutorial, "cache", test_cache)
+    return generations
+
+
+def test_stream_sends_parts_before_complete(
+    client: TestClient, stub_services: List[str]
+) -> None:
+    """Repo, tree and analysis precede the AI parts; complete comes last."""
+    response = client.get("/api/tutorial/stream", params={"repoUrl": REPO_URL})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = parse_events(response.text)
+    assert [name for name, _ in events] == [
+        "repo",
+        "tree",
+        "analysis",
+        "overview",
+        "module",
+        "step",
+        "complete",
+    ]
+    assert events[0][1]["name"] == "demo"
+    assert events[4][1]["id"] == "module-1"
+    assert events[5][1]["filePath"] == "README.md"
+
+    complete = events[-1][1]
+    assert complete["modules"][0]["stepIds"] == ["step-1"]
+    assert complete["structure"]["rootDirectories"][0]["path"] == "README.md"
+
+
+def test_stream_sends_parts_as_they_finish(
+    client: TestClient, stub_services: List[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A slow repository info request does not hold back the tree or analysis."""
+
+    async def slow_repository_info(
+        repo_url: str, use_cache: bool = True
+    ) -> Dict[str, Any]:
+        await asyncio.sleep(0.05)
+        return {"owner": "owner", "name": "demo", "stars": 1, "language": "Python"}
+
+    monkeypatch.setattr(
+        tutorial.repository_service, "get_repository_info_async", slow_repository_info
+    )
+    response = client.get("/api/tutorial/stream", params={"repoUrl": REPO_URL})
+
+    events = parse_events(response.text)
+    assert [name for name, _ in events[:3]] == ["tree", "analysis", "repo"]
+    assert events[-1][1]["repo"]["name"] == "demo"
+
+
+def test_stream_serves_cached_tutorial(
+    client: TestClient, stub_services: List[str]
+) -> None:
+    """A generated tutorial is replayed from cache as one complete event."""
+    params = {"repoUrl": REPO_URL}
+    first = parse_events(client.get("/api/tutorial/stream", params=params).text)
+    second = parse_events(client.get("/api/tutorial/stream", params=params).text)
+
+    assert stub_services == ["zh-CN"]
+    assert second == [first[-1]]
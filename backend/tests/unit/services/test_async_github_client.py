@@ -0,0 +1,87 @@
+"""Unit tests for the async GitHub client."""
+import asyncio
+import base64
+from typing import Any
+
+import httpx
+import pytest
+
+from app.core.exceptions import AppException
+from app.services.async_github_client import AsyncGitHubClient
+
+REPO_URL = "https://github.com/owner/demo"
+
+
+def _handler(request: httpx.Request) -> httpx.Response:
+    path = request.url.path
+    if path == "/repos/owner/demo/commits/HEAD":
+        return httpx.Response(200, text="abc123")
+    if path == "/repos/owner/demo/git/trees/abc123":
+        return httpx.Response(
+            200,
+            json={
+                "truncated": False,
+                "tree": [
+                    {"path": "README.md", "type": "blob", "mode": "100644", "size": 3},
+                    {"path": "src", "type": "tree", "mode": "040000"},
+                    {"path": "src/a.py", "type": "blob", "mode": "100644", "size": 1},
+                ],
+            },
+        )
+    if path == "/repos/owner/demo/contents/README.md":
+        encoded = base64.b64encode("# Demo".encode()).decode()
+        return httpx.Response(200, json={"type": "file", "content": encoded})
+    if path == "/repos/owner/demo/contents/data.json":
+        return httpx.Response(
+            200,
+            json={
+                "type": "file",
+                "sha": "blob1",
+                "size": 2_000_000,
+                "encoding": "none",
+                "content": "",
+            },
+        )
+    if path == "/repos/owner/demo/git/blobs/blob1":
+        assert request.headers["accept"] == "application/vnd.github.raw"
+        return httpx.Response(200, content=b'{"large": true}')
+    return httpx.Response(404, json={"message": "Not Found"})
+
+
+def _run(coro_factory: Any) -> Any:
+    async def runner() -> Any:
+        client = AsyncGitHubClient(token="test-token")
+        client._http = httpx.AsyncClient(
+            base_url="https://api.github.com", transport=httpx.MockTransport(_handler)
+        )
+        client._http_loop = asyncio.get_running_loop()
+        try:
+            return await coro_factory(client)
+        finally:
+            await client.aclose()
+
+    return asyncio.run(runner())
+
+
+def test_get_directory_tree() -> None:
+    """The tree is built from one recursive Git Trees response."""
+    tree = _run(lambda c: c.get_directory_tree(REPO_URL, max_depth=1))
+
+    assert [node["path"] for node in tree] == ["README.md", "src"]
+    assert tree[1]["children"] == []
+
+
+def test_get_file_content_and_not_found() -> None:
+    """File contents are decoded and 404s map to FILE_NOT_FOUND."""
+    assert _run(lambda c: c.get_file_content(REPO_URL, "README.md")) == "# Demo"
+
+    with pytest.raises(AppException) as exc_info:
+        _run(lambda c: c.get_file_content(REPO_URL, "missing.md"))
+    assert exc_info.value.error_code == "FILE_NOT_FOUND"
+
+
+def test_get_file_content_reads_large_files_as_blobs() -> None:
+    """Files the contents API returns without content are fetched as blobs."""
+    content = _run(lambda c: c.get_file_content(REPO_URL, "data.json"))
+
+    assert content == '{"large": true}'
@@ -0,0 +1,109 @@
+"""Unit tests for the background cache janitor."""
+import time
+from typing import Any
+
+from app.services.cache_backends import MemoryLRUBackend, SQLiteBackend
+from app.services.cache_janitor import CacheJanitor
+from app.services.cache_manager import CacheManager
+
+
+def make_cache(tmp_path: Any) -> CacheManager:
+    cache = CacheManager(
+        backends=[
+            MemoryLRUBackend(1_000_000),
+            SQLiteBackend(str(tmp_path / "cache.db")),
+        ]
+    )
+    cache.enabled = True
+    cache.stale_ttl = 0
+    return cache
+
+
+def test_sweep_purges_expired_in_batches(tmp_path: Any) -> None:
+    """Expired entries are removed from every tier and the reclaim is reported."""
+    cache = make_cache(tmp_path)
+    for i in range(25):
+        cache.set(f"file_content:{i}", "x" * 100, ttl=-1 if i < 20 else 3600)
+
+    janitor = CacheJanitor(cache, max_bytes=0, max_entries=0, batch_size=7)
+    report = janitor.run_once()
+
+    assert report["expired"] == 40  # 20 entries in each of the two tiers
+    assert report["bytes_reclaimed"] > 20 * 100
+    assert cache.get_stats()["total_files"] == 5
+    assert janitor.get_stats()["sweeps"] == 1
+
+
+def test_sweep_evicts_least_recently_used(tmp_path: Any) -> None:
+    """Entries beyond max_entries are evicted oldest-access first."""
+    cache = make_cache(tmp_path)
+    for i in range(10):
+        cache.set(f"repo_info:{i}", i)
+        time.sleep(0.002)
+    cache.backends[0].clear()
+    cache.get("repo_info:0")
+
+    report = CacheJanitor(cache, max_bytes=0, max_entries=4, policy="lru").run_once()
+
+    assert report["evicted"] == 6
+    assert cache.get_stats()["total_files"] == 4
+    cache.backends[0].clear()
+    assert cache.get("repo_info:0") == 0
+    assert cache.get("repo_info:1") is None
+
+
+def test_sweep_evicts_least_frequently_used(tmp_path: Any) -> None:
+    """With the LFU policy, the entries read most often survive."""
+    cache = make_cache(tmp_path)
+    for i in range(6):
+        cache.set(f"repo_tree:{i}", [i])
+    for _ in range(3):
+        cache.backends[0].clear()
+        cache.get("repo_tree:0")
+        cache.get("repo_tree:5")
+
+    CacheJanitor(cache, max_bytes=0, max_entries=2, policy="lfu").run_once()
+
+    cache.backends[0].clear()
+    assert cache.get("repo_tree:0") == [0]
+    assert cache.get("repo_tree:5") == [5]
+    assert cache.get_stats()["total_files"] == 2
+
+
+def test_sweep_keeps_stale_window_only_for_swr_keys(tmp_path: Any) -> None:
+    """Expired repo_info entries survive the stale window; other keys do not."""
+    cache = make_cache(tmp_path)
+    cache.stale_ttl = 3600
+    cache.set("repo_info:demo", {"stars": 1}, ttl=-1)
+    cache.set("file_content:demo", "x", ttl=-1)
+
+    report = CacheJanitor(cache, max_bytes=0, max_entries=0).run_once()
+
+    assert report["expired"] == 2  # file_content in both tiers
+    assert cache.get_with_stale("repo_info:demo", 3600) == ({"stars": 1}, True)
+
+
+def test_memory_hits_count_for_sqlite_eviction(tmp_path: Any) -> None:
+    """Reads served by memory reach SQLite's LFU counts in batched writes."""
+    cache = make_cache(tmp_path)
+    sqlite = cache.backends[1]
+    for i in range(6):
+        cache.set(f"repo_tree:{i}", [i])
+    for _ in range(3):
+        cache.get("repo_tree:0")
+        cache.get("repo_tree:5")
+
+    def hit_count(key: str) -> int:
+        return (
+            sqlite._get_conn()
+            .execute("SELECT hit_count FROM cache_entries WHERE key = ?", (key,))
+            .fetchone()[0]
+        )
+
+    assert hit_count("repo_tree:0") == 0  # buffered, not written per read
+    CacheJanitor(cache, max_bytes=0, max_entries=2, policy="lfu").run_once()
+
+    assert hit_count("repo_tree:0") == 3
+    cache.backends[0].clear()
+    assert cache.get("repo_tree:0") == [0]
+    assert cache.get("repo_tree:5") == [5]
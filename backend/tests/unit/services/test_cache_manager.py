@@ -0,0 +1,232 @@
+"""Unit tests for the tiered CacheManager."""
+import sqlite3
+import threading
+import time
+from typing import Any, List
+
+from app.services.cache_backends import FileBackend, MemoryLRUBackend, SQLiteBackend
+from app.services.cache_manager import CacheManager
+
+
+def make_cache(tmp_path: Any, max_bytes: int = 10_000) -> CacheManager:
+    cache = CacheManager(
+        backends=[MemoryLRUBackend(max_bytes), FileBackend(str(tmp_path))]
+    )
+    cache.enabled = True
+    return cache
+
+
+def test_memory_tier_evicts_least_recently_used() -> None:
+    """The memory tier stays under its byte budget by evicting LRU entries."""
+    backend = MemoryLRUBackend(max_bytes=250)
+    for key in ["a", "b", "c"]:
+        backend.set(key, {"key": key, "value": "x" * 50})
+    backend.get("a")
+    backend.set("d", {"key": "d", "value": "x" * 50})
+
+    assert backend.total_bytes <= 250
+    assert backend.get("a") is not None
+    assert backend.get("b") is None
+    assert backend.evictions >= 1
+
+
+def test_file_tier_hits_are_promoted(tmp_path: Any) -> None:
+    """A value found only on disk is copied into memory on first read."""
+    cache = make_cache(tmp_path)
+    cache.set("repo_info:demo", {"stars": 1})
+    memory, files = cache.backends
+    memory.clear()
+
+    assert cache.get("repo_info:demo") == {"stars": 1}
+    assert files.hits == 1
+    assert cache.get("repo_info:demo") == {"stars": 1}
+    assert memory.hits == 1
+
+    stats = cache.get_stats()
+    assert stats["hits"] == 2
+    assert stats["total_files"] == 1
+
+
+def test_expired_entries_are_dropped(tmp_path: Any) -> None:
+    """Entries past their TTL are treated as misses in every tier."""
+    cache = make_cache(tmp_path)
+    cache.set("repo_head:demo", "abc", ttl=-1)
+
+    assert cache.get("repo_head:demo") is None
+    assert cache.get_stats()["misses"] == 1
+    assert cache.get_stats()["total_files"] == 0
+
+
+def test_plain_get_keeps_entries_inside_the_stale_window(tmp_path: Any) -> None:
+    """A plain get misses on an expired repo_info entry without deleting it."""
+    cache = make_cache(tmp_path)
+    cache.stale_ttl = 3600
+    cache.set("repo_info:demo", {"stars": 1}, ttl=-1)
+
+    assert cache.get("repo_info:demo") is None
+    assert cache.get_with_stale("repo_info:demo", 3600) == ({"stars": 1}, True)
+
+
+def test_purge_keeps_only_swr_keys_inside_the_stale_window(tmp_path: Any) -> None:
+    """Expired entries are purged unless they are stale-while-revalidate keys."""
+    cache = CacheManager(
+        backends=[
+            MemoryLRUBackend(10_000),
+            SQLiteBackend(str(tmp_path / "cache.db")),
+        ]
+    )
+    cache.enabled = True
+    cache.stale_ttl = 3600
+    cache.set("repo_info:demo", {"stars": 1}, ttl=-1)
+    cache.set("file_content:demo:a.py", "print(1)", ttl=-1)
+
+    assert cache.purge_expired() == 1
+    assert cache.get_with_stale("repo_info:demo", 3600) == ({"stars": 1}, True)
+    assert cache.get_with_stale("file_content:demo:a.py", 3600) == (None, False)
+
+
+def test_sqlite_backend_upserts_and_tracks_stats(tmp_path: Any) -> None:
+    """Upserts replace rows, large entries round-trip compressed, stats stay exact."""
+    backend = SQLiteBackend(str(tmp_path / "cache.db"), compress_min_bytes=100)
+    backend.set("small", {"key": "small", "value": 1, "expires_at": None})
+    backend.set("large", {"key": "large", "value": "x" * 1000, "expires_at": None})
+    backend.set("large", {"key": "large", "value": "y" * 1000, "expires_at": None})
+
+    assert backend.get("large")["value"] == "y" * 1000
+    stats = backend.get_stats()
+    assert stats["entries"] == 2
+    conn = sqlite3.connect(tmp_path / "cache.db")
+    stored = conn.execute("SELECT SUM(length(data)) FROM cache_entries").fetchone()
+    assert stats["total_size"] == stored[0] < 1000
+
+    assert backend.delete("small")
+    assert backend.get_stats()["entries"] == 1
+    assert backend.clear() == 1
+    assert backend.get_stats() == {**stats, "entries": 0, "total_size": 0}
+
+
+def test_sqlite_backend_upgrades_old_schema(tmp_path: Any) -> None:
+    """Triggers are replaced and sizes recounted when the schema version is old."""
+    db_path = tmp_path / "cache.db"
+    backend = SQLiteBackend(str(db_path), compress_min_bytes=100)
+    backend.set("large", {"key": "large", "value": "x" * 1000, "expires_at": None})
+
+    # Version 1 recorded uncompressed sizes with a differently defined trigger
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        DROP TRIGGER cache_entries_insert;
+        CREATE TRIGGER cache_entries_insert AFTER INSERT ON cache_entries BEGIN
+            UPDATE cache_stats SET entries = entries + 1 WHERE id = 1;
+        END;
+        DROP TRIGGER cache_entries_update;
+        UPDATE cache_entries SET size = 1020;
+        UPDATE cache_stats SET total_size = 1020;
+        PRAGMA user_version = 1;
+        """)
+    conn.close()
+
+    upgraded = SQLiteBackend(str(db_path), compress_min_bytes=100)
+    upgraded.set("small", {"key": "small", "expires_at": None})
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == 2
+    stored = conn.execute("SELECT SUM(length(data)) FROM cache_entries").fetchone()
+    assert upgraded.get_stats()["entries"] == 2
+    assert upgraded.get_stats()["total_size"] == stored[0] < 1020
+
+
+def test_sqlite_backend_upgrades_once_under_concurrency(tmp_path: Any) -> None:
+    """A worker upgrading after another one took the write lock adds no columns."""
+    db_path = tmp_path / "cache.db"
+    other = sqlite3.connect(db_path, isolation_level=None)
+    other.execute("PRAGMA journal_mode=WAL")
+    other.execute(
+        "CREATE TABLE cache_entries (key TEXT PRIMARY KEY, data BLOB NOT NULL, "
+        "compressed INTEGER NOT NULL DEFAULT 0, size INTEGER NOT NULL, "
+        "expires_at REAL)"
+    )
+    # Another worker is midway through its own upgrade of the same database
+    other.execute("BEGIN IMMEDIATE")
+    errors: List[Exception] = []
+
+    def open_backend() -> None:
+        try:
+            SQLiteBackend(str(db_path))
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=open_backend)
+    thread.start()
+    time.sleep(0.2)
+    for statement in SQLiteBackend.MIGRATIONS.values():
+        other.execute(statement)
+    other.execute("COMMIT")
+    thread.join()
+
+    assert errors == []
+    backend = SQLiteBackend(str(db_path))
+    assert backend.set("key", {"value": 1, "expires_at": None})
+    assert backend.get("key") == {"value": 1, "expires_at": None}
+    assert backend.get_stats()["entries"] == 1
+
+
+def test_sqlite_backend_purges_expired_and_is_thread_safe(tmp_path: Any) -> None:
+    """Expired rows are purged in bulk; writers on several threads don't collide."""
+    backend = SQLiteBackend(str(tmp_path / "cache.db"))
+
+    def write(prefix: str) -> None:
+        for i in range(20):
+            expires_at = time.time() - 1 if i % 2 else time.time() + 60
+            backend.set(f"{prefix}:{i}", {"value": i, "expires_at": expires_at})
+
+    threads = [threading.Thread(target=write, args=(str(n),)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert backend.get_stats()["entries"] == 80
+    assert backend.purge_expired()[0] == 40
+    assert backend.get_stats()["entries"] == 40
+
+
+def test_invalidate_by_tag_and_prefix(tmp_path: Any) -> None:
+    """Tag and prefix invalidation remove matching entries from every tier."""
+    cache = CacheManager(
+        backends=[
+            MemoryLRUBackend(10_000),
+            SQLiteBackend(str(tmp_path / "cache.db")),
+        ]
+    )
+    cache.enabled = True
+    cache.set("repo_info:a", {"n": 1}, tags=["repo:owner/a"])
+    cache.set("repo_tree:a::2", [], tags=["repo:owner/a"])
+    cache.set("repo_info:b", {"n": 2}, tags=["repo:owner/b"])
+    cache.set("repo_tree:b::2", [], tags=["repo:owner/b"])
+
+    assert cache.invalidate_tag("repo:owner/a") == 2
+    assert cache.get("repo_info:a") is None
+    assert cache.get("repo_tree:a::2") is None
+    assert cache.get("repo_info:b") == {"n": 2}
+
+    assert cache.invalidate_prefix("repo_tree:") == 1
+    assert cache.get("repo_tree:b::2") is None
+    assert cache.invalidate_tag("kind:repo_info") == 1
+    assert cache.get_stats()["total_files"] == 0
+
+
+def test_ttl_policies_by_key_prefix(tmp_path: Any) -> None:
+    """TTLs come from the longest matching prefix; commit-pinned keys never expire."""
+    cache = make_cache(tmp_path)
+    cache.ttl_policies = {"repo_": 10, "repo_info:": 60, "analysis:": None}
+    sha = "0123456789abcdef0123456789abcdef01234567"
+
+    assert cache.get_ttl("repo_info:https://github.com/o/r") == 60
+    assert cache.get_ttl("repo_tree:https://github.com/o/r::2") == 10
+    assert cache.get_ttl("analysis:https://github.com/o/r:abc:v1") is None
+    assert cache.get_ttl(f"file_content:https://github.com/o/r@{sha}:a.py") is None
+    assert cache.get_ttl("other:key") == cache.ttl
+
+    cache.set(f"repo_tree:https://github.com/o/r@{sha}::2", [])
+    assert cache.backends[1].purge_expired()[0] == 0
+    assert cache.get(f"repo_tree:https://github.com/o/r@{sha}::2") == []
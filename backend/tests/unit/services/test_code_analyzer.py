@@ -0,0 +1,127 @@
+"""Unit tests for CodeAnalyzer prefetching and commit-keyed caching."""
+import threading
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from app.services import code_analyzer
+from app.services.cache_manager import CacheManager
+from app.services.code_analyzer import CodeAnalyzer
+
+REPO_URL = "https://github.com/owner/demo"
+
+
+@pytest.fixture
+def fake_repo(monkeypatch: pytest.MonkeyPatch, tmp_path: Any) -> Dict[str, Any]:
+    """Patch the repository service with an in-memory repo and an isolated cache."""
+    state: Dict[str, Any] = {"head": "a" * 40, "tree_calls": []}
+    service = code_analyzer.repository_service
+
+    def get_head_sha(repo_url: str, use_cache: bool = True) -> str:
+        return state["head"]
+
+    def get_repository_tree(
+        repo_url: str,
+        path: str = "",
+        max_depth: int = 3,
+        use_cache: bool = True,
+        ref: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        state["tree_calls"].append(ref)
+        return [
+            {"name": "requirements.txt", "path": "requirements.txt", "type": "file"}
+        ]
+
+    def get_file_paths(
+        repo_url: str, use_cache: bool = True, ref: Optional[str] = None
+    ) -> Dict[str, Any]:
+        return {
+            "paths": ["README.md", "requirements.txt", "app/main.py"],
+            "truncated": False,
+        }
+
+    def get_file_content(
+        repo_url: str, file_path: str, use_cache: bool = True, ref: Optional[str] = None
+    ) -> str:
+        if file_path == "requirements.txt":
+            return "fastapi==0.104.1\n"
+        raise FileNotFoundError(file_path)
+
+    def get_multiple_files(
+        repo_url: str,
+        file_paths: List[str],
+        use_cache: bool = True,
+        ref: Optional[str] = None,
+    ) -> Dict[str, str]:
+        return {"requirements.txt": "fastapi==0.104.1\n"}
+
+    monkeypatch.setattr(service, "get_head_sha", get_head_sha)
+    monkeypatch.setattr(service, "get_repository_tree", get_repository_tree)
+    monkeypatch.setattr(service, "get_file_paths", get_file_paths)
+    monkeypatch.setattr(service, "get_file_content", get_file_content)
+    monkeypatch.setattr(service, "get_multiple_files", get_multiple_files)
+    test_cache = CacheManager(cache_dir=str(tmp_path))
+    test_cache.enabled = True
+    monkeypatch.setattr(code_analyzer, "cache", test_cache)
+    return state
+
+
+def test_analysis_is_cached_per_commit(fake_repo: Dict[str, Any]) -> None:
+    """Repeated analysis of one commit is served from cache; a new HEAD reruns it."""
+    first = CodeAnalyzer(REPO_URL).analyze()
+    calls_after_first = len(fake_repo["tree_calls"])
+    assert calls_after_first > 0
+    assert set(fake_repo["tree_calls"]) == {"a" * 40}
+
+    assert CodeAnalyzer(REPO_URL).analyze() == first
+    assert len(fake_repo["tree_calls"]) == calls_after_first
+
+    fake_repo["head"] = "b" * 40
+    CodeAnalyzer(REPO_URL).analyze()
+    assert len(fake_repo["tree_calls"]) > calls_after_first
+    assert fake_repo["tree_calls"][-1] == "b" * 40
+
+
+def test_tree_and_manifests_fetched_concurrently(
+    fake_repo: Dict[str, Any], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """The manifest batch does not wait for the tree; analyzers do no extra I/O."""
+    service = code_analyzer.repository_service
+    barrier = threading.Barrier(2, timeout=5)
+    get_tree = service.get_repository_tree
+    get_files = service.get_multiple_files
+    requested: List[List[str]] = []
+
+    def get_repository_tree(*args: Any, **kwargs: Any) -> List[Dict[str, Any]]:
+        barrier.wait()
+        return get_tree(*args, **kwargs)
+
+    def get_multiple_files(
+        repo_url: str, file_paths: List[str], *args: Any
+    ) -> Dict[str, str]:
+        barrier.wait()
+        requested.append(file_paths)
+        return get_files(repo_url, file_paths, *args)
+
+    def get_file_content(*args: Any, **kwargs: Any) -> str:
+        raise AssertionError("analyzers should only read prefetched files")
+
+    monkeypatch.setattr(service, "get_repository_tree", get_repository_tree)
+    monkeypatch.setattr(service, "get_multiple_files", get_multiple_files)
+    monkeypatch.setattr(service, "get_file_content", get_file_content)
+
+    result = CodeAnalyzer(REPO_URL).analyze()
+
+    assert requested == [code_analyzer.MANIFEST_FILES]
+    assert len(fake_repo["tree_calls"]) == 1
+    assert result["project_type"]["primary_type"] == "FastAPI"
+    assert result["dependencies"]["dependencies"] == ["fastapi"]
+
+
+def test_key_files_limited_to_existing_paths(fake_repo: Dict[str, Any]) -> None:
+    """Key file candidates missing from the full path listing are dropped."""
+    result = CodeAnalyzer(REPO_URL).analyze()
+
+    assert [f["path"] for f in result["key_files"]] == ["README.md"]
+    assert result["structure"]["total_files"] == 3
+    assert result["structure"]["file_extensions"] == {".md": 1, ".py": 1, ".txt": 1}
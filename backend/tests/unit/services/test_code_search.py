@@ -0,0 +1,155 @@
+"""Unit tests for the per-commit code search index."""
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from app.services import code_search, qa_service
+from app.services.cache_manager import CacheManager
+from app.services.code_indexer import CodeIndexer
+from app.services.code_search import CodeSearchIndex, select_files, tokenize
+from app.services.file_store import file_store
+from app.services.path_index import PathIndex
+from app.services.qa_service import QAService
+
+REPO_URL = "https://github.com/owner/demo"
+SHA = "e" * 40
+
+FILES = {
+    "app/auth.py": "def login(user):\n    return create_session(user)\n",
+    "app/session.py": (
+        "class SessionStore:\n"
+        + "    pass\n" * 45
+        + "def create_session(user):\n    return SessionStore().add(user)\n"
+    ),
+    "app/utils.py": "def slugify(text):\n    return text.lower()\n",
+    "README.md": "# Demo\n",
+}
+
+
+@pytest.fixture
+def fake_repo(monkeypatch: pytest.MonkeyPatch, tmp_path: Any) -> Dict[str, Any]:
+    """Serve FILES from an in-memory repo with an isolated cache."""
+    state: Dict[str, Any] = {"fetched": []}
+    service = code_search.repository_service
+
+    def get_file_paths(
+        repo_url: str, use_cache: bool = True, ref: Optional[str] = None
+    ) -> Dict[str, Any]:
+        return {"paths": list(FILES), "truncated": False}
+
+    def get_multiple_files(
+        repo_url: str,
+        file_paths: List[str],
+        use_cache: bool = True,
+        ref: Optional[str] = None,
+    ) -> Dict[str, str]:
+        state["fetched"].append(file_paths)
+        return {path: FILES[path] for path in file_paths if path in FILES}
+
+    monkeypatch.setattr(service, "get_file_paths", get_file_paths)
+    monkeypatch.setattr(service, "get_multiple_files", get_multiple_files)
+    monkeypatch.setattr(PathIndex, "_shared", PathIndex._shared.__class__())
+    monkeypatch.setattr(CodeSearchIndex, "_shared", CodeSearchIndex._shared.__class__())
+    monkeypatch.setattr(file_store, "_files", file_store._files.__class__())
+    monkeypatch.setattr(file_store, "_bytes", 0)
+    test_cache = CacheManager(cache_dir=str(tmp_path))
+    test_cache.enabled = True
+    monkeypatch.setattr(code_search, "cache", test_cache)
+    return state
+
+
+def test_tokenize_splits_identifiers() -> None:
+    """Compound identifiers match both whole and by their parts."""
+    assert list(tokenize("getUserProfile(user_id)")) == [
+        "getuserprofile",
+        "get",
+        "user",
+        "profile",
+        "user_id",
+        "user",
+        "id",
+    ]
+
+
+def test_select_files_skips_vendored_and_ranks_tests_last() -> None:
+    """Only source files are indexed, shallow non-test files first."""
+    paths = PathIndex(
+        [
+            "tests/test_app.py",
+            "src/deep/module.py",
+            "main.py",
+            "node_modules/lib/index.js",
+            "static/app.min.js",
+            "logo.png",
+        ]
+    )
+    assert select_files(paths, 10) == [
+        "main.py",
+        "src/deep/module.py",
+        "tests/test_app.py",
+    ]
+    assert select_files(paths, 1) == ["main.py"]
+
+
+def test_search_ranks_matching_chunk_first() -> None:
+    """Results point at the chunk containing the terms, with real line ranges."""
+    index = CodeSearchIndex.build(REPO_URL, FILES, SHA)
+
+    hits = {hit["path"]: hit for hit in index.search(["create_session"])}
+
+    assert set(hits) == {"app/auth.py", "app/session.py"}
+    assert (
+        hits["app/session.py"]["start_line"],
+        hits["app/session.py"]["end_line"],
+    ) == (41, 49)
+    assert index.search(["nonexistent"]) == []
+
+
+def test_index_built_once_per_commit(fake_repo: Dict[str, Any]) -> None:
+    """A commit's index is built once, then served from memory or the cache."""
+    assert CodeSearchIndex.peek(REPO_URL, SHA) is None
+    CodeIndexer().build(REPO_URL, SHA)
+    index = CodeSearchIndex.peek(REPO_URL, SHA)
+    assert CodeSearchIndex.peek(REPO_URL, SHA) is index
+    assert fake_repo["fetched"] == [sorted(FILES)]
+
+    # A fresh process reads the persisted index instead of refetching files
+    CodeSearchIndex._shared.clear()
+    reloaded = CodeSearchIndex.peek(REPO_URL, SHA)
+    assert reloaded is not index
+    assert reloaded.search(["slugify"]) == index.search(["slugify"])
+    assert len(fake_repo["fetched"]) == 1
+
+
+def test_qa_retrieves_chunks_and_references_them(
+    fake_repo: Dict[str, Any], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Question keywords and entities retrieve chunks cited with their lines."""
+    indexer = CodeIndexer()
+    monkeypatch.setattr(qa_service, "code_indexer", indexer)
+    service = QAService()
+    question_analysis = {"keywords": ["where", "created"], "entities": {"SessionStore"}}
+
+    # The first question only schedules the build and does not wait for it
+    assert service._search_code(REPO_URL, question_analysis, SHA) == []
+    indexer._executor.shutdown(wait=True)
+
+    chunks = service._search_code(REPO_URL, question_analysis, SHA)
+    references = service._create_references({"README.md": "# Demo"}, chunks)
+
+    assert chunks[0]["path"] == "app/session.py"
+    assert "SessionStore" in chunks[0]["content"]
+    assert references[0].file_path == "app/session.py"
+    assert references[0].start_line == chunks[0]["start_line"]
+
+
+def test_references_show_the_first_lines_of_each_source() -> None:
+    """References cite at most ten lines; a trailing newline adds no line."""
+    long_file = "".join(f"line {i}\n" for i in range(1, 51))
+    chunk = {"path": "app/big.py", "start_line": 41, "content": long_file}
+
+    references = QAService()._create_references({"README.md": "a\nb\n"}, [chunk])
+
+    assert (references[0].start_line, references[0].end_line) == (41, 50)
+    assert references[0].snippet.split("\n") == [f"line {i}" for i in range(1, 11)]
+    assert (references[1].end_line, references[1].snippet) == (2, "a\nb")
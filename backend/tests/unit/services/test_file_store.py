@@ -0,0 +1,162 @@
+"""Unit tests for line-indexed files and the file store."""
+import mmap
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pytest
+
+from app.services import file_store as file_store_module
+from app.services.ai_generator import TutorialGenerator
+from app.services.file_store import FileStore, LineIndexedFile
+
+REPO_URL = "https://github.com/owner/demo"
+SHA = "f" * 40
+
+SOURCE = """import os
+
+
+def load(path):
+    # 读取配置
+    with open(path) as f:
+        return f.read()
+
+
+def save(path, data):
+    with open(path, "w") as f:
+        f.write(data)
+"""
+
+
+def test_lines_are_sliced_by_offset() -> None:
+    """Line ranges are 1-based, inclusive and clamped to the file."""
+    indexed = LineIndexedFile.from_text(SOURCE)
+
+    assert indexed.line_count == 12
+    assert indexed.lines(4, 4) == "def load(path):"
+    assert indexed.lines(5, 6) == "    # 读取配置\n    with open(path) as f:"
+    assert (
+        indexed.lines(11, 99) == '    with open(path, "w") as f:\n        f.write(data)'
+    )
+    assert indexed.lines(0, 1) == "import os"
+    assert indexed.lines(13, 20) == ""
+
+
+def test_line_count_edge_cases() -> None:
+    """A trailing newline does not start a line; empty content has one."""
+    assert LineIndexedFile.from_text("").line_count == 1
+    assert LineIndexedFile.from_text("a").line_count == 1
+    assert LineIndexedFile.from_text("a\n").line_count == 1
+    assert LineIndexedFile.from_text("a\nb").lines(2, 2) == "b"
+    assert LineIndexedFile.from_text("a\n\n").lines(1, 2) == "a\n"
+
+
+def test_find_reports_lines_of_occurrences() -> None:
+    """Occurrences map back to line numbers, also after multi-byte text."""
+    indexed = LineIndexedFile.from_text(SOURCE)
+
+    assert indexed.find("with open(path") == [6, 11]
+    assert indexed.find("def save") == [10]
+    assert indexed.find("missing") == []
+    assert indexed.find("") == []
+
+
+def test_mmap_buffer(tmp_path: Path) -> None:
+    """A memory-mapped file is indexed without reading it into a str."""
+    path = tmp_path / "source.py"
+    path.write_bytes(SOURCE.encode("utf-8"))
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    indexed = LineIndexedFile(mapped)
+    assert indexed.line_count == 12
+    assert indexed.lines(5, 5) == "    # 读取配置"
+    assert indexed.find("def save") == [10]
+
+
+@pytest.fixture
+def fetches(monkeypatch: pytest.MonkeyPatch) -> List[List[str]]:
+    """Serve SOURCE as src/io.py through a stubbed repository service.
+
+    Returns:
+        The path lists of every get_multiple_files call
+    """
+    calls: List[List[str]] = []
+    service = file_store_module.repository_service
+
+    def get_multiple_files(
+        repo_url: str, file_paths: List[str], ref: Optional[str] = None
+    ) -> Dict[str, str]:
+        calls.append(list(file_paths))
+        return {path: SOURCE for path in file_paths if path == "src/io.py"}
+
+    monkeypatch.setattr(service, "map_file", lambda *args, **kwargs: None)
+    monkeypatch.setattr(service, "get_multiple_files", get_multiple_files)
+    return calls
+
+
+def test_store_keeps_pinned_files(fetches: List[List[str]]) -> None:
+    """Files of a commit are fetched once; missing files are skipped."""
+    store = FileStore()
+
+    files = store.get_many(REPO_URL, ["src/io.py", "missing.py", "src/io.py"], SHA)
+    assert list(files) == ["src/io.py"]
+    assert store.get(REPO_URL, "src/io.py", SHA) is files["src/io.py"]
+    assert fetches == [["src/io.py", "missing.py"]]
+
+    store.get(REPO_URL, "src/io.py")
+    assert len(fetches) == 2  # unpinned reads are not kept
+
+
+def test_store_evicts_by_size(
+    fetches: List[List[str]], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """The least recently used files are dropped beyond MAX_BYTES."""
+    store = FileStore()
+    monkeypatch.setattr(store, "MAX_BYTES", len(SOURCE.encode("utf-8")) + 1)
+
+    store.get(REPO_URL, "src/io.py", SHA)
+    store.get(REPO_URL, "src/io.py", "a" * 40)
+    store.get(REPO_URL, "src/io.py", SHA)
+    assert len(fetches) == 3
+
+
+def _step(line_start: int, line_end: int, snippet: str) -> Dict[str, object]:
+    return {
+        "id": "step-1",
+        "filePath": "src/io.py",
+        "lineStart": line_start,
+        "lineEnd": line_end,
+        "codeSnippet": snippet,
+    }
+
+
+def test_step_moved_to_snippet_location() -> None:
+    """A snippet found in the file fixes the step's line numbers."""
+    indexed = LineIndexedFile.from_text(SOURCE)
+    step = _step(1, 2, "def save(path, data):\n    with open(path, 'w') as f:")
+
+    assert TutorialGenerator._verify_step_location(step, indexed)
+    assert (step["lineStart"], step["lineEnd"]) == (10, 11)
+    assert step["codeSnippet"] == indexed.lines(10, 11)
+
+
+def test_step_prefers_occurrence_nearest_cited_lines() -> None:
+    """Among several occurrences, the one closest to the cited range wins."""
+    indexed = LineIndexedFile.from_text(SOURCE)
+    step = _step(12, 12, "with open(path")
+
+    TutorialGenerator._verify_step_location(step, indexed)
+    assert (step["lineStart"], step["lineEnd"]) == (11, 11)
+
+
+def test_step_clamped_to_file() -> None:
+    """Without a match, the cited range is clamped and its real lines shown."""
+    indexed = LineIndexedFile.from_text(SOURCE)
+    step = _step(10, 400, "# 查看项目文档")
+
+    assert TutorialGenerator._verify_step_location(step, indexed)
+    assert (step["lineStart"], step["lineEnd"]) == (10, 12)
+    assert step["codeSnippet"].startswith("def save(path, data):")
+
+    unchanged = _step(4, 4, "def load(path):")
+    assert not TutorialGenerator._verify_step_location(unchanged, indexed)
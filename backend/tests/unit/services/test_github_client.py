@@ -0,0 +1,84 @@
+"""Unit tests for GitHub client tree building."""
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+from app.services.github_client import GitHubClient, build_directory_tree
+
+ENTRIES: List[Dict[str, Any]] = [
+    {"path": "README.md", "type": "blob", "mode": "100644", "size": 10},
+    {"path": "src", "type": "tree", "mode": "040000", "size": None},
+    {"path": "src/app", "type": "tree", "mode": "040000", "size": None},
+    {"path": "src/app/main.py", "type": "blob", "mode": "100644", "size": 42},
+    {"path": "src/index.ts", "type": "blob", "mode": "100644", "size": 7},
+]
+
+
+def test_build_directory_tree_limits_depth() -> None:
+    """Directories at the depth limit keep an empty children list."""
+    tree = build_directory_tree(ENTRIES, max_depth=2)
+
+    assert [node["name"] for node in tree] == ["README.md", "src"]
+    assert tree[0] == {
+        "name": "README.md",
+        "path": "README.md",
+        "type": "file",
+        "size": 10,
+    }
+
+    src = tree[1]
+    assert src["type"] == "dir"
+    assert [child["path"] for child in src["children"]] == ["src/app", "src/index.ts"]
+    assert src["children"][0]["children"] == []
+
+
+def test_build_directory_tree_with_start_path() -> None:
+    """A starting path scopes the tree and resets depth counting."""
+    tree = build_directory_tree(ENTRIES, path="src/", max_depth=1)
+    assert [node["path"] for node in tree] == ["src/app", "src/index.ts"]
+
+    single = build_directory_tree(ENTRIES, path="src/index.ts")
+    assert single == [
+        {"name": "index.ts", "path": "src/index.ts", "type": "file", "size": 7}
+    ]
+
+
+class _FakeRepo:
+    """Repository stub serving a truncated recursive tree."""
+
+    full_name = "owner/repo"
+    default_branch = "main"
+
+    def __init__(self) -> None:
+        self.calls: List[str] = []
+
+    def get_git_tree(self, sha: str, recursive: bool = False) -> Any:
+        self.calls.append(sha)
+        if recursive:
+            return SimpleNamespace(tree=[], raw_data={"truncated": True})
+        levels = {
+            "main": [("README.md", "blob", "r"), ("src", "tree", "s")],
+            "s": [("app", "tree", "a"), ("index.ts", "blob", "i")],
+        }
+        return SimpleNamespace(
+            tree=[
+                SimpleNamespace(path=p, type=t, sha=h, mode="100644", size=1)
+                for p, t, h in levels[sha]
+            ]
+        )
+
+
+def test_get_directory_tree_falls_back_when_truncated() -> None:
+    """Truncated recursive responses fall back to a bounded level walk."""
+    client = GitHubClient.__new__(GitHubClient)
+    repo = _FakeRepo()
+    client.get_repository = lambda repo_url: repo  # type: ignore[assignment]
+
+    tree = client.get_directory_tree("https://github.com/owner/repo", max_depth=2)
+
+    assert [node["path"] for node in tree] == ["README.md", "src"]
+    assert [child["path"] for child in tree[1]["children"]] == [
+        "src/app",
+        "src/index.ts",
+    ]
+    # Recursive attempt, root level, then only "src" (src/app is at the limit)
+    assert repo.calls == ["main", "main", "s"]
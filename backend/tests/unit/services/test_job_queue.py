@@ -0,0 +1,228 @@
+"""Unit tests for the persistent job queue."""
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+import httpx
+import pytest
+
+from app.core.exceptions import AppException
+from app.services import job_queue
+from app.services.job_queue import JobQueue
+
+
+def make_queue(tmp_path: Path, handler: Any, **kwargs: Any) -> JobQueue:
+    return JobQueue("test", handler, db_path=str(tmp_path / "jobs.db"), **kwargs)
+
+
+def test_submit_deduplicates_active_jobs(tmp_path: Path) -> None:
+    """A second submit with the same key returns the queued job."""
+    queue = make_queue(tmp_path, lambda params: params)
+
+    first = queue.submit("repo:en", {"n": 1})
+    second = queue.submit("repo:en", {"n": 2})
+    other = queue.submit("repo:zh", {"n": 3})
+
+    assert second["id"] == first["id"]
+    assert other["id"] != first["id"]
+    assert queue.get_stats()["queued"] == 2
+
+    # Once finished, the same key queues a new job
+    assert queue.run_next()
+    assert queue.submit("repo:en", {"n": 4})["id"] != first["id"]
+
+
+def test_submit_rejected_when_queue_full(tmp_path: Path) -> None:
+    """Backpressure: submits beyond max_pending raise JOB_QUEUE_FULL."""
+    queue = make_queue(tmp_path, lambda params: None, max_pending=2)
+    queue.submit("a", {})
+    queue.submit("b", {})
+
+    with pytest.raises(AppException) as exc_info:
+        queue.submit("c", {})
+    assert exc_info.value.error_code == "JOB_QUEUE_FULL"
+    assert exc_info.value.status_code == 503
+
+
+def test_run_next_records_result_and_error(tmp_path: Path) -> None:
+    """Results and failures are persisted and visible to a new instance."""
+
+    def handler(params: Dict[str, Any]) -> Dict[str, Any]:
+        if params["fail"]:
+            raise AppException(error_code="REPO_NOT_FOUND", message="missing")
+        return {"ok": True}
+
+    queue = make_queue(tmp_path, handler)
+    good = queue.submit("good", {"fail": False})
+    bad = queue.submit("bad", {"fail": True})
+
+    assert queue.run_next() and queue.run_next()
+    assert not queue.run_next()
+
+    reopened = make_queue(tmp_path, handler)
+    assert reopened.get(good["id"])["status"] == "succeeded"
+    assert reopened.get(good["id"])["result"] == {"ok": True}
+    assert reopened.get(bad["id"])["status"] == "failed"
+    assert reopened.get(bad["id"])["error"]["errorCode"] == "REPO_NOT_FOUND"
+
+
+def resolve(addresses: Set[str]) -> Any:
+    """A getaddrinfo stub resolving every host to the given addresses."""
+
+    def getaddrinfo(host: str, port: Any) -> List[Any]:
+        return [(None, None, None, "", (address, 0)) for address in addresses]
+
+    return getaddrinfo
+
+
+def capture_requests(monkeypatch: pytest.MonkeyPatch) -> List[httpx.Request]:
+    """Send callback requests to a mock transport and record them."""
+    requests: List[httpx.Request] = []
+    client = httpx.Client
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200)
+
+    def mock_client(**kwargs: Any) -> httpx.Client:
+        return client(transport=httpx.MockTransport(handler), **kwargs)
+
+    monkeypatch.setattr(job_queue.httpx, "Client", mock_client)
+    return requests
+
+
+def test_finished_job_posted_to_callback(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """The formatted job is POSTed to the checked address of its callback host."""
+    requests = capture_requests(monkeypatch)
+    monkeypatch.setattr(job_queue.socket, "getaddrinfo", resolve({"93.184.216.34"}))
+    queue = make_queue(
+        tmp_path, lambda params: 42, formatter=lambda job: {"status": job["status"]}
+    )
+    queue.submit("key", {}, callback_url="https://example.com/hook")
+    queue.run_next()
+
+    [request] = requests
+    assert str(request.url) == "https://93.184.216.34/hook"
+    assert request.headers["host"] == "example.com"
+    assert request.extensions["sni_hostname"] == "example.com"
+    assert json.loads(request.content) == {"status": "succeeded"}
+
+
+def test_callback_not_sent_when_host_rebinds(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A host resolving to an internal address after submit gets no callback."""
+    requests = capture_requests(monkeypatch)
+    monkeypatch.setattr(job_queue.socket, "getaddrinfo", resolve({"93.184.216.34"}))
+    queue = make_queue(tmp_path, lambda params: 42)
+    queue.submit("key", {}, callback_url="https://rebind.example.com/hook")
+
+    monkeypatch.setattr(job_queue.socket, "getaddrinfo", resolve({"127.0.0.1"}))
+    queue.run_next()
+
+    assert requests == []
+
+
+@pytest.mark.parametrize(
+    "url, address, expected",
+    [
+        (
+            "http://example.com:8080/a?b=1",
+            "93.184.216.34",
+            "http://93.184.216.34:8080/a?b=1",
+        ),
+        (
+            "https://user:pw@example.com/a",
+            "2606:2800::1",
+            "https://user:pw@[2606:2800::1]/a",
+        ),
+        ("https://hooks.internal/a", None, "https://hooks.internal/a"),
+    ],
+)
+def test_post_to_address_keeps_host(
+    monkeypatch: pytest.MonkeyPatch, url: str, address: Optional[str], expected: str
+) -> None:
+    """Only the connection target changes; the Host header stays the URL's."""
+    requests = capture_requests(monkeypatch)
+
+    job_queue.post_to_address(url, address, {"ok": True}, timeout=1)
+
+    [request] = requests
+    assert str(request.url) == expected
+    assert request.headers["host"] == httpx.URL(url).netloc.decode()
+
+
+def test_idle_workers_purge_expired_jobs(tmp_path: Path) -> None:
+    """Finished jobs past the retention period are purged while running."""
+    queue = make_queue(tmp_path, lambda params: 42, workers=1, retention=0)
+    queue.PURGE_INTERVAL = 0
+    job = queue.submit("key", {})
+    queue.start()
+    try:
+        deadline = time.monotonic() + 5
+        while queue.get(job["id"]) is not None and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        queue.stop()
+
+    assert queue.get(job["id"]) is None
+
+
+def test_deduplicated_submit_adds_its_callback(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Every submitter's callback is notified when the shared job finishes."""
+    requests = capture_requests(monkeypatch)
+    monkeypatch.setattr(job_queue.socket, "getaddrinfo", resolve({"93.184.216.34"}))
+    queue = make_queue(tmp_path, lambda params: 42)
+    first = queue.submit("key", {}, callback_url="https://a.example.com/hook")
+    queue.submit("key", {}, callback_url="https://b.example.com/hook")
+    queue.submit("key", {}, callback_url="https://a.example.com/hook")
+    queue.submit("key", {})
+    queue.run_next()
+
+    hosts = [request.headers["host"] for request in requests]
+    assert hosts == ["a.example.com", "b.example.com"]
+    queue.retention = -1
+    queue.purge_finished()
+    assert queue.get(first["id"]) is None
+    assert not queue._get_conn().execute("SELECT * FROM job_callbacks").fetchall()
+
+
+@pytest.mark.parametrize(
+    "url, addresses",
+    [
+        ("ftp://example.com/hook", {"93.184.216.34"}),
+        ("http://127.0.0.1:8000/hook", {"127.0.0.1"}),
+        ("http://metadata.internal/hook", {"169.254.169.254"}),
+        ("https://mixed.example.com/hook", {"93.184.216.34", "10.0.0.5"}),
+        ("https://unknown.example.com/hook", set()),
+    ],
+)
+def test_callback_urls_to_internal_hosts_rejected(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    url: str,
+    addresses: Set[str],
+) -> None:
+    """Without an allowlist, callbacks may only reach public addresses."""
+    monkeypatch.setattr(job_queue.socket, "getaddrinfo", resolve(addresses))
+    queue = make_queue(tmp_path, lambda params: None, callback_hosts=[])
+
+    with pytest.raises(AppException) as exc_info:
+        queue.submit("key", {}, callback_url=url)
+    assert exc_info.value.error_code == "INVALID_CALLBACK_URL"
+    assert exc_info.value.status_code == 400
+    assert queue.get_stats()["queued"] == 0
+
+
+def test_callback_allowlist(tmp_path: Path) -> None:
+    """With an allowlist, only its hosts are accepted, internal ones included."""
+    queue = make_queue(tmp_path, lambda params: None, callback_hosts=["Hooks.internal"])
+
+    assert queue.submit("a", {}, callback_url="http://hooks.internal/done")
+    with pytest.raises(AppException):
+        queue.submit("b", {}, callback_url="https://example.com/hook")
@@ -0,0 +1,47 @@
+"""Unit tests for the incremental JSON parser."""
+import json
+
+from app.services.json_stream import JSONStreamParser
+
+DOCUMENT = {
+    "overview": 'Says "hi" \\ and 你好',
+    "prerequisites": ["Python", "Git"],
+    "modules": [
+        {"id": "module-1", "nested": [1, {"a": None}], "minutes": 30},
+        {"id": "module-2", "ratio": -1.5e3, "optional": True},
+    ],
+    "steps": [],
+}
+
+
+def test_values_reported_when_complete() -> None:
+    """Items are reported as they close, followed by their container."""
+    parser = JSONStreamParser(max_depth=2)
+    events = []
+    for char in json.dumps(DOCUMENT, indent=2):
+        events.extend(parser.feed(char))
+
+    assert events == [
+        (("overview",), DOCUMENT["overview"]),
+        (("prerequisites", 0), "Python"),
+        (("prerequisites", 1), "Git"),
+        (("prerequisites",), ["Python", "Git"]),
+        (("modules", 0), DOCUMENT["modules"][0]),
+        (("modules", 1), DOCUMENT["modules"][1]),
+        (("modules",), DOCUMENT["modules"]),
+        (("steps",), []),
+    ]
+
+
+def test_item_reported_by_the_chunk_that_closes_it() -> None:
+    """Nothing is reported for a value until its last character arrives."""
+    parser = JSONStreamParser(max_depth=2)
+
+    assert parser.feed('{"modules": [{"id": "m') == []
+    assert parser.feed('1"}') == [(("modules", 0), {"id": "m1"})]
+    assert parser.feed(', {"id": 2') == []
+    assert parser.feed("}]}") == [
+        (("modules", 1), {"id": 2}),
+        (("modules",), [{"id": "m1"}, {"id": 2}]),
+    ]
+    assert json.loads(parser.text) == {"modules": [{"id": "m1"}, {"id": 2}]}
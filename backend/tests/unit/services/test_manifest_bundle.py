@@ -0,0 +1,86 @@
+"""Unit tests for the shared manifest bundle."""
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from app.services import manifest_bundle
+from app.services.manifest_bundle import MANIFEST_FILES, ManifestBundle
+from app.services.qa_service import QAService
+
+REPO_URL = "https://github.com/owner/demo"
+SHA = "c" * 40
+
+
+@pytest.fixture
+def fetches(monkeypatch: pytest.MonkeyPatch) -> List[List[str]]:
+    """Record manifest batch fetches and isolate the shared bundles."""
+    calls: List[List[str]] = []
+
+    def get_multiple_files(
+        repo_url: str,
+        file_paths: List[str],
+        use_cache: bool = True,
+        ref: Optional[str] = None,
+    ) -> Dict[str, str]:
+        calls.append(file_paths)
+        files = {
+            "package.json": '{"dependencies": {"react": "18"}}',
+            "README.md": "# demo",
+        }
+        return {path: files[path] for path in file_paths if path in files}
+
+    monkeypatch.setattr(
+        manifest_bundle.repository_service, "get_multiple_files", get_multiple_files
+    )
+    monkeypatch.setattr(ManifestBundle, "_shared", ManifestBundle._shared.__class__())
+    return calls
+
+
+def test_parsed_once_and_shared_per_commit(fetches: List[List[str]]) -> None:
+    """All consumers of a commit get one bundle; parsing happens once."""
+    bundle = ManifestBundle.load(REPO_URL, SHA)
+
+    assert ManifestBundle.load(REPO_URL, SHA) is bundle
+    assert fetches == [MANIFEST_FILES]
+    assert bundle.package_json is bundle.package_json
+    assert bundle.package_dependencies == {"react"}
+    assert bundle.requirements is None
+    assert "package.json" in bundle and "go.mod" not in bundle
+
+
+def test_unpinned_bundles_are_not_shared(fetches: List[List[str]]) -> None:
+    """Without a commit SHA the contents may change, so every load fetches."""
+    ManifestBundle.load(REPO_URL)
+    ManifestBundle.load(REPO_URL)
+
+    assert len(fetches) == 2
+
+
+def test_shared_bundles_are_bounded(
+    fetches: List[List[str]], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """The least recently used bundle is dropped beyond MAX_SHARED."""
+    monkeypatch.setattr(ManifestBundle, "MAX_SHARED", 2)
+    first = ManifestBundle.from_files(REPO_URL, {}, "1" * 40)
+    ManifestBundle.from_files(REPO_URL, {}, "2" * 40)
+    ManifestBundle.from_files(REPO_URL, {}, "3" * 40)
+
+    assert ManifestBundle.load(REPO_URL, "3" * 40) is not first
+    assert fetches == []
+    ManifestBundle.load(REPO_URL, "1" * 40)
+    assert fetches == [MANIFEST_FILES]
+
+
+def test_qa_key_files_reuse_bundle(fetches: List[List[str]]) -> None:
+    """QA only fetches key files that are not manifests."""
+    bundle = ManifestBundle.from_files(
+        REPO_URL, {"package.json": '{"name": "demo"}'}, SHA
+    )
+    analysis: Dict[str, Any] = {
+        "key_files": [{"path": "package.json"}, {"path": "pyproject.toml"}]
+    }
+
+    contents = QAService()._fetch_key_file_contents(REPO_URL, analysis, {}, bundle, SHA)
+
+    assert contents == {"README.md": "# demo", "package.json": '{"name": "demo"}'}
+    assert fetches == [["README.md"]]
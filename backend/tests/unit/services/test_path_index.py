@@ -0,0 +1,102 @@
+"""Unit tests for the sorted path index."""
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from app.services import path_index
+from app.services.path_index import PathIndex
+
+REPO_URL = "https://github.com/owner/demo"
+SHA = "d" * 40
+
+PATHS = [
+    "README.md",
+    "setup.py",
+    "src/app.py",
+    "src/app_test.py",
+    "src/pkg/__init__.py",
+    "src/pkg/Model.PY",
+    "src/pkg/data.json",
+    "src-old/app.py",
+    "docs/index.md",
+    ".gitignore",
+]
+
+
+@pytest.fixture
+def index() -> PathIndex:
+    return PathIndex(PATHS)
+
+
+def test_membership_and_directories(index: PathIndex) -> None:
+    """Files are members; directories exist only through the files below them."""
+    assert "src/pkg/data.json" in index
+    assert "src/pkg" not in index
+    assert index.is_dir("src/pkg")
+    assert index.is_dir("src/")
+    assert not index.is_dir("src/app.py")
+    assert len(index) == len(PATHS)
+
+
+def test_under_does_not_match_sibling_prefixes(index: PathIndex) -> None:
+    """A directory query excludes siblings that merely share a name prefix."""
+    assert index.under("src") == [
+        "src/app.py",
+        "src/app_test.py",
+        "src/pkg/Model.PY",
+        "src/pkg/__init__.py",
+        "src/pkg/data.json",
+    ]
+    assert index.under() == sorted(PATHS)
+
+
+def test_extension_queries(index: PathIndex) -> None:
+    """Extensions are case-insensitive and can be limited to a directory."""
+    assert index.with_extension(".py", "src/pkg") == [
+        "src/pkg/Model.PY",
+        "src/pkg/__init__.py",
+    ]
+    assert index.with_extension("md") == ["README.md", "docs/index.md"]
+    assert index.with_extension(".py", "missing") == []
+    assert index.extension_counts() == {".py": 6, ".md": 2, ".json": 1}
+
+
+@pytest.mark.parametrize(
+    "pattern, expected",
+    [
+        ("*.md", ["README.md"]),
+        ("**/*.md", ["README.md", "docs/index.md"]),
+        ("src/*.py", ["src/app.py", "src/app_test.py"]),
+        ("src/**/*.py", ["src/app.py", "src/app_test.py", "src/pkg/__init__.py"]),
+        ("src/app?test.py", ["src/app_test.py"]),
+        ("src*/app.py", ["src-old/app.py", "src/app.py"]),
+        ("src/pkg/[!_]*", ["src/pkg/Model.PY", "src/pkg/data.json"]),
+        ("setup.py", ["setup.py"]),
+        ("src", []),
+    ],
+)
+def test_glob(index: PathIndex, pattern: str, expected: List[str]) -> None:
+    """Single stars stay within a segment; double stars cross directories."""
+    assert index.glob(pattern) == expected
+
+
+def test_load_shares_index_per_commit(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The listing of a commit is fetched once; unpinned loads are not shared."""
+    calls: List[Optional[str]] = []
+
+    def get_file_paths(
+        repo_url: str, use_cache: bool = True, ref: Optional[str] = None
+    ) -> Dict[str, Any]:
+        calls.append(ref)
+        return {"paths": PATHS, "truncated": True}
+
+    monkeypatch.setattr(path_index.repository_service, "get_file_paths", get_file_paths)
+    monkeypatch.setattr(PathIndex, "_shared", PathIndex._shared.__class__())
+
+    first = PathIndex.load(REPO_URL, SHA)
+    assert PathIndex.load(REPO_URL, SHA) is first
+    assert first.truncated
+
+    PathIndex.load(REPO_URL)
+    PathIndex.load(REPO_URL)
+    assert calls == [SHA, None, None]
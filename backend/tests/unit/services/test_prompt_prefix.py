@@ -0,0 +1,99 @@
+"""Unit tests for stable prompt prefixes."""
+from typing import Any, Dict, List
+
+import pytest
+
+from app.services import qa_prompt_builder
+from app.services.ai_generator import TUTORIAL_INSTRUCTIONS, PromptBuilder
+from app.services.prompt_prefix import PrefixStats
+from app.services.qa_prompt_builder import QAPromptBuilder
+
+
+def _analysis(primary_type: str) -> Dict[str, Any]:
+    return {
+        "project_type": {"primary_type": primary_type, "language": "Python"},
+        "structure": {"total_directories": 2, "key_directories": [{"name": "src"}]},
+        "dependencies": {"package_manager": "pip", "core_dependencies": ["fastapi"]},
+    }
+
+
+def test_tutorial_prompts_share_instruction_prefix() -> None:
+    """Project data only follows the fixed instructions and schema."""
+    first = PromptBuilder.build_tutorial_layout(
+        {"name": "demo", "owner": "owner", "stars": 10}, _analysis("web")
+    )
+    second = PromptBuilder.build_tutorial_layout(
+        {"name": "tool", "owner": "other", "stars": 99}, _analysis("cli")
+    )
+
+    assert first.prefix == second.prefix == TUTORIAL_INSTRUCTIONS
+    assert '"steps": [' in first.prefix
+    assert '"filePath"' in first.prefix and '"codeSnippet"' in first.prefix
+    assert "## 关键文件\n- README.md\n" in first.body
+    assert first.prompt == first.prefix + first.body
+    assert first.body.startswith("## 项目信息\n- 名称: demo")
+    assert "web项目特点" in first.body and "cli项目特点" in second.body
+    prompt = PromptBuilder.build_tutorial_prompt(
+        {"name": "demo", "owner": "owner", "stars": 10}, _analysis("web")
+    )
+    assert prompt == first.prompt
+
+
+def test_prefix_stats_counts_repeated_prefixes() -> None:
+    """Hits are counted per prompt kind; a prefix is a hit once seen."""
+    stats = PrefixStats()
+
+    assert not stats.record("tutorial", "instructions")
+    assert stats.record("tutorial", "instructions")
+    assert not stats.record("qa", "instructions")
+    assert stats.record("tutorial", "instructions")
+
+    assert stats.get_stats() == {
+        "tutorial": {"requests": 3, "hits": 2, "hit_rate": 0.6667},
+        "qa": {"requests": 1, "hits": 0, "hit_rate": 0.0},
+    }
+
+
+def test_qa_system_message_ignores_budgeted_context(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """File contents and chunks vary per question; the system message does not."""
+    monkeypatch.setattr(qa_prompt_builder, "prefix_stats", PrefixStats())
+    builder = QAPromptBuilder()
+    analysis = {
+        **_analysis("web"),
+        "structure": {"total_directories": 2, "key_directories": [{"path": "app"}]},
+        "key_files": [{"path": "app/main.py", "description": "entry"}],
+    }
+
+    def build(budget: int, **kwargs: Any) -> List[Dict[str, str]]:
+        monkeypatch.setattr(
+            qa_prompt_builder.settings, "qa_prompt_token_budget", budget
+        )
+        return builder.build_messages(
+            question="How are sessions created?",
+            question_analysis={"entities": []},
+            repo_info={"owner": "owner", "name": "demo", "stars": 10},
+            analysis=analysis,
+            **kwargs,
+        )
+
+    readme_only = build(8000, file_contents={"README.md": "# Demo\n" * 500})
+    with_code = build(
+        2000,
+        file_contents={"README.md": "# Demo\n" * 500, "app/main.py": "app = 1\n"},
+        code_chunks=[
+            {
+                "path": "app/session.py",
+                "start_line": 1,
+                "end_line": 2,
+                "content": "def create_session(user):\n    pass",
+            }
+        ],
+    )
+
+    assert readme_only[0] == with_code[0]
+    assert "## Important Files\n- `app/main.py` - entry" in readme_only[0]["content"]
+    assert "# Demo" not in readme_only[0]["content"]
+    assert readme_only[-1] != with_code[-1]
+    assert qa_prompt_builder.prefix_stats.get_stats()["qa"]["hits"] == 1
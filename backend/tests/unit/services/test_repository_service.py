@@ -0,0 +1,115 @@
+"""Unit tests for RepositoryService fetching and caching."""
+import asyncio
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from app.core.exceptions import AppException
+from app.services import repository_service
+from app.services.cache_backends import FileBackend
+from app.services.cache_manager import CacheManager
+from app.services.repository_service import RepositoryService
+
+REPO_URL = "https://github.com/owner/demo"
+
+
+def test_get_multiple_files_runs_concurrently() -> None:
+    """Files are fetched in parallel, deduplicated, and failures are skipped."""
+    service = RepositoryService()
+    calls = []
+    lock = threading.Lock()
+
+    def fake_fetch(repo_url: str, file_path: str, ref: Optional[str] = None) -> str:
+        with lock:
+            calls.append(file_path)
+        time.sleep(0.2)
+        if file_path == "missing.txt":
+            raise AppException("FILE_NOT_FOUND", "File not found", 404)
+        return f"content of {file_path}"
+
+    service.github_client.get_file_content = fake_fetch  # type: ignore[assignment]
+    paths = ["a.txt", "b.txt", "c.txt", "d.txt", "a.txt", "missing.txt"]
+
+    started = time.monotonic()
+    results = service.get_multiple_files(REPO_URL, paths, use_cache=False)
+    elapsed = time.monotonic() - started
+
+    assert sorted(calls) == ["a.txt", "b.txt", "c.txt", "d.txt", "missing.txt"]
+    assert results == {
+        p: f"content of {p}" for p in ["a.txt", "b.txt", "c.txt", "d.txt"]
+    }
+    # Five 0.2s fetches would take 1s sequentially
+    assert elapsed < 0.6
+
+
+def test_stale_repo_info_is_served_and_refreshed_once(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Any
+) -> None:
+    """An expired entry within the stale window is returned immediately and
+    refreshed by a single background fetch."""
+    test_cache = CacheManager(backends=[FileBackend(str(tmp_path))])
+    test_cache.enabled = True
+    monkeypatch.setattr(repository_service, "cache", test_cache)
+    monkeypatch.setattr(repository_service.settings, "cache_stale_ttl", 3600)
+
+    service = RepositoryService()
+    fetched = threading.Event()
+    calls = []
+
+    def fake_repo_info(repo_url: str) -> Dict[str, Any]:
+        calls.append(repo_url)
+        time.sleep(0.1)
+        fetched.set()
+        return {"stars": 2}
+
+    service.github_client.get_repo_info = fake_repo_info  # type: ignore[assignment]
+    test_cache.set(f"repo_info:{REPO_URL}", {"stars": 1}, ttl=-1)
+
+    assert service.get_repository_info(REPO_URL) == {"stars": 1}
+    assert service.get_repository_info(REPO_URL) == {"stars": 1}
+    assert fetched.wait(2)
+    service._executor.shutdown(wait=True)
+
+    assert calls == [REPO_URL]
+    assert test_cache.get(f"repo_info:{REPO_URL}") == {"stars": 2}
+    assert test_cache.get_stats()["stale_hits"] == 2
+
+
+def test_async_reads_access_the_cache_off_the_event_loop(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Any
+) -> None:
+    """Disk-backed cache tiers are read and written from worker threads."""
+
+    class RecordingCache(CacheManager):
+        def __init__(self) -> None:
+            super().__init__(backends=[FileBackend(str(tmp_path))])
+            self.enabled = True
+            self.threads: List[threading.Thread] = []
+
+        def get(self, key: str) -> Optional[Any]:
+            self.threads.append(threading.current_thread())
+            return super().get(key)
+
+        def set(self, key: str, value: Any, *args: Any, **kwargs: Any) -> bool:
+            self.threads.append(threading.current_thread())
+            return super().set(key, value, *args, **kwargs)
+
+    test_cache = RecordingCache()
+    monkeypatch.setattr(repository_service, "cache", test_cache)
+    service = RepositoryService()
+
+    async def get_commit_sha(repo_url: str) -> str:
+        return "abc123"
+
+    service.async_github_client.get_commit_sha = get_commit_sha  # type: ignore
+
+    async def run() -> str:
+        first = await service.get_head_sha_async(REPO_URL)
+        assert await service.get_head_sha_async(REPO_URL) == first
+        return first
+
+    assert asyncio.run(run()) == "abc123"
+    assert len(test_cache.threads) == 3
+    assert threading.main_thread() not in test_cache.threads
@@ -0,0 +1,67 @@
+"""Unit tests for single-flight call coalescing."""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution() -> None:
+    """Threads asking for the same key get one call's result; other keys run."""
+    flight = SingleFlight()
+    calls = []
+    lock = threading.Lock()
+
+    def fetch(key: str) -> str:
+        with lock:
+            calls.append(key)
+        time.sleep(0.2)
+        return f"value of {key}"
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [
+            executor.submit(flight.do, key, fetch, key) for key in ["a"] * 6 + ["b"]
+        ]
+        results = [f.result() for f in futures]
+
+    assert sorted(calls) == ["a", "b"]
+    assert results == ["value of a"] * 6 + ["value of b"]
+
+    # The key is released afterwards
+    flight.do("a", fetch, "a")
+    assert calls.count("a") == 2
+
+
+def test_errors_are_shared_with_waiters() -> None:
+    """Every caller of a failing flight sees the exception."""
+    flight = SingleFlight()
+
+    def fail() -> None:
+        time.sleep(0.1)
+        raise ValueError("boom")
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(flight.do, "k", fail) for _ in range(3)]
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result()
+
+
+def test_async_calls_share_one_task() -> None:
+    """Coroutines awaiting the same key share one task."""
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch() -> int:
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 42
+
+    async def main() -> list:
+        return await asyncio.gather(*(flight.do_async("k", fetch) for _ in range(5)))
+
+    assert asyncio.run(main()) == [42] * 5
+    assert len(calls) == 1
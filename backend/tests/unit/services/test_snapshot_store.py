@@ -0,0 +1,166 @@
+"""Unit tests for tarball snapshot ingestion."""
+import io
+import json
+import os
+import tarfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from app.core.exceptions import AppException
+from app.services.repository_service import RepositoryService
+from app.services.snapshot_store import SnapshotStore
+
+COMMIT = "abc123"
+FILES = {
+    "README.md": b"# Demo\n",
+    "src/main.py": b"print('hello')\n",
+    "src/util/helpers.py": b"def helper():\n    return 1\n",
+}
+
+
+def _build_tarball() -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+        for path, data in FILES.items():
+            info = tarfile.TarInfo(f"owner-demo-{COMMIT}/{path}")
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def codeload_server() -> Iterator[str]:
+    """Serve a fixture tarball the way codeload.github.com does.
+
+    Yields:
+        Base URL of the stub server
+    """
+    tarball = _build_tarball()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path != f"/owner/demo/tar.gz/{COMMIT}":
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-gzip")
+            self.end_headers()
+            self.wfile.write(tarball)
+
+        def log_message(self, *args: object) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_download_and_read(tmp_path: Path, codeload_server: str) -> None:
+    """Files and directories are served from the extracted snapshot."""
+    store = SnapshotStore(str(tmp_path), codeload_base_url=codeload_server)
+    store.download("owner", "demo", COMMIT)
+
+    assert store.has_snapshot("owner", "demo", COMMIT)
+    assert store.read_file("owner", "demo", COMMIT, "src/main.py") == "print('hello')\n"
+
+    tree = store.get_tree("owner", "demo", COMMIT, max_depth=2)
+    assert [node["path"] for node in tree] == ["README.md", "src"]
+    assert [child["path"] for child in tree[1]["children"]] == [
+        "src/main.py",
+        "src/util",
+    ]
+
+    with pytest.raises(AppException) as exc_info:
+        store.read_file("owner", "demo", COMMIT, "missing.txt")
+    assert exc_info.value.error_code == "FILE_NOT_FOUND"
+
+
+def test_repository_service_serves_from_snapshot(
+    tmp_path: Path, codeload_server: str
+) -> None:
+    """With a snapshot in place, file reads make no GitHub API calls."""
+    service = RepositoryService()
+    service.snapshot_store = SnapshotStore(
+        str(tmp_path), codeload_base_url=codeload_server
+    )
+    service.get_head_sha = lambda repo_url, use_cache=True: COMMIT  # type: ignore
+
+    def no_api(*args: object, **kwargs: object) -> None:
+        raise AssertionError("GitHub API should not be called")
+
+    service.github_client.get_file_content = no_api  # type: ignore[assignment]
+    service.github_client.get_directory_tree = no_api  # type: ignore[assignment]
+
+    repo_url = "https://github.com/owner/demo"
+    files = service.get_multiple_files(repo_url, ["README.md", "src/util/helpers.py"])
+
+    assert files == {
+        "README.md": "# Demo\n",
+        "src/util/helpers.py": "def helper():\n    return 1\n",
+    }
+    assert service.get_repository_tree(repo_url, max_depth=1)[1]["children"] == []
+
+
+def test_concurrent_downloads_of_one_commit_share_a_download(
+    tmp_path: Path, codeload_server: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Parallel downloads of the same commit fetch the tarball once."""
+    store = SnapshotStore(str(tmp_path), codeload_base_url=codeload_server)
+    extract = store._extract
+    calls = []
+
+    def slow_extract(fileobj: object) -> object:
+        calls.append(fileobj)
+        time.sleep(0.1)
+        return extract(fileobj)
+
+    monkeypatch.setattr(store, "_extract", slow_extract)
+    threads = [
+        threading.Thread(target=store.download, args=("owner", "demo", COMMIT))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert store.has_snapshot("owner", "demo", COMMIT)
+
+
+def test_collect_garbage_removes_old_snapshots_and_orphans(
+    tmp_path: Path, codeload_server: str
+) -> None:
+    """Expired snapshots go, and with them objects no other snapshot uses."""
+    store = SnapshotStore(str(tmp_path), codeload_base_url=codeload_server)
+    store.download("owner", "demo", COMMIT)
+    # A second snapshot of another commit sharing README.md
+    manifest = store.get_manifest("owner", "demo", COMMIT)
+    kept = {
+        "commit": "def456",
+        "entries": {"README.md": manifest["entries"]["README.md"]},
+    }
+    kept_path = store._manifest_path("owner", "demo", "def456")
+    kept_path.write_text(json.dumps(kept), encoding="utf-8")
+    old = time.time() - 3600
+    os.utime(store._manifest_path("owner", "demo", COMMIT), (old, old))
+
+    assert store.collect_garbage(max_age=600, max_bytes=0) == {
+        "snapshots": 1,
+        "objects": 2,
+        "bytes_reclaimed": len(FILES["src/main.py"])
+        + len(FILES["src/util/helpers.py"]),
+    }
+    assert not store.has_snapshot("owner", "demo", COMMIT)
+    assert store.read_file("owner", "demo", "def456", "README.md") == "# Demo\n"
+
+    # Over the size limit, older snapshots go but the newest one stays
+    assert store.collect_garbage(max_age=0, max_bytes=1)["snapshots"] == 0
+    assert store.has_snapshot("owner", "demo", "def456")
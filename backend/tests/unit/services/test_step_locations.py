@@ -0,0 +1,48 @@
+"""Unit tests for verifying AI-generated step locations."""
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from app.services import ai_generator
+from app.services.ai_generator import tutorial_generator
+from app.services.file_store import LineIndexedFile
+
+REPO_URL = "https://github.com/owner/demo"
+
+README = b"# Demo\n\nInstall with pip.\nRun demo serve.\n"
+
+
+def test_steps_with_malformed_file_paths_are_left_alone(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A non-string filePath is skipped; the other steps are still corrected."""
+    requested: List[List[str]] = []
+
+    def get_many(
+        repo_url: str, file_paths: List[str], ref: Optional[str] = None
+    ) -> Dict[str, LineIndexedFile]:
+        requested.append(file_paths)
+        return {"README.md": LineIndexedFile(README)}
+
+    monkeypatch.setattr(ai_generator.file_store, "get_many", get_many)
+    steps: List[Dict[str, Any]] = [
+        {
+            "id": "step-1",
+            "filePath": "README.md",
+            "lineStart": 1,
+            "lineEnd": 2,
+            "codeSnippet": "Run demo serve.",
+        },
+        {"id": "step-2", "filePath": ["README.md", "setup.py"]},
+    ]
+
+    tutorial = tutorial_generator._post_process(
+        {"steps": steps}, {"name": "demo"}, {}, REPO_URL, "a" * 40
+    )
+
+    assert requested == [["README.md"]]
+    first, second = tutorial["steps"]
+    assert (first["lineStart"], first["lineEnd"]) == (4, 4)
+    assert first["codeSnippet"] == "Run demo serve."
+    assert second["filePath"] == ["README.md", "setup.py"]
+    assert second["codeSnippet"] == "# 查看项目文档"
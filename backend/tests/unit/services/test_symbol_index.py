@@ -0,0 +1,167 @@
+"""Unit tests for symbol extraction and the per-commit symbol index."""
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from app.services import code_search, qa_service, symbol_index
+from app.services.cache_manager import CacheManager
+from app.services.code_indexer import CodeIndexer
+from app.services.code_search import CodeSearchIndex
+from app.services.file_store import file_store
+from app.services.path_index import PathIndex
+from app.services.qa_service import QAService
+from app.services.symbol_index import SymbolIndex, extract_symbols
+
+REPO_URL = "https://github.com/owner/demo"
+SHA = "f" * 40
+
+PYTHON_SOURCE = """import functools
+
+
+@functools.total_ordering
+class SessionStore:
+    def add(self, user):
+        return user
+
+    async def remove(self, user):
+        pass
+
+
+def create_session(user):
+    return SessionStore().add(user)
+"""
+
+TS_SOURCE = """export default function App() {
+  const brace = "}";
+  return brace;
+}
+
+export const useAuth = async (token: string) => {
+  return token;
+};
+
+class Store {
+  load(id) {
+    if (id) {
+      return 1;
+    }
+  }
+}
+"""
+
+GO_SOURCE = """package main
+
+type Server struct {
+	addr string
+}
+
+func (s *Server) Start() error {
+	return nil
+}
+"""
+
+
+def test_python_definitions_use_ast_spans() -> None:
+    """Spans include decorators and end at the last line; methods know their class."""
+    assert extract_symbols("app/session.py", PYTHON_SOURCE) == [
+        ("SessionStore", "class", "app/session.py", 4, 10, ""),
+        ("add", "method", "app/session.py", 6, 7, "SessionStore"),
+        ("remove", "method", "app/session.py", 9, 10, "SessionStore"),
+        ("create_session", "function", "app/session.py", 13, 14, ""),
+    ]
+
+
+def test_brace_languages_end_at_closing_brace() -> None:
+    """Pattern-based spans skip braces in strings and nested blocks."""
+    assert extract_symbols("src/App.tsx", TS_SOURCE) == [
+        ("App", "function", "src/App.tsx", 1, 4, ""),
+        ("useAuth", "function", "src/App.tsx", 6, 8, ""),
+        ("Store", "class", "src/App.tsx", 10, 16, ""),
+        ("load", "method", "src/App.tsx", 11, 15, ""),
+    ]
+    assert extract_symbols("main.go", GO_SOURCE) == [
+        ("Server", "type", "main.go", 3, 5, ""),
+        ("Start", "method", "main.go", 7, 9, ""),
+    ]
+
+
+def test_lookup_is_case_insensitive_and_scoped() -> None:
+    """Names match case-insensitively; Class.method narrows to a container."""
+    index = SymbolIndex.build(
+        {"app/session.py": PYTHON_SOURCE, "app/cart.py": "def add(item):\n    pass\n"}
+    )
+
+    assert [d["path"] for d in index.lookup("ADD")] == ["app/cart.py", "app/session.py"]
+    assert index.lookup("SessionStore.add") == [
+        {
+            "name": "add",
+            "kind": "method",
+            "path": "app/session.py",
+            "start_line": 6,
+            "end_line": 7,
+            "container": "SessionStore",
+        }
+    ]
+    assert index.lookup("missing") == []
+
+
+@pytest.fixture
+def fake_repo(monkeypatch: pytest.MonkeyPatch, tmp_path: Any) -> List[List[str]]:
+    """Serve one Python file from an in-memory repo with an isolated cache."""
+    fetched: List[List[str]] = []
+    files = {"app/session.py": PYTHON_SOURCE}
+    service = code_search.repository_service
+
+    def get_file_paths(
+        repo_url: str, use_cache: bool = True, ref: Optional[str] = None
+    ) -> Dict[str, Any]:
+        return {"paths": list(files), "truncated": False}
+
+    def get_multiple_files(
+        repo_url: str,
+        file_paths: List[str],
+        use_cache: bool = True,
+        ref: Optional[str] = None,
+    ) -> Dict[str, str]:
+        fetched.append(file_paths)
+        return {path: files[path] for path in file_paths if path in files}
+
+    monkeypatch.setattr(service, "get_file_paths", get_file_paths)
+    monkeypatch.setattr(service, "get_multiple_files", get_multiple_files)
+    monkeypatch.setattr(PathIndex, "_shared", PathIndex._shared.__class__())
+    monkeypatch.setattr(SymbolIndex, "_shared", SymbolIndex._shared.__class__())
+    monkeypatch.setattr(CodeSearchIndex, "_shared", CodeSearchIndex._shared.__class__())
+    monkeypatch.setattr(file_store, "_files", file_store._files.__class__())
+    monkeypatch.setattr(file_store, "_bytes", 0)
+    test_cache = CacheManager(cache_dir=str(tmp_path))
+    test_cache.enabled = True
+    monkeypatch.setattr(symbol_index, "cache", test_cache)
+    monkeypatch.setattr(code_search, "cache", test_cache)
+    return fetched
+
+
+def test_qa_cites_definitions_of_mentioned_symbols(
+    fake_repo: List[List[str]], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Entities in the question resolve to definitions with real line ranges."""
+    indexer = CodeIndexer()
+    monkeypatch.setattr(qa_service, "code_indexer", indexer)
+    service = QAService()
+    question_analysis = {"keywords": [], "entities": {"create_session"}}
+
+    # Both indexes come from one background fetch of the source files
+    assert service._find_definitions(REPO_URL, question_analysis, SHA) == []
+    indexer._executor.shutdown(wait=True)
+    assert fake_repo == [["app/session.py"]]
+    assert CodeSearchIndex.peek(REPO_URL, SHA) is not None
+
+    definitions = service._find_definitions(REPO_URL, question_analysis, SHA)
+    references = service._create_references({}, definitions)
+
+    assert definitions[0]["content"].startswith("def create_session(user):")
+    assert references[0].file_path == "app/session.py"
+    assert (references[0].start_line, references[0].end_line) == (13, 14)
+
+    # Later lookups reuse the index and the line-indexed file
+    service._find_definitions(REPO_URL, question_analysis, SHA)
+    assert fake_repo.count(["app/session.py"]) == 2
@@ -0,0 +1,180 @@
+"""Unit tests for token counting and budgeted prompt assembly."""
+from typing import Any, Dict, List
+
+import pytest
+
+from app.schemas.qa import ChatMessage
+from app.services import qa_prompt_builder, token_budget
+from app.services.prompt_prefix import PrefixStats
+from app.services.qa_prompt_builder import QAPromptBuilder
+from app.services.token_budget import (
+    TRUNCATION_MARKER,
+    ContextPiece,
+    TokenCounter,
+    pack,
+)
+
+
+@pytest.fixture
+def counter(monkeypatch: pytest.MonkeyPatch) -> TokenCounter:
+    """A counter using the character estimate, whether or not tiktoken exists."""
+    monkeypatch.setattr(token_budget, "tiktoken", None)
+    return TokenCounter("gpt-4-turbo-preview")
+
+
+def test_estimate_counts_cjk_per_character(counter: TokenCounter) -> None:
+    """ASCII is estimated at four characters per token, CJK at one each."""
+    assert not counter.exact
+    assert counter.count("") == 0
+    assert counter.count("abcd" * 10) == 10
+    assert counter.count("读取配置") == 4
+    assert counter.count("abcd读取") == 3
+
+
+def test_counts_are_cached(
+    counter: TokenCounter, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Counting the same text again does not tokenize it again."""
+    calls: List[str] = []
+    count = counter._count
+
+    def counting(text: str) -> int:
+        calls.append(text)
+        return count(text)
+
+    monkeypatch.setattr(counter, "_count", counting)
+    assert counter.count("x" * 400) == counter.count("x" * 400) == 100
+    assert len(calls) == 1
+
+
+def test_truncate_cuts_at_line_break(counter: TokenCounter) -> None:
+    """Truncated text fits the limit and ends at a complete line."""
+    text = "\n".join(f"line number {i:03d}" for i in range(100))
+
+    cut = counter.truncate(text, 50)
+    assert counter.count(cut) <= 50
+    assert cut.endswith("line number 011")
+    assert counter.truncate(text, 10_000) == text
+    assert counter.truncate(text, 0) == ""
+
+
+def test_pack_prefers_priority_and_fills_gaps(counter: TokenCounter) -> None:
+    """Lower-priority pieces that still fit are packed after a skipped one."""
+    pieces = [
+        ContextPiece(key="small", content="a" * 40, priority=1),
+        ContextPiece(key="large", content="b" * 400, priority=5),
+        ContextPiece(key="best", content="c" * 200, priority=9, prefix="## C\n"),
+    ]
+
+    packed = pack(pieces, 70, counter)
+    assert list(packed) == ["best", "small"]
+    assert packed["best"] == "## C\n" + "c" * 200
+
+
+def test_pack_truncates_and_respects_requires(counter: TokenCounter) -> None:
+    """Truncatable pieces shrink to fit; dependent pieces follow their parent."""
+    pieces = [
+        ContextPiece(key="file", content="x\n" * 400, priority=5, min_tokens=20),
+        ContextPiece(key="new", content="n" * 400, priority=4),
+        ContextPiece(key="old", content="o" * 4, priority=3, requires="new"),
+    ]
+
+    packed = pack(pieces, 100, counter)
+    assert list(packed) == ["file"]
+    assert packed["file"].endswith(TRUNCATION_MARKER)
+    assert counter.count(packed["file"]) <= 100
+
+
+def _build(
+    monkeypatch: pytest.MonkeyPatch, budget: int, **kwargs: Any
+) -> List[Dict[str, str]]:
+    monkeypatch.setattr(token_budget, "tiktoken", None)
+    monkeypatch.setattr(qa_prompt_builder.settings, "qa_prompt_token_budget", budget)
+    builder = QAPromptBuilder()
+    builder.system_prompt = "You answer questions."
+    return builder.build_messages(
+        question="How are sessions created?",
+        question_analysis={"entities": ["create_session"]},
+        repo_info={"owner": "owner", "name": "demo", "stars": 10},
+        analysis={
+            "project_type": {"language": "Python", "primary_type": "web"},
+            "structure": {"total_directories": 3},
+            "key_files": [{"path": "app/main.py", "description": "entry"}],
+        },
+        **kwargs,
+    )
+
+
+def test_builder_keeps_question_and_drops_low_value_context(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Within a tight budget, old history is dropped and files truncated."""
+    history = [
+        ChatMessage(role="user", content="old question " * 100),
+        ChatMessage(role="assistant", content="old answer " * 100),
+        ChatMessage(role="user", content="What is demo?"),
+        ChatMessage(role="assistant", content="A web app."),
+    ]
+    chunks = [
+        {
+            "path": "app/session.py",
+            "start_line": 13,
+            "end_line": 14,
+            "content": "def create_session(user):\n    return Session(user)",
+            "symbol": "create_session",
+        }
+    ]
+
+    messages = _build(
+        monkeypatch,
+        400,
+        file_contents={"README.md": "# Demo\n" + "Long readme text.\n" * 200},
+        history=history,
+        code_chunks=chunks,
+    )
+    user_message = messages[-1]["content"]
+
+    assert [m["content"] for m in messages[1:-1]] == ["What is demo?", "A web app."]
+    assert "definition of `create_session`" in user_message
+    assert "## User's Question\nHow are sessions created?" in user_message
+    assert "Long readme text." in user_message
+    assert user_message.count("Long readme text.") < 200
+    assert "(content truncated)" in user_message
+
+
+def test_builder_includes_everything_within_a_large_budget(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """With room to spare, all sections appear in their usual order."""
+    messages = _build(
+        monkeypatch, 100_000, file_contents={"README.md": "# Demo"}, history=[]
+    )
+    prompt = "\n".join(message["content"] for message in messages)
+
+    assert len(messages) == 2
+    sections = [
+        "You answer questions.",
+        "## Repository Context",
+        "## Project Structure",
+        "## Important Files",
+        "## Relevant File Contents",
+        "### File: `README.md`\n```\n# Demo\n```",
+        "## User's Question",
+    ]
+    positions = [prompt.index(section) for section in sections]
+    assert positions == sorted(positions)
+    assert messages[1]["content"].startswith("## Relevant File Contents")
+
+
+def test_builder_system_message_is_shared_across_questions(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Questions about one commit share the system message as a cached prefix."""
+    monkeypatch.setattr(qa_prompt_builder, "prefix_stats", PrefixStats())
+
+    first = _build(monkeypatch, 8000, file_contents={"README.md": "# Demo"})
+    second = _build(monkeypatch, 8000, file_contents={"README.md": "# Demo"})
+
+    assert first[0] == second[0]
+    stats = qa_prompt_builder.prefix_stats.get_stats()
+    assert stats == {"qa": {"requests": 2, "hits": 1, "hit_rate": 0.5}}
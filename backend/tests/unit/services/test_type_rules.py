@@ -0,0 +1,56 @@
+"""Unit tests for the compiled project type rule engine."""
+from typing import Dict, List, Optional, Set
+
+from app.services.code_analyzer import ProjectTypeIdentifier
+from app.services.type_rules import TypeRuleEngine
+
+ENGINE = TypeRuleEngine(ProjectTypeIdentifier.TYPE_PATTERNS)
+
+
+def match(
+    files: Set[str], deps: Set[str] = frozenset(), contents: Dict[str, str] = {}
+) -> List[str]:
+    return ENGINE.match(files, lambda: deps, contents.get)
+
+
+def test_dependencies_and_exclusions() -> None:
+    """Required dependencies select a type; excluded ones rule it out."""
+    assert match({"package.json"}, {"react"}) == ["React", "Node.js"]
+    assert match({"package.json"}, {"react", "gatsby"}) == ["Node.js"]
+    assert match({"package.json", "angular.json"}, {"@angular/core"}) == [
+        "Angular",
+        "Node.js",
+    ]
+
+
+def test_content_patterns_apply_only_to_existing_files() -> None:
+    """A content pattern on a missing file does not constrain the rule."""
+    assert match({"requirements.txt"}, contents={"requirements.txt": "Flask==3"}) == [
+        "Python",
+        "Flask",
+    ]
+    assert match({"setup.py"}) == ["Python", "Flask", "FastAPI"]
+    assert match({"pom.xml"}, contents={"pom.xml": "<spring-boot/>"}) == [
+        "Java",
+        "Spring Boot",
+    ]
+
+
+def test_each_input_read_at_most_once() -> None:
+    """Files are read once for all rules; dependencies only when needed."""
+    reads: List[str] = []
+    dep_loads: List[None] = []
+
+    def read_file(path: str) -> Optional[str]:
+        reads.append(path)
+        return "fastapi\nflask"
+
+    def get_dependencies() -> Set[str]:
+        dep_loads.append(None)
+        return set()
+
+    result = ENGINE.match({"requirements.txt"}, get_dependencies, read_file)
+
+    assert result == ["Python", "Flask", "FastAPI"]
+    assert reads == ["requirements.txt"]
+    assert dep_loads == []